@@ -0,0 +1,52 @@
+"""feat: add atualizado_em to topics and posts
+
+Revision ID: 4b7e1d2c9a10
+Revises: 66d59931ffb5
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1d2c9a10'
+down_revision: Union[str, Sequence[str], None] = '66d59931ffb5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'topicos',
+        sa.Column(
+            'atualizado_em',
+            sa.DateTime(),
+            server_default=sa.text('CURRENT_TIMESTAMP'),
+            nullable=False,
+        ),
+    )
+    op.create_index('ix_topicos_atualizado_em', 'topicos', ['atualizado_em'])
+
+    op.add_column(
+        'posts',
+        sa.Column(
+            'atualizado_em',
+            sa.DateTime(),
+            server_default=sa.text('CURRENT_TIMESTAMP'),
+            nullable=False,
+        ),
+    )
+    op.create_index('ix_posts_topico_atualizado', 'posts', ['topico_post_id', 'atualizado_em'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_topico_atualizado', table_name='posts')
+    op.drop_column('posts', 'atualizado_em')
+    op.drop_index('ix_topicos_atualizado_em', table_name='topicos')
+    op.drop_column('topicos', 'atualizado_em')
@@ -0,0 +1,27 @@
+"""feat: add index to posts_anexos post_id
+
+Revision ID: 5c2d8e1f7a3b
+Revises: 4b7e1d2c9a10
+Create Date: 2026-10-19 10:41:07.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e1f7a3b'
+down_revision: Union[str, Sequence[str], None] = '4b7e1d2c9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_anexos_post_id', 'posts_anexos', ['post_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_anexos_post_id', table_name='posts_anexos')
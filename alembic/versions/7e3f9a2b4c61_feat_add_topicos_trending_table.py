@@ -0,0 +1,38 @@
+"""feat: add topicos_trending table
+
+Revision ID: 7e3f9a2b4c61
+Revises: 5c2d8e1f7a3b
+Create Date: 2026-10-19 14:12:45.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3f9a2b4c61'
+down_revision: Union[str, Sequence[str], None] = '5c2d8e1f7a3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'topicos_trending',
+        sa.Column('topico_id', sa.Integer(), nullable=False),
+        sa.Column('pontuacao', sa.Float(), nullable=False),
+        sa.Column('marco', sa.BigInteger(), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['topico_id'], ['topicos.id']),
+        sa.PrimaryKeyConstraint('topico_id'),
+    )
+    op.create_index('ix_topicos_trending_marco_pontuacao', 'topicos_trending', ['marco', 'pontuacao'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_topicos_trending_marco_pontuacao', table_name='topicos_trending')
+    op.drop_table('topicos_trending')
@@ -0,0 +1,44 @@
+"""feat: add topic activity rollup tables
+
+Revision ID: 9a4c2e7d1f35
+Revises: 7e3f9a2b4c61
+Create Date: 2026-10-19 16:03:21.847330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c2e7d1f35'
+down_revision: Union[str, Sequence[str], None] = '7e3f9a2b4c61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'topicos_atividade_horaria',
+        sa.Column('topico_id', sa.Integer(), nullable=False),
+        sa.Column('hora', sa.DateTime(), nullable=False),
+        sa.Column('quantidade_posts', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['topico_id'], ['topicos.id']),
+        sa.PrimaryKeyConstraint('topico_id', 'hora'),
+    )
+    op.create_table(
+        'agregacoes_marcas',
+        sa.Column('nome', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('ultimo_id', sa.BigInteger(), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('nome'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('agregacoes_marcas')
+    op.drop_table('topicos_atividade_horaria')
@@ -0,0 +1,41 @@
+"""feat: add tokens_revogados table
+
+Revision ID: b5e8d3a1c7f2
+Revises: 9a4c2e7d1f35
+Create Date: 2026-10-19 18:12:40.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8d3a1c7f2'
+down_revision: Union[str, Sequence[str], None] = '9a4c2e7d1f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tokens_revogados',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False),
+        sa.Column('chave', sqlmodel.sql.sqltypes.AutoString(length=128), nullable=False),
+        sa.Column('revogado_em', sa.BigInteger(), nullable=False),
+        sa.Column('expira_em', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tokens_revogados_expira_em', 'tokens_revogados', ['expira_em'])
+    op.create_index('ix_tokens_revogados_revogado_em', 'tokens_revogados', ['revogado_em'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tokens_revogados_revogado_em', table_name='tokens_revogados')
+    op.drop_index('ix_tokens_revogados_expira_em', table_name='tokens_revogados')
+    op.drop_table('tokens_revogados')
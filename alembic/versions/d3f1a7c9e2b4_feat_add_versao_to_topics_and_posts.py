@@ -0,0 +1,42 @@
+"""feat: add versao to topics and posts
+
+Revision ID: d3f1a7c9e2b4
+Revises: b5e8d3a1c7f2
+Create Date: 2026-10-19 21:04:17.538120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f1a7c9e2b4'
+down_revision: Union[str, Sequence[str], None] = 'b5e8d3a1c7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'topicos',
+        sa.Column('versao', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    )
+    op.create_index('ix_topicos_versao', 'topicos', ['versao'])
+
+    op.add_column(
+        'posts',
+        sa.Column('versao', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    )
+    op.create_index('ix_posts_topico_versao', 'posts', ['topico_post_id', 'versao'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_topico_versao', table_name='posts')
+    op.drop_column('posts', 'versao')
+    op.drop_index('ix_topicos_versao', table_name='topicos')
+    op.drop_column('topicos', 'versao')
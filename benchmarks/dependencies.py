@@ -0,0 +1,140 @@
+"""
+Per-request dependency resolution of the controllers
+
+Solves the dependency graph of each controller as FastAPI does for every
+request (fastapi.dependencies.utils.solve_dependencies) and touches the
+objects a handler uses, with a stub sessionmaker, so the numbers are the
+wiring overhead only (no pool checkout, no queries).
+
+Usage:
+    python benchmarks/dependencies.py --scale 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from contextlib import AsyncExitStack
+from dataclasses import asdict
+from typing import Any, Callable, List, Optional
+
+os.environ.setdefault("TESTING", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position
+from fastapi import Depends
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
+from starlette.requests import Request
+
+from harness import Result, bench
+
+from api.app import app
+from api.dependencies import get_controller
+from api.controllers.topics.handlers import PostsController, TopicsController
+from api.controllers.users.handlers.login_handler import LoginController
+from api.controllers.users.handlers.register_handler import RegisterController
+
+
+class StubSession:
+    """
+    Stands in for the request session (never queried by the measured calls)
+    """
+
+    def __init__(self):
+        self.info = {}
+        self.sync_session = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+    async def connection(self):
+        """
+        No connection to acquire
+        """
+        return None
+
+    async def commit(self):
+        """
+        Nothing to commit
+        """
+        return None
+
+
+def _request(stack: AsyncExitStack) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b"",
+        "app": app, "router": app.router,
+        "fastapi_inner_astack": stack, "fastapi_function_astack": stack,
+    })
+
+
+def _solver(controller: Optional[type], use: Callable[[Any], object]) -> Callable[[], object]:
+    """
+    Resolve the controller graph and touch what a handler would use
+
+    Notes:
+        Without a controller it measures the floor (event loop round trip
+        and an endpoint without dependencies)
+    """
+
+    async def endpoint(instance=Depends(get_controller(controller))):
+        return instance
+
+    async def empty():
+        return None
+
+    dependant = get_dependant(path="/", call=endpoint if controller is not None else empty)
+    loop = asyncio.new_event_loop()
+
+    async def solve():
+        async with AsyncExitStack() as stack:
+            solved = await solve_dependencies(
+                request=_request(stack), dependant=dependant, async_exit_stack=stack,
+                embed_body_fields=False,
+            )
+            use(solved.values.get("instance"))
+
+    return lambda: loop.run_until_complete(solve())
+
+
+def run(scale: float = 1.0) -> List[Result]:
+    """
+    Run the dependency resolution benchmarks
+
+    Args:
+        scale: Multiplier of the calls per round (lower is faster, noisier)
+    """
+    # Sessions come from a stub sessionmaker, dependency overrides would add
+    # their own resolution cost to every call
+    previous = getattr(app.state, "async_session", None)
+    app.state.async_session = StubSession
+    number = max(1, int(2000 * scale))
+    try:
+        return [
+            bench("deps.empty_endpoint", _solver(None, lambda _: None), number),
+            bench("deps.posts_controller", _solver(PostsController, lambda c: (c.post_repo, c.post_service)), number),
+            bench("deps.topics_controller", _solver(TopicsController, lambda c: (c.topic_repo, c.topic_service)), number),
+            bench("deps.register_controller", _solver(RegisterController, lambda c: c.register_service), number),
+            bench("deps.login_controller", _solver(LoginController, lambda c: c.login_service), number),
+        ]
+    finally:
+        app.state.async_session = previous
+
+
+def main():
+    """
+    Run the dependency benchmarks and print their results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of the calls per round")
+    args = parser.parse_args()
+
+    print(json.dumps([asdict(result) for result in run(args.scale)], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+End-to-end latency/throughput scenarios of the API
+
+Drives the ASGI app in-process (httpx ASGITransport, no network) against a
+seeded SQLite database file and the mock blob storage of the tests. The
+app runs with the test configuration, with trace sampling turned off as in
+production.
+
+Usage:
+    python benchmarks/endpoints.py --requests 500 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict
+from datetime import datetime
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("TESTING", "1")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(1, ROOT)
+
+# pylint: disable=wrong-import-position
+import sqlmodel
+from loguru import logger
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from harness import Result, drive, latency_result
+
+from setup import password_hasher, response_cache, storage_blob
+from api.app import app
+from api.dependencies import setup_services
+from database.activity import catch_up
+from database.instrumentation import instrument_engine
+from database.models import BlobModel, PostModel, TopicModel, UserModel
+from domain.entities import UserEntity
+from integrations.blob_storage import StorageProviders
+from utils.passwords import MIN_COST
+from utils.tracing import get_tracer
+from tests.unit.mock import MockBlobStorage  # pylint: disable=import-error  # repository root added to sys.path above
+
+
+EMAIL = "bench@example.com"
+PASSWORD = "StrongPass123!"
+
+
+def seed(path: str, topics: int, posts_per_topic: int) -> None:
+    """
+    Seed users, topics and posts with Core inserts
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    sqlmodel.SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+
+    user = UserEntity(
+        id=None, nome="Bench", ativo=True, email=EMAIL, excluido=False,
+        telefone="11999999999", uuid="bench-user",
+    )
+    user.set_password_hash(password_hasher.hash_sync(PASSWORD))
+
+    with engine.begin() as conn:
+        conn.execute(insert(BlobModel.__table__), [{
+            "id": 1, "provedor": "supabase", "provedor_id": "bench", "link": "https://example.com/bench.webp",
+            "nome": "bench", "extensao": "webp", "criado_em": now,
+        }])
+        conn.execute(insert(UserModel.__table__), [{
+            "id": 1, "nome": user.nome, "email": user.email, "uuid": user.uuid, "telefone": user.telefone,
+            "ativo": True, "excluido": False, "senha": user.get_password_hash(), "criado_em": now,
+        }])
+        conn.execute(insert(TopicModel.__table__), [{
+            "id": topic_id, "titulo": f"Topic {topic_id}", "descricao": "Bench topic",
+            "quantidade_posts": posts_per_topic, "criado_por_id": 1, "topico_thumbnail_blob_id": 1,
+            "criado_em": now, "atualizado_em": now,
+        } for topic_id in range(1, topics + 1)])
+        conn.execute(insert(PostModel.__table__), [{
+            "titulo": f"Post {index}", "descricao": "Lorem ipsum dolor sit amet " * 5,
+            "usuario_id": 1, "topico_post_id": topic_id, "gostei_contador": index % 50,
+            "resposta_contador": 0, "criado_em": now, "atualizado_em": now,
+        } for topic_id in range(1, topics + 1) for index in range(posts_per_topic)])
+
+    engine.dispose()
+
+
+async def run_scenarios(path: str, requests: int, concurrency: int) -> List[Result]:
+    """
+    Run every scenario against the seeded database
+    """
+    engine = instrument_engine(create_async_engine(f"sqlite+aiosqlite:///{path}"))
+    app.state.async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    storage_blob.register(StorageProviders.SUPABASE, MockBlobStorage())
+    setup_services(app, storage_blob)
+    get_tracer().sample_ratio = 0
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    # Roll up the seeded posts, as the backfill script does
+    await catch_up(app.state.async_session, 5000, 0)
+
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        login = await client.post("/users/security/login", params={"email": EMAIL, "password": PASSWORD})
+        login.raise_for_status()
+        auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        async def expect(response, status: int = 200):
+            response = await response
+            if response.status_code != status:
+                raise RuntimeError(f"{response.request.url}: {response.status_code} {response.text[:200]}")
+
+        async def public_topics_cached():
+            await expect(client.get("/public/topics"))
+
+        async def public_topics_uncached():
+            response_cache.clear()
+            await expect(client.get("/public/topics"))
+
+        async def public_topic_posts_uncached():
+            response_cache.clear()
+            await expect(client.get("/public/topics/1/posts"))
+
+        async def public_trending():
+            await expect(client.get("/public/topics/trending"))
+
+        async def public_activity_days():
+            await expect(client.get("/public/topics/1/activity", params={"granularity": "day"}))
+
+        async def get_topic():
+            await expect(client.get("/topics/1", headers=auth))
+
+        async def get_post():
+            await expect(client.get("/topics/posts/1", headers=auth))
+
+        async def create_post():
+            await expect(client.post(
+                "/topics/2/posts",
+                data={"title": "Bench post", "description": "Bench post description"},
+                headers=auth,
+            ))
+
+        async def login_user():
+            await expect(client.post("/users/security/login", params={"email": EMAIL, "password": PASSWORD}))
+
+        scenarios = [
+            ("e2e.public_topics_cached", public_topics_cached),
+            ("e2e.public_topics_uncached", public_topics_uncached),
+            ("e2e.public_topic_posts_uncached", public_topic_posts_uncached),
+            ("e2e.public_activity_days", public_activity_days),
+            ("e2e.get_topic", get_topic),
+            ("e2e.get_post", get_post),
+            ("e2e.create_post", create_post),
+            # After create_post, which feeds the index
+            ("e2e.public_trending", public_trending),
+            ("e2e.login", login_user),
+        ]
+
+        for name, scenario in scenarios:
+            # Warm-up (caches, prepared statements, lazy imports)
+            for _ in range(min(20, requests)):
+                await scenario()
+
+            latencies, elapsed = await drive(scenario, requests, concurrency)
+            result = latency_result(name, latencies, elapsed)
+            result.stats["concurrency"] = concurrency
+            results.append(result)
+
+        # Reads while a login storm hashes passwords: the hashes run in the
+        # hasher's threads, the reads must not queue behind them on the loop
+        storm_over = asyncio.Event()
+
+        async def login_storm():
+            while not storm_over.is_set():
+                response = await client.post("/users/security/login", params={"email": EMAIL, "password": PASSWORD})
+                if response.status_code not in (200, 503):
+                    raise RuntimeError(f"login: {response.status_code} {response.text[:200]}")
+
+        storm = [asyncio.create_task(login_storm()) for _ in range(concurrency)]
+        latencies, elapsed = await drive(get_topic, requests, concurrency)
+        storm_over.set()
+        await asyncio.gather(*storm)
+
+        result = latency_result("e2e.get_topic_during_login_storm", latencies, elapsed)
+        result.stats["concurrency"] = concurrency
+        results.append(result)
+
+    await engine.dispose()
+    return results
+
+
+def run(requests: int = 500, concurrency: int = 8, topics: int = 50, posts_per_topic: int = 40) -> List[Result]:
+    """
+    Seed a temporary database and run the scenarios
+
+    Args:
+        requests: Requests per scenario
+        concurrency: Concurrent clients
+        topics: Seeded topics
+        posts_per_topic: Seeded posts per topic
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        # Production cost floor (the tests hash with a much lower one)
+        password_hasher.n = MIN_COST
+        seed(path, topics, posts_per_topic)
+        return asyncio.run(run_scenarios(path, requests, concurrency))
+
+
+def main():
+    """
+    Run the endpoint scenarios and print their results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--topics", type=int, default=50, help="Seeded topics")
+    parser.add_argument("--posts-per-topic", type=int, default=40, help="Seeded posts per topic")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.concurrency, args.topics, args.posts_per_topic)
+    print(json.dumps([asdict(result) for result in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
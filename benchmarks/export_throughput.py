@@ -0,0 +1,149 @@
+"""
+Throughput benchmark of the topic NDJSON export
+
+Seeds a SQLite database with a single topic holding N posts (1M by default)
+and streams GET /topics/{id}/export through the export generator, reporting
+rows/s, MB/s and the resident memory growth while streaming.
+
+Usage:
+    python benchmarks/export_throughput.py --posts 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+os.environ.setdefault("TESTING", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position
+import sqlmodel
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from setup import config
+from database.models import BlobModel, PostModel, PostsAppendModel, TopicModel, UserModel
+from api.controllers.topics.export import export_topic_posts
+
+
+INSERT_BATCH = 20_000
+
+
+def current_rss() -> int:
+    """
+    Resident memory of the process in bytes (Linux), 0 when unavailable
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def seed(path: str, posts: int, appends_every: int) -> None:
+    """
+    Seed a topic with the given number of posts
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    sqlmodel.SQLModel.metadata.create_all(engine)
+    now = datetime.now()
+
+    with engine.begin() as conn:
+        conn.execute(insert(BlobModel.__table__), [{
+            "id": 1, "provedor": "supabase", "provedor_id": "bench", "link": "https://example.com/bench.webp",
+            "nome": "bench", "extensao": "webp", "criado_em": now,
+        }])
+        conn.execute(insert(UserModel.__table__), [{
+            "id": 1, "nome": "Bench", "email": "bench@example.com", "uuid": "bench", "telefone": "11999999999",
+            "ativo": True, "excluido": False, "senha": "bench", "criado_em": now,
+        }])
+        conn.execute(insert(TopicModel.__table__), [{
+            "id": 1, "titulo": "Bench", "descricao": "Bench topic", "quantidade_posts": posts,
+            "criado_por_id": 1, "criado_em": now, "atualizado_em": now,
+        }])
+
+        for start in range(1, posts + 1, INSERT_BATCH):
+            ids = range(start, min(start + INSERT_BATCH, posts + 1))
+            conn.execute(insert(PostModel.__table__), [{
+                "id": post_id, "titulo": f"Post {post_id}", "descricao": "Lorem ipsum dolor sit amet " * 5,
+                "usuario_id": 1, "topico_post_id": 1, "gostei_contador": post_id % 50,
+                "resposta_contador": 0, "criado_em": now, "atualizado_em": now,
+            } for post_id in ids])
+
+            if appends_every:
+                conn.execute(insert(PostsAppendModel.__table__), [{
+                    "post_id": post_id, "anexo_blob_id": 1, "criado_em": now,
+                } for post_id in ids if post_id % appends_every == 0])
+
+    engine.dispose()
+
+
+async def run_export(path: str) -> dict:
+    """
+    Stream the export and measure it
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    app = SimpleNamespace(state=SimpleNamespace(
+        async_session=sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    ))
+
+    rows = total_bytes = chunks = 0
+    rss_after_first_chunk = 0
+    start = time.perf_counter()
+
+    async for chunk in export_topic_posts(app, 1):
+        chunks += 1
+        total_bytes += len(chunk)
+        rows += chunk.count(b"\n")
+        if chunks == 1:
+            rss_after_first_chunk = current_rss()
+
+    elapsed = time.perf_counter() - start
+    rss_end = current_rss()
+    await engine.dispose()
+
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed),
+        "mb_per_second": round(total_bytes / elapsed / 1024 / 1024, 2),
+        "rss_growth_mb": round((rss_end - rss_after_first_chunk) / 1024 / 1024, 2),
+    }
+
+
+def main():
+    """
+    Run the export throughput benchmark and print its results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=1_000_000, help="Posts in the exported topic")
+    parser.add_argument("--appends-every", type=int, default=10, help="One attachment every N posts (0 = none)")
+    parser.add_argument("--chunk-size", type=int, default=config.EXPORT_CHUNK_SIZE, help="Posts per cursor chunk")
+    args = parser.parse_args()
+
+    config.EXPORT_CHUNK_SIZE = args.chunk_size
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.db")
+
+        start = time.perf_counter()
+        seed(path, args.posts, args.appends_every)
+        seed_seconds = time.perf_counter() - start
+
+        result = asyncio.run(run_export(path))
+
+    result.update(posts=args.posts, chunk_size=args.chunk_size, seed_seconds=round(seed_seconds, 3))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Shared helpers of the benchmark suite (timing, JSON results, baseline report)
+
+Every benchmark produces one result with a primary value where lower is
+better (microseconds per call, or milliseconds of median latency), so the
+baseline comparison is the same for every suite.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Result:
+    """
+    Result of a benchmark
+
+    Args:
+        name: Unique name, the key of the baseline comparison
+        unit: Unit of value (e.g. us/op, ms)
+        value: Primary value, lower is better
+        stats: Extra numbers (percentiles, throughput...)
+    """
+    name: str
+    unit: str
+    value: float
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def bench(name: str, func: Callable[[], object], number: int, rounds: int = 5) -> Result:
+    """
+    Time a callable, value is the median microseconds per call over rounds
+
+    Notes:
+        Each round calls func number times, one warm-up round is discarded
+    """
+    func()
+    per_call = []
+    for _ in range(rounds + 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number * 1e6)
+
+    per_call = per_call[1:]
+    return Result(
+        name=name,
+        unit="us/op",
+        value=round(statistics.median(per_call), 3),
+        stats={"min_us": round(min(per_call), 3), "max_us": round(max(per_call), 3), "calls": number * rounds},
+    )
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def latency_result(name: str, latencies: List[float], elapsed: float) -> Result:
+    """
+    Build the result of a load scenario, value is the median latency (ms)
+
+    Args:
+        latencies: Seconds per request
+        elapsed: Wall time of the scenario (seconds)
+    """
+    millis = [latency * 1000 for latency in latencies]
+    return Result(
+        name=name,
+        unit="ms",
+        value=round(statistics.median(millis), 3),
+        stats={
+            "p95_ms": round(percentile(millis, 0.95), 3),
+            "p99_ms": round(percentile(millis, 0.99), 3),
+            "requests": len(millis),
+            "throughput_rps": round(len(millis) / elapsed, 1),
+        },
+    )
+
+
+async def drive(
+    request: Callable[[], Awaitable[object]],
+    requests: int,
+    concurrency: int,
+) -> Tuple[List[float], float]:
+    """
+    Run requests with a fixed number of concurrent workers
+
+    Returns:
+        Latencies (seconds) and the wall time, see latency_result
+    """
+    latencies: List[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await request()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def environment() -> dict:
+    """
+    Machine and interpreter of the run (results are only comparable on the same one)
+    """
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: str, results: List[Result]) -> None:
+    """
+    Write the results to a JSON file
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment": environment(),
+            "results": [asdict(result) for result in results],
+        }, file, indent=2)
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    """
+    Load the results of a JSON file by benchmark name
+    """
+    with open(path, encoding="utf-8") as file:
+        return {result["name"]: result for result in json.load(file)["results"]}
+
+
+def compare(results: List[Result], baseline: Dict[str, dict], tolerance: float) -> List[dict]:
+    """
+    Compare results against a baseline
+
+    Args:
+        tolerance: Allowed relative increase (0.1 = 10% slower) before a
+            result is reported as a regression
+    """
+    rows = []
+    for result in results:
+        previous: Optional[dict] = baseline.get(result.name)
+        if previous is None or not previous["value"]:
+            rows.append({"name": result.name, "unit": result.unit, "value": result.value,
+                         "baseline": None, "change": None, "status": "new"})
+            continue
+
+        change = (result.value - previous["value"]) / previous["value"]
+        if change > tolerance:
+            status = "regression"
+        elif change < -tolerance:
+            status = "improvement"
+        else:
+            status = "ok"
+
+        rows.append({"name": result.name, "unit": result.unit, "value": result.value,
+                     "baseline": previous["value"], "change": round(change, 4), "status": status})
+    return rows
+
+
+def format_report(rows: List[dict]) -> str:
+    """
+    Format the comparison as a text table
+    """
+    width = max([len(row["name"]) for row in rows] + [9])
+    lines = [f"{'benchmark':<{width}}  {'value':>12}  {'baseline':>12}  {'change':>8}  status"]
+
+    for row in rows:
+        value = f"{row['value']:.3f} {row['unit']}"
+        baseline = f"{row['baseline']:.3f}" if row["baseline"] is not None else "-"
+        change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        lines.append(f"{row['name']:<{width}}  {value:>12}  {baseline:>12}  {change:>8}  {row['status']}")
+
+    return "\n".join(lines)
@@ -0,0 +1,204 @@
+"""
+Microbenchmarks of the hot paths
+
+Model to entity mappers of the repositories, response schema construction
+as done by the handlers, JWT encode/decode, WebP conversion and the
+password strength check.
+
+Usage:
+    python benchmarks/hot_paths.py --scale 1.0
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from typing import List
+
+os.environ.setdefault("TESTING", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position,protected-access
+from PIL import Image
+
+from harness import Result, bench
+
+from database.models import BlobModel, PostModel, PostsAppendModel, TopicModel, UserModel
+from database.repositories import PostRepository, TopicRepository, UserRepository
+from api.controllers.topics.schemas import BlobResponseSchema, PostResponseSchema, TopicResponseSchema
+from utils.converters import convert_bytes_image_to_webp
+from utils.security import SecurityHandler
+from utils.trending import TrendingIndex
+from utils.validators import check_password_strong
+
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def post_model(appends: int) -> PostModel:
+    """
+    Post model with loaded attachments (as returned by the repository queries)
+    """
+    return PostModel(
+        id=1, titulo="Post", descricao="Lorem ipsum dolor sit amet " * 5, usuario_id=1,
+        resposta_post_id=None, topico_post_id=1, gostei_contador=10, resposta_contador=2,
+        criado_em=NOW, atualizado_em=NOW,
+        anexos=[
+            PostsAppendModel(post_id=1, anexo_blob_id=index, anexo_blob=BlobModel(
+                id=index, provedor="supabase", provedor_id=f"blob-{index}",
+                link=f"https://example.com/{index}.webp", nome=str(index), extensao="webp", criado_em=NOW,
+            )) for index in range(appends)
+        ],
+    )
+
+
+def mapper_benchmarks(scale: float) -> List[Result]:
+    """
+    Model to entity mappers
+    """
+    posts = PostRepository(None)
+    topics = TopicRepository(None)
+    users = UserRepository(None)
+
+    post = post_model(appends=3)
+    topic = TopicModel(
+        id=1, titulo="Topic", descricao="Description", quantidade_posts=10, criado_por_id=1,
+        topico_thumbnail_blob_id=1, criado_em=NOW, atualizado_em=NOW,
+    )
+    user = UserModel(
+        id=1, nome="Bench", email="bench@example.com", uuid="bench", telefone="11999999999",
+        ativo=True, excluido=False, senha="hash", criado_em=NOW,
+    )
+
+    number = max(1, int(20_000 * scale))
+    return [
+        bench("mapper.post_model_to_entity", lambda: posts._model_to_entity(post), number),
+        bench("mapper.topic_model_to_entity", lambda: topics._model_to_entity(topic), number),
+        bench("mapper.user_model_to_entity", lambda: users._model_to_entity(user), number),
+    ]
+
+
+def schema_benchmarks(scale: float) -> List[Result]:
+    """
+    Response schemas built from entities, as in the handlers
+    """
+    post = PostRepository(None)._model_to_entity(post_model(appends=3))
+    topic = TopicModel(
+        id=1, titulo="Topic", descricao="Description", quantidade_posts=10, criado_por_id=1,
+        topico_thumbnail_blob_id=1, criado_em=NOW, atualizado_em=NOW,
+    )
+
+    def post_schema():
+        return PostResponseSchema(
+            id=post.id,
+            title=post.title,
+            description=post.description,
+            user_id=post.user_id,
+            reply_post_id=post.reply_post_id,
+            likes_count=post.likes_count,
+            reply_count=post.reply_count,
+            topic_post_id=post.topic_post_id,
+            appends=[
+                BlobResponseSchema(id=blob.id, link=blob.link, nome=blob.nome, extensao=blob.extensao)
+                for blob in post.post_apppends
+            ]
+        )
+
+    def topic_schema():
+        return TopicResponseSchema(
+            id=topic.id,
+            title=topic.titulo,
+            description=topic.descricao,
+            qtd_posts=topic.quantidade_posts,
+            topic_image_id=topic.topico_thumbnail_blob_id,
+            created_by_user_id=topic.criado_por_id,
+            created_at=topic.criado_em
+        )
+
+    schema = post_schema()
+    number = max(1, int(20_000 * scale))
+    return [
+        bench("schema.post_response", post_schema, number),
+        bench("schema.topic_response", topic_schema, number),
+        bench("schema.post_response_json", schema.model_dump_json, number),
+    ]
+
+
+def security_benchmarks(scale: float) -> List[Result]:
+    """
+    JWT encode/decode (cached and verified every call) and password strength
+    """
+    handler = SecurityHandler("bench-secret-key-minimum-32-bytes!")
+    uncached = SecurityHandler("bench-secret-key-minimum-32-bytes!", cache_size=0)
+    payload = {"sub": "0f8fad5b-d9cb-469f-a165-70867728950e", "email": "bench@example.com", "type": "access"}
+    token = handler.encode_payload(payload, 3600)
+
+    number = max(1, int(5_000 * scale))
+    return [
+        bench("security.encode_payload", lambda: handler.encode_payload(payload, 3600), number),
+        bench("security.decode_payload", lambda: handler.decode_payload(token), number),
+        bench("security.decode_payload_uncached", lambda: uncached.decode_payload(token), number),
+        bench("validators.check_password_strong", lambda: check_password_strong("StrongPass123!"), number * 4),
+    ]
+
+
+def trending_benchmarks(scale: float) -> List[Result]:
+    """
+    Trending index event and top-10 with 1000 ranked topics
+    """
+    index = TrendingIndex(half_life=6 * 3600, max_topics=1000)
+    for topic_id in range(1000):
+        index.record(topic_id, weight=topic_id % 50 + 1)
+    topic_ids = iter(range(10**9))
+
+    number = max(1, int(20_000 * scale))
+    return [
+        bench("trending.record", lambda: index.record(next(topic_ids) % 1000), number),
+        bench("trending.top_10", lambda: index.top(10), number),
+    ]
+
+
+def image_benchmarks(scale: float) -> List[Result]:
+    """
+    WebP conversion of an upload with the minimum topic dimensions
+    """
+    buffer = io.BytesIO()
+    Image.effect_noise((650, 360), 64).convert("RGB").save(buffer, format="PNG")
+    image = buffer.getvalue()
+
+    number = max(1, int(20 * scale))
+    return [bench("image.convert_bytes_image_to_webp", lambda: convert_bytes_image_to_webp(image), number)]
+
+
+def run(scale: float = 1.0) -> List[Result]:
+    """
+    Run every microbenchmark
+
+    Args:
+        scale: Multiplier of the calls per round (lower is faster, noisier)
+    """
+    return (
+        mapper_benchmarks(scale)
+        + schema_benchmarks(scale)
+        + security_benchmarks(scale)
+        + trending_benchmarks(scale)
+        + image_benchmarks(scale)
+    )
+
+
+def main():
+    """
+    Run the hot path benchmarks and print their results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of the calls per round")
+    args = parser.parse_args()
+
+    print(json.dumps([asdict(result) for result in run(args.scale)], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Overhead benchmark of the metrics middleware
+
+Calls a minimal ASGI app directly and through MetricsMiddleware, reporting
+the added cost per request. Exits with status 1 when it is over the budget.
+
+Usage:
+    python benchmarks/metrics_overhead.py --requests 200000 --budget-us 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("TESTING", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position
+from api.middlewares._http.base import MetricsMiddleware
+
+
+ROUTE = SimpleNamespace(path="/public/topics/{topic_id}/posts")
+START = {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def endpoint(scope, receive, send):
+    """
+    Minimal app: resolves a route and sends a fixed response
+    """
+    scope["route"] = ROUTE
+    await send(START)
+    await send(BODY)
+
+
+async def empty_receive():
+    """
+    Request without body
+    """
+    return {"type": "http.request", "body": b""}
+
+
+async def discard_send(_):
+    """
+    Drop the response messages
+    """
+    return None
+
+
+async def run(app, requests: int) -> float:
+    """
+    Seconds per request of an app
+    """
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/public/topics/1/posts"}, empty_receive, discard_send)
+    return (time.perf_counter() - start) / requests
+
+
+async def measure(requests: int, rounds: int) -> dict:
+    """
+    Best of several rounds, alternating bare and instrumented runs
+    """
+    instrumented = MetricsMiddleware(endpoint)
+    bare_times, metrics_times = [], []
+
+    for _ in range(rounds):
+        bare_times.append(await run(endpoint, requests))
+        metrics_times.append(await run(instrumented, requests))
+
+    bare, metrics = min(bare_times), min(metrics_times)
+    return {
+        "bare_us": round(bare * 1e6, 3),
+        "instrumented_us": round(metrics * 1e6, 3),
+        "overhead_us": round((metrics - bare) * 1e6, 3),
+    }
+
+
+def main():
+    """
+    Run the metrics overhead benchmark and print its results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200_000, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds (best is reported)")
+    parser.add_argument("--budget-us", type=float, default=20.0, help="Maximum overhead per request")
+    args = parser.parse_args()
+
+    result = asyncio.run(measure(args.requests, args.rounds))
+    result.update(requests=args.requests, budget_us=args.budget_us, ok=result["overhead_us"] < args.budget_us)
+    print(json.dumps(result, indent=2))
+
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Run the benchmark suite, write JSON results and compare with a baseline
+
+Runs the microbenchmarks (hot_paths.py, dependencies.py) and the
+end-to-end scenarios (endpoints.py), writes every result to --output and,
+with --baseline, prints the change of each benchmark. Exits with status 1 when a benchmark
+is slower than the baseline by more than --tolerance. Baselines are only
+comparable on the same machine and interpreter (see "environment").
+
+Usage:
+    python benchmarks/run.py --output benchmarks/results/latest.json
+    python benchmarks/run.py --baseline benchmarks/results/baseline.json --tolerance 0.15
+    python benchmarks/run.py --suite micro --quick
+"""
+
+import argparse
+import os
+import sys
+
+import dependencies
+import endpoints
+import hot_paths
+from harness import compare, format_report, load_results, write_results
+
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "latest.json")
+
+
+def main():
+    """
+    Run the benchmark suites, compare with a baseline and exit 1 on regressions
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suite", choices=("all", "micro", "e2e"), default="all", help="Benchmarks to run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file of the results")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations (smoke run, noisier)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per end-to-end scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients of the scenarios")
+    args = parser.parse_args()
+
+    results = []
+    if args.suite in ("all", "micro"):
+        results.extend(hot_paths.run(scale=0.1 if args.quick else 1.0))
+        results.extend(dependencies.run(scale=0.1 if args.quick else 1.0))
+    if args.suite in ("all", "e2e"):
+        results.extend(endpoints.run(requests=50 if args.quick else args.requests, concurrency=args.concurrency))
+
+    write_results(args.output, results)
+
+    baseline = load_results(args.baseline) if args.baseline else {}
+    rows = compare(results, baseline, args.tolerance)
+    print(format_report(rows))
+    print(f"\nResults written to {args.output}")
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"Regressions over {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
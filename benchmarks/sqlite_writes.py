@@ -0,0 +1,196 @@
+"""
+Concurrent write throughput of SQLite: default engine vs WAL single writer
+
+Runs the transaction shape of post creation (read the topic, insert a post,
+increment the topic counter, commit) from concurrent sessions, with readers
+listing posts meanwhile (one query every 5ms each), against a fresh SQLite
+file for each mode:
+
+- default: one engine with the default pool and journal (rollback journal),
+  as the lifespan created it before the SQLite profile
+- tuned: WAL pragmas, a single writer connection (writes queue for it) and
+  a reader pool (database.sqlite.create_sqlite_engines)
+
+Failed transactions ("database is locked") are counted in the stats.
+
+Usage:
+    python benchmarks/sqlite_writes.py --writes 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict
+from datetime import datetime
+from time import perf_counter
+from typing import List, Optional
+
+os.environ.setdefault("TESTING", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position
+import sqlmodel
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from harness import Result, latency_result
+
+from database.models import PostModel, TopicModel, UserModel
+from database.sqlite import create_sqlite_engines, sqlite_pragmas
+
+
+TOPICS = 20
+
+# Pause of each reader between queries (steady read load, not a busy loop)
+READ_INTERVAL = 0.005
+
+
+async def prepare(engine: AsyncEngine) -> None:
+    """
+    Create the tables, one user and the topics
+    """
+    now = datetime.now()
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+        await conn.execute(insert(UserModel.__table__), [{
+            "id": 1, "nome": "Bench", "email": "bench@example.com", "uuid": "bench", "telefone": "11999999999",
+            "ativo": True, "excluido": False, "senha": "hash", "criado_em": now,
+        }])
+        await conn.execute(insert(TopicModel.__table__), [{
+            "id": topic_id, "titulo": f"Topic {topic_id}", "descricao": "Bench", "quantidade_posts": 0,
+            "criado_por_id": 1, "criado_em": now, "atualizado_em": now,
+        } for topic_id in range(1, TOPICS + 1)])
+
+
+async def run_mode(
+    name: str,
+    writer: AsyncEngine,
+    reader: Optional[AsyncEngine],
+    writes: int,
+    concurrency: int,
+    readers: int,
+) -> List[Result]:
+    """
+    Run the concurrent writes (and readers) of a mode
+    """
+    await prepare(writer)
+    write_session = sessionmaker(writer, class_=AsyncSession, expire_on_commit=False)
+    read_session = sessionmaker(reader or writer, class_=AsyncSession, expire_on_commit=False)
+
+    remaining = writes
+    write_latencies: List[float] = []
+    read_latencies: List[float] = []
+    errors = 0
+    done = asyncio.Event()
+
+    async def write_worker(worker: int):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            topic_id = (remaining + worker) % TOPICS + 1
+            start = perf_counter()
+            try:
+                async with write_session() as session:
+                    # Request sessions check out their connection first
+                    await session.connection()
+                    await session.exec(select(TopicModel.id).where(TopicModel.id == topic_id))
+                    now = datetime.now()
+                    await session.exec(insert(PostModel.__table__).values(
+                        titulo="Bench", descricao="Bench post", usuario_id=1, topico_post_id=topic_id,
+                        gostei_contador=0, resposta_contador=0, criado_em=now, atualizado_em=now,
+                    ))
+                    await session.exec(
+                        update(TopicModel.__table__)
+                        .where(TopicModel.id == topic_id)
+                        .values(quantidade_posts=TopicModel.quantidade_posts + 1)
+                    )
+                    await session.commit()
+                write_latencies.append(perf_counter() - start)
+            except OperationalError:
+                errors += 1
+
+    async def read_worker():
+        while not done.is_set():
+            start = perf_counter()
+            async with read_session() as session:
+                await session.exec(
+                    select(PostModel.id).where(PostModel.topico_post_id == 1).order_by(PostModel.id.desc()).limit(10)
+                )
+            read_latencies.append(perf_counter() - start)
+            await asyncio.sleep(READ_INTERVAL)
+
+    start = perf_counter()
+    reading = [asyncio.create_task(read_worker()) for _ in range(readers)]
+    await asyncio.gather(*(write_worker(worker) for worker in range(concurrency)))
+    elapsed = perf_counter() - start
+    done.set()
+    await asyncio.gather(*reading)
+
+    async with writer.connect() as conn:
+        posts = (await conn.execute(select(PostModel.id))).all()
+
+    write_result = latency_result(f"sqlite.{name}.write", write_latencies or [0.0], elapsed)
+    write_result.stats.update({
+        "errors": errors,
+        "committed": len(posts),
+        "writes_per_second": round(len(posts) / elapsed, 1),
+        "concurrency": concurrency,
+    })
+    read_result = latency_result(f"sqlite.{name}.read_during_writes", read_latencies or [0.0], elapsed)
+
+    await writer.dispose()
+    if reader is not None:
+        await reader.dispose()
+    return [write_result, read_result]
+
+
+async def run_all(directory: str, writes: int, concurrency: int, readers: int) -> List[Result]:
+    """
+    Run every mode against its own database file
+    """
+    default_url = f"sqlite+aiosqlite:///{os.path.join(directory, 'default.db')}"
+    tuned_url = f"sqlite+aiosqlite:///{os.path.join(directory, 'tuned.db')}"
+
+    results = await run_mode("default", create_async_engine(default_url), None, writes, concurrency, readers)
+
+    writer, reader = create_sqlite_engines(
+        tuned_url, sqlite_pragmas(5000, 65536, 268435456), reader_pool_size=4, writer_timeout=30
+    )
+    results += await run_mode("tuned", writer, reader, writes, concurrency, readers)
+    return results
+
+
+def run(writes: int = 2000, concurrency: int = 16, readers: int = 4) -> List[Result]:
+    """
+    Run the write benchmark in a temporary directory
+
+    Args:
+        writes: Write transactions per mode
+        concurrency: Concurrent writers
+        readers: Concurrent readers during the writes
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        return asyncio.run(run_all(directory, writes, concurrency, readers))
+
+
+def main():
+    """
+    Run the SQLite write benchmark and print its results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2000, help="Write transactions per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent writers")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent readers during the writes")
+    args = parser.parse_args()
+
+    print(json.dumps([asdict(result) for result in run(args.writes, args.concurrency, args.readers)], indent=2))
+
+
+if __name__ == "__main__":
+    main()
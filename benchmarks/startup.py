@@ -0,0 +1,145 @@
+"""
+Cold start of the API: import time, lifespan startup and first requests
+
+Each run is a fresh interpreter (subprocess), so nothing is warm: it times
+"import api.app", the lifespan startup (engines and schema creation of a
+temporary SQLite file) and the first request of GET /public/topics and of
+GET /openapi.json, generated on the request or served from a precomputed
+file (api.openapi). Values are the medians of the runs.
+
+Usage:
+    python benchmarks/startup.py --runs 7
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict
+from time import perf_counter
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# pylint: disable=wrong-import-position
+from harness import Result
+
+
+async def _first_requests(app, timings: Dict[str, float]) -> None:
+    """
+    Run the lifespan and the first requests of a fresh app
+    """
+    from httpx import ASGITransport, AsyncClient  # pylint: disable=import-outside-toplevel
+
+    start = perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["lifespan"] = perf_counter() - start
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for name, path in (("public_topics", "/public/topics"), ("openapi", "/openapi.json")):
+                start = perf_counter()
+                response = await client.get(path)
+                timings[f"first_request.{name}"] = perf_counter() - start
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path}: status {response.status_code}")
+
+
+def child(database: str, openapi_path: str) -> None:
+    """
+    Measure one cold start, print the seconds of each phase as JSON
+    """
+    os.environ["TESTING"] = "1"
+    sys.path.insert(0, os.path.join(ROOT, "src"))
+
+    timings: Dict[str, float] = {}
+    start = perf_counter()
+    from api.app import app  # pylint: disable=import-outside-toplevel
+    timings["import"] = perf_counter() - start
+
+    from loguru import logger  # pylint: disable=import-outside-toplevel
+    from api.openapi import setup_openapi  # pylint: disable=import-outside-toplevel
+    from setup import config  # pylint: disable=import-outside-toplevel
+
+    logger.remove()
+    config.DATABASE_SQLITE_PATH = f"sqlite+aiosqlite:///{database}"
+    if openapi_path:
+        setup_openapi(app, openapi_path)
+
+    asyncio.run(_first_requests(app, timings))
+    print(json.dumps(timings))
+
+
+def _run_child(database: str, openapi_path: str = "") -> Dict[str, float]:
+    """
+    Cold start in a subprocess (fresh database file)
+    """
+    if os.path.exists(database):
+        os.remove(database)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", database, "--openapi", openapi_path],
+        check=True, capture_output=True, text=True, cwd=ROOT,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _result(name: str, samples: List[float]) -> Result:
+    millis = [sample * 1000 for sample in samples]
+    return Result(
+        name=name,
+        unit="ms",
+        value=round(statistics.median(millis), 2),
+        stats={"min_ms": round(min(millis), 2), "max_ms": round(max(millis), 2), "runs": len(millis)},
+    )
+
+
+def run(runs: int = 7) -> List[Result]:
+    """
+    Run the cold starts, without and with the precomputed OpenAPI schema
+
+    Args:
+        runs: Cold starts of each mode
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "startup.db")
+        openapi_path = os.path.join(directory, "openapi.json")
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, "scripts", "write_openapi.py"), openapi_path],
+            check=True, capture_output=True, env={**os.environ, "TESTING": "1"}, cwd=ROOT,
+        )
+
+        generated = [_run_child(database) for _ in range(runs)]
+        precomputed = [_run_child(database, openapi_path) for _ in range(runs)]
+
+    results = [
+        _result(f"startup.{phase}", [timings[phase] for timings in generated])
+        for phase in ("import", "lifespan", "first_request.public_topics", "first_request.openapi")
+    ]
+    results.append(_result(
+        "startup.first_request.openapi_precomputed", [timings["first_request.openapi"] for timings in precomputed]
+    ))
+    return results
+
+
+def main():
+    """
+    Run the startup benchmark and print its results
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7, help="Cold starts of each mode")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--openapi", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.openapi)
+        return
+
+    print(json.dumps([asdict(result) for result in run(args.runs)], indent=2))
+
+
+if __name__ == "__main__":
+    main()
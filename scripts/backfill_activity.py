@@ -0,0 +1,55 @@
+"""
+Backfill the topic activity rollup with the posts already in the database
+
+Counts every post past the rollup watermark, in batches (one transaction
+each, an interruption keeps the batches done). With --rebuild the rollup
+is emptied first and rebuilt from the first post. The API may keep
+running: its aggregator and this script share the watermark.
+
+Usage:
+    python scripts/backfill_activity.py [--batch-size 5000] [--lag 60] [--rebuild]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from setup import config
+from database.activity import ACTIVITY_ROLLUP, catch_up
+from database.repositories import ActivityRepository
+
+
+async def backfill(batch_size: int, lag: float, rebuild: bool) -> int:
+    engine = create_async_engine(config.DATABASE_SQLITE_PATH)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        if rebuild:
+            async with session_factory() as session:
+                await ActivityRepository(session).reset(ACTIVITY_ROLLUP)
+                await session.commit()
+        return await catch_up(session_factory, batch_size, lag)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the topic activity rollup")
+    parser.add_argument("--batch-size", type=int, default=config.ACTIVITY_ROLLUP_BATCH_SIZE)
+    parser.add_argument("--lag", type=float, default=config.ACTIVITY_ROLLUP_LAG_SECONDS)
+    parser.add_argument("--rebuild", action="store_true", help="Empty the rollup and count every post again")
+    args = parser.parse_args()
+
+    counted = asyncio.run(backfill(args.batch_size, args.lag, args.rebuild))
+    print(f"{counted} posts agregados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Write the precomputed OpenAPI schema of the API (build step)
+
+The API serves the file of OPENAPI_SCHEMA_PATH while its routes, title and
+version match, so run it with the same configuration as the deploy.
+
+Usage:
+    python scripts/write_openapi.py openapi.json
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# pylint: disable=wrong-import-position
+from api.app import app
+from api.openapi import write_openapi_schema
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else "openapi.json"
+    write_openapi_schema(app, output)
+    print(f"Schema OpenAPI escrito em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,14 @@ Module contains APP Fastapi
 
 from fastapi import FastAPI
 
-from setup import config
+from setup import config, storage_blob
 from .dependencies.lifespan import lifespan
+from .dependencies.services import setup_services
+from .openapi import setup_openapi
 from .middlewares import setup_middlewares
 from .controllers.users import setup_users_controllers
 from .controllers.topics import setup_topics_controllers
+from .controllers.monitoring import setup_monitoring_controllers
 
 
 app = FastAPI(
@@ -18,6 +21,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+setup_services(app, storage_blob)
 setup_middlewares(app)
 setup_users_controllers(app)
 setup_topics_controllers(app)
+setup_monitoring_controllers(app)
+setup_openapi(app, config.OPENAPI_SCHEMA_PATH)
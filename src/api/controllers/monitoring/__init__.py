@@ -0,0 +1,24 @@
+"""
+Setup monitoring controllers
+"""
+
+from fastapi import FastAPI
+
+from setup import config
+from .routers.metrics_routers import router as metrics_router
+from .routers.profiles_routers import router as profiles_router
+
+
+def setup_monitoring_controllers(app: FastAPI):
+    """
+    Setup monitoring controllers
+
+    Args:
+        app: FastAPI
+    """
+
+    if config.METRICS_ENABLED:
+        app.include_router(metrics_router, tags=["Monitoramento"])
+
+    if config.PROFILER_ENABLED:
+        app.include_router(profiles_router, tags=["Monitoramento"])
@@ -0,0 +1,18 @@
+"""
+Metrics Routers
+"""
+
+from fastapi import APIRouter, Response
+
+from utils.metrics import registry, CONTENT_TYPE
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Metrics in Prometheus text format
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
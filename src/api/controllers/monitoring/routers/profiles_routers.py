@@ -0,0 +1,39 @@
+"""
+Profiles Routers (slow and requested request profiles)
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from setup import profile_store
+from api.dependencies import require_profiler_token
+
+
+FOLDED_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+router = APIRouter(prefix="/admin/profiles", dependencies=[Depends(require_profiler_token)])
+
+
+@router.get("", include_in_schema=False)
+async def list_profiles() -> List[dict]:
+    """
+    Last captured profiles, newest first
+    """
+    return [profile.summary() for profile in profile_store.list()]
+
+
+@router.get("/{request_id}", include_in_schema=False)
+async def download_profile(request_id: str) -> Response:
+    """
+    Download a profile in collapsed stack format (flamegraph.pl, speedscope)
+    """
+    profile = profile_store.get(request_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    return Response(
+        content=profile.folded(),
+        media_type=FOLDED_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{profile.filename()}"'},
+    )
@@ -0,0 +1,82 @@
+"""
+Topic activity series (buckets of the hourly rollup)
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from domain.entities import ActivityPointEntity
+from database.activity import hour_of
+
+
+HOUR = "hour"
+DAY = "day"
+
+BUCKETS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# Range served when the client gives no start, and the longest accepted
+DEFAULT_RANGES = {HOUR: timedelta(hours=24), DAY: timedelta(days=30)}
+MAX_RANGES = {HOUR: timedelta(days=31), DAY: timedelta(days=366)}
+
+
+def bucket_of(at: datetime, granularity: str) -> datetime:
+    """
+    Start of the bucket (hour or day) of a time
+    """
+    at = hour_of(at)
+    return at.replace(hour=0) if granularity == DAY else at
+
+
+def _local(at: datetime) -> datetime:
+    # Posts are dated in naive local time
+    return at if at.tzinfo is None else at.astimezone().replace(tzinfo=None)
+
+
+def activity_range(
+    granularity: str,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    now: Optional[datetime] = None,
+) -> Tuple[datetime, datetime]:
+    """
+    Bucket-aligned [start, end) of a request, ending at the current bucket by default
+
+    Raises:
+        ValueError: The range is empty or longer than MAX_RANGES
+    """
+    step = BUCKETS[granularity]
+    now = datetime.now() if now is None else now
+    end = bucket_of(now if end is None else _local(end), granularity) + step
+    start = end - DEFAULT_RANGES[granularity] if start is None else bucket_of(_local(start), granularity)
+
+    if start >= end:
+        raise ValueError("start must be before end")
+    if end - start > MAX_RANGES[granularity]:
+        raise ValueError(f"Range longer than {MAX_RANGES[granularity].days} days")
+    return start, end
+
+
+def activity_series(
+    points: Iterable[ActivityPointEntity],
+    granularity: str,
+    start: datetime,
+    end: datetime,
+) -> List[ActivityPointEntity]:
+    """
+    Posts per bucket of [start, end), buckets without posts included (0)
+
+    Notes:
+        Days are sums of the hourly rows, at most 24 * 366 rows per request
+    """
+    step = BUCKETS[granularity]
+    totals: Dict[datetime, int] = {}
+    for point in points:
+        bucket = bucket_of(point.start, granularity)
+        totals[bucket] = totals.get(bucket, 0) + point.posts
+
+    series = []
+    bucket = start
+    while bucket < end:
+        series.append(ActivityPointEntity(start=bucket, posts=totals.get(bucket, 0)))
+        bucket += step
+    return series
@@ -0,0 +1,126 @@
+"""
+Public topics response cache
+"""
+
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from setup import config, response_cache, response_compressor
+from api.dependencies.connections import open_read_session, run_after_commit
+from utils.cache import CachedResponse
+from utils.http_cache import cache_headers, is_not_modified, not_modified_response
+
+
+TOPICS_PATH = "/public/topics"
+
+
+def topic_posts_path(topic_id: int) -> str:
+    """
+    Path of the public posts listing of a topic
+    """
+    return f"{TOPICS_PATH}/{topic_id}/posts"
+
+
+def invalidate_public_topics(session: AsyncSession, topic_id: Optional[int] = None) -> None:
+    """
+    Invalidate the public topics listing once the transaction commits
+
+    Args:
+        session: Session of the write
+        topic_id: When given, the posts listing of the topic is invalidated too
+    """
+    def invalidate():
+        response_cache.invalidate(TOPICS_PATH)
+        if topic_id is not None:
+            response_cache.invalidate(topic_posts_path(topic_id))
+
+    run_after_commit(session, invalidate)
+
+
+def invalidate_public_posts(session: AsyncSession, topic_id: int) -> None:
+    """
+    Invalidate the public posts listing of a topic once the transaction commits
+    """
+    run_after_commit(session, lambda: response_cache.invalidate(topic_posts_path(topic_id)))
+
+
+def open_cache_session(request: Request, path: str) -> AbstractAsyncContextManager:
+    """
+    Read session of a cache loader
+
+    Notes:
+        Within DATABASE_PRIMARY_PIN_SECONDS of an invalidation of the path
+        the loader reads the primary: a lagging replica would put the page
+        from before the write in the cache, served to every client for the
+        TTL. Not for the reader pool of SQLite (same file, no lag), the
+        writer connection stays free for the writes.
+    """
+    replicas = getattr(request.app.state, "replicas", None)
+    primary = (
+        replicas is not None
+        and replicas.lagging
+        and response_cache.invalidated_within(path, config.DATABASE_PRIMARY_PIN_SECONDS)
+    )
+    return open_read_session(request, primary=primary)
+
+
+def _vary_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """
+    Validator headers of a cached response, varying on the content coding
+    """
+    headers = cache_headers(etag, last_modified)
+    headers["Vary"] = "Accept-Encoding"
+    return headers
+
+
+async def cached_response(
+    request: Request,
+    path: str,
+    etag: str,
+    last_modified: Optional[datetime],
+    loader: Callable[[], Awaitable[CachedResponse]],
+    **params
+) -> Response:
+    """
+    Serve a public response from the cache, answering conditional requests
+
+    Notes:
+        The validators come from the version lookup of the caller, so a
+        conditional request is answered with 304 before any cache or page
+        query. The ETag is part of the cache key: a write commits a new
+        version, and every worker misses the entries of the old one even
+        when it did not see the invalidation (they expire with the TTL).
+        The body is compressed once per negotiated coding and kept in the
+        cache entry, the compression middleware skips it afterwards.
+
+    Args:
+        request: Current request
+        path: Path of the resource
+        etag: ETag of the current version of the resource
+        last_modified: Last modification of the resource
+        loader: Renders the response on cache miss
+        params: Validated query params (cache key)
+    """
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(_vary_headers(etag, last_modified))
+
+    key = response_cache.build_key(path, etag=etag, **params)
+    entry = await response_cache.get_or_load(key, path, loader)
+    headers = _vary_headers(entry.etag, entry.last_modified)
+
+    body = entry.body
+    encoding = response_compressor.negotiate(request.headers.get("accept-encoding"))
+
+    if encoding and response_compressor.should_compress(entry.media_type, len(body)):
+        body = entry.variants.get(encoding)
+        if body is None:
+            body = response_compressor.compress(entry.body, encoding)
+            response_cache.add_variant(key, entry, encoding, body)
+
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type=entry.media_type, headers=headers)
@@ -0,0 +1,68 @@
+"""
+Topic export (NDJSON streamed from a server-side cursor)
+"""
+
+from typing import AsyncGenerator, Dict, List
+
+from fastapi import FastAPI
+
+from setup import config
+from api.dependencies.connections import open_session
+from database.instrumentation import allow_repeated_queries
+from database.repositories import PostRepository
+from domain.entities import PostEntity, BlobEntity
+from .schemas import PostExportSchema, BlobResponseSchema
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _render_chunk(posts: List[PostEntity], appends: Dict[int, List[BlobEntity]]) -> bytes:
+    """
+    Render a chunk of posts as NDJSON lines
+    """
+    return b"".join(
+        PostExportSchema(
+            id=post.id,
+            title=post.title,
+            description=post.description,
+            user_id=post.user_id,
+            reply_post_id=post.reply_post_id,
+            likes_count=post.likes_count,
+            reply_count=post.reply_count,
+            topic_post_id=post.topic_post_id,
+            created_at=post.created_at,
+            updated_at=post.updated_at,
+            appends=[
+                BlobResponseSchema(
+                    id=blob.id,
+                    link=blob.link,
+                    nome=blob.nome,
+                    extensao=blob.extensao
+                ) for blob in appends.get(post.id, ())
+            ]
+        ).model_dump_json().encode() + b"\n"
+        for post in posts
+    )
+
+
+async def export_topic_posts(app: FastAPI, topic_id: int, read_only: bool = False) -> AsyncGenerator[bytes, None]:
+    """
+    Generate the NDJSON export of every post of a topic
+
+    Notes:
+        Posts come from a server-side cursor on one session, attachments
+        are fetched per chunk with a single IN query on a second session
+        (the cursor keeps its connection busy until the end, e.g. MySQL
+        unbuffered cursors). Memory is bounded by EXPORT_CHUNK_SIZE. With
+        read_only both sessions may come from read replicas.
+    """
+    async with open_session(app, read_only) as stream_session, open_session(app, read_only) as lookup_session:
+        post_repo = PostRepository(stream_session)
+        appends_repo = PostRepository(lookup_session)
+
+        async for posts in post_repo.stream_by_topic(topic_id, config.EXPORT_CHUNK_SIZE):
+            # One lookup per chunk is the intended batching, not an N+1
+            with allow_repeated_queries():
+                appends = await appends_repo.get_appends([post.id for post in posts])
+            yield _render_chunk(posts, appends)
@@ -2,45 +2,82 @@
 Posts Handler
 """
 
+from functools import cached_property, partial
 from io import BytesIO
 from typing import List, Optional
 
-from fastapi import Depends, UploadFile, HTTPException, status
-from PIL import Image
+from fastapi import UploadFile, HTTPException, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from api.dependencies.connections import get_repository
+from api.dependencies.connections import run_on_rollback
+from api.dependencies.services import AppServices
 from database.repositories import PostRepository, BlobRepository, UserRepository, TopicRepository
 from domain.services.topics.posts_service import PostService
 from domain.services.blob.blob_services import BlobService
-from domain.entities import PostEntity
+from domain.entities import PostEntity, BlobEntity
 from domain.exceptions import BlobException
-from setup import storage_blob
-from integrations.blob_storage import StorageProviders, BlobStorageAdapter
-from ..schemas import PostUpdateSchema, PostResponseSchema, BlobResponseSchema
-
-
+from setup import config
+from utils.http_cache import build_etag, cache_headers, is_not_modified, not_modified_response
+from utils.metrics import IMAGE_PROCESSING_SECONDS
+from utils.timing import IMAGE, timed
+from utils.tracing import traced, traced_methods
+from ..cache import invalidate_public_topics, invalidate_public_posts
+from ..stream import publish_post_created
+from ..trending import record_post_activity
+from ..schemas import PostUpdateSchema, PostResponseSchema, PostPublicResponseSchema, BlobResponseSchema
+
+
+@traced_methods
 class PostsController:
     """
     Posts controller
     """
 
-    def __init__(
-        self,
-        post_repo: PostRepository = Depends(get_repository(PostRepository)),
-        blob_repo: BlobRepository = Depends(get_repository(BlobRepository)),
-        user_repo: UserRepository = Depends(get_repository(UserRepository)),
-        topic_repo: TopicRepository = Depends(get_repository(TopicRepository)),
-    ):
-        self.post_repo = post_repo
-        self.blob_repo = blob_repo
-        self.user_repo = user_repo
-        self.topic_repo = topic_repo
-        self.post_service = PostService(post_repo)
-
-        # Setup blob service
-        storage = storage_blob.get(StorageProviders.SUPABASE)
-        adapter = BlobStorageAdapter(storage)
-        self.blob_service = BlobService(blob_repo, adapter, StorageProviders.SUPABASE.value)
+    def __init__(self, session: AsyncSession, services: AppServices):
+        self.session = session
+        self.services = services
+
+    @cached_property
+    def post_repo(self) -> PostRepository:
+        """
+        Post repository of the request session
+        """
+        return PostRepository(self.session)
+
+    @cached_property
+    def blob_repo(self) -> BlobRepository:
+        """
+        Blob repository of the request session
+        """
+        return BlobRepository(self.session)
+
+    @cached_property
+    def user_repo(self) -> UserRepository:
+        """
+        User repository of the request session
+        """
+        return UserRepository(self.session)
+
+    @cached_property
+    def topic_repo(self) -> TopicRepository:
+        """
+        Topic repository of the request session
+        """
+        return TopicRepository(self.session)
+
+    @cached_property
+    def post_service(self) -> PostService:
+        """
+        Post service of the request
+        """
+        return PostService(self.post_repo)
+
+    @cached_property
+    def blob_service(self) -> BlobService:
+        """
+        Blob service of the request
+        """
+        return BlobService(self.blob_repo, self.services.blob_storage, self.services.blob_provider)
 
     async def _get_user_id(self, user_uuid: str) -> int:
         """
@@ -58,6 +95,7 @@ class PostsController:
         """
         Validate image dimensions
         """
+        from PIL import Image  # pylint: disable=import-outside-toplevel
         try:
             image = Image.open(BytesIO(file_content))
             width, height = image.size
@@ -74,28 +112,39 @@ class PostsController:
                 detail=f"Invalid image file: {filename}"
             ) from err
 
+    @traced("image.convert_webp")
     def _convert_to_webp(self, file_content: bytes) -> bytes:
         """
         Convert image to webp format
         """
-        image = Image.open(BytesIO(file_content))
-        if image.mode in ('RGBA', 'LA', 'P'):
-            image = image.convert('RGBA')
-        else:
-            image = image.convert('RGB')
-        output = BytesIO()
-        image.save(output, format='WEBP', quality=85)
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+        with IMAGE_PROCESSING_SECONDS.time("decode"), timed(IMAGE):
+            image = Image.open(BytesIO(file_content))
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+            else:
+                image = image.convert('RGB')
+
+        with IMAGE_PROCESSING_SECONDS.time("encode"), timed(IMAGE):
+            output = BytesIO()
+            image.save(output, format='WEBP', quality=85)
         return output.getvalue()
 
-    async def _rollback_uploaded_blobs(self, blobs: list) -> None:
+    async def _upload_image(self, file_name: str, file_content: bytes) -> BlobEntity:
         """
-        Delete uploaded blobs in case of failure (rollback)
+        Upload a converted image, deleted from the storage if the request is rolled back
+
+        Notes:
+            The blob rows roll back with the transaction, the stored file is
+            compensated (validation errors, failed commits and deadlines)
         """
-        for blob in blobs:
-            try:
-                await self.blob_service.delete(blob.id)
-            except Exception:
-                pass  # Ignore errors during rollback
+        blob = await self.blob_service.upload(
+            file_name=file_name,
+            file_bytes=file_content,
+            file_extension="webp"
+        )
+        run_on_rollback(self.post_repo.session, partial(self.blob_service.storage_provider.delete, blob.provedor_id))
+        return blob
 
     async def create_post(
         self,
@@ -125,21 +174,11 @@ class PostsController:
                     # Convert to webp
                     file_content = self._convert_to_webp(file_content)
 
-                    blob = await self.blob_service.upload(
-                        file_name=file_name,
-                        file_bytes=file_content,
-                        file_extension="webp"
-                    )
+                    blob = await self._upload_image(file_name, file_content)
                     uploaded_blobs.append(blob)
 
-        except HTTPException:
-            # Rollback uploaded blobs on validation error
-            await self._rollback_uploaded_blobs(uploaded_blobs)
-            raise
-
         except BlobException as err:
-            # Rollback uploaded blobs on upload error
-            await self._rollback_uploaded_blobs(uploaded_blobs)
+            # Uploaded blobs are deleted by the rollback of the request
             raise HTTPException(
                 status_code=err.code,
                 detail={"message": err.message, "detail": err.detail}
@@ -171,12 +210,13 @@ class PostsController:
             # Increment reply counter
             await self.post_repo.increment_reply_count(reply_post_id, 1)
 
-        # Increment topic post counter
+        # Increment topic post counter (and its trending score, on commit)
         await self.topic_repo.increment_post_count(topic_id, 1)
+        record_post_activity(self.topic_repo.session, topic_id)
 
         result = await self.post_service.create(topic_id, user_id, post_entity)
 
-        return PostResponseSchema(
+        response = PostResponseSchema(
             id=result.id,
             title=result.titulo,
             description=result.descricao,
@@ -195,6 +235,14 @@ class PostsController:
             ]
         )
 
+        invalidate_public_topics(self.post_repo.session, topic_id)
+        publish_post_created(
+            self.post_repo.session,
+            PostPublicResponseSchema.model_validate(response.model_dump(exclude={"user_id"}))
+        )
+
+        return response
+
     async def update_post(
         self,
         post_id: int,
@@ -219,6 +267,7 @@ class PostsController:
             existing_post.description = data.description
 
         result = await self.post_service.update(existing_post, user_id)
+        invalidate_public_posts(self.post_repo.session, existing_post.topic_post_id)
 
         return PostResponseSchema(
             id=result.id,
@@ -232,9 +281,18 @@ class PostsController:
             appends=[]
         )
 
-    async def get_post(self, post_id: int) -> PostResponseSchema:
+    async def get_post(
+        self,
+        post_id: int,
+        request: Optional[Request] = None,
+        response: Optional[Response] = None
+    ) -> PostResponseSchema:
         """
         Get a post by ID
+
+        Notes:
+            When request and response are given, the response carries
+            cache validators and conditional requests are answered with 304
         """
         post = await self.post_repo.get_by_id(post_id)
 
@@ -244,6 +302,19 @@ class PostsController:
                 detail="Post not found"
             )
 
+        if request is not None and response is not None and post.updated_at is not None:
+            etag = build_etag("post", post.id, post.updated_at.isoformat())
+            headers = cache_headers(
+                etag,
+                post.updated_at,
+                f"public, max-age={config.HTTP_CACHE_MAX_AGE}, must-revalidate"
+            )
+
+            if is_not_modified(request, etag, post.updated_at):
+                return not_modified_response(headers)
+
+            response.headers.update(headers)
+
         return PostResponseSchema(
             id=post.id,
             title=post.title,
@@ -300,21 +371,11 @@ class PostsController:
                 # Convert to webp
                 file_content = self._convert_to_webp(file_content)
 
-                blob = await self.blob_service.upload(
-                    file_name=file_name,
-                    file_bytes=file_content,
-                    file_extension="webp"
-                )
+                blob = await self._upload_image(file_name, file_content)
                 uploaded_blobs.append(blob)
 
-        except HTTPException:
-            # Rollback uploaded blobs on validation error
-            await self._rollback_uploaded_blobs(uploaded_blobs)
-            raise
-
         except BlobException as err:
-            # Rollback uploaded blobs on upload error
-            await self._rollback_uploaded_blobs(uploaded_blobs)
+            # Uploaded blobs are deleted by the rollback of the request
             raise HTTPException(
                 status_code=err.code,
                 detail={"message": err.message, "detail": err.detail}
@@ -323,9 +384,11 @@ class PostsController:
         # Save appends to posts_anexos table
         if uploaded_blobs:
             await self.post_repo.add_appends(post_id, uploaded_blobs)
+            invalidate_public_posts(self.post_repo.session, existing_post.topic_post_id)
 
-        # Refresh post to get updated appends
-        updated_post = await self.post_repo.get_by_id(post_id)
+        # The loaded post plus the new appends is the stored state, no need to reload it
+        updated_post = existing_post
+        updated_post.post_apppends.extend(uploaded_blobs)
 
         return PostResponseSchema(
             id=updated_post.id,
@@ -385,9 +448,11 @@ class PostsController:
 
         # Mark append as removed in entity
         existing_post.remove_append(append_id)
+        await self.post_repo.touch(post_id)
+        invalidate_public_posts(self.post_repo.session, existing_post.topic_post_id)
 
-        # Refresh post
-        updated_post = await self.post_repo.get_by_id(post_id)
+        # The append was removed from the loaded post, no need to reload it
+        updated_post = existing_post
 
         return PostResponseSchema(
             id=updated_post.id,
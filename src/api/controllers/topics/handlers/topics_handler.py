@@ -3,42 +3,75 @@ Topics Handler
 """
 
 from datetime import datetime
+from functools import cached_property, partial
 from io import BytesIO
+from typing import Optional
 
-from fastapi import Depends, UploadFile, HTTPException, status
-from PIL import Image
+from fastapi import UploadFile, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from api.dependencies.connections import get_repository
+from api.dependencies.connections import reads_from_replica, run_on_rollback
+from api.dependencies.services import AppServices
 from database.repositories import TopicRepository, BlobRepository, UserRepository
 from domain.services.topics.topics_service import TopicService
 from domain.services.blob.blob_services import BlobService
-from domain.entities import TopicEntity
+from domain.entities import TopicEntity, BlobEntity
 from domain.exceptions import BlobException
-from setup import storage_blob
-from integrations.blob_storage import StorageProviders, BlobStorageAdapter
+from setup import config
+from utils.http_cache import build_etag, cache_headers, is_not_modified, not_modified_response
+from utils.metrics import IMAGE_PROCESSING_SECONDS
+from utils.timing import IMAGE, timed
+from utils.tracing import traced, traced_methods
+from ..cache import invalidate_public_topics
+from ..export import export_topic_posts, NDJSON_MEDIA_TYPE
 from ..schemas import TopicUpdateSchema, TopicResponseSchema
 
 
+@traced_methods
 class TopicsController:
     """
     Topics controller
     """
 
-    def __init__(
-        self,
-        topic_repo: TopicRepository = Depends(get_repository(TopicRepository)),
-        blob_repo: BlobRepository = Depends(get_repository(BlobRepository)),
-        user_repo: UserRepository = Depends(get_repository(UserRepository))
-    ):
-        self.topic_repo = topic_repo
-        self.blob_repo = blob_repo
-        self.user_repo = user_repo
-        self.topic_service = TopicService(topic_repo)
-
-        # Setup blob service
-        storage = storage_blob.get(StorageProviders.SUPABASE)
-        adapter = BlobStorageAdapter(storage)
-        self.blob_service = BlobService(blob_repo, adapter, StorageProviders.SUPABASE.value)
+    def __init__(self, session: AsyncSession, services: AppServices):
+        self.session = session
+        self.services = services
+
+    @cached_property
+    def topic_repo(self) -> TopicRepository:
+        """
+        Topic repository of the request session
+        """
+        return TopicRepository(self.session)
+
+    @cached_property
+    def blob_repo(self) -> BlobRepository:
+        """
+        Blob repository of the request session
+        """
+        return BlobRepository(self.session)
+
+    @cached_property
+    def user_repo(self) -> UserRepository:
+        """
+        User repository of the request session
+        """
+        return UserRepository(self.session)
+
+    @cached_property
+    def topic_service(self) -> TopicService:
+        """
+        Topic service of the request
+        """
+        return TopicService(self.topic_repo)
+
+    @cached_property
+    def blob_service(self) -> BlobService:
+        """
+        Blob service of the request
+        """
+        return BlobService(self.blob_repo, self.services.blob_storage, self.services.blob_provider)
 
     async def _get_user_id(self, user_uuid: str) -> int:
         """
@@ -56,6 +89,7 @@ class TopicsController:
         """
         Validate image dimensions
         """
+        from PIL import Image  # pylint: disable=import-outside-toplevel
         try:
             image = Image.open(BytesIO(file_content))
             width, height = image.size
@@ -73,19 +107,36 @@ class TopicsController:
                 detail="Invalid image file"
             ) from err
 
+    @traced("image.convert_webp")
     def _convert_to_webp(self, file_content: bytes) -> bytes:
         """
         Convert image to webp format
         """
-        image = Image.open(BytesIO(file_content))
-        if image.mode in ('RGBA', 'LA', 'P'):
-            image = image.convert('RGBA')
-        else:
-            image = image.convert('RGB')
-        output = BytesIO()
-        image.save(output, format='WEBP', quality=85)
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+        with IMAGE_PROCESSING_SECONDS.time("decode"), timed(IMAGE):
+            image = Image.open(BytesIO(file_content))
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+            else:
+                image = image.convert('RGB')
+
+        with IMAGE_PROCESSING_SECONDS.time("encode"), timed(IMAGE):
+            output = BytesIO()
+            image.save(output, format='WEBP', quality=85)
         return output.getvalue()
 
+    async def _upload_image(self, file_name: str, file_content: bytes) -> BlobEntity:
+        """
+        Upload a converted image, deleted from the storage if the request is rolled back
+        """
+        blob = await self.blob_service.upload(
+            file_name=file_name,
+            file_bytes=file_content,
+            file_extension="webp"
+        )
+        run_on_rollback(self.topic_repo.session, partial(self.blob_service.storage_provider.delete, blob.provedor_id))
+        return blob
+
     async def create_topic(
         self,
         title: str,
@@ -116,11 +167,7 @@ class TopicsController:
         file_content = self._convert_to_webp(file_content)
 
         try:
-            blob = await self.blob_service.upload(
-                file_name=file_name,
-                file_bytes=file_content,
-                file_extension="webp"
-            )
+            blob = await self._upload_image(file_name, file_content)
             topic_image_id = blob.id
         except BlobException as err:
 
@@ -140,6 +187,7 @@ class TopicsController:
         )
 
         result = await self.topic_service.create(topic_entity, None)
+        invalidate_public_topics(self.topic_repo.session)
 
         return TopicResponseSchema(
             id=result.id,
@@ -177,6 +225,7 @@ class TopicsController:
             existing_topic.topic_image_id = data.topic_image_id
 
         result = await self.topic_service.update(existing_topic, user_id)
+        invalidate_public_topics(self.topic_repo.session)
 
         return TopicResponseSchema(
             id=result.id,
@@ -188,9 +237,18 @@ class TopicsController:
             created_at=result.criado_em
         )
 
-    async def get_topic(self, topic_id: int) -> TopicResponseSchema:
+    async def get_topic(
+        self,
+        topic_id: int,
+        request: Optional[Request] = None,
+        response: Optional[Response] = None
+    ) -> TopicResponseSchema:
         """
         Get a topic by ID
+
+        Notes:
+            When request and response are given, the response carries
+            cache validators and conditional requests are answered with 304
         """
         topic = await self.topic_repo.get_by_id(topic_id)
 
@@ -200,6 +258,20 @@ class TopicsController:
                 detail="Topic not found"
             )
 
+        if request is not None and response is not None:
+            last_modified = topic.updated_at or topic.created_at
+            etag = build_etag("topic", topic.id, last_modified.isoformat())
+            headers = cache_headers(
+                etag,
+                last_modified,
+                f"public, max-age={config.HTTP_CACHE_MAX_AGE}, must-revalidate"
+            )
+
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(headers)
+
+            response.headers.update(headers)
+
         return TopicResponseSchema(
             id=topic.id,
             title=topic.title,
@@ -243,11 +315,7 @@ class TopicsController:
             if existing_topic.topic_image_id and existing_topic.topic_image_id > 0:
                 await self.blob_service.delete(existing_topic.topic_image_id)
 
-            blob = await self.blob_service.upload(
-                file_name=file_name,
-                file_bytes=file_content,
-                file_extension="webp"
-            )
+            blob = await self._upload_image(file_name, file_content)
 
         except BlobException as err:
 
@@ -259,6 +327,7 @@ class TopicsController:
         # Update topic with new image
         existing_topic.topic_image_id = blob.id
         result = await self.topic_service.update(existing_topic, user_id)
+        invalidate_public_topics(self.topic_repo.session)
 
         return TopicResponseSchema(
             id=result.id,
@@ -301,6 +370,7 @@ class TopicsController:
 
             existing_topic.topic_image_id = None
             result = await self.topic_service.update(existing_topic, user_id)
+            invalidate_public_topics(self.topic_repo.session)
         else:
             result = existing_topic
 
@@ -313,3 +383,25 @@ class TopicsController:
             created_by_user_id=result.criado_por_id if hasattr(result, 'criado_por_id') else existing_topic.created_by_user_id,
             created_at=result.criado_em if hasattr(result, 'criado_em') else existing_topic.created_at
         )
+
+    async def export_topic(self, topic_id: int, request: Request) -> StreamingResponse:
+        """
+        Export every post of a topic as NDJSON (one post per line)
+
+        Notes:
+            The body is streamed while it is read from the database, so
+            memory does not grow with the topic size
+        """
+        topic = await self.topic_repo.get_by_id(topic_id)
+
+        if topic is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Topic not found"
+            )
+
+        return StreamingResponse(
+            export_topic_posts(request.app, topic_id, reads_from_replica(request)),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="topic-{topic_id}-posts.ndjson"'},
+        )
@@ -4,14 +4,15 @@ Posts Routers
 
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Request, Response
 
-from api.dependencies import get_current_user_uuid
+from api.dependencies import get_controller, get_current_user_uuid
+from api.middlewares import TimedRoute
 from ..schemas import PostUpdateSchema, PostResponseSchema
 from ..handlers import PostsController
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/{topic_id}/posts", response_model=PostResponseSchema)
@@ -22,7 +23,7 @@ async def create_post(
     reply_post_id: Optional[int] = Form(None, description="Reply to post ID"),
     files: List[UploadFile] = File(default=[], description="Post attachments (optional)"),
     user_uuid: Annotated[str, Depends(get_current_user_uuid)] = None,
-    controller: PostsController = Depends()
+    controller: PostsController = Depends(get_controller(PostsController))
 ) -> PostResponseSchema:
     """
     Create a new post in a topic with optional file attachments
@@ -35,7 +36,7 @@ async def update_post(
     post_id: int,
     data: PostUpdateSchema,
     user_uuid: Annotated[str, Depends(get_current_user_uuid)],
-    controller: PostsController = Depends()
+    controller: PostsController = Depends(get_controller(PostsController))
 ) -> PostResponseSchema:
     """
     Update a post
@@ -46,12 +47,14 @@ async def update_post(
 @router.get("/posts/{post_id}", response_model=PostResponseSchema)
 async def get_post(
     post_id: int,
-    controller: PostsController = Depends()
+    request: Request,
+    response: Response,
+    controller: PostsController = Depends(get_controller(PostsController))
 ) -> PostResponseSchema:
     """
     Get a post by ID
     """
-    return await controller.get_post(post_id)
+    return await controller.get_post(post_id, request, response)
 
 
 @router.post("/posts/{post_id}/appends", response_model=PostResponseSchema)
@@ -59,7 +62,7 @@ async def upload_post_appends(
     post_id: int,
     files: List[UploadFile] = File(...),
     user_uuid: Annotated[str, Depends(get_current_user_uuid)] = None,
-    controller: PostsController = Depends()
+    controller: PostsController = Depends(get_controller(PostsController))
 ) -> PostResponseSchema:
     """
     Upload append files for a post
@@ -72,7 +75,7 @@ async def delete_post_append(
     post_id: int,
     append_id: int,
     user_uuid: Annotated[str, Depends(get_current_user_uuid)],
-    controller: PostsController = Depends()
+    controller: PostsController = Depends(get_controller(PostsController))
 ) -> PostResponseSchema:
     """
     Delete an append file from a post
@@ -3,15 +3,28 @@ Public Topics Routers - No authentication required
 """
 
 import math
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Header, HTTPException, Query, Path, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from api.dependencies.connections import get_repository
-from database.repositories import TopicRepository, PostRepository
+from setup import trending_index
+from api.dependencies.connections import open_read_session
+from api.middlewares import TimedRoute
+from database.repositories import ActivityRepository, TopicRepository, PostRepository
+from utils.cache import CachedResponse
+from utils.http_cache import build_etag
+from ..activity import DAY, HOUR, activity_range, activity_series
+from ..cache import TOPICS_PATH, topic_posts_path, cached_response, open_cache_session
+from ..stream import topic_post_events
 from ..schemas import (
     TopicPaginatedResponseSchema,
     TopicPublicResponseSchema,
+    TrendingTopicSchema,
+    TrendingTopicsResponseSchema,
+    ActivityPointSchema,
+    TopicActivityResponseSchema,
     PostPaginatedResponseSchema,
     PostPublicResponseSchema,
     BlobResponseSchema,
@@ -19,7 +32,7 @@ from ..schemas import (
 )
 
 
-router = APIRouter(prefix="/public", tags=["public"])
+router = APIRouter(prefix="/public", tags=["public"], route_class=TimedRoute)
 
 
 @router.get(
@@ -29,35 +42,109 @@ router = APIRouter(prefix="/public", tags=["public"])
     description="Search topics by title or ID with pagination. No authentication required."
 )
 async def search_topics(
+    request: Request,
     search: Optional[str] = Query(None, description="Search by topic title or ID"),
     page: int = Query(1, ge=1, description="Page number"),
     items_per_page: int = Query(10, ge=1, le=50, description="Items per page (max 50)"),
-    topic_repo: TopicRepository = Depends(get_repository(TopicRepository))
-) -> TopicPaginatedResponseSchema:
+) -> Response:
     """
     Search topics with pagination
+
+    Notes:
+        Responses are shared by every anonymous client through the response
+        cache, concurrent misses of the same page run the queries only once
+        (a conditional request only runs the version lookup)
+    """
+
+    async with open_cache_session(request, TOPICS_PATH) as session:
+        version = await TopicRepository(session).get_version()
+    etag = build_etag("topics", version.token(), search, page, items_per_page)
+
+    async def load() -> CachedResponse:
+        async with open_cache_session(request, TOPICS_PATH) as session:
+            topics, total_count = await TopicRepository(session).search(search, page, items_per_page)
+
+        total_pages = math.ceil(total_count / items_per_page) if total_count > 0 else 0
+
+        body = TopicPaginatedResponseSchema(
+            data=[
+                TopicPublicResponseSchema(
+                    id=topic.id,
+                    title=topic.title,
+                    description=topic.description,
+                    qtd_posts=topic.qtd_posts,
+                    topic_image_id=topic.topic_image_id,
+                    created_at=topic.created_at
+                ) for topic in topics
+            ],
+            pagination=PaginationMeta(
+                page=page,
+                items_per_page=items_per_page,
+                total_items=total_count,
+                total_pages=total_pages
+            )
+        )
+
+        return CachedResponse(
+            body=body.model_dump_json().encode(),
+            etag=etag,
+            last_modified=version.last_modified,
+        )
+
+    return await cached_response(
+        request,
+        TOPICS_PATH,
+        etag,
+        version.last_modified,
+        load,
+        search=search,
+        page=page,
+        items_per_page=items_per_page,
+    )
+
+
+@router.get(
+    "/topics/trending",
+    response_model=TrendingTopicsResponseSchema,
+    summary="Trending topics",
+    description=(
+        "Topics ranked by their recent posts, older activity counting less (time decay). "
+        "No authentication required."
+    ),
+)
+async def trending_topics(
+    request: Request,
+    limit: int = Query(10, ge=1, le=50, description="Number of topics (max 50)"),
+) -> TrendingTopicsResponseSchema:
     """
-    topics, total_count = await topic_repo.search(search, page, items_per_page)
+    Trending topics
 
-    total_pages = math.ceil(total_count / items_per_page) if total_count > 0 else 0
+    Notes:
+        The ranking comes from the in-process index (setup.trending_index),
+        the request only loads the ranked topics by primary key
+    """
+    ranking = trending_index.top(limit)
+    if not ranking:
+        return TrendingTopicsResponseSchema(data=[])
+
+    async with open_read_session(request) as session:
+        topics = await TopicRepository(session).get_by_ids([topic_id for topic_id, _ in ranking])
+    topics_by_id = {topic.id: topic for topic in topics}
 
-    return TopicPaginatedResponseSchema(
+    return TrendingTopicsResponseSchema(
         data=[
-            TopicPublicResponseSchema(
+            TrendingTopicSchema(
                 id=topic.id,
                 title=topic.title,
                 description=topic.description,
                 qtd_posts=topic.qtd_posts,
                 topic_image_id=topic.topic_image_id,
-                created_at=topic.created_at
-            ) for topic in topics
-        ],
-        pagination=PaginationMeta(
-            page=page,
-            items_per_page=items_per_page,
-            total_items=total_count,
-            total_pages=total_pages
-        )
+                created_at=topic.created_at,
+                score=round(score, 4),
+            )
+            for topic_id, score in ranking
+            if (topic := topics_by_id.get(topic_id)) is not None
+        ]
     )
 
 
@@ -68,43 +155,155 @@ async def search_topics(
     description="Search posts by title or ID within a topic with pagination. No authentication required."
 )
 async def search_posts(
+    request: Request,
     topic_id: int = Path(..., description="Topic ID"),
     search: Optional[str] = Query(None, description="Search by post title or ID"),
     page: int = Query(1, ge=1, description="Page number"),
     items_per_page: int = Query(10, ge=1, le=50, description="Items per page (max 50)"),
-    post_repo: PostRepository = Depends(get_repository(PostRepository))
-) -> PostPaginatedResponseSchema:
+) -> Response:
     """
     Search posts in a topic with pagination
+
+    Notes:
+        Responses are shared by every anonymous client through the response
+        cache, concurrent misses of the same page run the queries only once
+        (a conditional request only runs the version lookup)
+    """
+
+    async with open_cache_session(request, topic_posts_path(topic_id)) as session:
+        version = await PostRepository(session).get_topic_version(topic_id)
+    etag = build_etag("posts", topic_id, version.token(), search, page, items_per_page)
+
+    async def load() -> CachedResponse:
+        async with open_cache_session(request, topic_posts_path(topic_id)) as session:
+            posts, total_count = await PostRepository(session).search(topic_id, search, page, items_per_page)
+
+        total_pages = math.ceil(total_count / items_per_page) if total_count > 0 else 0
+
+        body = PostPaginatedResponseSchema(
+            data=[
+                PostPublicResponseSchema(
+                    id=post.id,
+                    title=post.title,
+                    description=post.description,
+                    reply_post_id=post.reply_post_id,
+                    likes_count=post.likes_count,
+                    reply_count=post.reply_count,
+                    topic_post_id=post.topic_post_id,
+                    appends=[
+                        BlobResponseSchema(
+                            id=blob.id,
+                            link=blob.link,
+                            nome=blob.nome,
+                            extensao=blob.extensao
+                        ) for blob in post.post_apppends
+                    ]
+                ) for post in posts
+            ],
+            pagination=PaginationMeta(
+                page=page,
+                items_per_page=items_per_page,
+                total_items=total_count,
+                total_pages=total_pages
+            )
+        )
+
+        return CachedResponse(
+            body=body.model_dump_json().encode(),
+            etag=etag,
+            last_modified=version.last_modified,
+        )
+
+    return await cached_response(
+        request,
+        topic_posts_path(topic_id),
+        etag,
+        version.last_modified,
+        load,
+        search=search,
+        page=page,
+        items_per_page=items_per_page,
+    )
+
+
+@router.get(
+    "/topics/{topic_id}/activity",
+    response_model=TopicActivityResponseSchema,
+    summary="Topic activity",
+    description=(
+        "Posts created per hour or per day in a topic, for charts. The last minutes may not "
+        "be counted yet. No authentication required."
+    ),
+)
+async def topic_activity(
+    request: Request,
+    topic_id: int = Path(..., description="Topic ID"),
+    granularity: str = Query(HOUR, pattern=f"^({HOUR}|{DAY})$", description="Bucket size (hour or day)"),
+    start: Optional[datetime] = Query(None, description="First bucket (default: 24 hours or 30 days before end)"),
+    end: Optional[datetime] = Query(None, description="Last bucket (default: now)"),
+) -> TopicActivityResponseSchema:
+    """
+    Posts per hour or day of a topic
+
+    Notes:
+        Served from the hourly rollup (database.activity), a range of its
+        primary key: the posts table is not read
     """
-    posts, total_count = await post_repo.search(topic_id, search, page, items_per_page)
+    try:
+        start, end = activity_range(granularity, start, end)
+    except ValueError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err)) from err
 
-    total_pages = math.ceil(total_count / items_per_page) if total_count > 0 else 0
+    async with open_read_session(request) as session:
+        topic = await TopicRepository(session).get_by_id(topic_id)
+        if topic is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Topic not found"
+            )
+        points = await ActivityRepository(session).list_hourly(topic_id, start, end)
 
-    return PostPaginatedResponseSchema(
+    return TopicActivityResponseSchema(
+        topic_id=topic_id,
+        granularity=granularity,
         data=[
-            PostPublicResponseSchema(
-                id=post.id,
-                title=post.title,
-                description=post.description,
-                reply_post_id=post.reply_post_id,
-                likes_count=post.likes_count,
-                reply_count=post.reply_count,
-                topic_post_id=post.topic_post_id,
-                appends=[
-                    BlobResponseSchema(
-                        id=blob.id,
-                        link=blob.link,
-                        nome=blob.nome,
-                        extensao=blob.extensao
-                    ) for blob in post.post_apppends
-                ]
-            ) for post in posts
+            ActivityPointSchema(start=point.start, posts=point.posts)
+            for point in activity_series(points, granularity, start, end)
         ],
-        pagination=PaginationMeta(
-            page=page,
-            items_per_page=items_per_page,
-            total_items=total_count,
-            total_pages=total_pages
+    )
+
+
+@router.get(
+    "/topics/{topic_id}/stream",
+    summary="Live feed of new posts",
+    description=(
+        "Server-Sent Events stream of the posts created in a topic. "
+        "Send Last-Event-ID to resume after the last received post. No authentication required."
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_posts(
+    request: Request,
+    topic_id: int = Path(..., description="Topic ID"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", description="Last received post ID"),
+) -> StreamingResponse:
+    """
+    Stream new posts of a topic
+
+    Notes:
+        One long-lived connection replaces polling the posts listing
+    """
+    async with open_read_session(request) as session:
+        topic = await TopicRepository(session).get_by_id(topic_id)
+
+    if topic is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Topic not found"
         )
+
+    return StreamingResponse(
+        topic_post_events(request.app, topic_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -4,14 +4,16 @@ Topics Routers
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Request, Response
+from fastapi.responses import StreamingResponse
 
-from api.dependencies import get_current_user_uuid
+from api.dependencies import get_controller, get_current_user_uuid
+from api.middlewares import TimedRoute
 from ..schemas import TopicUpdateSchema, TopicResponseSchema
 from ..handlers import TopicsController
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("", response_model=TopicResponseSchema)
@@ -20,7 +22,7 @@ async def create_topic(
     description: str = Form(..., description="Topic description"),
     image: UploadFile = File(..., description="Topic image (required, min 650x360)"),
     user_uuid: Annotated[str, Depends(get_current_user_uuid)] = None,
-    controller: TopicsController = Depends()
+    controller: TopicsController = Depends(get_controller(TopicsController))
 ) -> TopicResponseSchema:
     """
     Create a new topic with required image upload (min 650x360)
@@ -33,7 +35,7 @@ async def update_topic(
     topic_id: int,
     data: TopicUpdateSchema,
     user_uuid: Annotated[str, Depends(get_current_user_uuid)],
-    controller: TopicsController = Depends()
+    controller: TopicsController = Depends(get_controller(TopicsController))
 ) -> TopicResponseSchema:
     """
     Update a topic
@@ -44,12 +46,27 @@ async def update_topic(
 @router.get("/{topic_id}", response_model=TopicResponseSchema)
 async def get_topic(
     topic_id: int,
-    controller: TopicsController = Depends()
+    request: Request,
+    response: Response,
+    controller: TopicsController = Depends(get_controller(TopicsController))
 ) -> TopicResponseSchema:
     """
     Get a topic by ID
     """
-    return await controller.get_topic(topic_id)
+    return await controller.get_topic(topic_id, request, response)
+
+
+@router.get("/{topic_id}/export", response_class=StreamingResponse)
+async def export_topic(
+    topic_id: int,
+    request: Request,
+    user_uuid: Annotated[str, Depends(get_current_user_uuid)],
+    controller: TopicsController = Depends(get_controller(TopicsController))
+) -> StreamingResponse:
+    """
+    Export every post of a topic as NDJSON
+    """
+    return await controller.export_topic(topic_id, request)
 
 
 @router.post("/{topic_id}/image", response_model=TopicResponseSchema)
@@ -57,7 +74,7 @@ async def upload_topic_image(
     topic_id: int,
     file: UploadFile = File(...),
     user_uuid: Annotated[str, Depends(get_current_user_uuid)] = None,
-    controller: TopicsController = Depends()
+    controller: TopicsController = Depends(get_controller(TopicsController))
 ) -> TopicResponseSchema:
     """
     Upload image for a topic
@@ -69,7 +86,7 @@ async def upload_topic_image(
 async def delete_topic_image(
     topic_id: int,
     user_uuid: Annotated[str, Depends(get_current_user_uuid)] = None,
-    controller: TopicsController = Depends()
+    controller: TopicsController = Depends(get_controller(TopicsController))
 ) -> TopicResponseSchema:
     """
     Delete image from a topic
@@ -9,11 +9,16 @@ from .topics_schemas import (
     TopicPublicResponseSchema,
     PaginationMeta,
     TopicPaginatedResponseSchema,
+    TrendingTopicSchema,
+    TrendingTopicsResponseSchema,
+    ActivityPointSchema,
+    TopicActivityResponseSchema,
 )
 from .posts_schemas import (
     PostCreateSchema,
     PostUpdateSchema,
     PostResponseSchema,
+    PostExportSchema,
     BlobResponseSchema,
     PostPublicResponseSchema,
     PostPaginatedResponseSchema,
@@ -27,9 +32,14 @@ __all__ = [
     "TopicPublicResponseSchema",
     "PaginationMeta",
     "TopicPaginatedResponseSchema",
+    "TrendingTopicSchema",
+    "TrendingTopicsResponseSchema",
+    "ActivityPointSchema",
+    "TopicActivityResponseSchema",
     "PostCreateSchema",
     "PostUpdateSchema",
     "PostResponseSchema",
+    "PostExportSchema",
     "BlobResponseSchema",
     "PostPublicResponseSchema",
     "PostPaginatedResponseSchema",
@@ -2,6 +2,7 @@
 Posts Schemas
 """
 
+from datetime import datetime
 from typing import Optional, List
 
 from pydantic import BaseModel, Field
@@ -55,6 +56,14 @@ class PostResponseSchema(BaseModel):
     appends: List[BlobResponseSchema] = Field(default_factory=list, description="List of appends")
 
 
+class PostExportSchema(PostResponseSchema):
+    """
+    Schema of a post line in the topic export (NDJSON)
+    """
+    created_at: Optional[datetime] = Field(None, description="Creation date")
+    updated_at: Optional[datetime] = Field(None, description="Last update date")
+
+
 class PostPublicResponseSchema(BaseModel):
     """
     Schema for public post response
@@ -70,3 +70,34 @@ class TopicPaginatedResponseSchema(BaseModel):
     """
     data: List[TopicPublicResponseSchema] = Field(..., description="List of topics")
     pagination: PaginationMeta = Field(..., description="Pagination metadata")
+
+
+class TrendingTopicSchema(TopicPublicResponseSchema):
+    """
+    Public topic with its trending score
+    """
+    score: float = Field(..., description="Recent activity score (decays with time)")
+
+
+class TrendingTopicsResponseSchema(BaseModel):
+    """
+    Trending topics response
+    """
+    data: List[TrendingTopicSchema] = Field(..., description="Topics ranked by score")
+
+
+class ActivityPointSchema(BaseModel):
+    """
+    Posts created in a bucket of time
+    """
+    start: datetime = Field(..., description="Start of the hour or day")
+    posts: int = Field(..., description="Posts created in the bucket")
+
+
+class TopicActivityResponseSchema(BaseModel):
+    """
+    Topic activity response
+    """
+    topic_id: int = Field(..., description="Topic ID")
+    granularity: str = Field(..., description="Bucket size (hour or day)")
+    data: List[ActivityPointSchema] = Field(..., description="Buckets oldest first, empty ones with 0 posts")
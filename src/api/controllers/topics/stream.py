@@ -0,0 +1,150 @@
+"""
+Live feed of new posts per topic (Server-Sent Events)
+"""
+
+import asyncio
+from typing import AsyncGenerator, Optional, Set
+
+from fastapi import FastAPI
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from setup import post_broker, config
+from api.dependencies.connections import open_session, run_after_commit
+from database.instrumentation import allow_repeated_queries
+from database.repositories import PostRepository
+from domain.entities import PostEntity
+from utils.broker import HEARTBEAT_FRAME, ServerSentEvent
+from .schemas import PostPublicResponseSchema, BlobResponseSchema
+
+
+POST_CREATED_EVENT = "post_created"
+
+# Reconnection delay suggested to EventSource clients (milliseconds)
+RETRY_FRAME = "retry: 3000\n\n"
+
+
+def topic_channel(topic_id: int) -> str:
+    """
+    Broker channel of a topic
+    """
+    return f"topics:{topic_id}:posts"
+
+
+def post_event(post: PostPublicResponseSchema) -> ServerSentEvent:
+    """
+    Build the event of a created post, the post id is the event id
+    """
+    return ServerSentEvent(id=post.id, event=POST_CREATED_EVENT, data=post.model_dump_json())
+
+
+def _entity_to_schema(post: PostEntity) -> PostPublicResponseSchema:
+    """
+    Convert a post entity to its public schema
+    """
+    return PostPublicResponseSchema(
+        id=post.id,
+        title=post.title,
+        description=post.description,
+        reply_post_id=post.reply_post_id,
+        likes_count=post.likes_count,
+        reply_count=post.reply_count,
+        topic_post_id=post.topic_post_id,
+        appends=[
+            BlobResponseSchema(
+                id=blob.id,
+                link=blob.link,
+                nome=blob.nome,
+                extensao=blob.extensao
+            ) for blob in post.post_apppends
+        ]
+    )
+
+
+def publish_post_created(session: AsyncSession, post: PostPublicResponseSchema) -> None:
+    """
+    Publish a created post to the topic subscribers once the transaction commits
+    """
+    event = post_event(post)
+    run_after_commit(session, lambda: post_broker.publish(topic_channel(post.topic_post_id), event))
+
+
+async def _posts_after(app: FastAPI, topic_id: int, after_id: int) -> AsyncGenerator[PostEntity, None]:
+    """
+    Read the posts of a topic created after a post id, in batches, oldest first
+    """
+    while True:
+        async with open_session(app) as session:
+            with allow_repeated_queries():
+                posts = await PostRepository(session).list_after(
+                    topic_id, after_id, config.STREAM_RESUME_BATCH_SIZE
+                )
+
+        for post in posts:
+            yield post
+            after_id = post.id
+
+        if len(posts) < config.STREAM_RESUME_BATCH_SIZE:
+            return
+
+
+async def _last_post_id(app: FastAPI, topic_id: int) -> int:
+    """
+    Id of the latest post of a topic (0 without posts)
+    """
+    async with open_session(app) as session:
+        version = await PostRepository(session).get_topic_version(topic_id)
+    return version.last_id or 0
+
+
+async def topic_post_events(
+    app: FastAPI,
+    topic_id: int,
+    last_event_id: Optional[int] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Generate the SSE frames of a topic feed
+
+    Args:
+        app: Application (sessions of the catch-up queries)
+        topic_id: Topic ID
+        last_event_id: Last post id seen by the client
+
+    Notes:
+        The broker only fans out the posts created in this worker. The
+        posts table is read after subscribing (Last-Event-ID resume) and
+        again on every heartbeat, so posts created in other workers reach
+        the client within STREAM_HEARTBEAT_INTERVAL. Posts already pushed
+        by the broker are skipped by id. The stream ends when the
+        subscriber is dropped for being slow, the client reconnects with
+        Last-Event-ID and resumes from the posts table.
+    """
+    last_id = last_event_id if last_event_id is not None else await _last_post_id(app, topic_id)
+    pushed: Set[int] = set()
+
+    with post_broker.subscribe(topic_channel(topic_id)) as subscription:
+        yield RETRY_FRAME
+
+        while True:
+            async for post in _posts_after(app, topic_id, last_id):
+                if post.id not in pushed:
+                    yield post_event(_entity_to_schema(post)).frame
+                last_id = post.id
+            pushed = {post_id for post_id in pushed if post_id > last_id}
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), timeout=config.STREAM_HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+                    break
+
+                if event is None:
+                    return
+
+                if event.id <= last_id or event.id in pushed:
+                    continue
+
+                pushed.add(event.id)
+                yield event.frame
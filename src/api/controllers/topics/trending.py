@@ -0,0 +1,15 @@
+"""
+Trending topics (activity events of the in-process index)
+"""
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from setup import trending_index
+from api.dependencies.connections import run_after_commit
+
+
+def record_post_activity(session: AsyncSession, topic_id: int) -> None:
+    """
+    Count a created post in the trending score of its topic once the transaction commits
+    """
+    run_after_commit(session, lambda: trending_index.record(topic_id))
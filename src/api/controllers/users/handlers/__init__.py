@@ -3,10 +3,11 @@ Initialize handlers
 """
 
 from .register_handler import RegisterController
-from .login_handler import LoginController
+from .login_handler import LoginController, PasswordLoginController
 
 
 __all__ = [
     "RegisterController",
     "LoginController",
+    "PasswordLoginController",
 ]
@@ -2,37 +2,51 @@
 Login service
 """
 
-from fastapi import Depends
+from functools import cached_property
+from typing import Optional
+
+from fastapi import Request
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from setup import jwt_handler
-from api.dependencies.connections import get_repository
-from database.repositories import UserRepository
+from api.dependencies.connections import open_read_session, open_transaction
+from api.dependencies.services import AppServices
+from database.repositories import RevocationRepository, UserRepository
 from domain.services.users import LoginService
+from utils.tracing import traced_methods
 from ..schemas import UserTokensResponseSchema
 
 
+@traced_methods
 class LoginController:
     """
     User service
     """
 
-    def __init__(
-        self,
-        user_repo: UserRepository = Depends(get_repository(UserRepository))
-    ):
-        self.user_repo = user_repo
-        self.login_service = LoginService(user_repo)
+    def __init__(self, session: AsyncSession, services: AppServices):
+        self.session = session
+        self.services = services
 
-    async def login(self, email: str, password: str) -> UserTokensResponseSchema:
+    @cached_property
+    def user_repo(self) -> UserRepository:
         """
-        Method for login user
+        User repository of the request session
         """
-        tokens = await self.login_service.login(email, password)
+        return UserRepository(self.session)
 
-        return UserTokensResponseSchema(
-            access_token=tokens['access_token'],
-            refresh_token=tokens['refresh_token'],
-        )
+    @cached_property
+    def revocation_repo(self) -> RevocationRepository:
+        """
+        Token revocation repository of the request session
+        """
+        return RevocationRepository(self.session)
+
+    @cached_property
+    def login_service(self) -> LoginService:
+        """
+        Login service of the request
+        """
+        return LoginService(self.user_repo, self.revocation_repo)
 
     async def refresh_tokens(self, refresh_token: str) -> UserTokensResponseSchema:
         """
@@ -47,3 +61,57 @@ class LoginController:
             access_token=tokens['access_token'],
             refresh_token=tokens['refresh_token'],
         )
+
+    async def logout(self, access_token: str, refresh_token: Optional[str] = None) -> None:
+        """
+        Method for logout user (revokes the tokens)
+        """
+        await self.login_service.logout(access_token, refresh_token)
+
+
+@traced_methods
+class PasswordLoginController:
+    """
+    Password login, without a request transaction
+
+    Notes:
+        Checking a password takes tens of milliseconds in the hasher's
+        threads. Held across it, the pool connection of a request
+        transaction would stall the other requests of the worker (every
+        write, with the single-writer SQLite profile). The user is looked
+        up in a short read session, the password checked with no
+        connection held, and only a rehash opens a write transaction.
+    """
+
+    def __init__(self, request: Request, services: AppServices):
+        self.request = request
+        self.services = services
+
+    @staticmethod
+    def login_service(session: AsyncSession) -> LoginService:
+        """
+        Login service of a session
+        """
+        return LoginService(UserRepository(session), RevocationRepository(session))
+
+    async def login(self, email: str, password: str) -> UserTokensResponseSchema:
+        """
+        Method for login user
+        """
+        async with open_read_session(self.request) as session:
+            login_service = self.login_service(session)
+            user = await login_service.repo.get_by_email(email)
+
+        user = await login_service.check_password(user, password)
+
+        password_hash = await login_service.new_password_hash(user, password)
+        if password_hash is not None:
+            async with open_transaction(self.request) as session:
+                await self.login_service(session).save_password_hash(user, password_hash)
+
+        tokens = login_service.issue_tokens(user)
+
+        return UserTokensResponseSchema(
+            access_token=tokens['access_token'],
+            refresh_token=tokens['refresh_token'],
+        )
@@ -3,44 +3,79 @@ Register handler
 """
 
 import uuid
+from functools import cached_property, partial
 
-from fastapi import Depends, UploadFile
+from fastapi import UploadFile
 from fastapi.exceptions import HTTPException
 from fastapi.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from setup import storage_blob, StorageProviders
+from setup import password_hasher
 from utils.converters import convert_bytes_image_to_webp
-from api.dependencies.connections import get_repository
-from database.repositories import UserRepository, BlobRepository
+from utils.tracing import traced_methods
+from api.dependencies.connections import run_on_rollback
+from api.dependencies.services import AppServices
+from database.repositories import UserRepository, BlobRepository, RevocationRepository
 from domain.entities import UserEntity
 from domain.services.users import RegisterService, LoginService
 from domain.services.blob import BlobService
-from integrations.blob_storage import BlobStorageAdapter
 from ..schemas import UserRequestSchema, UserTokensResponseSchema
 
 
+@traced_methods
 class RegisterController:
     """
     User registration handler
     """
 
-    def __init__(
-        self,
-        user_repo: UserRepository = Depends(get_repository(UserRepository)),
-        blob_repo: BlobRepository = Depends(get_repository(BlobRepository)),
-    ):
-        self.user_repo = user_repo
-        self.blob_repo = blob_repo
-        self.register_service = RegisterService(user_repo)
-        self.login_service = LoginService(user_repo)
-
-        # Create blob service with storage adapter
-        storage = storage_blob.get(StorageProviders.SUPABASE)
-        storage_adapter = BlobStorageAdapter(storage)
-        self.blob_service = BlobService(
-            blob_repository=blob_repo,
-            storage_provider=storage_adapter,
-            provider_name=StorageProviders.SUPABASE.value,
+    def __init__(self, session: AsyncSession, services: AppServices):
+        self.session = session
+        self.services = services
+
+    @cached_property
+    def user_repo(self) -> UserRepository:
+        """
+        User repository of the request session
+        """
+        return UserRepository(self.session)
+
+    @cached_property
+    def blob_repo(self) -> BlobRepository:
+        """
+        Blob repository of the request session
+        """
+        return BlobRepository(self.session)
+
+    @cached_property
+    def revocation_repo(self) -> RevocationRepository:
+        """
+        Token revocation repository of the request session
+        """
+        return RevocationRepository(self.session)
+
+    @cached_property
+    def register_service(self) -> RegisterService:
+        """
+        Register service of the request
+        """
+        return RegisterService(self.user_repo, self.revocation_repo)
+
+    @cached_property
+    def login_service(self) -> LoginService:
+        """
+        Login service of the request
+        """
+        return LoginService(self.user_repo, self.revocation_repo)
+
+    @cached_property
+    def blob_service(self) -> BlobService:
+        """
+        Blob service of the request
+        """
+        return BlobService(
+            blob_repository=self.blob_repo,
+            storage_provider=self.services.blob_storage,
+            provider_name=self.services.blob_provider,
         )
 
     async def create_new_user(self, user: UserRequestSchema, avatar: UploadFile) -> UserTokensResponseSchema:
@@ -59,6 +94,10 @@ class RegisterController:
             excluido=False,
         )
 
+        # Set user password (hashed off the event loop, before the avatar
+        # upload so a busy hasher does not cost an upload)
+        user_entity.set_password_hash(await password_hasher.hash(user.senha))
+
         if avatar:
 
             supported_types = ("image/png", "image/jpeg", "image/jpg", "image/webp")
@@ -80,20 +119,18 @@ class RegisterController:
                 file_bytes=webp_bytes,
                 file_extension="webp",
             )
+            # Deleted from the storage if the user is not created (duplicate, deadline)
+            run_on_rollback(self.session, partial(self.blob_service.storage_provider.delete, user_avatar.provedor_id))
 
             user_entity.avatar_blob_id = user_avatar.id
-
-        # Set user password
-        user_entity.set_password(user.senha)
+            user_entity.avatar = user_avatar
 
         # Create user
         created_user = await self.register_service.create_new_user(user_entity)
 
-        # Generate tokens
-        tokens = await self.login_service.login(
-            email=created_user.email,
-            password=user.senha,
-        )
+        # Generate tokens (the user was just created, no need to log in again)
+        created_user.avatar = user_entity.avatar
+        tokens = self.login_service.issue_tokens(created_user)
 
         return UserTokensResponseSchema(
             access_token=tokens["access_token"],
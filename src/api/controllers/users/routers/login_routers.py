@@ -2,21 +2,25 @@
 Login Routers
 """
 
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response, status
 from fastapi.security.http import HTTPBearer, HTTPAuthorizationCredentials
 
+from api.dependencies import get_controller, get_request_controller
+from api.middlewares import TimedRoute
 from ..schemas import UserTokensResponseSchema
-from ..handlers import LoginController
+from ..handlers import LoginController, PasswordLoginController
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/login")
 async def login_user(
     email: str,
     password: str,
-    controller: LoginController = Depends()
+    controller: PasswordLoginController = Depends(get_request_controller(PasswordLoginController))
 ) -> UserTokensResponseSchema:
     """
     Login user
@@ -27,9 +31,22 @@ async def login_user(
 @router.get("/refresh")
 async def refresh_tokens(
     refresh_token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
-    controller: LoginController = Depends()
+    controller: LoginController = Depends(get_controller(LoginController))
 ) -> UserTokensResponseSchema:
     """
     Refresh tokens
     """
     return await controller.refresh_tokens(refresh_token.credentials)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_user(
+    access_token: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    refresh_token: Optional[str] = None,
+    controller: LoginController = Depends(get_controller(LoginController))
+) -> Response:
+    """
+    Logout user, the access token (and the refresh token, if given) stop being accepted
+    """
+    await controller.logout(access_token.credentials, refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
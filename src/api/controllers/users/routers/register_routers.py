@@ -5,11 +5,13 @@ Routers for register Api Domain
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, UploadFile, File, Form
+from api.dependencies import get_controller
+from api.middlewares import TimedRoute
 from ..schemas import UserRequestSchema, UserTokensResponseSchema
 from ..handlers import RegisterController
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("")
@@ -19,7 +21,7 @@ async def create_user(
     password: Annotated[str, Form(..., description="Password user")],
     phone: Annotated[str, Form(..., description="Phone user")],
     avatar: UploadFile = File(..., description="Avatar user"),
-    controller: RegisterController = Depends()
+    controller: RegisterController = Depends(get_controller(RegisterController))
 ) -> UserTokensResponseSchema:
     """
     Create user
@@ -2,12 +2,40 @@
 API Dependencies
 """
 
-from .connections import get_repository, get_transaction_session
-from .auth import get_current_user_uuid
+from .connections import (
+    get_read_session,
+    get_repository,
+    get_session,
+    get_transaction_session,
+    open_read_session,
+    open_session,
+    open_transaction,
+    pinned_to_primary,
+    reads_from_replica,
+    run_after_commit,
+    run_on_rollback,
+)
+from .services import AppServices, get_controller, get_request_controller, get_services, setup_services
+from .auth import get_current_user_uuid, require_profiler_token
 
 
 __all__ = [
+    "get_read_session",
     "get_repository",
+    "get_session",
     "get_transaction_session",
+    "open_read_session",
+    "open_session",
+    "open_transaction",
+    "pinned_to_primary",
+    "reads_from_replica",
+    "run_after_commit",
+    "run_on_rollback",
+    "AppServices",
+    "get_controller",
+    "get_request_controller",
+    "get_services",
+    "setup_services",
     "get_current_user_uuid",
+    "require_profiler_token",
 ]
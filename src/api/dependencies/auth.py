@@ -2,12 +2,14 @@
 JWT Authentication dependency
 """
 
-from typing import Annotated
+import hmac
+from typing import Annotated, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from setup import jwt_handler
+from setup import jwt_handler, config
+from utils.timing import AUTH, timed
 
 
 security = HTTPBearer()
@@ -20,7 +22,8 @@ async def get_current_user_uuid(
     Validate JWT token and return user_id from payload
     """
     try:
-        payload = jwt_handler.decode_payload(credentials.credentials)
+        with timed(AUTH):
+            payload = jwt_handler.decode_payload(credentials.credentials)
         user_uuid = payload.get("sub")
 
         if user_uuid is None:
@@ -41,3 +44,17 @@ async def get_current_user_uuid(
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
+
+
+async def require_profiler_token(
+    x_profile: Annotated[Optional[str], Header()] = None
+) -> None:
+    """
+    Validate the profiler token of the admin endpoints (X-Profile header)
+    """
+    token = config.PROFILER_TOKEN
+    if not token or not x_profile or not hmac.compare_digest(x_profile.encode(), token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid profiler token",
+        )
@@ -2,36 +2,255 @@
 Dependencies connections
 """
 
-from typing import TypeVar, AsyncGenerator
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TypeVar, AsyncGenerator, Awaitable, Callable, Optional
 
-from fastapi import Depends, Request
+from fastapi import Depends, FastAPI, Request
+from loguru import logger
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from setup import config
+from database.replicas import PRIMARY_PIN_COOKIE, ReplicaSet, is_pinned
+from utils.deadline import no_deadline
+from utils.metrics import DB_POOL_WAIT_SECONDS, DB_SESSIONS
+from utils.timing import DB, timed
+
 
 T = TypeVar("T")
 
+AFTER_COMMIT_KEY = "after_commit"
+ON_ROLLBACK_KEY = "on_rollback"
 
-async def get_transaction_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+# Requests that never write, served by the read replicas
+READ_METHODS = frozenset(("GET", "HEAD"))
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
     """
-    Get transaction session
+    Schedule a callback to run once the request transaction is committed
+
+    Notes:
+        Callbacks are dropped when the transaction is rolled back
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+def run_on_rollback(session: AsyncSession, compensation: Callable[[], Awaitable[None]]) -> None:
+    """
+    Schedule a compensation to run if the request transaction is rolled back
+
+    Notes:
+        For side effects outside the database (e.g. an uploaded blob).
+        Compensations run in reverse order on errors, timeouts and
+        cancellation, outside the request deadline, and are dropped on
+        commit
     """
+    session.info.setdefault(ON_ROLLBACK_KEY, []).append(compensation)
 
-    async_session: 'sessionmaker[AsyncSession]' = request.app.state.async_session
-    async with async_session() as session:
+
+async def _acquire_connection(session: AsyncSession) -> None:
+    """
+    Check out the connection of a session, measuring the pool wait
+    """
+    with DB_POOL_WAIT_SECONDS.time(), timed(DB):
+        await session.connection()
+
+
+def _run_after_commit_callbacks(session: AsyncSession) -> None:
+    """
+    Run the callbacks scheduled with run_after_commit
+    """
+    for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("Erro ao executar callback apos commit")
+
+
+async def _run_rollback_compensations(session: AsyncSession) -> None:
+    """
+    Run the compensations scheduled with run_on_rollback
+    """
+    with no_deadline():
+        for compensation in reversed(session.info.pop(ON_ROLLBACK_KEY, [])):
+            try:
+                await asyncio.wait_for(compensation(), config.DEADLINE_COMPENSATION_SECONDS)
+            except Exception:
+                logger.exception("Erro ao executar compensacao apos rollback")
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """
+    Check if a client is pinned to the primary by a recent write (replicas configured)
+
+    Notes:
+        The pin is signed with JWT_SECRET_KEY by PrimaryPinMiddleware
+    """
+    return (
+        getattr(request.app.state, "replicas", None) is not None
+        and is_pinned(
+            request.cookies.get(PRIMARY_PIN_COOKIE),
+            config.DATABASE_PRIMARY_PIN_SECONDS,
+            config.JWT_SECRET_KEY.encode(),
+        )
+    )
+
+
+def reads_from_replica(request: Request) -> bool:
+    """
+    Check if the sessions of a request can be served by a read replica
+
+    Notes:
+        Only reads (GET/HEAD) of clients that are not pinned to the primary,
+        a write pins its client for DATABASE_PRIMARY_PIN_SECONDS so it reads
+        its own writes while the replicas catch up
+    """
+    return (
+        getattr(request.app.state, "replicas", None) is not None
+        and request.method in READ_METHODS
+        and not pinned_to_primary(request)
+    )
+
+
+def _new_session(app: FastAPI, read_only: bool):
+    """
+    Session context of the primary, or of a replica for read only work
+    """
+    replicas: Optional[ReplicaSet] = getattr(app.state, "replicas", None)
+    if read_only and replicas is not None:
+        DB_SESSIONS.inc("replica")
+        return replicas.session()
+
+    DB_SESSIONS.inc("primary")
+    async_session: 'sessionmaker[AsyncSession]' = app.state.async_session
+    return async_session()
+
+
+def _read_only(session: AsyncSession) -> AsyncSession:
+    """
+    Turn off autoflush, queries of a read session never flush pending objects
+    """
+    session.sync_session.autoflush = False
+    return session
+
+
+@asynccontextmanager
+async def _transaction(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session committed at the end of the request (rolled back on errors)
+    """
+    async with _new_session(request.app, reads_from_replica(request)) as session:
+        # Single-writer SQLite sessions take the writer at their first write
+        if not getattr(session.sync_session, "lazy_checkout", False):
+            await _acquire_connection(session)
         try:
             yield session
             await session.commit()
-        except Exception:
-            await session.rollback()
+        except BaseException:
+            # Also on timeouts and cancellation, the work outside the
+            # database is still compensated
+            session.info.pop(AFTER_COMMIT_KEY, None)
+            try:
+                await session.rollback()
+            finally:
+                await _run_rollback_compensations(session)
             raise
 
+        session.info.pop(ON_ROLLBACK_KEY, None)
+        _run_after_commit_callbacks(session)
+
+
+def open_transaction(request: Request):
+    """
+    Open a session committed at the end of the block (rolled back on errors)
+
+    Notes:
+        For handlers without a request transaction (see
+        services.get_request_controller), with the same after-commit and
+        rollback hooks
+    """
+    return _transaction(request)
+
+
+async def get_transaction_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get transaction session
+
+    Notes:
+        Reads go to a read replica when configured, see reads_from_replica
+    """
+    # FastAPI always resumes or throws into dependency generators, the
+    # transaction is exited (committed or rolled back) with the request
+    async with _transaction(request) as session:  # pylint: disable=contextmanager-generator-missing-cleanup
+        yield session
+
+
+@asynccontextmanager
+async def open_read_session(request: Request, primary: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Open a read-only session for a request
+
+    Args:
+        primary: Read from the primary even when a replica is allowed
+
+    Notes:
+        Never flushes nor commits: closing the session ends the implicit
+        transaction with a rollback, the COMMIT round trip of
+        get_transaction_session is skipped and locks are not held until
+        the end of the request. Served by a read replica when allowed
+        (reads_from_replica).
+    """
+    async with _new_session(request.app, reads_from_replica(request) and not primary) as session:
+        await _acquire_connection(session)
+        yield _read_only(session)
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get read-only session (see open_read_session)
+    """
+    async with open_read_session(request) as session:
+        yield session
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get the session of a request, read-only for GET/HEAD
+
+    Notes:
+        Handlers that write must not be served by GET/HEAD routes, their
+        changes would be discarded
+    """
+    context = open_read_session(request) if request.method in READ_METHODS else _transaction(request)
+    async with context as session:
+        yield session
+
+
+@asynccontextmanager
+async def open_session(app: FastAPI, read_only: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Open a session outside of the request dependencies
+
+    Args:
+        read_only: Serve the session from a read replica when configured
+            (usually reads_from_replica(request))
+
+    Notes:
+        Used by work that may outlive the request (cache loaders, streams)
+    """
+    async with _new_session(app, read_only) as session:
+        await _acquire_connection(session)
+        yield session
+
+
 def get_repository(repositorie: T) -> T:
     """
     Get repositorie by wrapper
     """
-    async def wrapper(session: AsyncSession = Depends(get_transaction_session)):
+    async def wrapper(session: AsyncSession = Depends(get_session)):
         return repositorie(session)
 
     return wrapper
@@ -2,16 +2,58 @@
 Lifespan dependencies
 """
 
+import asyncio
 from contextlib import asynccontextmanager
+from typing import Optional, Tuple
 
 from fastapi import FastAPI
 
 import sqlmodel
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from setup import config
+from loguru import logger
+
+from setup import config, jwt_handler, password_hasher, trending_index
+from database import migrations
+from database.deadlines import apply_statement_deadlines
+from database.instrumentation import instrument_engine
+from database.replicas import ReplicaSet
+from database.revocations import run_revocation_sync, sync_revocations
+from database.sqlite import (
+    apply_pragmas,
+    create_sqlite_engines,
+    is_sqlite_file,
+    single_writer_sessionmaker,
+    sqlite_pragmas,
+)
+from database.activity import run_activity_rollup
+from database.trending import run_trending_sync, sync_trending_index
+from utils.metrics import registry, run_metrics_flush
+from utils.tracing import get_tracer
+
+
+def _create_primary_engine() -> Tuple[AsyncEngine, Optional[AsyncEngine]]:
+    """
+    Create the engine of the primary database
+
+    Returns:
+        Primary engine and, for the single-writer SQLite mode, the engine of
+        the reader pool
+
+    Notes:
+        SQLite files get the WAL pragmas on every connection
+    """
+    url = config.DATABASE_SQLITE_PATH
+    if not (config.SQLITE_PRAGMAS_ENABLED and is_sqlite_file(url)):
+        return create_async_engine(url), None
+
+    pragmas = sqlite_pragmas(config.SQLITE_BUSY_TIMEOUT_MS, config.SQLITE_CACHE_SIZE_KB, config.SQLITE_MMAP_SIZE)
+    if not config.SQLITE_SINGLE_WRITER:
+        return apply_pragmas(create_async_engine(url), pragmas), None
+
+    return create_sqlite_engines(url, pragmas, config.SQLITE_READER_POOL_SIZE, config.SQLITE_WRITER_TIMEOUT)
 
 
 @asynccontextmanager
@@ -21,14 +63,120 @@ async def lifespan(app: FastAPI):
     """
 
     # Create database session
-    engine = create_async_engine(config.DATABASE_SQLITE_PATH)
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    engine, reader_engine = _create_primary_engine()
+    engine = apply_statement_deadlines(instrument_engine(engine))
+    if reader_engine is not None:
+        reader_engine = apply_statement_deadlines(instrument_engine(reader_engine))
+        async_session = single_writer_sessionmaker(engine, reader_engine)
+    else:
+        async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     app.state.async_session = async_session
 
-    # Create tables
-    async with engine.begin() as conn:
-        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+    # Read replicas (GET and public reads), or the reader pool of SQLite
+    replica_engines = [
+        apply_statement_deadlines(instrument_engine(create_async_engine(path))) for path in config.DATABASE_REPLICA_PATHS
+    ]
+    if not replica_engines and reader_engine is not None:
+        replica_engines = [reader_engine]
+    app.state.replicas = ReplicaSet(
+        [sessionmaker(replica, class_=AsyncSession, expire_on_commit=False) for replica in replica_engines],
+        config.DATABASE_REPLICA_STRATEGY,
+        lagging=bool(config.DATABASE_REPLICA_PATHS),
+    ) if replica_engines else None
+
+    # Schema: the migrated revision must match the code (create_all only for
+    # tests and SQLite files, the migrations are MySQL only)
+    if config.DATABASE_SCHEMA_CHECK == migrations.ALEMBIC:
+        async with engine.connect() as conn:
+            await conn.run_sync(migrations.check_schema_revision)
+    elif config.DATABASE_SCHEMA_CHECK == migrations.CREATE_ALL:
+        async with engine.begin() as conn:
+            await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+
+    # Password hashing cost for this machine (already done by the master of
+    # the pre-forked server, the workers inherit it)
+    if config.PASSWORD_HASH_CALIBRATE and not password_hasher.calibrated:
+        await asyncio.to_thread(
+            password_hasher.calibrate,
+            config.PASSWORD_HASH_TARGET_SECONDS,
+            config.PASSWORD_HASH_MAX_MEMORY_MB * 2**20,
+        )
+
+    # Token revocations: load the ones not expired (restart), then the ones
+    # made by the other workers periodically
+    try:
+        await sync_revocations(jwt_handler.revocations, async_session)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Erro ao carregar os tokens revogados")
+    revocation_task = None
+    if config.JWT_REVOCATION_SYNC_SECONDS > 0:
+        revocation_task = asyncio.create_task(
+            run_revocation_sync(jwt_handler.revocations, async_session, config.JWT_REVOCATION_SYNC_SECONDS)
+        )
+
+    # Trending topics: restore the snapshot, then sync it periodically
+    try:
+        await sync_trending_index(trending_index, async_session)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Erro ao restaurar o indice de topicos em alta")
+    trending_task = None
+    if config.TRENDING_SYNC_SECONDS > 0:
+        trending_task = asyncio.create_task(
+            run_trending_sync(trending_index, async_session, config.TRENDING_SYNC_SECONDS)
+        )
+
+    # Topic activity rollup (every worker runs it, the watermark keeps a
+    # batch from being counted twice)
+    activity_task = None
+    if config.ACTIVITY_ROLLUP_INTERVAL_SECONDS > 0:
+        activity_task = asyncio.create_task(
+            run_activity_rollup(
+                async_session,
+                config.ACTIVITY_ROLLUP_INTERVAL_SECONDS,
+                config.ACTIVITY_ROLLUP_BATCH_SIZE,
+                config.ACTIVITY_ROLLUP_LAG_SECONDS,
+            )
+        )
+
+    # Metrics of this worker for the scrapes served by the others (pre-forked server)
+    metrics_task = None
+    if registry.shared_dir is not None and config.METRICS_FLUSH_SECONDS > 0:
+        metrics_task = asyncio.create_task(run_metrics_flush(registry, config.METRICS_FLUSH_SECONDS))
+
+    # Periodic span export
+    tracer = get_tracer()
+    if tracer.processor is not None:
+        tracer.processor.start()
 
     yield
 
+    password_hasher.shutdown()
+
+    if activity_task is not None:
+        activity_task.cancel()
+    if revocation_task is not None:
+        revocation_task.cancel()
+
+    # Persist the last increments of this worker
+    if trending_task is not None:
+        trending_task.cancel()
+        try:
+            await sync_trending_index(trending_index, async_session)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Erro ao salvar o indice de topicos em alta")
+
+    if tracer.processor is not None:
+        await tracer.processor.shutdown()
+
+    if metrics_task is not None:
+        metrics_task.cancel()
+    try:
+        registry.flush()
+    except OSError:
+        logger.exception("Erro ao salvar as metricas do worker")
+
+    for replica in replica_engines:
+        await replica.dispose()
+    if reader_engine is not None:
+        await reader_engine.dispose()
     await engine.dispose()
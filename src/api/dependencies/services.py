@@ -0,0 +1,87 @@
+"""
+App-scoped dependencies (stateless adapters shared by every request)
+"""
+
+from functools import cached_property
+from typing import Awaitable, Callable, Type, TypeVar
+
+from fastapi import Depends, FastAPI, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from integrations.blob_storage import BlobStorageAdapter, BlobStorageFactory, StorageProviders
+from .connections import get_session
+
+
+T = TypeVar("T")
+
+
+class AppServices:
+    """
+    Stateless objects created once per app, shared by the controllers
+
+    Args:
+        storage: Blob storage factory (setup.storage_blob)
+        provider: Blob storage provider of the uploads
+    """
+
+    def __init__(self, storage: BlobStorageFactory, provider: StorageProviders = StorageProviders.SUPABASE):
+        self.blob_provider = provider.value
+        self._storage = storage
+        self._provider = provider
+
+    @cached_property
+    def blob_storage(self) -> BlobStorageAdapter:
+        """
+        Adapter of the blob storage, the provider is created on first use
+        """
+        return BlobStorageAdapter(self._storage.get(self._provider))
+
+
+def setup_services(app: FastAPI, storage: BlobStorageFactory) -> None:
+    """
+    Create the app-scoped services (at startup, or again after replacing the storage)
+    """
+    app.state.services = AppServices(storage)
+
+
+async def get_services(request: Request) -> AppServices:
+    """
+    Get the app-scoped services
+    """
+    return request.app.state.services
+
+
+def get_controller(controller: Type[T]) -> Callable[..., Awaitable[T]]:
+    """
+    Get controller by wrapper
+
+    Notes:
+        The controller gets the request session and the app-scoped services,
+        its repositories and domain services are built on first use. The
+        wrapper is async: a class given to Depends() is sync and FastAPI
+        would construct it in the threadpool on every request.
+    """
+    async def wrapper(
+        session: AsyncSession = Depends(get_session),
+        services: AppServices = Depends(get_services),
+    ) -> T:
+        return controller(session, services)
+
+    return wrapper
+
+
+def get_request_controller(controller: Type[T]) -> Callable[..., Awaitable[T]]:
+    """
+    Get controller that opens its own sessions (no request transaction)
+
+    Notes:
+        For handlers that spend long stretches outside the database (e.g.
+        password hashing): the request transaction would keep its pool
+        connection checked out meanwhile. The controller gets the request,
+        to open short sessions (connections.open_read_session,
+        connections.open_transaction), and the app-scoped services.
+    """
+    async def wrapper(request: Request, services: AppServices = Depends(get_services)) -> T:
+        return controller(request, services)
+
+    return wrapper
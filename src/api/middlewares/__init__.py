@@ -2,11 +2,26 @@
 Setup Middlewares Fastapi
 """
 
+from typing import List
+
 import jwt
 
 from fastapi import FastAPI
 
+from setup import config, response_compressor, profile_store, rate_limit_store, admission_pools, jwt_handler
 from domain.exceptions import SecurityError, NotFoundException, DuplicateException
+from utils.passwords import PasswordHasherBusy
+from utils.rate_limit import RateRule
+from ._http.base import MetricsMiddleware
+from ._http.compression import CompressionMiddleware
+from ._http.queries import QueryStatsMiddleware
+from ._http.tracing import TracingMiddleware
+from ._http.timing import ServerTimingMiddleware, TimedRoute
+from ._http.profiling import ProfilingMiddleware
+from ._http.replicas import PrimaryPinMiddleware
+from ._http.rate_limit import RateLimitMiddleware, RateLimitGroup
+from ._http.admission import AdmissionMiddleware
+from ._http.deadline import DeadlineMiddleware
 from ._exec.integrations import blob_storage_exception_handler, BlobStorageException
 from ._exec.exception_handlers import (
     security_error_handler,
@@ -14,9 +29,51 @@ from ._exec.exception_handlers import (
     duplicate_handler,
     jwt_error_handler,
     jwt_expired_handler,
+    password_hasher_busy_handler,
 )
 
 
+# Routes that process images (CPU-expensive)
+MEDIA_ROUTES = [
+    ("POST", "/topics"),
+    ("POST", "/topics/{topic_id}/image"),
+    ("POST", "/topics/{topic_id}/posts"),
+    ("POST", "/topics/posts/{post_id}/appends"),
+]
+
+# Long-lived streaming responses (SSE, NDJSON export)
+STREAM_ROUTES = [
+    ("GET", "/public/topics/{topic_id}/stream"),
+    ("GET", "/topics/{topic_id}/export"),
+]
+
+# Routes outside admission control (streams, operational endpoints)
+ADMISSION_EXEMPT_ROUTES = STREAM_ROUTES + [
+    ("GET", "/metrics"),
+    ("GET", "/admin/profiles"),
+    ("GET", "/admin/profiles/{request_id}"),
+]
+
+
+def rate_limit_groups() -> List[RateLimitGroup]:
+    """
+    Route groups of the rate limiter (image processing and password hashing)
+    """
+    return [
+        RateLimitGroup.build(
+            "media",
+            MEDIA_ROUTES,
+            per_user=RateRule.per_minute(config.RATE_LIMIT_MEDIA_USER_PER_MINUTE, config.RATE_LIMIT_MEDIA_USER_BURST),
+            per_ip=RateRule.per_minute(config.RATE_LIMIT_MEDIA_IP_PER_MINUTE, config.RATE_LIMIT_MEDIA_IP_BURST),
+        ),
+        RateLimitGroup.build(
+            "register",
+            [("POST", "/users")],
+            per_ip=RateRule.per_minute(config.RATE_LIMIT_REGISTER_IP_PER_MINUTE, config.RATE_LIMIT_REGISTER_IP_BURST),
+        ),
+    ]
+
+
 def setup_middlewares(app: FastAPI):
     """
     Setup middlewares and exception handlers
@@ -31,4 +88,75 @@ def setup_middlewares(app: FastAPI):
 
     # JWT exception handlers
     app.add_exception_handler(jwt.InvalidTokenError, jwt_error_handler)
-    app.add_exception_handler(jwt.ExpiredSignatureError, jwt_expired_handler)
\ No newline at end of file
+    app.add_exception_handler(jwt.ExpiredSignatureError, jwt_expired_handler)
+
+    # Password hashing queue full (login and register storms)
+    app.add_exception_handler(PasswordHasherBusy, password_hasher_busy_handler)
+
+    # HTTP middlewares
+    app.add_middleware(
+        QueryStatsMiddleware,
+        debug_header=bool(config.SQL_DEBUG_HEADER),
+        n_plus_one_threshold=config.SQL_N_PLUS_ONE_THRESHOLD,
+        raise_on_n_plus_one=bool(config.SQL_N_PLUS_ONE_RAISE),
+        slow_request_db_time=config.SQL_SLOW_REQUEST_DB_TIME,
+    )
+    app.add_middleware(CompressionMiddleware, compressor=response_compressor)
+
+    # Read-your-writes: clients that write read from the primary for a while
+    if config.DATABASE_REPLICA_PATHS:
+        app.add_middleware(
+            PrimaryPinMiddleware,
+            pin_seconds=config.DATABASE_PRIMARY_PIN_SECONDS,
+            secret=config.JWT_SECRET_KEY.encode(),
+        )
+
+    # Per-phase cost of the request (auth, db, blob, image, serialization)
+    if config.SERVER_TIMING_ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
+
+    # Sampling profiler of requested and slow requests
+    if config.PROFILER_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=profile_store,
+            token=config.PROFILER_TOKEN,
+            slow_request_threshold=config.PROFILER_SLOW_REQUEST_THRESHOLD,
+            interval=config.PROFILER_INTERVAL,
+            output_dir=config.PROFILER_OUTPUT_DIR,
+        )
+
+    # Time budget of the request, bounds the SQL statements and storage calls
+    if config.DEADLINE_ENABLED:
+        app.add_middleware(
+            DeadlineMiddleware,
+            default_timeout=config.DEADLINE_DEFAULT_SECONDS,
+            route_timeouts=[(method, path, config.DEADLINE_MEDIA_SECONDS) for method, path in MEDIA_ROUTES],
+            exempt_routes=STREAM_ROUTES,
+        )
+
+    # Separate concurrency pools of reads, writes and uploads (load shedding)
+    if config.ADMISSION_ENABLED:
+        app.add_middleware(
+            AdmissionMiddleware,
+            pools=admission_pools,
+            media_routes=MEDIA_ROUTES,
+            exempt_routes=ADMISSION_EXEMPT_ROUTES,
+        )
+
+    # Token buckets of the CPU-expensive routes, before the body is read
+    if config.RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            store=rate_limit_store,
+            groups=rate_limit_groups(),
+            decode_token=jwt_handler.decode_payload,
+        )
+
+    # Root span of the request, around the SQL statistics and the handlers
+    if config.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+
+    # Outermost, so the latency includes every other middleware
+    if config.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
@@ -7,6 +7,7 @@ from fastapi.responses import JSONResponse
 import jwt
 
 from domain.exceptions import SecurityError, NotFoundException, DuplicateException
+from utils.passwords import PasswordHasherBusy
 
 
 async def security_error_handler(request: Request, exc: SecurityError):
@@ -42,3 +43,14 @@ async def jwt_expired_handler(request: Request, exc: jwt.ExpiredSignatureError):
         status_code=status.HTTP_401_UNAUTHORIZED,
         content={"detail": "Token expirado"}
     )
+
+
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """
+    Password hashing pool saturated: 503 with Retry-After
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service overloaded, try again later"},
+        headers={"Retry-After": "1"},
+    )
@@ -0,0 +1,79 @@
+"""
+Admission control middleware (load shedding by request class)
+"""
+
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.admission import MEDIA, READ, WRITE, AdmissionPool, AdmissionRejected
+from .rate_limit import compile_routes, match_route
+
+
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+class AdmissionMiddleware:
+    """
+    Run each request in the admission pool of its class, 503 when shed
+
+    Args:
+        app: ASGI app
+        pools: Pools by request class (read, write, media)
+        media_routes: (method, path pattern) pairs of the uploads
+        exempt_routes: Routes never admitted (streams, operational endpoints)
+
+    Notes:
+        Classified before routing: media routes, then reads by method,
+        everything else is a write. Long-lived streams (SSE, exports) are
+        exempt, they would hold a slot for their whole duration and count
+        as slow requests. A slot is held until the response is sent, the
+        latency of requests that raised does not adapt the limit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        pools: Dict[str, AdmissionPool],
+        media_routes: Sequence[Tuple[str, str]] = (),
+        exempt_routes: Sequence[Tuple[str, str]] = (),
+    ):
+        self.app = app
+        self.pools = pools
+        self.media_routes = compile_routes(media_routes)
+        self.exempt_routes = compile_routes(exempt_routes)
+
+    def _pool(self, scope: Scope) -> Optional[AdmissionPool]:
+        method, path = scope["method"], scope["path"]
+        if match_route(self.exempt_routes, method, path):
+            return None
+        if match_route(self.media_routes, method, path):
+            return self.pools.get(MEDIA)
+        return self.pools.get(READ if method in READ_METHODS else WRITE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        pool = self._pool(scope) if scope["type"] == "http" else None
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await pool.acquire()
+        except AdmissionRejected:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Service overloaded, try again later"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        latency = None
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+            latency = time.perf_counter() - start
+        finally:
+            pool.release(latency)
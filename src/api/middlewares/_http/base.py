@@ -1,3 +1,54 @@
 """
-Base HTTP middleware
-"""
\ No newline at end of file
+Base HTTP middleware (request metrics)
+"""
+
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import HTTP_REQUESTS, HTTP_REQUEST_SECONDS, HTTP_IN_FLIGHT
+
+
+# Route label of requests that did not match any route (avoids one series per URL)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and in-flight requests per route
+
+    Notes:
+        Pure ASGI and labelled by route template (e.g. /topics/{topic_id}),
+        the cost per request is a couple of dict updates
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+
+            route = scope.get("route")
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope["method"]
+
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, path)
+            HTTP_REQUESTS.inc(method, path, str(status_code))
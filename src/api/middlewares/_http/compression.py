@@ -0,0 +1,94 @@
+"""
+Response compression middleware
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.compression import ResponseCompressor
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies negotiated from Accept-Encoding
+
+    Notes:
+        Streamed responses and responses that already carry a
+        Content-Encoding (e.g. served precompressed from the response
+        cache) are passed through untouched
+    """
+
+    def __init__(self, app: ASGIApp, compressor: ResponseCompressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.compressor.negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, self.compressor, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """
+    Holds the response start until the body is known
+    """
+
+    def __init__(self, send: Send, compressor: ResponseCompressor, encoding: str):
+        self._send = send
+        self.compressor = compressor
+        self.encoding = encoding
+        self.start_message: Message = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        """
+        Buffer the start message until the first body chunk decides the coding
+        """
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.start_message is None:
+            await self._send(message)
+            return
+
+        # Streams are sent as they are produced
+        self.passthrough = True
+        if message.get("more_body", False):
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+
+        if self._should_compress(headers, body):
+            body = self.compressor.compress(body, self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            message = {**message, "body": body}
+
+        await self._send(self.start_message)
+        await self._send(message)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        """
+        Check if the buffered response can be compressed
+        """
+        if self.start_message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+
+        return self.compressor.should_compress(headers.get("content-type"), len(body))
@@ -0,0 +1,97 @@
+"""
+Request deadline middleware (time budget per route, 504 when exceeded)
+"""
+
+import asyncio
+from typing import Optional, Sequence, Tuple
+
+from loguru import logger
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.deadline import deadline_scope, expired
+from utils.metrics import HTTP_DEADLINE_EXCEEDED
+from .rate_limit import compile_routes, match_route
+
+
+# Route label of requests that did not match any route
+UNMATCHED_ROUTE = "unmatched"
+
+
+class DeadlineMiddleware:
+    """
+    Run each request within its time budget
+
+    Args:
+        app: ASGI app
+        default_timeout: Budget (seconds) of the routes without their own
+        route_timeouts: (method, path pattern, seconds) of specific routes
+        exempt_routes: Routes without a deadline (long-lived streams)
+
+    Notes:
+        The deadline is set in a contextvar (utils.deadline), SQL
+        statements and storage calls are bounded by what is left of it.
+        When it runs out the request task is cancelled: the transaction
+        is rolled back, its compensations still run (see
+        api.dependencies.connections.run_on_rollback) and the client gets
+        504. A response already started cannot become a 504, its
+        connection is closed instead.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_timeout: float,
+        route_timeouts: Sequence[Tuple[str, str, float]] = (),
+        exempt_routes: Sequence[Tuple[str, str]] = (),
+    ):
+        self.app = app
+        self.default_timeout = default_timeout
+        self.route_timeouts = [
+            (compile_routes([(method, path)]), seconds) for method, path, seconds in route_timeouts
+        ]
+        self.exempt_routes = compile_routes(exempt_routes)
+
+    def _timeout(self, scope: Scope) -> Optional[float]:
+        method, path = scope["method"], scope["path"]
+        if match_route(self.exempt_routes, method, path):
+            return None
+        for routes, seconds in self.route_timeouts:
+            if match_route(routes, method, path):
+                return seconds
+        return self.default_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        timeout = self._timeout(scope) if scope["type"] == "http" else None
+        if timeout is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        budget = asyncio.timeout(timeout)
+        with deadline_scope(timeout):
+            try:
+                async with budget:
+                    await self.app(scope, receive, send_wrapper)
+                return
+            except Exception:
+                # Timeouts of the budget, DeadlineExceeded and the errors of
+                # interrupted statements are all the deadline
+                if not (budget.expired() or expired()):
+                    raise
+
+                route = scope.get("route")
+                HTTP_DEADLINE_EXCEEDED.inc(scope["method"], route.path if route is not None else UNMATCHED_ROUTE)
+                logger.warning(f"Prazo de {timeout}s esgotado em {scope['method']} {scope['path']}")
+                if response_started:
+                    raise
+
+        response = JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+        await response(scope, receive, send)
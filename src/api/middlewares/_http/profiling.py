@@ -0,0 +1,134 @@
+"""
+Request profiling middleware (on demand and slow requests)
+"""
+
+import asyncio
+import hmac
+import time
+import uuid
+from typing import Optional
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.profiler import Profile, ProfileStore, SamplingProfiler, valid_request_id
+
+
+REQUEST_ID_HEADER = b"x-request-id"
+PROFILE_HEADER = b"x-profile"
+
+# Reasons of a profile
+REASON_REQUESTED = "requested"
+REASON_SLOW = "slow"
+
+# Route of requests that did not match any route
+UNMATCHED_ROUTE = "unmatched"
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with the sampling profiler
+
+    Notes:
+        A request is profiled from the start when it carries the X-Profile
+        header with the profiler token. Otherwise the profiler is armed
+        and starts once the request exceeds slow_request_threshold, so
+        the profile covers the slow part of the request. Profiles are kept
+        in the store (ring buffer) and written to output_dir as collapsed
+        stacks. Every response carries its X-Request-ID.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        token: Optional[str] = None,
+        slow_request_threshold: float = 1.0,
+        interval: float = 0.005,
+        output_dir: Optional[str] = None,
+    ):
+        self.app = app
+        self.store = store
+        self.token = token.encode() if token else None
+        self.slow_request_threshold = slow_request_threshold
+        self.interval = interval
+        self.output_dir = output_dir
+
+    def _requested(self, value: Optional[bytes]) -> bool:
+        """
+        Check the X-Profile header against the profiler token
+        """
+        return bool(self.token and value and hmac.compare_digest(value, self.token))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        # The id names the profile file, ids not matching the pattern are replaced
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")
+        if not valid_request_id(request_id):
+            request_id = uuid.uuid4().hex
+        profiler: Optional[SamplingProfiler] = None
+
+        def start(reason: str) -> None:
+            nonlocal profiler
+            if not self.store.acquire():
+                return
+            profile = Profile(
+                request_id=request_id,
+                method=scope["method"],
+                route=UNMATCHED_ROUTE,
+                reason=reason,
+                started_at=time.time(),
+                interval=self.interval,
+            )
+            profiler = SamplingProfiler(profile).start()
+
+        timer = None
+        if self._requested(headers.get(PROFILE_HEADER)):
+            start(REASON_REQUESTED)
+        elif self.slow_request_threshold > 0:
+            timer = asyncio.get_running_loop().call_later(self.slow_request_threshold, start, REASON_SLOW)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+            if profiler is not None:
+                await self._finish(scope, profiler)
+
+    async def _finish(self, scope: Scope, profiler: SamplingProfiler) -> None:
+        """
+        Stop the profiler, keep and write the profile
+        """
+        try:
+            profile = await asyncio.to_thread(profiler.stop)
+        finally:
+            self.store.release()
+
+        route = scope.get("route")
+        if route is not None:
+            profile.route = route.path
+
+        self.store.add(profile)
+
+        path = None
+        if self.output_dir:
+            try:
+                path = await asyncio.to_thread(profile.write, self.output_dir)
+            except (OSError, ValueError):
+                logger.exception("Erro ao gravar o perfil da requisicao", request_id=profile.request_id)
+
+        logger.bind(**profile.summary()).warning(
+            "Perfil de requisicao capturado", path=str(path) if path else None
+        )
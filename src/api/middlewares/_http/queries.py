@@ -0,0 +1,82 @@
+"""
+Per-request SQL statistics middleware
+"""
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.instrumentation import QueryStats, instrument_queries, track_queries
+
+
+class QueryStatsMiddleware:
+    """
+    Track the SQL executed by each request
+
+    Notes:
+        Query count, DB time and the slowest statement are logged per
+        request and, when debug_header is set, sent in X-DB-* headers.
+        Statements repeated n_plus_one_threshold times are logged as N+1
+        (or raise NPlusOneError with raise_on_n_plus_one, used by tests).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        debug_header: bool = False,
+        n_plus_one_threshold: int = 0,
+        raise_on_n_plus_one: bool = False,
+        slow_request_db_time: float = 0.5,
+    ):
+        self.app = app
+        self.debug_header = debug_header
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.raise_on_n_plus_one = raise_on_n_plus_one
+        self.slow_request_db_time = slow_request_db_time
+        instrument_queries()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(self.n_plus_one_threshold, self.raise_on_n_plus_one) as stats:
+
+            async def send_wrapper(message: Message):
+                if self.debug_header and message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+                    headers["X-DB-Slowest-Ms"] = f"{stats.slowest_time * 1000:.2f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._log(scope, stats)
+
+    def _log(self, scope: Scope, stats: QueryStats) -> None:
+        """
+        Log the SQL statistics of a request
+        """
+        if not stats.count:
+            return
+
+        route = scope.get("route")
+        path = route.path if route is not None else scope["path"]
+        extra = {
+            "method": scope["method"],
+            "route": path,
+            "queries": stats.count,
+            "db_time_ms": round(stats.total_time * 1000, 2),
+            "slowest_ms": round(stats.slowest_time * 1000, 2),
+            "slowest_statement": stats.slowest_statement,
+        }
+
+        for statement in stats.repeated:
+            logger.bind(**extra).warning("Consulta repetida na requisicao (N+1): {}", statement)
+
+        if stats.total_time >= self.slow_request_db_time:
+            logger.bind(**extra).warning("Requisicao com tempo de banco elevado")
+        else:
+            logger.bind(**extra).debug("Consultas SQL da requisicao")
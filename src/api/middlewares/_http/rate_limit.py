@@ -0,0 +1,155 @@
+"""
+Rate limiting middleware (token buckets per user and per client IP)
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Pattern, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.metrics import RATE_LIMITED_REQUESTS
+from utils.rate_limit import RateLimitStore, RateRule
+
+
+# Bucket scopes (label of the metric, prefix of the keys)
+USER = "user"
+IP = "ip"
+
+
+def compile_routes(routes: Sequence[Tuple[str, str]]) -> Tuple[Tuple[str, Pattern], ...]:
+    """
+    Compile (method, path pattern) pairs, "{param}" matches one segment
+    """
+    return tuple(
+        (method, re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", path) + "/?$"))
+        for method, path in routes
+    )
+
+
+def match_route(routes: Tuple[Tuple[str, Pattern], ...], method: str, path: str) -> bool:
+    """
+    Check a request against compiled routes (before routing)
+    """
+    return any(method == route_method and pattern.match(path) for route_method, pattern in routes)
+
+
+@dataclass(frozen=True)
+class RateLimitGroup:
+    """
+    Routes limited by the same buckets
+
+    Args:
+        name: Name of the group (keys and metric label)
+        routes: (method, path regex) pairs of the group
+        per_user: Limit of each authenticated user (JWT sub), None to skip
+        per_ip: Limit of each client IP, None to skip
+    """
+
+    name: str
+    routes: Tuple[Tuple[str, Pattern], ...]
+    per_user: Optional[RateRule] = None
+    per_ip: Optional[RateRule] = None
+
+    @classmethod
+    def build(cls, name: str, routes: Sequence[Tuple[str, str]], **rules: Optional[RateRule]) -> "RateLimitGroup":
+        """
+        Group from (method, path pattern) pairs
+        """
+        return cls(name=name, routes=compile_routes(routes), **rules)
+
+    def matches(self, method: str, path: str) -> bool:
+        """
+        Check if a request belongs to the group
+        """
+        return match_route(self.routes, method, path)
+
+
+class RateLimitMiddleware:
+    """
+    Reject requests over the limits of their route group with 429
+
+    Notes:
+        Runs before routing and before the body is read, so a rejected
+        upload costs a regex match and a bucket lookup. Authenticated
+        requests take a token from the user bucket and from the IP bucket,
+        requests without a valid token only from the IP bucket (they are
+        rejected later by the auth dependency). The response carries
+        Retry-After with the seconds until the bucket has a token again.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: RateLimitStore,
+        groups: Sequence[RateLimitGroup],
+        decode_token: Callable[[str], dict],
+    ):
+        self.app = app
+        self.store = store
+        self.groups = tuple(groups)
+        self.decode_token = decode_token
+
+    def _group(self, scope: Scope) -> Optional[RateLimitGroup]:
+        method, path = scope["method"], scope["path"]
+        for group in self.groups:
+            if group.matches(method, path):
+                return group
+        return None
+
+    def _user(self, headers: Headers) -> Optional[str]:
+        """
+        Subject of the bearer token, None without a valid one
+        """
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return self.decode_token(token).get("sub")
+        except Exception:  # pylint: disable=broad-exception-caught
+            return None
+
+    async def _retry_after(self, group: RateLimitGroup, scope: Scope) -> Tuple[float, str]:
+        """
+        Take the tokens of the request
+
+        Returns:
+            Seconds to wait (0 when allowed) and the scope that limited it
+        """
+        if group.per_user is not None:
+            user = self._user(Headers(scope=scope))
+            if user is not None:
+                wait = await self.store.take(f"{group.name}:{USER}:{user}", group.per_user)
+                if wait > 0:
+                    return wait, USER
+
+        if group.per_ip is not None:
+            client = scope.get("client")
+            host = client[0] if client else "unknown"
+            wait = await self.store.take(f"{group.name}:{IP}:{host}", group.per_ip)
+            if wait > 0:
+                return wait, IP
+
+        return 0.0, ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        group = self._group(scope) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait, limited_by = await self._retry_after(group, scope)
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED_REQUESTS.inc(group.name, limited_by)
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+        await response(scope, receive, send)
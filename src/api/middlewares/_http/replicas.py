@@ -0,0 +1,44 @@
+"""
+Read-your-writes middleware (pins writing clients to the primary database)
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.replicas import PRIMARY_PIN_COOKIE, primary_pin
+
+
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+class PrimaryPinMiddleware:
+    """
+    Set the primary pin cookie on the response of successful writes
+
+    Notes:
+        While the cookie is valid the reads of the client are served by the
+        primary (see api.dependencies.connections.reads_from_replica), so it
+        sees its own writes before the replicas catch up. The cookie is
+        signed with the secret, forged pins are ignored.
+    """
+
+    def __init__(self, app: ASGIApp, pin_seconds: float, secret: bytes):
+        self.app = app
+        self.pin_seconds = pin_seconds
+        self.secret = secret
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{PRIMARY_PIN_COOKIE}={primary_pin(self.pin_seconds, self.secret)}; "
+                    f"Max-Age={int(self.pin_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,103 @@
+"""
+Server-Timing middleware and route class (per-phase cost of each request)
+"""
+
+import functools
+import inspect
+from time import perf_counter
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.timing import SERIALIZATION, current_timings, track_timings
+
+
+class ServerTimingMiddleware:
+    """
+    Send the phases reported during the request in a Server-Timing header
+
+    Notes:
+        Phases finished after the response starts (e.g. the commit of the
+        request session, streamed bodies) are not part of the header
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_timings() as timings:
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", timings.header())
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+def _mark_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap an endpoint to mark when it returns (start of the serialization)
+    """
+    if getattr(endpoint, "__timed_endpoint__", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            timings = current_timings()
+            if timings is not None:
+                timings.endpoint_returned = perf_counter()
+            return result
+
+        wrapper = async_wrapper
+    else:
+        @functools.wraps(endpoint)
+        def sync_wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            timings = current_timings()
+            if timings is not None:
+                timings.endpoint_returned = perf_counter()
+            return result
+
+        wrapper = sync_wrapper
+
+    wrapper.__timed_endpoint__ = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    Route that reports the response serialization phase
+
+    Notes:
+        Serialization is the time between the endpoint return and the
+        response being built (response_model validation and JSON rendering)
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+
+            timings = current_timings()
+            if timings is not None and timings.endpoint_returned is not None:
+                timings.add(SERIALIZATION, perf_counter() - timings.endpoint_returned)
+                timings.endpoint_returned = None
+
+            return response
+
+        return timed_handler
@@ -0,0 +1,66 @@
+"""
+Request tracing middleware (root span of each request)
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.tracing import (
+    SPAN_KIND_SERVER,
+    STATUS_ERROR,
+    format_traceparent,
+    get_tracer,
+    parse_traceparent,
+)
+
+
+TRACEPARENT_HEADER = b"traceparent"
+
+
+class TracingMiddleware:
+    """
+    Open a server span per request, every span of the request is its child
+
+    Notes:
+        An incoming W3C traceparent continues the caller trace (and its
+        sampling decision). The span is named by the route template
+        (e.g. "POST /topics/{topic_id}/posts") and its context is returned
+        in the traceparent response header of sampled requests.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        parent = None
+        for name, value in scope["headers"]:
+            if name == TRACEPARENT_HEADER:
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        with get_tracer().start_span(method, kind=SPAN_KIND_SERVER, parent=parent) as span:
+
+            async def send_wrapper(message: Message):
+                if message["type"] == "http.response.start" and span.is_recording:
+                    status_code = message["status"]
+                    span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(STATUS_ERROR)
+                    MutableHeaders(scope=message)["traceparent"] = format_traceparent(span.context)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if span.is_recording:
+                    route = scope.get("route")
+                    if route is not None:
+                        span.name = f"{method} {route.path}"
+                        span.set_attribute("http.route", route.path)
+                    span.set_attribute("http.request.method", method)
+                    span.set_attribute("url.path", scope["path"])
@@ -0,0 +1,88 @@
+"""
+Precomputed OpenAPI schema (generated at build time instead of on the first request)
+
+Usage:
+    python scripts/write_openapi.py openapi.json
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from loguru import logger
+
+
+FINGERPRINT_KEY = "x-fingerprint"
+
+
+def openapi_fingerprint(app: FastAPI) -> str:
+    """
+    Fingerprint of the routes and metadata of the app
+
+    Notes:
+        Cheap to compute (no schema generation), a file written for other
+        routes, title or version is not served
+    """
+    parts = [app.title, app.description, app.version]
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.include_in_schema:
+            parts.append(f"{','.join(sorted(route.methods))} {route.path} {route.name}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def write_openapi_schema(app: FastAPI, path: str) -> Dict[str, Any]:
+    """
+    Generate the schema of the app and write it with its fingerprint
+    """
+    # Always generated from the routes, never from a previous file
+    app.openapi_schema = None
+    schema = dict(FastAPI.openapi(app))
+    app.openapi_schema = None
+    schema[FINGERPRINT_KEY] = openapi_fingerprint(app)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(schema, file, ensure_ascii=False, separators=(",", ":"))
+    return schema
+
+
+def load_openapi_schema(app: FastAPI, path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Load a precomputed schema if it matches the app
+
+    Returns:
+        The schema, or None if the file is missing, invalid or stale
+    """
+    if not path or not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, "rb") as file:
+            schema = json.load(file)
+    except (OSError, ValueError) as error:
+        logger.warning(f"Schema OpenAPI pre-gerado invalido ({path}): {error}")
+        return None
+
+    if schema.get(FINGERPRINT_KEY) != openapi_fingerprint(app):
+        logger.warning(f"Schema OpenAPI pre-gerado desatualizado ({path}), gerando na primeira requisicao")
+        return None
+    return schema
+
+
+def setup_openapi(app: FastAPI, path: Optional[str]) -> None:
+    """
+    Serve the precomputed schema of path, if present and up to date
+
+    Notes:
+        Called after the routers are included. Without a valid file FastAPI
+        keeps generating the schema on the first request to /openapi.json
+    """
+    generate = app.openapi
+
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            app.openapi_schema = load_openapi_schema(app, path) or generate()
+        return app.openapi_schema
+
+    app.openapi = openapi
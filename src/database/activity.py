@@ -0,0 +1,114 @@
+"""
+Topic activity rollup (posts per topic and hour, maintained from a watermark)
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .repositories import ActivityRepository
+
+
+# Watermark of the hourly rollup
+ACTIVITY_ROLLUP = "topicos_atividade_horaria"
+
+
+def hour_of(at: datetime) -> datetime:
+    """
+    Start of the hour of a time
+    """
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def count_by_hour(posts: Iterable[Tuple[int, int, datetime]]) -> Dict[Tuple[int, datetime], int]:
+    """
+    Posts by (topic id, hour) of (id, topic id, creation date) rows
+    """
+    return dict(Counter((topic_id, hour_of(created_at)) for _, topic_id, created_at in posts))
+
+
+async def rollup_batch(session: AsyncSession, batch_size: int, lag: float, now: Optional[datetime] = None) -> int:
+    """
+    Add the next batch of posts to the rollup, in one transaction
+
+    Args:
+        session: Session of the primary database
+        batch_size: Posts read per batch
+        lag: Seconds a post must be old to be counted
+        now: Current time (tests)
+
+    Returns:
+        Posts counted (0 when there is nothing new or another run took the batch)
+
+    Notes:
+        Post ids are given at insert but become visible at commit, a post
+        may show up after others with higher ids. Only the prefix of posts
+        older than `lag` is counted: a transaction shorter than the lag
+        that inserted a lower id has committed by then, so the watermark
+        never skips a post. The watermark moves first (compare-and-set),
+        a concurrent run of the same batch gets False and counts nothing.
+    """
+    now = datetime.now() if now is None else now
+    cutoff = now - timedelta(seconds=lag)
+    repo = ActivityRepository(session)
+
+    watermark = await repo.get_watermark(ACTIVITY_ROLLUP)
+    posts = await repo.list_posts_after(watermark, batch_size)
+
+    ready = []
+    for post in posts:
+        if post[2] >= cutoff:
+            break
+        ready.append(post)
+    if not ready:
+        return 0
+
+    if not await repo.advance_watermark(ACTIVITY_ROLLUP, watermark, ready[-1][0]):
+        await session.rollback()
+        return 0
+
+    await repo.add_hourly_counts(count_by_hour(ready))
+    await session.commit()
+    return len(ready)
+
+
+async def catch_up(session_factory: Callable[[], AsyncSession], batch_size: int, lag: float) -> int:
+    """
+    Count every post ready, batch after batch
+
+    Returns:
+        Posts counted
+
+    Notes:
+        One transaction per batch, an interruption keeps the batches done
+    """
+    total = 0
+    while True:
+        async with session_factory() as session:
+            counted = await rollup_batch(session, batch_size, lag)
+        total += counted
+        if counted < batch_size:
+            return total
+
+
+async def run_activity_rollup(
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+    batch_size: int,
+    lag: float,
+) -> None:
+    """
+    Catch up the rollup every interval seconds (lifespan background task)
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            counted = await catch_up(session_factory, batch_size, lag)
+            if counted:
+                logger.debug(f"Atividade dos topicos: {counted} posts agregados")
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Erro ao agregar a atividade dos topicos")
@@ -0,0 +1,126 @@
+"""
+Request deadlines on SQL statements (MySQL execution limit, SQLite interrupt)
+"""
+
+import asyncio
+import re
+import sqlite3
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from utils.deadline import timeout_for
+
+
+INTERRUPT_KEY = "deadline_interrupt"
+
+# Hint added to the MySQL SELECTs, its value changes with every statement
+EXECUTION_HINT = re.compile(r"^SELECT /\*\+ MAX_EXECUTION_TIME\(\d+\) \*/")
+
+
+def original_statement(statement: str) -> str:
+    """
+    Statement without the execution limit hint (same shape on every call)
+    """
+    return EXECUTION_HINT.sub("SELECT", statement, count=1) if statement.startswith("SELECT /*+") else statement
+
+
+def _check(operation: str = "sql") -> Optional[float]:
+    """
+    Remaining budget of the statement (raises when it ran out)
+    """
+    return timeout_for(None, operation)
+
+
+def _check_statement(*_):
+    _check()
+
+
+def _mysql_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Limit SELECTs to the remaining budget (MAX_EXECUTION_TIME optimizer hint)
+
+    Notes:
+        MySQL has no server-side limit for writes, a write past the
+        deadline is cancelled by the request (the connection is discarded).
+        Listeners after this one see the rewritten text, the query
+        statistics strip the hint (original_statement) so the same query
+        keeps the same shape.
+    """
+    left = _check()
+    if left is None:
+        return statement, parameters
+
+    stripped = statement.lstrip()
+    if stripped[:6].upper() != "SELECT":
+        return statement, parameters
+    return f"SELECT /*+ MAX_EXECUTION_TIME({max(1, int(left * 1000))}) */{stripped[6:]}", parameters
+
+
+def _sqlite_handle(conn) -> Optional[sqlite3.Connection]:
+    """
+    sqlite3 connection under aiosqlite, None if its layout changed
+
+    Notes:
+        aiosqlite keeps it in a private attribute, without it statements
+        are only checked before they run
+    """
+    handle = getattr(conn.connection.driver_connection, "_conn", None)
+    return handle if isinstance(handle, sqlite3.Connection) else None
+
+
+def _sqlite_before_cursor_execute(conn, *_):
+    """
+    Interrupt the statement when the deadline passes
+
+    Notes:
+        aiosqlite runs the statement in its own thread, cancelling the
+        request would leave it running and holding the connection.
+        sqlite3's interrupt() is thread-safe and aborts the statement
+        with "interrupted".
+    """
+    left = _check()
+    if left is None:
+        return
+
+    sqlite_connection = _sqlite_handle(conn)
+    if sqlite_connection is not None:
+        conn.info[INTERRUPT_KEY] = asyncio.get_running_loop().call_later(left, sqlite_connection.interrupt)
+
+
+def _cancel_interrupt(conn, *_):
+    handle = conn.info.pop(INTERRUPT_KEY, None)
+    if handle is not None:
+        handle.cancel()
+
+
+def _on_error(context):
+    if context.connection is not None:
+        _cancel_interrupt(context.connection)
+
+
+def apply_statement_deadlines(engine: AsyncEngine) -> AsyncEngine:
+    """
+    Bound the statements of an engine by the request deadline
+
+    Notes:
+        A statement started after the deadline fails with DeadlineExceeded
+        without reaching the database. Other dialects are only checked
+        before the statement.
+    """
+    sync_engine = engine.sync_engine
+    dialect = sync_engine.dialect.name
+
+    if dialect == "mysql":
+        if not event.contains(sync_engine, "before_cursor_execute", _mysql_before_cursor_execute):
+            event.listen(sync_engine, "before_cursor_execute", _mysql_before_cursor_execute, retval=True)
+    elif dialect == "sqlite" and sync_engine.dialect.is_async:
+        if not event.contains(sync_engine, "before_cursor_execute", _sqlite_before_cursor_execute):
+            event.listen(sync_engine, "before_cursor_execute", _sqlite_before_cursor_execute)
+            event.listen(sync_engine, "after_cursor_execute", _cancel_interrupt)
+            event.listen(sync_engine, "handle_error", _on_error)
+    elif not event.contains(sync_engine, "before_cursor_execute", _check_statement):
+        event.listen(sync_engine, "before_cursor_execute", _check_statement)
+
+    return engine
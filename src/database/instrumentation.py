@@ -0,0 +1,176 @@
+"""
+Database engine instrumentation (pool metrics and per-request SQL statistics)
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from utils.metrics import DB_POOL_CHECKOUTS, DB_POOL_IN_USE
+from .deadlines import original_statement
+
+
+QUERY_START_KEY = "query_start"
+
+
+class NPlusOneError(Exception):
+    """
+    Raised when the same statement is repeated too often within one scope
+    """
+
+    def __init__(self, statement: str, count: int):
+        self.statement = statement
+        self.count = count
+        super().__init__(f"Consulta repetida {count} vezes na mesma requisicao (N+1): {statement}")
+
+
+@dataclass
+class QueryStats:
+    """
+    SQL statistics of a scope (usually one request)
+
+    Args:
+        n_plus_one_threshold: Executions of the same statement that flag an N+1
+            (0 disables the detector)
+        raise_on_n_plus_one: Raise NPlusOneError instead of only flagging it
+    """
+    n_plus_one_threshold: int = 0
+    raise_on_n_plus_one: bool = False
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+    shapes: Counter = field(default_factory=Counter)
+    repeated: List[str] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed: float, detect: bool = True) -> None:
+        """
+        Record an executed statement
+
+        Notes:
+            The statement text carries placeholders instead of values, so
+            the same query with different parameters has the same shape
+        """
+        self.count += 1
+        self.total_time += elapsed
+
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+        if not detect or not self.n_plus_one_threshold:
+            return
+
+        self.shapes[statement] += 1
+        if self.shapes[statement] == self.n_plus_one_threshold:
+            self.repeated.append(statement)
+            if self.raise_on_n_plus_one:
+                raise NPlusOneError(statement, self.n_plus_one_threshold)
+
+
+_active_stats: ContextVar[Tuple[QueryStats, ...]] = ContextVar("active_query_stats", default=())
+_repeats_allowed: ContextVar[bool] = ContextVar("repeated_queries_allowed", default=False)
+
+
+@contextmanager
+def track_queries(n_plus_one_threshold: int = 0, raise_on_n_plus_one: bool = False) -> Iterator[QueryStats]:
+    """
+    Collect the statements executed inside the block
+
+    Notes:
+        Scopes can be nested (e.g. a test around a request), every active
+        scope records the statement. Query budgets are enforced by
+        asserting on the yielded stats.
+
+    Example:
+        with track_queries() as stats:
+            ...
+        assert stats.count <= 3
+    """
+    stats = QueryStats(n_plus_one_threshold, raise_on_n_plus_one)
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@contextmanager
+def allow_repeated_queries() -> Iterator[None]:
+    """
+    Disable the N+1 detector inside the block
+
+    Notes:
+        For intentional batches of the same statement (e.g. one attachment
+        lookup per export chunk), statements are still counted
+    """
+    token = _repeats_allowed.set(True)
+    try:
+        yield
+    finally:
+        _repeats_allowed.reset(token)
+
+
+def _before_cursor_execute(conn, *_):
+    conn.info.setdefault(QUERY_START_KEY, []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, *_):
+    elapsed = perf_counter() - conn.info[QUERY_START_KEY].pop()
+    detect = not _repeats_allowed.get()
+    active = _active_stats.get()
+    if active:
+        # Without the per-call deadline hint of MySQL
+        statement = original_statement(statement)
+    for stats in active:
+        stats.record(statement, elapsed, detect)
+
+
+def _on_error(context):
+    # Failed statements never reach after_cursor_execute
+    starts = context.connection.info.get(QUERY_START_KEY) if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_queries() -> None:
+    """
+    Record the statements of every engine in the active track_queries scopes
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _on_error)
+
+
+def _on_checkout(*_):
+    DB_POOL_CHECKOUTS.inc()
+    DB_POOL_IN_USE.inc()
+
+
+def _on_checkin(*_):
+    DB_POOL_IN_USE.dec()
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """
+    Record pool checkouts and connections in use of an engine
+
+    Notes:
+        Time spent waiting for a connection is measured where sessions
+        acquire it (see api.dependencies.connections)
+    """
+    sync_engine = engine.sync_engine
+
+    if not event.contains(sync_engine, "checkout", _on_checkout):
+        event.listen(sync_engine, "checkout", _on_checkout)
+        event.listen(sync_engine, "checkin", _on_checkin)
+
+    return engine
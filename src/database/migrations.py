@@ -0,0 +1,87 @@
+"""
+Schema revision check (the database must be migrated before the API starts)
+"""
+
+from typing import Set
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+
+
+# Head of alembic/versions, update with each new migration
+SCHEMA_REVISION = "d3f1a7c9e2b4"
+
+ALEMBIC = "alembic"
+CREATE_ALL = "create_all"
+OFF = "off"
+
+
+class SchemaRevisionError(RuntimeError):
+    """
+    Database not migrated to the revision of the code
+    """
+
+
+def current_revisions(conn: Connection) -> Set[str]:
+    """
+    Revisions stamped in the alembic_version table of the database
+    """
+    if not inspect(conn).has_table("alembic_version"):
+        return set()
+    return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+
+
+def check_schema_revision(conn: Connection, expected: str = SCHEMA_REVISION) -> None:
+    """
+    Fail fast if the database is not at the expected revision
+
+    Args:
+        conn: Sync connection (AsyncConnection.run_sync)
+        expected: Revision the code was written for
+
+    Raises:
+        SchemaRevisionError: Missing or different revision
+
+    Notes:
+        Reads the alembic_version table only, the migration scripts are not
+        loaded at startup (run "alembic upgrade head" on deploy)
+    """
+    revisions = current_revisions(conn)
+    if revisions == {expected}:
+        return
+
+    found = ", ".join(sorted(revisions)) or "nenhuma"
+    raise SchemaRevisionError(
+        f"Revisao do banco de dados ({found}) diferente da esperada ({expected}), "
+        "execute 'alembic upgrade head'"
+    )
+
+
+def bootstrap_schema(conn: Connection, metadata: MetaData, revision: str = SCHEMA_REVISION) -> None:
+    """
+    Create the schema of a new database from the models and stamp the revision
+
+    Args:
+        conn: Sync connection, in a transaction
+        metadata: Metadata of the models (SQLModel.metadata)
+        revision: Revision the models correspond to
+
+    Raises:
+        SchemaRevisionError: The database already has a revision
+
+    Notes:
+        The first revisions do not create every table (they were created by
+        the startup of the API at the time), so "alembic upgrade head" only
+        works on databases made before them. New databases are created
+        here, the same as "alembic stamp head" after create_all, and follow
+        the migrations from then on.
+    """
+    revisions = current_revisions(conn)
+    if revisions:
+        raise SchemaRevisionError(
+            f"Banco de dados ja versionado ({', '.join(sorted(revisions))}), execute 'alembic upgrade head'"
+        )
+
+    metadata.create_all(conn)
+    conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL, PRIMARY KEY (version_num))"))
+    conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:revision)"), {"revision": revision})
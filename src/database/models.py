@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Optional, List
 
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column, DateTime, func, Integer
+from sqlalchemy import BigInteger, Column, DateTime, Float, func, Integer, Index, text
 
 
 
@@ -47,7 +47,7 @@ class UserModel(SQLModel, table=True):
     telefone: str = Field(max_length=11)
     ativo: bool = Field(default=True)
     excluido: bool = Field(default=False)
-    senha: str = Field(max_length=256, description="HASH256 da senha")
+    senha: str = Field(max_length=256, description="Hash da senha (scrypt)")
     criado_em: datetime = Field(
         default_factory=datetime.now,
         sa_column=Column(DateTime, server_default=func.now(), nullable=False),
@@ -78,6 +78,29 @@ class PostModel(SQLModel, table=True):
         default_factory=datetime.now,
         sa_column=Column(DateTime, server_default=func.now(), nullable=False),
     )
+    atualizado_em: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(
+            DateTime,
+            server_default=func.now(),
+            onupdate=datetime.now,
+            nullable=False,
+        ),
+    )
+    versao: int = Field(
+        default=0,
+        sa_column=Column(
+            BigInteger,
+            server_default="0",
+            onupdate=text("versao + 1"),
+            nullable=False,
+        ),
+    )
+
+    __table_args__ = (
+        Index("ix_posts_topico_atualizado", "topico_post_id", "atualizado_em"),
+        Index("ix_posts_topico_versao", "topico_post_id", "versao"),
+    )
 
 
 class PostsAppendModel(SQLModel, table=True):
@@ -88,7 +111,7 @@ class PostsAppendModel(SQLModel, table=True):
     __tablename__ = "posts_anexos"
 
     id: int = Field(default=None, primary_key=True)
-    post_id: int = Field(foreign_key="posts.id")
+    post_id: int = Field(foreign_key="posts.id", index=True)
     post: Optional[PostModel] = Relationship(back_populates="anexos")
     anexo_blob_id: int = Field(foreign_key="arquivos_blob.id")
     anexo_blob: Optional[BlobModel] = Relationship()
@@ -116,3 +139,108 @@ class TopicModel(SQLModel, table=True):
         default_factory=datetime.now,
         sa_column=Column(DateTime, server_default=func.now(), nullable=False),
     )
+    atualizado_em: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(
+            DateTime,
+            server_default=func.now(),
+            onupdate=datetime.now,
+            nullable=False,
+            index=True,
+        ),
+    )
+    versao: int = Field(
+        default=0,
+        sa_column=Column(
+            BigInteger,
+            server_default="0",
+            onupdate=text("versao + 1"),
+            nullable=False,
+            index=True,
+        ),
+    )
+
+
+class TopicTrendingModel(SQLModel, table=True):
+    """
+    Trending score of a topic (snapshot of the in-process index)
+
+    Notes:
+        pontuacao is forward-decayed relative to marco (epoch seconds of
+        its landmark), see utils.trending
+    """
+
+    __tablename__ = "topicos_trending"
+
+    topico_id: int = Field(foreign_key="topicos.id", primary_key=True)
+    pontuacao: float = Field(default=0, sa_column=Column(Float, nullable=False))
+    marco: int = Field(sa_column=Column(BigInteger, nullable=False))
+    atualizado_em: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(
+            DateTime,
+            server_default=func.now(),
+            onupdate=datetime.now,
+            nullable=False,
+        ),
+    )
+
+    __table_args__ = (
+        Index("ix_topicos_trending_marco_pontuacao", "marco", "pontuacao"),
+    )
+
+
+class TopicActivityHourlyModel(SQLModel, table=True):
+    """
+    Posts created per topic and hour (rollup of posts, see database.activity)
+    """
+
+    __tablename__ = "topicos_atividade_horaria"
+
+    topico_id: int = Field(foreign_key="topicos.id", primary_key=True)
+    hora: datetime = Field(sa_column=Column(DateTime, primary_key=True))
+    quantidade_posts: int = Field(default=0, sa_column=Column(Integer, nullable=False))
+
+
+class AggregationWatermarkModel(SQLModel, table=True):
+    """
+    Last post processed by each background aggregation
+    """
+
+    __tablename__ = "agregacoes_marcas"
+
+    nome: str = Field(max_length=64, primary_key=True)
+    ultimo_id: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+    atualizado_em: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(
+            DateTime,
+            server_default=func.now(),
+            onupdate=datetime.now,
+            nullable=False,
+        ),
+    )
+
+
+class TokenRevocationModel(SQLModel, table=True):
+    """
+    Revoked tokens and users (shared by every worker, see database.revocations)
+
+    Notes:
+        chave is the digest of the token (hex) or the subject of the user,
+        times are epoch seconds. Rows are read in id order by the workers
+        and deleted once expired.
+    """
+
+    __tablename__ = "tokens_revogados"
+
+    id: int = Field(default=None, primary_key=True)
+    tipo: str = Field(max_length=16)
+    chave: str = Field(max_length=128)
+    revogado_em: int = Field(sa_column=Column(BigInteger, nullable=False))
+    expira_em: int = Field(sa_column=Column(BigInteger, nullable=False))
+
+    __table_args__ = (
+        Index("ix_tokens_revogados_expira_em", "expira_em"),
+        Index("ix_tokens_revogados_revogado_em", "revogado_em"),
+    )
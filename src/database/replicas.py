@@ -0,0 +1,122 @@
+"""
+Read replicas (session routing and read-your-writes pinning)
+"""
+
+import hashlib
+import hmac
+import itertools
+from contextlib import asynccontextmanager
+from time import time
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+ROUND_ROBIN = "round_robin"
+LEAST_LOAD = "least_load"
+
+# Cookie with the time until which the client reads from the primary
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+
+class ReplicaSet:
+    """
+    Sessionmakers of the read replicas, one is picked per read session
+
+    Args:
+        sessionmakers: One sessionmaker per replica engine
+        strategy: ROUND_ROBIN, or LEAST_LOAD (fewest open sessions, ties
+            broken in round-robin order)
+        lagging: The replicas may be behind the primary (False for the
+            reader pool of an SQLite file, it reads the same file)
+    """
+
+    def __init__(
+        self,
+        sessionmakers: List['sessionmaker[AsyncSession]'],
+        strategy: str = ROUND_ROBIN,
+        lagging: bool = True,
+    ):
+        if not sessionmakers:
+            raise ValueError("Ao menos uma replica deve ser informada")
+        if strategy not in (ROUND_ROBIN, LEAST_LOAD):
+            raise ValueError(f"Estrategia de replicas desconhecida: {strategy}")
+
+        self.sessionmakers = sessionmakers
+        self.strategy = strategy
+        self.lagging = lagging
+        self.in_flight = [0] * len(sessionmakers)
+        self._next = itertools.cycle(range(len(sessionmakers)))
+
+    def pick(self) -> int:
+        """
+        Index of the replica of the next session
+        """
+        start = next(self._next)
+        if self.strategy == ROUND_ROBIN:
+            return start
+
+        count = len(self.sessionmakers)
+        return min(
+            ((start + offset) % count for offset in range(count)),
+            key=lambda index: self.in_flight[index],
+        )
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Open a session on the picked replica
+        """
+        index = self.pick()
+        self.in_flight[index] += 1
+        try:
+            async with self.sessionmakers[index]() as session:
+                yield session
+        finally:
+            self.in_flight[index] -= 1
+
+
+def _pin_signature(until: str, secret: bytes) -> str:
+    """
+    HMAC of the expiry of a pin, keyed by a server secret
+    """
+    return hmac.new(secret, f"{PRIMARY_PIN_COOKIE}:{until}".encode(), hashlib.sha256).hexdigest()
+
+
+def primary_pin(seconds: float, secret: bytes) -> str:
+    """
+    Value of the pin cookie set after a write
+
+    Notes:
+        Expiry in epoch milliseconds, followed by its signature
+        ("<until>.<hmac>"), clients cannot forge or extend a pin
+    """
+    until = str(int((time() + seconds) * 1000))
+    return f"{until}.{_pin_signature(until, secret)}"
+
+
+def is_pinned(value: Optional[str], max_seconds: float, secret: bytes) -> bool:
+    """
+    Check if a pin cookie still routes the client to the primary
+
+    Notes:
+        Unsigned or tampered values are ignored, so only a write of the
+        client pins it (they skip the replicas, that would let any client
+        load the primary). Values further than max_seconds in the future
+        are ignored too, the pin never outlives a change of the setting.
+    """
+    if not value:
+        return False
+
+    until, _, signature = value.partition(".")
+    if not hmac.compare_digest(signature.encode(), _pin_signature(until, secret).encode()):
+        return False
+
+    try:
+        expires_at = int(until) / 1000
+    except ValueError:
+        return False
+
+    now = time()
+    return now < expires_at <= now + max_seconds
@@ -6,6 +6,9 @@ from .user import UserRepository
 from .blob import BlobRepository
 from .topics import TopicRepository
 from .posts import PostRepository
+from .trending import TrendingRepository
+from .activity import ActivityRepository
+from .revocation import RevocationRepository
 
 
 __all__ = [
@@ -13,4 +16,7 @@ __all__ = [
     "BlobRepository",
     "TopicRepository",
     "PostRepository",
+    "TrendingRepository",
+    "ActivityRepository",
+    "RevocationRepository",
 ]
@@ -0,0 +1,120 @@
+"""
+Topic activity rollup repository
+"""
+
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlmodel import select, update, delete, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from domain.repositories import IActivityRepository
+from domain.entities import ActivityPointEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
+from ..models import AggregationWatermarkModel, PostModel, TopicActivityHourlyModel
+
+
+@timed_methods(DB)
+@traced_methods
+class ActivityRepository(IActivityRepository):
+    """
+    Topic activity rollup repository
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_hourly(self, topic_id: int, start: datetime, end: datetime) -> List[ActivityPointEntity]:
+        """
+        Hours of a topic with posts in [start, end), oldest first
+
+        Notes:
+            A range of the primary key (topico_id, hora)
+        """
+        result = await self.session.exec(
+            select(TopicActivityHourlyModel.hora, TopicActivityHourlyModel.quantidade_posts)
+            .where(
+                TopicActivityHourlyModel.topico_id == topic_id,
+                TopicActivityHourlyModel.hora >= start,
+                TopicActivityHourlyModel.hora < end,
+            )
+            .order_by(TopicActivityHourlyModel.hora)
+        )
+
+        return [ActivityPointEntity(start=hour, posts=posts) for hour, posts in result.all()]
+
+    async def list_posts_after(self, after_id: int, limit: int) -> List[Tuple[int, int, datetime]]:
+        """
+        (id, topic id, creation date) of the posts after an id, by id
+
+        Notes:
+            A range of the posts primary key, only the three columns are read
+        """
+        result = await self.session.exec(
+            select(PostModel.id, PostModel.topico_post_id, PostModel.criado_em)
+            .where(PostModel.id > after_id)
+            .order_by(PostModel.id)
+            .limit(limit)
+        )
+
+        return [tuple(row) for row in result.all()]
+
+    async def add_hourly_counts(self, counts: Dict[Tuple[int, datetime], int]) -> None:
+        """
+        Add post counts by (topic id, hour)
+        """
+        for (topic_id, hour), posts in counts.items():
+            result = await self.session.exec(
+                update(TopicActivityHourlyModel)
+                .where(TopicActivityHourlyModel.topico_id == topic_id, TopicActivityHourlyModel.hora == hour)
+                .values(quantidade_posts=TopicActivityHourlyModel.quantidade_posts + posts)
+            )
+            if not result.rowcount:
+                await self.session.exec(
+                    insert(TopicActivityHourlyModel).values(topico_id=topic_id, hora=hour, quantidade_posts=posts)
+                )
+
+    async def get_watermark(self, name: str) -> int:
+        """
+        Last post id processed by an aggregation (0 before the first run)
+        """
+        result = await self.session.exec(
+            select(AggregationWatermarkModel.ultimo_id).where(AggregationWatermarkModel.nome == name)
+        )
+        return result.one_or_none() or 0
+
+    async def advance_watermark(self, name: str, current: int, new: int) -> bool:
+        """
+        Move a watermark if it is still at `current` (False if another run moved it)
+
+        Notes:
+            Compare-and-set on the watermark row, which also locks it until
+            the end of the transaction: concurrent runs of the same batch
+            (several workers) are serialized and only the first one counts
+        """
+        result = await self.session.exec(
+            update(AggregationWatermarkModel)
+            .where(AggregationWatermarkModel.nome == name, AggregationWatermarkModel.ultimo_id == current)
+            .values(ultimo_id=new)
+        )
+        if result.rowcount:
+            return True
+        if current != 0:
+            return False
+
+        # First run, the row does not exist yet
+        try:
+            async with self.session.begin_nested():
+                await self.session.exec(insert(AggregationWatermarkModel).values(nome=name, ultimo_id=new))
+            return True
+        except IntegrityError:
+            return False
+
+    async def reset(self, name: str) -> None:
+        """
+        Delete the rollup and its watermark (rebuild from the first post)
+        """
+        await self.session.exec(delete(AggregationWatermarkModel).where(AggregationWatermarkModel.nome == name))
+        await self.session.exec(delete(TopicActivityHourlyModel))
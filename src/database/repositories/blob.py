@@ -7,9 +7,13 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from domain.repositories import IBlobRepository
 from domain.entities import BlobEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
 from ..models import BlobModel
 
 
+@timed_methods(DB)
+@traced_methods
 class BlobRepository(IBlobRepository):
     """
     Blob repository
@@ -2,18 +2,23 @@
 Posts repository
 """
 
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from sqlmodel import select, update, func, or_
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from domain.repositories import IPostRepository
-from domain.entities import PostEntity, BlobEntity
+from domain.entities import PostEntity, BlobEntity, ContentVersionEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
 from ..models import PostModel, PostsAppendModel, BlobModel
 
 
 
+@timed_methods(DB)
+@traced_methods
 class PostRepository(IPostRepository):
     """
     Topics repository
@@ -104,6 +109,167 @@ class PostRepository(IPostRepository):
             self.session.add(append_model)
         await self.session.flush()
 
+        # Appends are part of the public listing, bump the post version
+        await self.touch(post_id)
+
+    async def touch(self, post_id: int) -> None:
+        """
+        Mark a post as updated without changing its content
+        """
+
+        statement = (
+            update(PostModel)
+            .where(PostModel.id == post_id)
+            .values(atualizado_em=datetime.now())
+        )
+
+        await self.session.exec(statement)
+
+    async def list_after(self, topic_id: int, after_id: int, limit: int) -> List[PostEntity]:
+        """
+        List posts of a topic created after the given post id, oldest first
+
+        Notes:
+            Used to resume event streams from Last-Event-ID (ids are monotonic)
+        """
+
+        statement = (
+            select(PostModel)
+            .where(PostModel.topico_post_id == topic_id, PostModel.id > after_id)
+            .options(
+                joinedload(PostModel.anexos).joinedload(PostsAppendModel.anexo_blob)
+            )
+            .order_by(PostModel.id)
+            .limit(limit)
+        )
+
+        result = await self.session.exec(statement)
+        models = result.unique().all()
+
+        return [self._model_to_entity(model) for model in models]
+
+    # Declared as a plain method returning an AsyncIterator, an async generator implements it
+    async def stream_by_topic(  # pylint: disable=invalid-overridden-method
+        self, topic_id: int, chunk_size: int
+    ) -> AsyncIterator[List[PostEntity]]:
+        """
+        Stream every post of a topic in chunks, oldest first
+
+        Notes:
+            Rows come from a server-side cursor (yield_per) and only columns
+            are selected, so nothing is kept in the identity map and memory
+            stays bounded by the chunk size. The cursor holds the connection
+            until the stream ends, other queries need another session.
+        """
+
+        statement = (
+            select(
+                PostModel.id,
+                PostModel.titulo,
+                PostModel.descricao,
+                PostModel.usuario_id,
+                PostModel.resposta_post_id,
+                PostModel.gostei_contador,
+                PostModel.resposta_contador,
+                PostModel.topico_post_id,
+                PostModel.criado_em,
+                PostModel.atualizado_em,
+            )
+            .where(PostModel.topico_post_id == topic_id)
+            .order_by(PostModel.id)
+            .execution_options(yield_per=chunk_size)
+        )
+
+        result = await self.session.stream(statement)
+        async for rows in result.tuples().partitions():
+            # Unpacking the tuples is much cheaper than Row attribute access
+            yield [
+                PostEntity(
+                    id=post_id,
+                    title=title,
+                    description=description,
+                    user_id=user_id,
+                    reply_post_id=reply_post_id,
+                    likes_count=likes_count,
+                    reply_count=reply_count,
+                    topic_post_id=topic_post_id,
+                    post_apppends=[],
+                    created_at=created_at,
+                    updated_at=updated_at,
+                ) for (
+                    post_id, title, description, user_id, reply_post_id, likes_count,
+                    reply_count, topic_post_id, created_at, updated_at,
+                ) in rows
+            ]
+
+    async def get_appends(self, post_ids: List[int]) -> Dict[int, List[BlobEntity]]:
+        """
+        Get the attachments of several posts, keyed by post id
+        """
+        if not post_ids:
+            return {}
+
+        statement = (
+            select(
+                PostsAppendModel.post_id,
+                BlobModel.id,
+                BlobModel.link,
+                BlobModel.criado_em,
+                BlobModel.extensao,
+                BlobModel.nome,
+                BlobModel.provedor,
+                BlobModel.provedor_id,
+            )
+            .join(BlobModel, BlobModel.id == PostsAppendModel.anexo_blob_id)
+            .where(PostsAppendModel.post_id.in_(post_ids))
+            .order_by(PostsAppendModel.id)
+        )
+
+        result = await self.session.exec(statement)
+
+        appends: Dict[int, List[BlobEntity]] = {}
+        for row in result.all():
+            appends.setdefault(row.post_id, []).append(
+                BlobEntity(
+                    id=row.id,
+                    link=row.link,
+                    criado_em=row.criado_em,
+                    extensao=row.extensao,
+                    nome=row.nome,
+                    provedor=row.provedor,
+                    provedor_id=row.provedor_id,
+                )
+            )
+
+        return appends
+
+    async def get_topic_version(self, topic_id: int) -> ContentVersionEntity:
+        """
+        Get the current version of the posts listing of a topic
+
+        Notes:
+            The id and revision come from the (topico_post_id, versao)
+            index, the update date from (topico_post_id, atualizado_em)
+        """
+
+        statement = (
+            select(
+                func.max(PostModel.id),
+                func.max(PostModel.atualizado_em),
+                func.coalesce(func.sum(PostModel.versao), 0),
+            )
+            .where(PostModel.topico_post_id == topic_id)
+        )
+
+        result = await self.session.exec(statement)
+        last_id, last_modified, revision = result.one()
+
+        return ContentVersionEntity(
+            last_id=last_id,
+            last_modified=last_modified,
+            revision=int(revision),
+        )
+
     async def search(
         self,
         topic_id: int,
@@ -193,5 +359,7 @@ class PostRepository(IPostRepository):
                     provedor=blob.anexo_blob.provedor,
                     provedor_id=blob.anexo_blob.provedor_id,
                 ) for blob in model.anexos
-            ]
+            ],
+            created_at=model.criado_em,
+            updated_at=model.atualizado_em,
         )
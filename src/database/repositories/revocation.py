@@ -0,0 +1,83 @@
+"""
+Token revocations repository
+"""
+
+from typing import Dict, List
+
+from sqlmodel import select, delete, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from domain.repositories import IRevocationRepository
+from domain.entities import TokenRevocationEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
+from ..models import TokenRevocationModel
+
+
+@timed_methods(DB)
+@traced_methods
+class RevocationRepository(IRevocationRepository):
+    """
+    Token revocations repository
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _to_entity(row: TokenRevocationModel) -> TokenRevocationEntity:
+        return TokenRevocationEntity(
+            id=row.id,
+            kind=row.tipo,
+            key=row.chave,
+            revoked_at=row.revogado_em,
+            expires_at=row.expira_em,
+        )
+
+    async def add(self, kind: str, revoked_at: int, expirations: Dict[str, int]) -> None:
+        """
+        Persist revocations of a kind made at the same time (one multi-row insert)
+        """
+        await self.session.exec(
+            insert(TokenRevocationModel).values([
+                {"tipo": kind, "chave": key, "revogado_em": revoked_at, "expira_em": expires_at}
+                for key, expires_at in expirations.items()
+            ])
+        )
+
+    async def list_after(self, after_id: int, now: int, limit: int) -> List[TokenRevocationEntity]:
+        """
+        Revocations added after an id and not expired, by id
+
+        Notes:
+            A range of the primary key, each sync only reads the new rows
+        """
+        result = await self.session.exec(
+            select(TokenRevocationModel)
+            .where(TokenRevocationModel.id > after_id, TokenRevocationModel.expira_em > now)
+            .order_by(TokenRevocationModel.id)
+            .limit(limit)
+        )
+
+        return [self._to_entity(row) for row in result.all()]
+
+    async def list_recent(self, since: int, now: int) -> List[TokenRevocationEntity]:
+        """
+        Revocations made since a time and not expired
+
+        Notes:
+            Ids are given at insert and become visible at commit, a row may
+            show up after rows with higher ids were read: the recent ones
+            are read again by every sync
+        """
+        result = await self.session.exec(
+            select(TokenRevocationModel)
+            .where(TokenRevocationModel.revogado_em >= since, TokenRevocationModel.expira_em > now)
+        )
+        return [self._to_entity(row) for row in result.all()]
+
+    async def delete_expired(self, now: int) -> None:
+        """
+        Delete the revocations expired at `now`
+        """
+        await self.session.exec(delete(TokenRevocationModel).where(TokenRevocationModel.expira_em <= now))
@@ -9,11 +9,15 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from domain.repositories import ITopicRepository
-from domain.entities import TopicEntity
+from domain.entities import TopicEntity, ContentVersionEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
 from ..models import TopicModel
 
 
 
+@timed_methods(DB)
+@traced_methods
 class TopicRepository(ITopicRepository):
     """
     Topics repository
@@ -53,6 +57,18 @@ class TopicRepository(ITopicRepository):
 
         return self._model_to_entity(model)
 
+    async def get_by_ids(self, topic_ids: List[int]) -> List[TopicEntity]:
+        """
+        Get topics by id (missing ids are skipped, order not kept)
+        """
+        if not topic_ids:
+            return []
+
+        statement = select(TopicModel).where(TopicModel.id.in_(topic_ids))
+        result = await self.session.exec(statement)
+
+        return [self._model_to_entity(model) for model in result.all()]
+
     async def update(self, post: TopicEntity):
         """
         Update a post
@@ -124,6 +140,30 @@ class TopicRepository(ITopicRepository):
 
         return [self._model_to_entity(model) for model in models], total_count
 
+    async def get_version(self) -> ContentVersionEntity:
+        """
+        Get the current version of the topics listing
+
+        Notes:
+            Every aggregate is resolved from an index (primary key,
+            `atualizado_em` and `versao`), so this is a single cheap lookup
+        """
+
+        statement = select(
+            func.max(TopicModel.id),
+            func.max(TopicModel.atualizado_em),
+            func.coalesce(func.sum(TopicModel.versao), 0),
+        )
+
+        result = await self.session.exec(statement)
+        last_id, last_modified, revision = result.one()
+
+        return ContentVersionEntity(
+            last_id=last_id,
+            last_modified=last_modified,
+            revision=int(revision),
+        )
+
     def _entity_to_model(self, entity: TopicEntity) -> TopicModel:
         """
         Convert a PostEntity to a PostModel
@@ -151,5 +191,6 @@ class TopicRepository(ITopicRepository):
             id=model.id,
             qtd_posts=model.quantidade_posts,
             title=model.titulo,
-            topic_image_id=model.topico_thumbnail_blob_id
+            topic_image_id=model.topico_thumbnail_blob_id,
+            updated_at=model.atualizado_em,
         )
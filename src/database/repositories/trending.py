@@ -0,0 +1,108 @@
+"""
+Trending scores repository
+"""
+
+from typing import Dict, List
+
+from sqlmodel import select, update, delete, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from domain.repositories import ITrendingRepository
+from domain.entities import TrendingScoreEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
+from utils.trending import rescale
+from ..models import TopicTrendingModel
+
+
+# Tries of a score update racing with other workers
+MAX_ATTEMPTS = 3
+
+
+@timed_methods(DB)
+@traced_methods
+class TrendingRepository(ITrendingRepository):
+    """
+    Trending scores repository
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_scores(self, landmark: int, increments: Dict[int, float], half_life: float) -> None:
+        """
+        Add score increments (relative to landmark) to the topics
+
+        Notes:
+            Increments of the same landmark are a single additive UPDATE,
+            so workers flushing together do not lose each other's. A row
+            of an older landmark is rescaled with a compare-and-set on its
+            landmark, a missing row is inserted.
+        """
+        for topic_id, increment in increments.items():
+            await self._add_score(topic_id, landmark, increment, half_life)
+
+    async def _add_score(self, topic_id: int, landmark: int, increment: float, half_life: float) -> None:
+        for _ in range(MAX_ATTEMPTS):
+            result = await self.session.exec(
+                update(TopicTrendingModel)
+                .where(TopicTrendingModel.topico_id == topic_id, TopicTrendingModel.marco == landmark)
+                .values(pontuacao=TopicTrendingModel.pontuacao + increment)
+            )
+            if result.rowcount:
+                return
+
+            result = await self.session.exec(
+                select(TopicTrendingModel.pontuacao, TopicTrendingModel.marco)
+                .where(TopicTrendingModel.topico_id == topic_id)
+            )
+            row = result.one_or_none()
+
+            if row is None:
+                try:
+                    async with self.session.begin_nested():
+                        await self.session.exec(
+                            insert(TopicTrendingModel).values(topico_id=topic_id, pontuacao=increment, marco=landmark)
+                        )
+                    return
+                except IntegrityError:
+                    # Inserted by another worker meanwhile
+                    continue
+
+            score, row_landmark = row
+            if row_landmark > landmark:
+                # Another worker already moved the row to a later landmark
+                increment = rescale(increment, landmark, row_landmark, half_life)
+                landmark = row_landmark
+                continue
+
+            result = await self.session.exec(
+                update(TopicTrendingModel)
+                .where(TopicTrendingModel.topico_id == topic_id, TopicTrendingModel.marco == row_landmark)
+                .values(pontuacao=rescale(score, row_landmark, landmark, half_life) + increment, marco=landmark)
+            )
+            if result.rowcount:
+                return
+
+    async def list_scores(self, landmark: int, limit: int) -> List[TrendingScoreEntity]:
+        """
+        Highest scores stored relative to a landmark
+        """
+        result = await self.session.exec(
+            select(TopicTrendingModel.topico_id, TopicTrendingModel.pontuacao)
+            .where(TopicTrendingModel.marco == landmark)
+            .order_by(TopicTrendingModel.pontuacao.desc())
+            .limit(limit)
+        )
+
+        return [
+            TrendingScoreEntity(topic_id=topic_id, score=score, landmark=landmark)
+            for topic_id, score in result.all()
+        ]
+
+    async def delete_before(self, landmark: int) -> None:
+        """
+        Delete the scores of landmarks older than the given one
+        """
+        await self.session.exec(delete(TopicTrendingModel).where(TopicTrendingModel.marco < landmark))
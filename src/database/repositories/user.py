@@ -8,9 +8,13 @@ from sqlalchemy.orm import joinedload
 
 from domain.repositories import IUserRepository
 from domain.entities import UserEntity, BlobEntity
+from utils.timing import DB, timed_methods
+from utils.tracing import traced_methods
 from ..models import UserModel
 
 
+@timed_methods(DB)
+@traced_methods
 class UserRepository(IUserRepository):
     """
     Repository for user
@@ -70,7 +74,7 @@ class UserRepository(IUserRepository):
         """
         statement = (
             select(UserModel)
-            .where(UserModel.id == user.uuid)
+            .where(UserModel.uuid == user.uuid)
             .options(joinedload(UserModel.avatar_blob))
         )
         result = await self.session.exec(statement)
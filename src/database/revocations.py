@@ -0,0 +1,69 @@
+"""
+Token revocations sync (every worker loads the revocations of the others)
+"""
+
+import asyncio
+import time
+from typing import Callable
+
+from loguru import logger
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from utils.tokens import RevocationList
+from .repositories import RevocationRepository
+
+
+# Rows read per query
+BATCH_SIZE = 1000
+
+# Revocations read again by every sync, longer than any write transaction
+RECENT_SECONDS = 120
+
+
+async def sync_revocations(revocations: RevocationList, session_factory: Callable[[], AsyncSession]) -> int:
+    """
+    Load the revocations persisted since the last sync and delete the expired ones
+
+    Returns:
+        Revocations read
+
+    Notes:
+        The first sync of a worker loads every revocation not expired
+        (restart). Later ones read the rows after the last id seen plus
+        the recent ones, which may have committed out of id order;
+        applying a revocation twice changes nothing.
+    """
+    now = int(time.time())
+    read = 0
+    async with session_factory() as session:
+        repo = RevocationRepository(session)
+        while True:
+            rows = await repo.list_after(revocations.last_id, now, BATCH_SIZE)
+            revocations.load(((row.id, row.kind, row.key, row.revoked_at, row.expires_at) for row in rows), now)
+            read += len(rows)
+            if len(rows) < BATCH_SIZE:
+                break
+
+        rows = await repo.list_recent(now - RECENT_SECONDS, now)
+        revocations.load(((row.id, row.kind, row.key, row.revoked_at, row.expires_at) for row in rows), now)
+
+        await repo.delete_expired(now)
+        await session.commit()
+
+    return read
+
+
+async def run_revocation_sync(
+    revocations: RevocationList,
+    session_factory: Callable[[], AsyncSession],
+    interval: float,
+) -> None:
+    """
+    Sync the revocations every interval seconds (lifespan background task)
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await sync_revocations(revocations, session_factory)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Erro ao sincronizar os tokens revogados")
@@ -0,0 +1,149 @@
+"""
+High-concurrency SQLite profile (WAL pragmas, single writer and reader pool)
+"""
+
+from typing import List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+# Session info keys of the single-writer sessions
+READER_BIND = "sqlite_reader"
+WRITER_USED = "sqlite_writer_used"
+
+
+def is_sqlite_file(url: str) -> bool:
+    """
+    Check if a database URL is an SQLite file (not an in-memory database)
+    """
+    parsed = make_url(url)
+    return (
+        parsed.get_backend_name() == "sqlite"
+        and parsed.database not in (None, "", ":memory:")
+        and parsed.query.get("mode") != "memory"
+    )
+
+
+def sqlite_pragmas(busy_timeout_ms: int, cache_size_kb: int, mmap_size: int) -> List[str]:
+    """
+    Pragmas applied on every connection
+
+    Notes:
+        WAL lets readers run while a write is in progress and, with
+        synchronous=NORMAL, commits only fsync at checkpoints. busy_timeout
+        makes a connection wait for a lock instead of failing with
+        "database is locked".
+    """
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={busy_timeout_ms}",
+        f"PRAGMA cache_size=-{cache_size_kb}",
+        f"PRAGMA mmap_size={mmap_size}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def apply_pragmas(engine: AsyncEngine, pragmas: List[str]) -> AsyncEngine:
+    """
+    Run the pragmas on each new connection of an engine
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def create_sqlite_engines(
+    url: str,
+    pragmas: List[str],
+    reader_pool_size: int,
+    writer_timeout: float,
+) -> Tuple[AsyncEngine, AsyncEngine]:
+    """
+    Create the writer and reader engines of an SQLite file
+
+    Args:
+        url: Database URL (sqlite+aiosqlite:///path)
+        pragmas: Pragmas of every connection, see sqlite_pragmas
+        reader_pool_size: Connections of the reader pool (at least 2, the
+            topic export holds two read sessions)
+        writer_timeout: Seconds a session waits for the writer connection
+
+    Returns:
+        Writer engine with a single connection and reader engine
+
+    Notes:
+        SQLite allows one writer at a time. Instead of concurrent writers
+        racing for the file lock, write sessions wait in the pool queue of
+        the single writer connection (FIFO, no busy retries). Reads use the
+        reader pool and, in WAL mode, are not blocked by the writer. Use
+        single_writer_sessionmaker so write sessions only hold the writer
+        from their first write to the commit.
+    """
+    writer = create_async_engine(url, pool_size=1, max_overflow=0, pool_timeout=writer_timeout)
+    reader = create_async_engine(url, pool_size=max(2, reader_pool_size), max_overflow=0)
+    return apply_pragmas(writer, pragmas), apply_pragmas(reader, pragmas)
+
+
+class SingleWriterSession(Session):
+    """
+    Session that takes the writer connection at its first write
+
+    Notes:
+        Until it writes, the session reads from the reader pool, so a
+        request that reads, converts images and uploads them before its
+        INSERTs does not keep the only writer connection meanwhile. From
+        the first flush or DML statement on, every statement uses the
+        writer until the end of the transaction (reads see the writes of
+        the transaction). Counters are updated with atomic UPDATEs, so
+        reading before taking the writer loses no increments.
+    """
+
+    # The request transaction must not check out a connection up front
+    lazy_checkout = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):  # pylint: disable=arguments-differ
+        """
+        Reader connection until the first write of the transaction, then the writer
+        """
+        writer = super().get_bind(mapper, clause=clause, **kwargs)
+        reader = self.info.get(READER_BIND)
+        if reader is None or self.info.get(WRITER_USED) or self._flushing or getattr(clause, "is_dml", False):
+            self.info[WRITER_USED] = True
+            return writer
+        return reader
+
+
+@event.listens_for(SingleWriterSession, "after_transaction_end")
+def _release_writer(session: Session, transaction) -> None:
+    """
+    Read from the reader pool again in the next transaction
+    """
+    if transaction.parent is None:
+        session.info.pop(WRITER_USED, None)
+
+
+def single_writer_sessionmaker(writer: AsyncEngine, reader: AsyncEngine) -> 'sessionmaker[AsyncSession]':
+    """
+    Sessionmaker of the write sessions of an SQLite file (see SingleWriterSession)
+    """
+    return sessionmaker(
+        writer,
+        class_=AsyncSession,
+        sync_session_class=SingleWriterSession,
+        expire_on_commit=False,
+        info={READER_BIND: reader.sync_engine},
+    )
@@ -0,0 +1,60 @@
+"""
+Trending index snapshot (persist the increments, reload every worker from the table)
+"""
+
+import asyncio
+import time
+from typing import Callable
+
+from loguru import logger
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from utils.trending import LANDMARK_HALF_LIVES, TrendingIndex, landmark_for
+from .repositories import TrendingRepository
+
+
+async def sync_trending_index(index: TrendingIndex, session_factory: Callable[[], AsyncSession]) -> None:
+    """
+    Add the increments of this worker to the snapshot table and reload the index from it
+
+    Notes:
+        After a sync the index holds the scores of every worker (as of the
+        sync) plus its own events since. Increments that failed to persist
+        are kept for the next sync. Scores of the current and the previous
+        landmark are loaded (older ones decayed by more than
+        2 ** LANDMARK_HALF_LIVES) and the older rows deleted. No query
+        reads the posts table.
+    """
+    period = int(index.half_life * LANDMARK_HALF_LIVES)
+    landmark, increments = index.take_pending()
+
+    try:
+        async with session_factory() as session:
+            repo = TrendingRepository(session)
+            if increments:
+                await repo.add_scores(landmark, increments, index.half_life)
+            await repo.delete_before(landmark - period)
+            await session.commit()
+    except Exception:
+        index.return_pending(landmark, increments)
+        raise
+
+    current = landmark_for(time.time(), index.half_life)
+    async with session_factory() as session:
+        repo = TrendingRepository(session)
+        rows = await repo.list_scores(current, index.max_topics)
+        rows += await repo.list_scores(current - period, index.max_topics)
+
+    index.load(((row.topic_id, row.score, row.landmark) for row in rows))
+
+
+async def run_trending_sync(index: TrendingIndex, session_factory: Callable[[], AsyncSession], interval: float) -> None:
+    """
+    Sync the index every interval seconds (lifespan background task)
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await sync_trending_index(index, session_factory)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Erro ao sincronizar o indice de topicos em alta")
@@ -6,6 +6,10 @@ from .user import UserEntity
 from .blob import BlobEntity
 from .topics import TopicEntity
 from .posts import PostEntity
+from .version import ContentVersionEntity
+from .trending import TrendingScoreEntity
+from .activity import ActivityPointEntity
+from .revocation import TokenRevocationEntity
 
 
 __all__ = [
@@ -13,4 +17,8 @@ __all__ = [
     "BlobEntity",
     "TopicEntity",
     "PostEntity",
+    "ContentVersionEntity",
+    "TrendingScoreEntity",
+    "ActivityPointEntity",
+    "TokenRevocationEntity",
 ]
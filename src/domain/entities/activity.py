@@ -0,0 +1,16 @@
+"""
+Topic activity entity
+"""
+
+from datetime import datetime
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ActivityPointEntity:
+    """
+    Posts created in a topic during one hour (or day) starting at `start`
+    """
+
+    start: datetime
+    posts: int
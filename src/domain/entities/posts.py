@@ -2,6 +2,7 @@
 Posts entity
 """
 
+from datetime import datetime
 from typing import Optional, List
 from dataclasses import dataclass, field
 
@@ -24,6 +25,8 @@ class PostEntity:
     topic_post_id: int
     post_apppends: List[BlobEntity] = field(default_factory=list)
     _removed_append_ids: List[int] = field(default_factory=list)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
     def remove_append(self, append_id: int) -> None:
@@ -0,0 +1,23 @@
+"""
+Token revocation entity
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TokenRevocationEntity:
+    """
+    Persisted revocation of a token or of every token of a user
+
+    Notes:
+        key is the digest of the token (hex) or the subject of the user,
+        times are epoch seconds. The row is useless past expires_at: the
+        token, or every token issued before revoked_at, has expired.
+    """
+
+    id: int
+    kind: str
+    key: str
+    revoked_at: int
+    expires_at: int
@@ -3,6 +3,7 @@ Topics entity
 """
 
 from datetime import datetime
+from typing import Optional
 from dataclasses import dataclass
 
 
@@ -19,3 +20,4 @@ class TopicEntity:
     topic_image_id: int
     created_by_user_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,20 @@
+"""
+Trending score entity
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TrendingScoreEntity:
+    """
+    Persisted trending score of a topic
+
+    Notes:
+        The score is forward-decayed relative to its landmark (epoch
+        seconds), see utils.trending
+    """
+
+    topic_id: int
+    score: float
+    landmark: int
@@ -2,8 +2,6 @@
 Entities related to user
 """
 
-from hashlib import sha256
-
 from dataclasses import dataclass
 
 from .blob import BlobEntity
@@ -27,26 +25,14 @@ class UserEntity:
     _senha_hash: str | None = None
 
 
-    def authenticated(self, password: str) -> bool:
-        """
-        Method for authenticated user
-
-        Args:
-            password: str
-
-        Returns:
-            bool
-        """
-        return self._senha_hash == sha256(password.encode()).hexdigest()
-
-    def set_password(self, password: str):
+    def set_password_hash(self, password_hash: str):
         """
-        Method for set password
+        Setter for password hash
 
         Notes:
-            This method hash the password for sha256
+            Passwords are hashed (scrypt) by the services, off the event loop
         """
-        self._senha_hash = sha256(password.encode()).hexdigest()
+        self._senha_hash = password_hash
 
     def get_password_hash(self) -> str:
         """
@@ -0,0 +1,31 @@
+"""
+Content version entity
+"""
+
+from datetime import datetime
+from typing import Optional
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ContentVersionEntity:
+    """
+    Cheap version marker of a listing, used to validate HTTP caches
+
+    Notes:
+        Every UPDATE of a topic/post increments its `versao` in the
+        database, and topics/posts are never deleted, so the greatest id
+        plus the sum of the row versions changes whenever a page of the
+        listing could change. `last_modified` only feeds Last-Modified,
+        it has second resolution and comes from the app clock.
+    """
+
+    last_id: Optional[int]
+    last_modified: Optional[datetime]
+    revision: int = 0
+
+    def token(self) -> str:
+        """
+        Serialize the version to a stable string
+        """
+        return f"{self.last_id or 0}:{self.revision}"
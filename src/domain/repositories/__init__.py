@@ -6,6 +6,9 @@ from .user import IUserRepository
 from .blob import IBlobRepository
 from .topics import ITopicRepository
 from .posts import IPostRepository
+from .trending import ITrendingRepository
+from .activity import IActivityRepository
+from .revocation import IRevocationRepository
 
 
 __all__ = [
@@ -13,4 +16,7 @@ __all__ = [
     "IBlobRepository",
     "ITopicRepository",
     "IPostRepository",
+    "ITrendingRepository",
+    "IActivityRepository",
+    "IRevocationRepository",
 ]
@@ -0,0 +1,51 @@
+"""
+Topic activity rollup repository
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from ..entities import ActivityPointEntity
+
+
+class IActivityRepository(ABC):
+    """
+    Hourly posts per topic, maintained from the posts after a watermark
+    """
+
+    @abstractmethod
+    async def list_hourly(self, topic_id: int, start: datetime, end: datetime) -> List[ActivityPointEntity]:
+        """
+        Hours of a topic with posts in [start, end), oldest first
+        """
+
+    @abstractmethod
+    async def list_posts_after(self, after_id: int, limit: int) -> List[Tuple[int, int, datetime]]:
+        """
+        (id, topic id, creation date) of the posts after an id, by id
+        """
+
+    @abstractmethod
+    async def add_hourly_counts(self, counts: Dict[Tuple[int, datetime], int]) -> None:
+        """
+        Add post counts by (topic id, hour)
+        """
+
+    @abstractmethod
+    async def get_watermark(self, name: str) -> int:
+        """
+        Last post id processed by an aggregation (0 before the first run)
+        """
+
+    @abstractmethod
+    async def advance_watermark(self, name: str, current: int, new: int) -> bool:
+        """
+        Move a watermark if it is still at `current` (False if another run moved it)
+        """
+
+    @abstractmethod
+    async def reset(self, name: str) -> None:
+        """
+        Delete the rollup and its watermark (rebuild from the first post)
+        """
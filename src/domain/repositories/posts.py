@@ -3,9 +3,9 @@ Posts repository
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from ..entities import PostEntity, BlobEntity
+from ..entities import PostEntity, BlobEntity, ContentVersionEntity
 
 
 class IPostRepository(ABC):
@@ -43,6 +43,12 @@ class IPostRepository(ABC):
         Add appends to a post
         """
 
+    @abstractmethod
+    async def touch(self, post_id: int) -> None:
+        """
+        Mark a post as updated without changing its content
+        """
+
     @abstractmethod
     async def search(
         self,
@@ -55,3 +61,30 @@ class IPostRepository(ABC):
         Search posts by title or id with pagination
         Returns tuple of (posts, total_count)
         """
+
+    @abstractmethod
+    async def list_after(self, topic_id: int, after_id: int, limit: int) -> List[PostEntity]:
+        """
+        List posts of a topic created after the given post id, oldest first
+        """
+
+    @abstractmethod
+    def stream_by_topic(self, topic_id: int, chunk_size: int) -> AsyncIterator[List[PostEntity]]:
+        """
+        Stream every post of a topic in chunks, oldest first
+
+        Notes:
+            Attachments are not loaded, see get_appends
+        """
+
+    @abstractmethod
+    async def get_appends(self, post_ids: List[int]) -> Dict[int, List[BlobEntity]]:
+        """
+        Get the attachments of several posts, keyed by post id
+        """
+
+    @abstractmethod
+    async def get_topic_version(self, topic_id: int) -> ContentVersionEntity:
+        """
+        Get the current version of the posts listing of a topic
+        """
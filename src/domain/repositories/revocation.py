@@ -0,0 +1,38 @@
+"""
+Token revocations repository
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from ..entities import TokenRevocationEntity
+
+
+class IRevocationRepository(ABC):
+    """
+    Token revocations repository (shared by every worker)
+    """
+
+    @abstractmethod
+    async def add(self, kind: str, revoked_at: int, expirations: Dict[str, int]) -> None:
+        """
+        Persist revocations of a kind made at the same time (expiration by key)
+        """
+
+    @abstractmethod
+    async def list_after(self, after_id: int, now: int, limit: int) -> List[TokenRevocationEntity]:
+        """
+        Revocations added after an id and not expired, by id
+        """
+
+    @abstractmethod
+    async def list_recent(self, since: int, now: int) -> List[TokenRevocationEntity]:
+        """
+        Revocations made since a time and not expired
+        """
+
+    @abstractmethod
+    async def delete_expired(self, now: int) -> None:
+        """
+        Delete the revocations expired at `now`
+        """
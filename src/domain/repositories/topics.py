@@ -5,7 +5,7 @@ Topics repository
 from abc import ABC, abstractmethod
 from typing import List, Optional, Tuple
 
-from ..entities import TopicEntity
+from ..entities import TopicEntity, ContentVersionEntity
 
 
 class ITopicRepository(ABC):
@@ -31,6 +31,12 @@ class ITopicRepository(ABC):
         Get topic by id
         """
 
+    @abstractmethod
+    async def get_by_ids(self, topic_ids: List[int]) -> List[TopicEntity]:
+        """
+        Get topics by id (missing ids are skipped, order not kept)
+        """
+
     @abstractmethod
     async def increment_post_count(self, topic_id: int, quantity: int) -> None:
         """
@@ -48,3 +54,9 @@ class ITopicRepository(ABC):
         Search topics by title or id with pagination
         Returns tuple of (topics, total_count)
         """
+
+    @abstractmethod
+    async def get_version(self) -> ContentVersionEntity:
+        """
+        Get the current version of the topics listing
+        """
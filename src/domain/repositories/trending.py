@@ -0,0 +1,32 @@
+"""
+Trending scores repository
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from ..entities import TrendingScoreEntity
+
+
+class ITrendingRepository(ABC):
+    """
+    Trending scores repository (snapshot of the in-process index)
+    """
+
+    @abstractmethod
+    async def add_scores(self, landmark: int, increments: Dict[int, float], half_life: float) -> None:
+        """
+        Add score increments (relative to landmark) to the topics
+        """
+
+    @abstractmethod
+    async def list_scores(self, landmark: int, limit: int) -> List[TrendingScoreEntity]:
+        """
+        Highest scores stored relative to a landmark
+        """
+
+    @abstractmethod
+    async def delete_before(self, landmark: int) -> None:
+        """
+        Delete the scores of landmarks older than the given one
+        """
@@ -2,12 +2,15 @@
 Blob service
 """
 
+from utils.deadline import DeadlineExceeded
+from utils.tracing import traced_methods
 from ...entities.blob import BlobEntity
 from ...exceptions import BlobException
 from ...interfaces import IBlobStorageProvider
 from ...repositories.blob import IBlobRepository
 
 
+@traced_methods
 class BlobService:
     """
     File service
@@ -44,6 +47,9 @@ class BlobService:
                 file_extension=file_extension,
             )
 
+        except DeadlineExceeded:
+            raise
+
         except Exception as err:
             # Preserve error details if available
             code = getattr(err, 'code', 500)
@@ -77,6 +83,9 @@ class BlobService:
             # Delete from cloud storage
             await self.storage_provider.delete(blob.provedor_id)
 
+        except DeadlineExceeded:
+            raise
+
         except Exception as err:
             # Preserve error details if available
             code = getattr(err, 'code', 500)
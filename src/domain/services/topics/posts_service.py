@@ -2,11 +2,13 @@
 Posts service
 """
 
+from utils.tracing import traced_methods
 from ...repositories import IPostRepository
 from ...entities import PostEntity
 from ...exceptions import BaseDomainException
 
 
+@traced_methods
 class PostService:
     """
     Posts service
@@ -2,11 +2,13 @@
 Topic service
 """
 
+from utils.tracing import traced_methods
 from ...repositories import ITopicRepository
 from ...entities import TopicEntity, UserEntity
 from ...exceptions import BaseDomainException
 
 
+@traced_methods
 class TopicService:
     """
     Posts service
@@ -2,13 +2,19 @@
 Login and JWT controll Users
 """
 
-import jwt
+import time
+from typing import Optional, TypedDict
 
-from typing import TypedDict
+import jwt
+from loguru import logger
 
-from setup import jwt_handler, config
+from setup import jwt_handler, password_hasher, config
+from utils.metrics import PASSWORD_REHASHED
+from utils.tokens import REVOKED_TOKEN, REVOKED_USER
+from utils.tracing import traced_methods
 from ...exceptions import SecurityError
-from ...repositories import IUserRepository
+from ...entities import UserEntity
+from ...repositories import IRevocationRepository, IUserRepository
 
 
 class UserToken(TypedDict):
@@ -28,13 +34,15 @@ class UserPayload(TypedDict):
     sub: str
 
 
+@traced_methods
 class LoginService:
     """
     Login Service
     """
 
-    def __init__(self, user_repository: IUserRepository):
+    def __init__(self, user_repository: IUserRepository, revocation_repository: IRevocationRepository):
         self.repo = user_repository
+        self.revocation_repo = revocation_repository
 
     async def login(self, email: str, password: str) -> UserToken:
         """
@@ -49,12 +57,96 @@ class LoginService:
         
         Raises:
             SecurityError: Exception for security error
+
+        Notes:
+            The lookup, the password check and the rehash share the
+            repository session, see PasswordLoginController.login for the request
+            path that checks the password with no connection held
+        """
+
+        user = await self.check_password(await self.repo.get_by_email(email), password)
+
+        password_hash = await self.new_password_hash(user, password)
+        if password_hash is not None:
+            await self.save_password_hash(user, password_hash)
+
+        return self.issue_tokens(user)
+
+    async def check_password(self, user: Optional[UserEntity], password: str) -> UserEntity:
+        """
+        Check the password of the user of a login
+
+        Args:
+            user: UserEntity of the email, None when there is none
+            password: str
+
+        Returns:
+            UserEntity: The authenticated user
+
+        Raises:
+            SecurityError: Unknown email or wrong password
+
+        Notes:
+            An unknown email is checked against a dummy hash at the same
+            cost, so the response time does not reveal which emails exist
         """
 
-        user = await self.repo.get_by_email(email)
-        if not user or not user.authenticated(password):
+        if user is None:
+            await password_hasher.verify_dummy(password)
             raise SecurityError("Email ou senha incorretos.")
 
+        if not await password_hasher.verify(password, user.get_password_hash()):
+            raise SecurityError("Email ou senha incorretos.")
+
+        return user
+
+    async def new_password_hash(self, user: UserEntity, password: str) -> Optional[str]:
+        """
+        Hash replacing a legacy (SHA-256) or cheaper hash after a successful login
+
+        Args:
+            user: UserEntity, authenticated with password
+            password: str
+
+        Returns:
+            The new hash, None when the stored one is current
+
+        Notes:
+            Best effort: the login still succeeds when the hasher is busy,
+            the hash is replaced on a later login
+        """
+        if not password_hasher.needs_rehash(user.get_password_hash()):
+            return None
+
+        try:
+            return await password_hasher.hash(password)
+        except Exception as err:  # pylint: disable=broad-except
+            logger.warning(f"Hash da senha do usuario {user.uuid} nao atualizado: {err}")
+            return None
+
+    async def save_password_hash(self, user: UserEntity, password_hash: str) -> None:
+        """
+        Store the hash made by new_password_hash
+
+        Args:
+            user: UserEntity
+            password_hash: str
+        """
+        user.set_password_hash(password_hash)
+        await self.repo.update_user(user)
+        PASSWORD_REHASHED.inc()
+
+    def issue_tokens(self, user: UserEntity) -> UserToken:
+        """
+        Issue access and refresh tokens for an authenticated user
+
+        Args:
+            user: UserEntity
+
+        Returns:
+            UserToken: Access and refresh token
+        """
+
         access_token = {
             "tipo": "ACCESS",
             "nome": user.nome,
@@ -63,7 +155,7 @@ class LoginService:
             "sub": user.uuid,
         }
 
-        acces_token = jwt_handler.encode_payload(
+        access_token = jwt_handler.encode_payload(
             access_token,
             config.JWT_ACCESS_TOKEN_EXPIRES
         )
@@ -79,7 +171,7 @@ class LoginService:
         )
 
         return UserToken(
-            access_token=acces_token,
+            access_token=access_token,
             refresh_token=refresh_token
         )
 
@@ -106,30 +198,51 @@ class LoginService:
 
         user = await self.repo.get_by_uuid(payload["sub"])
 
-        access_token = {
-            "tipo": "ACCESS",
-            "nome": user.nome,
-            "email": user.email,
-            "avatar": user.avatar.link if user.avatar else None,
-            "sub": user.uuid,
-        }
+        return self.issue_tokens(user)
 
-        access_token = jwt_handler.encode_payload(
-            access_token,
-            config.JWT_ACCESS_TOKEN_EXPIRES
-        )
+    async def logout(self, access_token: str, refresh_token: Optional[str] = None) -> None:
+        """
+        Revoke the tokens of a session until they expire
 
-        refresh_token = {
-            "tipo": "REFRESH",
-            "sub": user.uuid,
-        }
+        Args:
+            access_token: str
+            refresh_token: Refresh token of the same user, optional
 
-        refresh_token = jwt_handler.encode_payload(
-            refresh_token,
-            config.JWT_REFRESH_TOKEN_EXPIRES
-        )
+        Raises:
+            SecurityError: Invalid token, or tokens of different users
 
-        return UserToken(
-            access_token=access_token,
-            refresh_token=refresh_token
-        )
+        Notes:
+            Revoked in this worker at once and persisted for the others
+            (database.revocations)
+        """
+
+        try:
+
+            payload = jwt_handler.decode_payload(access_token)
+
+            tokens = [access_token]
+            if refresh_token:
+                if jwt_handler.decode_payload(refresh_token)["sub"] != payload["sub"]:
+                    raise SecurityError("Token inválido.")
+                tokens.append(refresh_token)
+
+            expirations = dict(jwt_handler.revoke_token(token) for token in tokens)
+
+        except jwt.InvalidTokenError as err:
+            raise SecurityError("Token inválido.") from err
+
+        await self.revocation_repo.add(REVOKED_TOKEN, int(time.time()), expirations)
+
+    async def revoke_all_tokens(self, user_uuid: str) -> None:
+        """
+        Revoke every token issued so far to a user (password change, logout everywhere)
+
+        Args:
+            user_uuid: str
+
+        Notes:
+            Kept until every token issued before it has expired
+        """
+        revoked_at = jwt_handler.revoke_user(user_uuid)
+        expires_at = revoked_at + max(config.JWT_ACCESS_TOKEN_EXPIRES, config.JWT_REFRESH_TOKEN_EXPIRES)
+        await self.revocation_repo.add(REVOKED_USER, revoked_at, {user_uuid: expires_at})
@@ -2,24 +2,29 @@
 Register with Manage Users
 """
 
+from setup import password_hasher
 from utils import check_password_strong
-from ...repositories import IUserRepository
+from utils.tracing import traced_methods
+from ...repositories import IRevocationRepository, IUserRepository
 from ...entities.user import UserEntity
 from ...exceptions import DuplicateException, SecurityError
+from .login_services import LoginService
 
 
+@traced_methods
 class RegisterService:
     """
     Service for register
     """
 
 
-    def __init__(self, user_repository: IUserRepository):
+    def __init__(self, user_repository: IUserRepository, revocation_repository: IRevocationRepository):
         """
         Register Service
         """
 
         self.user_repo = user_repository
+        self.revocation_repo = revocation_repository
 
     async def create_new_user(self, user: UserEntity) -> UserEntity:
         """
@@ -56,6 +61,8 @@ class RegisterService:
                 "um número e um caractere especial."
             )
 
-        # Set new password
-        user.set_password(password)
-        return await self.user_repo.update_user(user)
+        # Set new password (tokens issued before the change are revoked)
+        user.set_password_hash(await password_hasher.hash(password))
+        updated_user = await self.user_repo.update_user(user)
+        await LoginService(self.user_repo, self.revocation_repo).revoke_all_tokens(user.uuid)
+        return updated_user
@@ -4,9 +4,10 @@ API for supa base integration
 
 from datetime import datetime
 
-import httpx
 import uuid
 
+from utils.deadline import DeadlineExceeded, expired, timeout_for
+from utils.tracing import SPAN_KIND_CLIENT, STATUS_ERROR, get_tracer
 from ..interfaces import IBlobStorage
 from ..exceptions import BlobStorageException
 from ..schemas import FileSchema
@@ -22,16 +23,19 @@ class SupabaseStorage(IBlobStorage):
         supabase_url: str,
         supabase_key: str,
         supabase_storage_name: str,
+        timeout: float = 30.0,
     ):
         """
         Args:
             supabase_url: str
             supabase_key: str
             supabase_storage_name: str
+            timeout: Seconds of a request, capped by the request deadline
         """
         self.supabase_url = supabase_url
         self.supabase_key = supabase_key
         self.supabase_storage_name = supabase_storage_name
+        self.timeout = timeout
 
     async def delete_archive(self, file_id: str) -> None:
         """
@@ -92,6 +96,8 @@ class SupabaseStorage(IBlobStorage):
         """
         Request Supabase API
         """
+        # Imported on the first request, keeps httpx out of the startup
+        import httpx  # pylint: disable=import-outside-toplevel
 
         headers = {
             "Authorization": f"Bearer {self.supabase_key}"
@@ -101,27 +107,49 @@ class SupabaseStorage(IBlobStorage):
         if "headers" in kwargs:
             headers.update(kwargs.pop("headers"))
 
-
-        async with httpx.AsyncClient(
-            base_url=self.supabase_url,
-            headers=headers,
-        ) as client:
-
-            response = await client.request(
-                method=method,
-                url=path,
-                **kwargs
-            )
-
-            try:
-                response.raise_for_status()
-            
-            except httpx.HTTPStatusError as err:
-                raise BlobStorageException(
-                    code=err.response.status_code or 500,
-                    detail=err.response.json(),
-                    message="Error de comunicaçao com o provedor de armazenamento."
-                ) from err
+        # Remaining budget of the request (fails before sending once it ran out)
+        timeout = timeout_for(self.timeout, "supabase")
+
+        with get_tracer().start_span(
+            "supabase.request",
+            kind=SPAN_KIND_CLIENT,
+            attributes={"http.request.method": method, "url.path": path},
+        ) as span:
+
+            async with httpx.AsyncClient(
+                base_url=self.supabase_url,
+                headers=headers,
+                timeout=timeout,
+            ) as client:
+
+                try:
+                    response = await client.request(
+                        method=method,
+                        url=path,
+                        **kwargs
+                    )
+                except httpx.TimeoutException as err:
+                    span.set_status(STATUS_ERROR, "timeout")
+                    if expired():
+                        raise DeadlineExceeded("supabase") from err
+                    raise BlobStorageException(
+                        code=504,
+                        detail=str(err),
+                        message="Tempo esgotado na comunicaçao com o provedor de armazenamento."
+                    ) from err
+
+                span.set_attribute("http.response.status_code", response.status_code)
+
+                try:
+                    response.raise_for_status()
+
+                except httpx.HTTPStatusError as err:
+                    span.set_status(STATUS_ERROR, str(err.response.status_code))
+                    raise BlobStorageException(
+                        code=err.response.status_code or 500,
+                        detail=err.response.json(),
+                        message="Error de comunicaçao com o provedor de armazenamento."
+                    ) from err
 
 if __name__ == "__main__":            
     from findacat import FindaCat, CatOptions
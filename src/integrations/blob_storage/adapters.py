@@ -3,6 +3,8 @@ Adapters for blob storage to domain interfaces
 """
 
 from domain.interfaces import IBlobStorageProvider, BlobUploadResult
+from utils.metrics import BLOB_OPERATION_SECONDS
+from utils.timing import BLOB, timed
 from .interfaces import IBlobStorage
 
 
@@ -27,11 +29,12 @@ class BlobStorageAdapter(IBlobStorageProvider):
         """
         Upload a file to the storage provider.
         """
-        result = await self._storage.upload_archive(
-            file_name=file_name,
-            file_extension=file_extension,
-            file_content=file_content,
-        )
+        with BLOB_OPERATION_SECONDS.time("upload"), timed(BLOB):
+            result = await self._storage.upload_archive(
+                file_name=file_name,
+                file_extension=file_extension,
+                file_content=file_content,
+            )
 
         return BlobUploadResult(
             id=result.id,
@@ -44,4 +47,5 @@ class BlobStorageAdapter(IBlobStorageProvider):
         """
         Delete a file from the storage provider.
         """
-        await self._storage.delete_archive(file_id)
+        with BLOB_OPERATION_SECONDS.time("delete"), timed(BLOB):
+            await self._storage.delete_archive(file_id)
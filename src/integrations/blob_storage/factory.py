@@ -3,6 +3,7 @@ Factory for blob storage
 """
 
 from enum import Enum
+from typing import Callable, Dict
 
 from .interfaces import IBlobStorage
 from .exceptions import BlobStorageException
@@ -22,14 +23,28 @@ class BlobStorageFactory:
 
     def __init__(self):
         self._stores = {}
+        self._builders: Dict[StorageProviders, Callable[[], IBlobStorage]] = {}
 
     def register(self, provider: StorageProviders, storage: IBlobStorage):
         """
         Register storage
         """
 
+        self._builders.pop(provider, None)
         self._stores[provider] = storage
 
+    def register_lazy(self, provider: StorageProviders, builder: Callable[[], IBlobStorage]):
+        """
+        Register storage created on its first use
+
+        Notes:
+            Keeps the client of a provider (and its credentials check) out
+            of the import of the app
+        """
+
+        self._stores.pop(provider, None)
+        self._builders[provider] = builder
+
     def get(self, provider: StorageProviders) -> IBlobStorage:
         """
         Storage provider
@@ -37,6 +52,9 @@ class BlobStorageFactory:
 
         storage = self._stores.get(provider)
 
+        if not storage and provider in self._builders:
+            storage = self._stores[provider] = self._builders.pop(provider)()
+
         if not storage:
             raise BlobStorageException(
                 message="Provider not found",
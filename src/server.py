@@ -0,0 +1,341 @@
+"""
+Production server (pre-forked uvicorn workers sharing one listening socket)
+
+The app is imported once by the master and the workers are forked from it,
+so they share the imported code instead of importing it again. Everything
+bound to a process or an event loop (database engines, span export, HTTP
+clients) is created by each worker in the lifespan.
+
+Workers are recycled after SERVER_MAX_REQUESTS requests (plus a random
+jitter, so they do not restart together) or when their RSS goes above
+SERVER_MAX_RSS_MB, which contains the growth of long-lived processes
+(fragmentation of image buffers). SIGTERM/SIGINT stop the workers
+gracefully (in-flight requests finish, up to SERVER_GRACEFUL_TIMEOUT),
+SIGHUP recycles every worker.
+
+State kept in memory is per worker:
+    - metrics: shared through a temporary directory, a scrape served by
+      any worker renders the totals of every worker (utils.metrics)
+    - response cache: a write only invalidates the cache of the worker
+      that served it, but the key holds the version of the listing (read
+      from the database on every request), so every worker misses the
+      pages of the previous version. The client that wrote reads the
+      version from the primary (replicas configured)
+    - SSE broker: a stream is pushed the posts written through its own
+      worker, the others are read from the database on every heartbeat
+    - rate limit (memory backend) and admission pools: the configured
+      limits are the ones of the deployment, the master gives each worker
+      its share before forking (rates, bursts, slots and queues divided
+      by the workers, at least one request each)
+
+Usage:
+    python src/server.py
+    python src/server.py --workers 4 --port 9000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from loguru import logger
+
+from api import app
+from setup import admission_pools, config, password_hasher, rate_limit_store
+from utils.metrics import registry
+
+
+# Seconds between the RSS checks of a worker (uvicorn ticks every 0.1s)
+RSS_CHECK_INTERVAL = 5.0
+
+# A worker that fails within this many seconds of its start is not respawned
+BOOT_TIMEOUT = 5.0
+
+# Exit code of a worker whose lifespan startup failed
+STARTUP_FAILURE = 3
+
+
+def worker_count(configured: int) -> int:
+    """
+    Number of workers, one per CPU when not configured
+    """
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def max_requests_with_jitter(max_requests: int, jitter: int, rng: random.Random = random) -> Optional[int]:
+    """
+    Request limit of a worker (None when recycling is off)
+    """
+    if max_requests <= 0:
+        return None
+    return max_requests + rng.randint(0, max(0, jitter))
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident memory of the current process
+
+    Notes:
+        Reads /proc on Linux, elsewhere falls back to the peak RSS
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource  # pylint: disable=import-outside-toplevel
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class WorkerServer(uvicorn.Server):
+    """
+    Uvicorn server of a worker, exits (to be recycled) above the RSS limit
+
+    Args:
+        config: Uvicorn config of the worker
+        max_rss_bytes: RSS limit, 0 turns the check off
+    """
+
+    def __init__(self, config: uvicorn.Config, max_rss_bytes: int = 0):  # pylint: disable=redefined-outer-name
+        super().__init__(config)
+        self.max_rss_bytes = max_rss_bytes
+        self._check_every = max(1, int(RSS_CHECK_INTERVAL * 10))
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.max_rss_bytes and counter % self._check_every == 0:
+            rss = current_rss_bytes()
+            if rss > self.max_rss_bytes:
+                logger.warning(
+                    f"Worker {os.getpid()} acima do limite de memoria "
+                    f"({rss // 2**20} MB > {self.max_rss_bytes // 2**20} MB), reciclando"
+                )
+                return True
+        return await super().on_tick(counter)
+
+
+def run_worker(sock: socket.socket, max_requests: Optional[int], max_rss_bytes: int, graceful_timeout: float) -> None:
+    """
+    Serve the preloaded app on the shared socket (worker process)
+    """
+    # Handlers of the master are inherited by the fork, uvicorn installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+
+    server = WorkerServer(
+        uvicorn.Config(
+            app,
+            loop="auto",  # uvloop when installed
+            http="auto",  # httptools when installed
+            lifespan="on",
+            limit_max_requests=max_requests,
+            timeout_graceful_shutdown=graceful_timeout,
+        ),
+        max_rss_bytes=max_rss_bytes,
+    )
+    server.run(sockets=[sock])
+
+    if not server.started:
+        sys.exit(STARTUP_FAILURE)
+
+
+class Supervisor:
+    """
+    Master process: forks the workers, respawns the ones that exit and
+    stops them on shutdown
+
+    Args:
+        host: Bind address
+        port: Bind port
+        workers: Number of worker processes
+        max_requests: Requests before a worker is recycled (0 = off)
+        max_requests_jitter: Random extra requests per worker
+        max_rss_mb: RSS (MB) above which a worker is recycled (0 = off)
+        graceful_timeout: Seconds the workers have to finish on shutdown
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        workers: int,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        max_rss_mb: int = 0,
+        graceful_timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_rss_bytes = max_rss_mb * 2**20
+        self.graceful_timeout = graceful_timeout
+
+        self._context = multiprocessing.get_context("fork")
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._started_at: Dict[int, float] = {}
+        self._sock: Optional[socket.socket] = None
+        self._stopping = False
+        self._recycle_all = False
+
+    def _spawn(self) -> None:
+        process = self._context.Process(
+            target=run_worker,
+            args=(
+                self._sock,
+                max_requests_with_jitter(self.max_requests, self.max_requests_jitter),
+                self.max_rss_bytes,
+                self.graceful_timeout,
+            ),
+            daemon=False,
+        )
+        process.start()
+        self._processes[process.pid] = process
+        self._started_at[process.pid] = time.monotonic()
+        logger.info(f"Worker {process.pid} iniciado")
+
+    def _handle_stop(self, *_) -> None:
+        self._stopping = True
+
+    def _handle_recycle(self, *_) -> None:
+        self._recycle_all = True
+
+    def _reap(self) -> bool:
+        """
+        Respawn the workers that exited
+
+        Returns:
+            False if a worker failed during its startup (the service cannot
+            boot, respawning would loop)
+        """
+        for pid, process in list(self._processes.items()):
+            if self._stopping or process.is_alive():
+                continue
+
+            process.join()
+            del self._processes[pid]
+            uptime = time.monotonic() - self._started_at.pop(pid)
+            self._retire_metrics(pid)
+
+            if process.exitcode not in (0, -signal.SIGTERM) and uptime < BOOT_TIMEOUT:
+                logger.error(f"Worker {pid} falhou ao iniciar (codigo {process.exitcode})")
+                return False
+
+            logger.info(f"Worker {pid} encerrado (codigo {process.exitcode}), reciclando")
+            self._spawn()
+        return True
+
+    def _retire_metrics(self, pid: int) -> None:
+        """
+        Keep the counters of an exited worker in the totals of the scrapes
+        """
+        try:
+            registry.retire(pid)
+        except OSError as err:
+            logger.warning(f"Metricas do worker {pid} nao arquivadas: {err}")
+
+    def _stop_workers(self) -> None:
+        """
+        SIGTERM every worker, SIGKILL the ones left after the graceful timeout
+        """
+        for process in self._processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout + 1
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker {process.pid} nao encerrou a tempo, finalizando")
+                process.kill()
+                process.join()
+
+    def run(self) -> int:
+        """
+        Serve until SIGTERM/SIGINT
+
+        Returns:
+            Exit code of the master
+        """
+        self._sock = uvicorn.Config(app, host=self.host, port=self.port).bind_socket()
+        # Inherited by the forked workers
+        metrics_dir = tempfile.mkdtemp(prefix="metrics-")
+        registry.share(metrics_dir)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_recycle)
+
+        logger.info(f"Servidor em http://{self.host}:{self.port} com {self.workers} workers (pid {os.getpid()})")
+        for _ in range(self.workers):
+            self._spawn()
+
+        status = 0
+        while not self._stopping:
+            time.sleep(0.2)
+
+            if self._recycle_all:
+                self._recycle_all = False
+                logger.info("Reciclando todos os workers")
+                for process in self._processes.values():
+                    if process.is_alive():
+                        os.kill(process.pid, signal.SIGTERM)
+
+            if not self._reap():
+                status = STARTUP_FAILURE
+                break
+
+        logger.info("Encerrando workers")
+        self._stop_workers()
+        self._sock.close()
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        return status
+
+
+def main():
+    """
+    Parse the command line and run the supervisor
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=config.API_HOST, help="Bind address")
+    parser.add_argument("--port", type=int, default=config.API_PORT, help="Bind port")
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS, help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--max-requests", type=int, default=config.SERVER_MAX_REQUESTS, help="Requests before a worker is recycled (0 = off)")
+    parser.add_argument("--max-requests-jitter", type=int, default=config.SERVER_MAX_REQUESTS_JITTER, help="Random extra requests per worker")
+    parser.add_argument("--max-rss-mb", type=int, default=config.SERVER_MAX_RSS_MB, help="RSS (MB) above which a worker is recycled (0 = off)")
+    parser.add_argument("--graceful-timeout", type=float, default=config.SERVER_GRACEFUL_TIMEOUT, help="Seconds to finish in-flight requests on shutdown")
+    args = parser.parse_args()
+
+    supervisor = Supervisor(
+        host=args.host,
+        port=args.port,
+        workers=worker_count(args.workers),
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        max_rss_mb=args.max_rss_mb,
+        graceful_timeout=args.graceful_timeout,
+    )
+
+    # Inherited by the forked workers, the configured limits are split among them
+    rate_limit_store.share_workers(supervisor.workers)
+    for pool in admission_pools.values():
+        pool.share_workers(supervisor.workers)
+
+    # Calibrated once before forking: the workers calibrating together would
+    # compete for the CPUs and pick a lower cost
+    if config.PASSWORD_HASH_CALIBRATE:
+        password_hasher.calibrate(config.PASSWORD_HASH_TARGET_SECONDS, config.PASSWORD_HASH_MAX_MEMORY_MB * 2**20)
+
+    sys.exit(supervisor.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,16 @@ if "src" not in sys.path:
     sys.path.append(base_dir)
 
 from utils.security import SecurityHandler
+from utils.tokens import RevocationList
+from utils.passwords import PasswordHasher
+from utils.cache import ResponseCache
+from utils.compression import ResponseCompressor
+from utils.broker import EventBroker
+from utils.profiler import ProfileStore
+from utils.rate_limit import create_rate_limit_store
+from utils.admission import AdmissionPool, READ, WRITE, MEDIA
+from utils.trending import TrendingIndex
+from utils.tracing import Tracer, BatchSpanProcessor, create_span_exporter, set_tracer
 from integrations.blob_storage import SupabaseStorage, BlobStorageFactory, StorageProviders
 
 # Check if running in test mode
@@ -48,10 +58,29 @@ class Config:
         self.API_TITLE = "Test API"
         self.API_DESCRIPTION = "Test API Description"
 
+        # Production server (src/server.py)
+        self.SERVER_WORKERS = 1
+        self.SERVER_MAX_REQUESTS = 0
+        self.SERVER_MAX_REQUESTS_JITTER = 0
+        self.SERVER_MAX_RSS_MB = 0
+        self.SERVER_GRACEFUL_TIMEOUT = 10.0
+
         # JWT Config - use proper length key for tests
         self.JWT_SECRET_KEY = "test-secret-key-minimum-32-bytes!"
         self.JWT_ACCESS_TOKEN_EXPIRES = 3600
         self.JWT_REFRESH_TOKEN_EXPIRES = 86400
+        self.JWT_CACHE_SIZE = 10000
+        self.JWT_REVOCATION_CAPACITY = 100000
+        self.JWT_REVOCATION_SYNC_SECONDS = 0
+
+        # Password hashing (scrypt in a thread pool, low fixed cost for tests)
+        self.PASSWORD_HASH_N = 1024
+        self.PASSWORD_HASH_WORKERS = 2
+        self.PASSWORD_HASH_QUEUE = 64
+        self.PASSWORD_HASH_QUEUE_TIMEOUT = 5.0
+        self.PASSWORD_HASH_CALIBRATE = 0
+        self.PASSWORD_HASH_TARGET_SECONDS = 0.1
+        self.PASSWORD_HASH_MAX_MEMORY_MB = 64
 
         # Logger Config
         self.LOG_FILE_ACTIVE = 0
@@ -60,10 +89,125 @@ class Config:
         self.SUPABASE_URL = "https://mock-supabase.example.com"
         self.SUPABASE_KEY = "mock-supabase-key"
         self.SUPABASE_STORAGE_NAME = "mock-storage"
+        self.SUPABASE_TIMEOUT = 30.0
 
         # Database (in-memory SQLite for tests)
         self.DATABASE_SQLITE_PATH = "sqlite+aiosqlite:///:memory:"
 
+        # Schema at startup (tables created from the models in tests)
+        self.DATABASE_SCHEMA_CHECK = "create_all"
+        self.OPENAPI_SCHEMA_PATH = None
+
+        # Read replicas (primary only in tests)
+        self.DATABASE_REPLICA_PATHS = []
+        self.DATABASE_REPLICA_STRATEGY = "round_robin"
+        self.DATABASE_PRIMARY_PIN_SECONDS = 5.0
+
+        # SQLite profile (WAL pragmas, single writer and reader pool; SQLite files only)
+        self.SQLITE_PRAGMAS_ENABLED = 1
+        self.SQLITE_BUSY_TIMEOUT_MS = 5000
+        self.SQLITE_CACHE_SIZE_KB = 65536
+        self.SQLITE_MMAP_SIZE = 268435456
+        self.SQLITE_SINGLE_WRITER = 1
+        self.SQLITE_READER_POOL_SIZE = 4
+        self.SQLITE_WRITER_TIMEOUT = 30.0
+
+        # HTTP cache
+        self.HTTP_CACHE_MAX_AGE = 60
+
+        # Public response cache
+        self.RESPONSE_CACHE_TTL = 5
+        self.RESPONSE_CACHE_STALE_TTL = 30
+        self.RESPONSE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+        # Response compression
+        self.COMPRESSION_MINIMUM_SIZE = 500
+        self.COMPRESSION_GZIP_LEVEL = 6
+        self.COMPRESSION_BROTLI_QUALITY = 4
+
+        # Server-Sent Events
+        self.STREAM_QUEUE_SIZE = 100
+        self.STREAM_HEARTBEAT_INTERVAL = 15
+        self.STREAM_RESUME_BATCH_SIZE = 100
+
+        # Topic export (posts per cursor chunk)
+        self.EXPORT_CHUNK_SIZE = 1000
+
+        # Metrics (/metrics endpoint and middleware)
+        self.METRICS_ENABLED = 1
+        self.METRICS_FLUSH_SECONDS = 0
+
+        # SQL instrumentation (tests fail on N+1 queries)
+        self.SQL_DEBUG_HEADER = 1
+        self.SQL_N_PLUS_ONE_THRESHOLD = 2
+        self.SQL_N_PLUS_ONE_RAISE = 1
+        self.SQL_SLOW_REQUEST_DB_TIME = 0.5
+
+        # Tracing (spans kept in memory, every trace sampled)
+        self.TRACING_ENABLED = 1
+        self.TRACING_SERVICE_NAME = "fishing-dock-api"
+        self.TRACING_SAMPLE_RATIO = 1.0
+        self.TRACING_EXPORTER = "memory"
+        self.TRACING_FILE_PATH = "logs/traces.jsonl"
+        self.TRACING_OTLP_ENDPOINT = None
+        self.TRACING_QUEUE_SIZE = 2048
+        self.TRACING_BATCH_SIZE = 512
+        self.TRACING_FLUSH_INTERVAL = 5
+
+        # Server-Timing header
+        self.SERVER_TIMING_ENABLED = 1
+
+        # Request profiler (slow requests and X-Profile header)
+        self.PROFILER_ENABLED = 1
+        self.PROFILER_TOKEN = "test-profiler-token"
+        self.PROFILER_SLOW_REQUEST_THRESHOLD = 5.0
+        self.PROFILER_INTERVAL = 0.005
+        self.PROFILER_MAX_PROFILES = 20
+        self.PROFILER_OUTPUT_DIR = None
+
+        # Rate limiting (token buckets of the media and register routes)
+        self.RATE_LIMIT_ENABLED = 0
+        self.RATE_LIMIT_BACKEND = "memory"
+        self.RATE_LIMIT_SHARDS = 16
+        self.RATE_LIMIT_MAX_KEYS = 100_000
+        self.RATE_LIMIT_MEDIA_USER_PER_MINUTE = 30
+        self.RATE_LIMIT_MEDIA_USER_BURST = 10
+        self.RATE_LIMIT_MEDIA_IP_PER_MINUTE = 120
+        self.RATE_LIMIT_MEDIA_IP_BURST = 30
+        self.RATE_LIMIT_REGISTER_IP_PER_MINUTE = 5
+        self.RATE_LIMIT_REGISTER_IP_BURST = 5
+
+        # Admission control (concurrency pools of reads, writes and media uploads)
+        self.ADMISSION_ENABLED = 0
+        self.ADMISSION_READ_LIMIT = 64
+        self.ADMISSION_READ_QUEUE = 128
+        self.ADMISSION_READ_QUEUE_TIMEOUT = 0.5
+        self.ADMISSION_READ_TARGET_LATENCY = 0.5
+        self.ADMISSION_WRITE_LIMIT = 16
+        self.ADMISSION_WRITE_QUEUE = 32
+        self.ADMISSION_WRITE_QUEUE_TIMEOUT = 2.0
+        self.ADMISSION_WRITE_TARGET_LATENCY = 1.0
+        self.ADMISSION_MEDIA_LIMIT = 4
+        self.ADMISSION_MEDIA_QUEUE = 8
+        self.ADMISSION_MEDIA_QUEUE_TIMEOUT = 5.0
+        self.ADMISSION_MEDIA_TARGET_LATENCY = 2.0
+
+        # Request deadlines (504 when the time budget runs out)
+        self.DEADLINE_ENABLED = 1
+        self.DEADLINE_DEFAULT_SECONDS = 30.0
+        self.DEADLINE_MEDIA_SECONDS = 60.0
+        self.DEADLINE_COMPENSATION_SECONDS = 10.0
+
+        # Trending topics (time-decayed index, synced with its snapshot table)
+        self.TRENDING_HALF_LIFE_HOURS = 6.0
+        self.TRENDING_MAX_TOPICS = 1000
+        self.TRENDING_SYNC_SECONDS = 0
+
+        # Topic activity rollup (background aggregation of posts per hour)
+        self.ACTIVITY_ROLLUP_INTERVAL_SECONDS = 0
+        self.ACTIVITY_ROLLUP_BATCH_SIZE = 1000
+        self.ACTIVITY_ROLLUP_LAG_SECONDS = 60.0
+
     def _load_env_config(self):
         """
         Load configuration from .env file
@@ -76,10 +220,29 @@ class Config:
         self.API_TITLE = self.get_env("API_TITLE", str, optional=True)
         self.API_DESCRIPTION = self.get_env("API_DESCRIPTION", str, optional=True)
 
+        # Production server (src/server.py, workers 0 = one per CPU, limits 0 = off)
+        self.SERVER_WORKERS = self.get_env("SERVER_WORKERS", int, 0)
+        self.SERVER_MAX_REQUESTS = self.get_env("SERVER_MAX_REQUESTS", int, 10000)
+        self.SERVER_MAX_REQUESTS_JITTER = self.get_env("SERVER_MAX_REQUESTS_JITTER", int, 1000)
+        self.SERVER_MAX_RSS_MB = self.get_env("SERVER_MAX_RSS_MB", int, 0)
+        self.SERVER_GRACEFUL_TIMEOUT = self.get_env("SERVER_GRACEFUL_TIMEOUT", float, 30)
+
         # JWT Config
         self.JWT_SECRET_KEY = self.get_env("JWT_SECRET_KEY", str)
         self.JWT_ACCESS_TOKEN_EXPIRES = self.get_env("JWT_EXPIRES_IN", int, 3600)
         self.JWT_REFRESH_TOKEN_EXPIRES = self.get_env("JWT_EXPIRES_IN", int, 86400)
+        self.JWT_CACHE_SIZE = self.get_env("JWT_CACHE_SIZE", int, 10000)
+        self.JWT_REVOCATION_CAPACITY = self.get_env("JWT_REVOCATION_CAPACITY", int, 100000)
+        self.JWT_REVOCATION_SYNC_SECONDS = self.get_env("JWT_REVOCATION_SYNC_SECONDS", float, 2)
+
+        # Password hashing (scrypt in a thread pool, cost calibrated at startup)
+        self.PASSWORD_HASH_N = self.get_env("PASSWORD_HASH_N", int, 2**14)
+        self.PASSWORD_HASH_WORKERS = self.get_env("PASSWORD_HASH_WORKERS", int, 2)
+        self.PASSWORD_HASH_QUEUE = self.get_env("PASSWORD_HASH_QUEUE", int, 64)
+        self.PASSWORD_HASH_QUEUE_TIMEOUT = self.get_env("PASSWORD_HASH_QUEUE_TIMEOUT", float, 2.0)
+        self.PASSWORD_HASH_CALIBRATE = self.get_env("PASSWORD_HASH_CALIBRATE", int, 1)
+        self.PASSWORD_HASH_TARGET_SECONDS = self.get_env("PASSWORD_HASH_TARGET_SECONDS", float, 0.1)
+        self.PASSWORD_HASH_MAX_MEMORY_MB = self.get_env("PASSWORD_HASH_MAX_MEMORY_MB", int, 64)
 
         # Logger Config
         self.LOG_FILE_ACTIVE = self.get_env("LOG_FILE_ACTIVE", int, 0)
@@ -88,11 +251,132 @@ class Config:
         self.SUPABASE_URL = self.get_env("SUPABASE_URL", str)
         self.SUPABASE_KEY = self.get_env("SUPABASE_KEY", str)
         self.SUPABASE_STORAGE_NAME = self.get_env("SUPABASE_STORAGE_NAME", str)
+        self.SUPABASE_TIMEOUT = self.get_env("SUPABASE_TIMEOUT", float, 30)
 
         # Database
         self.DATABASE_SQLITE_PATH = self.get_env("DATABASE_PATH", str)\
             .replace("pymysql", "aiomysql")
 
+        # Schema at startup (alembic revision check, create_all or off)
+        self.DATABASE_SCHEMA_CHECK = self.get_env("DATABASE_SCHEMA_CHECK", str, "alembic")
+        self.OPENAPI_SCHEMA_PATH = self.get_env("OPENAPI_SCHEMA_PATH", str, None, optional=True)
+
+        # Read replicas (comma-separated URLs, reads routed away from the primary)
+        self.DATABASE_REPLICA_PATHS = [
+            path.strip().replace("pymysql", "aiomysql")
+            for path in self.get_env("DATABASE_REPLICA_PATHS", str, "", optional=True).split(",")
+            if path.strip()
+        ]
+        self.DATABASE_REPLICA_STRATEGY = self.get_env("DATABASE_REPLICA_STRATEGY", str, "round_robin")
+        self.DATABASE_PRIMARY_PIN_SECONDS = self.get_env("DATABASE_PRIMARY_PIN_SECONDS", float, 5)
+
+        # SQLite profile (WAL pragmas, single writer and reader pool; SQLite files only)
+        self.SQLITE_PRAGMAS_ENABLED = self.get_env("SQLITE_PRAGMAS_ENABLED", int, 1)
+        self.SQLITE_BUSY_TIMEOUT_MS = self.get_env("SQLITE_BUSY_TIMEOUT_MS", int, 5000)
+        self.SQLITE_CACHE_SIZE_KB = self.get_env("SQLITE_CACHE_SIZE_KB", int, 65536)
+        self.SQLITE_MMAP_SIZE = self.get_env("SQLITE_MMAP_SIZE", int, 268435456)
+        self.SQLITE_SINGLE_WRITER = self.get_env("SQLITE_SINGLE_WRITER", int, 1)
+        self.SQLITE_READER_POOL_SIZE = self.get_env("SQLITE_READER_POOL_SIZE", int, 4)
+        self.SQLITE_WRITER_TIMEOUT = self.get_env("SQLITE_WRITER_TIMEOUT", float, 30)
+
+        # HTTP cache
+        self.HTTP_CACHE_MAX_AGE = self.get_env("HTTP_CACHE_MAX_AGE", int, 60)
+
+        # Public response cache
+        self.RESPONSE_CACHE_TTL = self.get_env("RESPONSE_CACHE_TTL", float, 5)
+        self.RESPONSE_CACHE_STALE_TTL = self.get_env("RESPONSE_CACHE_STALE_TTL", float, 30)
+        self.RESPONSE_CACHE_MAX_BYTES = self.get_env("RESPONSE_CACHE_MAX_BYTES", int, 64 * 1024 * 1024)
+
+        # Response compression
+        self.COMPRESSION_MINIMUM_SIZE = self.get_env("COMPRESSION_MINIMUM_SIZE", int, 500)
+        self.COMPRESSION_GZIP_LEVEL = self.get_env("COMPRESSION_GZIP_LEVEL", int, 6)
+        self.COMPRESSION_BROTLI_QUALITY = self.get_env("COMPRESSION_BROTLI_QUALITY", int, 4)
+
+        # Server-Sent Events
+        self.STREAM_QUEUE_SIZE = self.get_env("STREAM_QUEUE_SIZE", int, 100)
+        self.STREAM_HEARTBEAT_INTERVAL = self.get_env("STREAM_HEARTBEAT_INTERVAL", float, 15)
+        self.STREAM_RESUME_BATCH_SIZE = self.get_env("STREAM_RESUME_BATCH_SIZE", int, 100)
+
+        # Topic export (posts per cursor chunk)
+        self.EXPORT_CHUNK_SIZE = self.get_env("EXPORT_CHUNK_SIZE", int, 1000)
+
+        # Metrics (/metrics endpoint and middleware)
+        self.METRICS_ENABLED = self.get_env("METRICS_ENABLED", int, 1)
+        self.METRICS_FLUSH_SECONDS = self.get_env("METRICS_FLUSH_SECONDS", float, 1)
+
+        # SQL instrumentation
+        self.SQL_DEBUG_HEADER = self.get_env("SQL_DEBUG_HEADER", int, 0)
+        self.SQL_N_PLUS_ONE_THRESHOLD = self.get_env("SQL_N_PLUS_ONE_THRESHOLD", int, 5)
+        self.SQL_N_PLUS_ONE_RAISE = self.get_env("SQL_N_PLUS_ONE_RAISE", int, 0)
+        self.SQL_SLOW_REQUEST_DB_TIME = self.get_env("SQL_SLOW_REQUEST_DB_TIME", float, 0.5)
+
+        # Tracing
+        self.TRACING_ENABLED = self.get_env("TRACING_ENABLED", int, 0)
+        self.TRACING_SERVICE_NAME = self.get_env("TRACING_SERVICE_NAME", str, "fishing-dock-api")
+        self.TRACING_SAMPLE_RATIO = self.get_env("TRACING_SAMPLE_RATIO", float, 0.1)
+        self.TRACING_EXPORTER = self.get_env("TRACING_EXPORTER", str, "file")
+        self.TRACING_FILE_PATH = self.get_env("TRACING_FILE_PATH", str, "logs/traces.jsonl")
+        self.TRACING_OTLP_ENDPOINT = self.get_env("TRACING_OTLP_ENDPOINT", str, optional=True)
+        self.TRACING_QUEUE_SIZE = self.get_env("TRACING_QUEUE_SIZE", int, 2048)
+        self.TRACING_BATCH_SIZE = self.get_env("TRACING_BATCH_SIZE", int, 512)
+        self.TRACING_FLUSH_INTERVAL = self.get_env("TRACING_FLUSH_INTERVAL", float, 5)
+
+        # Server-Timing header
+        self.SERVER_TIMING_ENABLED = self.get_env("SERVER_TIMING_ENABLED", int, 1)
+
+        # Request profiler (slow requests and X-Profile header)
+        self.PROFILER_ENABLED = self.get_env("PROFILER_ENABLED", int, 1)
+        self.PROFILER_TOKEN = self.get_env("PROFILER_TOKEN", str, optional=True)
+        self.PROFILER_SLOW_REQUEST_THRESHOLD = self.get_env("PROFILER_SLOW_REQUEST_THRESHOLD", float, 2.0)
+        self.PROFILER_INTERVAL = self.get_env("PROFILER_INTERVAL", float, 0.005)
+        self.PROFILER_MAX_PROFILES = self.get_env("PROFILER_MAX_PROFILES", int, 20)
+        self.PROFILER_OUTPUT_DIR = self.get_env("PROFILER_OUTPUT_DIR", str, "logs/profiles")
+
+        # Rate limiting (token buckets of the media and register routes)
+        # Limits of the whole server, the memory backend splits them among the workers
+        self.RATE_LIMIT_ENABLED = self.get_env("RATE_LIMIT_ENABLED", int, 1)
+        self.RATE_LIMIT_BACKEND = self.get_env("RATE_LIMIT_BACKEND", str, "memory")
+        self.RATE_LIMIT_SHARDS = self.get_env("RATE_LIMIT_SHARDS", int, 16)
+        self.RATE_LIMIT_MAX_KEYS = self.get_env("RATE_LIMIT_MAX_KEYS", int, 100_000)
+        self.RATE_LIMIT_MEDIA_USER_PER_MINUTE = self.get_env("RATE_LIMIT_MEDIA_USER_PER_MINUTE", float, 30)
+        self.RATE_LIMIT_MEDIA_USER_BURST = self.get_env("RATE_LIMIT_MEDIA_USER_BURST", float, 10)
+        self.RATE_LIMIT_MEDIA_IP_PER_MINUTE = self.get_env("RATE_LIMIT_MEDIA_IP_PER_MINUTE", float, 120)
+        self.RATE_LIMIT_MEDIA_IP_BURST = self.get_env("RATE_LIMIT_MEDIA_IP_BURST", float, 30)
+        self.RATE_LIMIT_REGISTER_IP_PER_MINUTE = self.get_env("RATE_LIMIT_REGISTER_IP_PER_MINUTE", float, 5)
+        self.RATE_LIMIT_REGISTER_IP_BURST = self.get_env("RATE_LIMIT_REGISTER_IP_BURST", float, 5)
+
+        # Admission control (concurrency pools of reads, writes and media uploads)
+        # Limits and queues of the whole server, split among the workers
+        self.ADMISSION_ENABLED = self.get_env("ADMISSION_ENABLED", int, 1)
+        self.ADMISSION_READ_LIMIT = self.get_env("ADMISSION_READ_LIMIT", int, 64)
+        self.ADMISSION_READ_QUEUE = self.get_env("ADMISSION_READ_QUEUE", int, 128)
+        self.ADMISSION_READ_QUEUE_TIMEOUT = self.get_env("ADMISSION_READ_QUEUE_TIMEOUT", float, 0.5)
+        self.ADMISSION_READ_TARGET_LATENCY = self.get_env("ADMISSION_READ_TARGET_LATENCY", float, 0.5)
+        self.ADMISSION_WRITE_LIMIT = self.get_env("ADMISSION_WRITE_LIMIT", int, 16)
+        self.ADMISSION_WRITE_QUEUE = self.get_env("ADMISSION_WRITE_QUEUE", int, 32)
+        self.ADMISSION_WRITE_QUEUE_TIMEOUT = self.get_env("ADMISSION_WRITE_QUEUE_TIMEOUT", float, 2.0)
+        self.ADMISSION_WRITE_TARGET_LATENCY = self.get_env("ADMISSION_WRITE_TARGET_LATENCY", float, 1.0)
+        self.ADMISSION_MEDIA_LIMIT = self.get_env("ADMISSION_MEDIA_LIMIT", int, 4)
+        self.ADMISSION_MEDIA_QUEUE = self.get_env("ADMISSION_MEDIA_QUEUE", int, 8)
+        self.ADMISSION_MEDIA_QUEUE_TIMEOUT = self.get_env("ADMISSION_MEDIA_QUEUE_TIMEOUT", float, 5.0)
+        self.ADMISSION_MEDIA_TARGET_LATENCY = self.get_env("ADMISSION_MEDIA_TARGET_LATENCY", float, 2.0)
+
+        # Request deadlines (504 when the time budget runs out)
+        self.DEADLINE_ENABLED = self.get_env("DEADLINE_ENABLED", int, 1)
+        self.DEADLINE_DEFAULT_SECONDS = self.get_env("DEADLINE_DEFAULT_SECONDS", float, 10)
+        self.DEADLINE_MEDIA_SECONDS = self.get_env("DEADLINE_MEDIA_SECONDS", float, 30)
+        self.DEADLINE_COMPENSATION_SECONDS = self.get_env("DEADLINE_COMPENSATION_SECONDS", float, 10)
+
+        # Trending topics (time-decayed index, synced with its snapshot table)
+        self.TRENDING_HALF_LIFE_HOURS = self.get_env("TRENDING_HALF_LIFE_HOURS", float, 6)
+        self.TRENDING_MAX_TOPICS = self.get_env("TRENDING_MAX_TOPICS", int, 1000)
+        self.TRENDING_SYNC_SECONDS = self.get_env("TRENDING_SYNC_SECONDS", float, 30)
+
+        # Topic activity rollup (background aggregation of posts per hour)
+        self.ACTIVITY_ROLLUP_INTERVAL_SECONDS = self.get_env("ACTIVITY_ROLLUP_INTERVAL_SECONDS", float, 60)
+        self.ACTIVITY_ROLLUP_BATCH_SIZE = self.get_env("ACTIVITY_ROLLUP_BATCH_SIZE", int, 5000)
+        self.ACTIVITY_ROLLUP_LAG_SECONDS = self.get_env("ACTIVITY_ROLLUP_LAG_SECONDS", float, 60)
+
     def get_env(
         self,
         key: str,
@@ -155,14 +439,106 @@ class Config:
 
 config = Config()
 config.setup_loguru()
-jwt_handler = SecurityHandler(config.JWT_SECRET_KEY)
+jwt_handler = SecurityHandler(
+    config.JWT_SECRET_KEY,
+    cache_size=config.JWT_CACHE_SIZE,
+    revocations=RevocationList(config.JWT_REVOCATION_CAPACITY),
+)
 
-# Blog configuration
-store_supa_base = SupabaseStorage(
-    supabase_key=config.SUPABASE_KEY,
-    supabase_storage_name=config.SUPABASE_STORAGE_NAME,
-    supabase_url=config.SUPABASE_URL,
+# Password hashing (calibrated by the lifespan, or once by the server master)
+password_hasher = PasswordHasher(
+    n=config.PASSWORD_HASH_N,
+    workers=config.PASSWORD_HASH_WORKERS,
+    queue_size=config.PASSWORD_HASH_QUEUE,
+    queue_timeout=config.PASSWORD_HASH_QUEUE_TIMEOUT,
 )
 
+# Blog configuration (the Supabase client is created on the first upload)
 storage_blob = BlobStorageFactory()
-storage_blob.register(StorageProviders.SUPABASE, store_supa_base)
+storage_blob.register_lazy(
+    StorageProviders.SUPABASE,
+    lambda: SupabaseStorage(
+        supabase_key=config.SUPABASE_KEY,
+        supabase_storage_name=config.SUPABASE_STORAGE_NAME,
+        supabase_url=config.SUPABASE_URL,
+        timeout=config.SUPABASE_TIMEOUT,
+    ),
+)
+
+# Public response cache
+response_cache = ResponseCache(
+    ttl=config.RESPONSE_CACHE_TTL,
+    stale_ttl=config.RESPONSE_CACHE_STALE_TTL,
+    max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+)
+
+# Response compression
+response_compressor = ResponseCompressor(
+    minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Live feeds (Server-Sent Events)
+post_broker = EventBroker(queue_size=config.STREAM_QUEUE_SIZE)
+
+
+# Tracing (spans of routes, controllers, services, repositories and storage)
+tracer = Tracer(processor=None, sample_ratio=0)
+if config.TRACING_ENABLED:
+    tracer = Tracer(
+        processor=BatchSpanProcessor(
+            create_span_exporter(
+                config.TRACING_EXPORTER,
+                service_name=config.TRACING_SERVICE_NAME,
+                file_path=config.TRACING_FILE_PATH,
+                otlp_endpoint=config.TRACING_OTLP_ENDPOINT,
+            ),
+            max_queue_size=config.TRACING_QUEUE_SIZE,
+            max_batch_size=config.TRACING_BATCH_SIZE,
+            schedule_delay=config.TRACING_FLUSH_INTERVAL,
+        ),
+        sample_ratio=config.TRACING_SAMPLE_RATIO,
+    )
+set_tracer(tracer)
+
+# Request profiles (ring buffer served at /admin/profiles)
+profile_store = ProfileStore(max_profiles=config.PROFILER_MAX_PROFILES)
+
+# Rate limit buckets (per process with its share of the limits, or the shared store of the deployment)
+rate_limit_store = create_rate_limit_store(
+    config.RATE_LIMIT_BACKEND,
+    shards=config.RATE_LIMIT_SHARDS,
+    max_keys=config.RATE_LIMIT_MAX_KEYS,
+)
+
+# Admission pools by request class (shared by the requests of a worker, split among the workers by the server)
+admission_pools = {
+    READ: AdmissionPool(
+        READ,
+        max_limit=config.ADMISSION_READ_LIMIT,
+        queue_size=config.ADMISSION_READ_QUEUE,
+        queue_timeout=config.ADMISSION_READ_QUEUE_TIMEOUT,
+        target_latency=config.ADMISSION_READ_TARGET_LATENCY,
+    ),
+    WRITE: AdmissionPool(
+        WRITE,
+        max_limit=config.ADMISSION_WRITE_LIMIT,
+        queue_size=config.ADMISSION_WRITE_QUEUE,
+        queue_timeout=config.ADMISSION_WRITE_QUEUE_TIMEOUT,
+        target_latency=config.ADMISSION_WRITE_TARGET_LATENCY,
+    ),
+    MEDIA: AdmissionPool(
+        MEDIA,
+        max_limit=config.ADMISSION_MEDIA_LIMIT,
+        queue_size=config.ADMISSION_MEDIA_QUEUE,
+        queue_timeout=config.ADMISSION_MEDIA_QUEUE_TIMEOUT,
+        target_latency=config.ADMISSION_MEDIA_TARGET_LATENCY,
+    ),
+}
+
+# Trending topics of this worker (restored from and synced with topicos_trending)
+trending_index = TrendingIndex(
+    half_life=config.TRENDING_HALF_LIFE_HOURS * 3600,
+    max_topics=config.TRENDING_MAX_TOPICS,
+)
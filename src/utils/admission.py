@@ -0,0 +1,182 @@
+"""
+Admission control (concurrency pools with bounded queues and adaptive limits)
+
+Notes:
+    Each class of requests (reads, writes, media uploads) has its own pool,
+    so a burst of uploads queues behind the media limit while the reads
+    keep their slots. A request waits in a FIFO queue when its pool is at
+    the limit and is rejected when the queue is full or its wait exceeds
+    the queue timeout, which fails fast instead of timing out later.
+
+    The limit adapts to the latency of the completed requests (AIMD): it
+    grows by 1/limit per request under the target latency (about one slot
+    per window of `limit` requests) and is cut by decrease_factor when a
+    request goes over it, at most once per target latency so a window of
+    slow requests counts once. It grows only while the pool is saturated,
+    an idle pool has no evidence that more concurrency is fine.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from utils.metrics import ADMISSION_LIMIT, ADMISSION_IN_FLIGHT, ADMISSION_REJECTED, ADMISSION_QUEUE_SECONDS
+
+
+# Request classes
+READ = "read"
+WRITE = "write"
+MEDIA = "media"
+
+# Rejection reasons (metric label)
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+
+class AdmissionRejected(Exception):
+    """
+    Request rejected by an admission pool
+    """
+
+    def __init__(self, pool: str, reason: str):
+        self.pool = pool
+        self.reason = reason
+        super().__init__(f"{pool}: {reason}")
+
+
+class AdmissionPool:
+    """
+    Concurrency pool of a request class
+
+    Args:
+        name: Name of the pool (metric label)
+        max_limit: Initial and highest concurrency limit
+        queue_size: Requests allowed to wait for a slot
+        queue_timeout: Seconds a request may wait for a slot
+        target_latency: Latency (seconds) above which the limit decreases
+        min_limit: Lowest concurrency limit
+        decrease_factor: Multiplier of the limit on a slow request
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        target_latency: float,
+        min_limit: int = 1,
+        decrease_factor: float = 0.75,
+    ):
+        self.name = name
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self._configured = (self.max_limit, queue_size)
+        ADMISSION_LIMIT.set(name, value=self.max_limit)
+
+    def share_workers(self, workers: int) -> None:
+        """
+        Limit to the share of one of `workers` processes (set before forking)
+
+        Notes:
+            The configured limit and queue are the ones of the deployment,
+            each worker gets at least one slot
+        """
+        max_limit, queue_size = self._configured
+        workers = max(1, workers)
+
+        self.max_limit = max(1, max_limit // workers)
+        self.min_limit = min(self.min_limit, self.max_limit)
+        self.queue_size = queue_size // workers
+        self.limit = float(self.max_limit)
+        ADMISSION_LIMIT.set(self.name, value=self.max_limit)
+
+    @property
+    def queued(self) -> int:
+        """
+        Requests waiting for a slot
+        """
+        return len(self._waiters)
+
+    def _take_slot(self) -> None:
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.name, value=self.in_flight)
+
+    def _free_slot(self) -> None:
+        """
+        Free a slot and hand the free slots to the oldest waiters
+        """
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.name, value=self.in_flight)
+
+    def _adapt(self, latency: float, now: float) -> None:
+        """
+        Additive increase under the target latency, multiplicative decrease over it
+        """
+        if latency > self.target_latency:
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+        elif self.in_flight >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.set(self.name, value=int(self.limit))
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue when the pool is at its limit
+
+        Raises:
+            AdmissionRejected: The queue is full or the wait timed out
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._take_slot()
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            ADMISSION_REJECTED.inc(self.name, QUEUE_FULL)
+            raise AdmissionRejected(self.name, QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended
+                self._free_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                ADMISSION_REJECTED.inc(self.name, QUEUE_TIMEOUT)
+                raise AdmissionRejected(self.name, QUEUE_TIMEOUT) from None
+            raise
+        finally:
+            ADMISSION_QUEUE_SECONDS.observe(time.perf_counter() - start, self.name)
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """
+        Free the slot of a request
+
+        Args:
+            latency: Seconds the request took, None to not adapt the limit
+                (failed or cancelled requests)
+        """
+        if latency is not None:
+            self._adapt(latency, time.monotonic())
+        self._free_slot()
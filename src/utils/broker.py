@@ -0,0 +1,166 @@
+"""
+In-process publish/subscribe broker for Server-Sent Events
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from loguru import logger
+
+
+HEARTBEAT_FRAME = ": heartbeat\n\n"
+
+
+def format_sse(data: str, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    """
+    Format a Server-Sent Events frame
+
+    Notes:
+        Multi-line data is split into several data fields (one per line)
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+
+    return "\n".join(lines) + "\n\n"
+
+
+@dataclass(frozen=True)
+class ServerSentEvent:
+    """
+    Event published to a channel
+
+    Notes:
+        The frame is rendered once and shared by every subscriber
+    """
+    id: int
+    event: str
+    data: str
+    frame: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "frame", format_sse(self.data, self.event, self.id))
+
+
+class Subscription:
+    """
+    Bounded queue of events of a channel
+
+    Notes:
+        A subscriber that lets its queue fill up is dropped by the broker,
+        get() then returns None and the client is expected to reconnect
+        with Last-Event-ID
+    """
+
+    def __init__(self, broker: "EventBroker", channel: str, queue_size: int):
+        self.broker = broker
+        self.channel = channel
+        self.dropped = False
+        self._queue: "asyncio.Queue[Optional[ServerSentEvent]]" = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> Optional[ServerSentEvent]:
+        """
+        Wait for the next event, None when the subscription was dropped
+        """
+        if self.dropped and self._queue.empty():
+            return None
+
+        return await self._queue.get()
+
+    def offer(self, event: ServerSentEvent) -> bool:
+        """
+        Queue an event without waiting
+
+        Returns:
+            bool: False when the queue is full
+        """
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+
+        return True
+
+    def drop(self) -> None:
+        """
+        Discard pending events and wake the subscriber up
+        """
+        self.dropped = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    def close(self) -> None:
+        """
+        Unsubscribe from the channel
+        """
+        self.broker.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class EventBroker:
+    """
+    Fan-out of events to the subscribers of a channel
+
+    Notes:
+        State is local to the process, events published by other
+        workers are read from the database by the subscribers (see
+        api.controllers.topics.stream)
+    """
+
+    def __init__(self, queue_size: int = 100):
+        """
+        Args:
+            queue_size: Events buffered per subscriber before it is dropped
+        """
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, channel: str) -> Subscription:
+        """
+        Subscribe to a channel
+        """
+        subscription = Subscription(self, channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscription from its channel
+        """
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is None:
+            return
+
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._channels[subscription.channel]
+
+    def subscribers(self, channel: str) -> int:
+        """
+        Number of subscribers of a channel
+        """
+        return len(self._channels.get(channel, ()))
+
+    def publish(self, channel: str, event: ServerSentEvent) -> None:
+        """
+        Deliver an event to every subscriber of a channel, never waiting
+
+        Notes:
+            Slow consumers (full queue) are dropped instead of blocking
+            the publisher or buffering without bound
+        """
+        for subscription in list(self._channels.get(channel, ())):
+            if not subscription.offer(event):
+                logger.warning("Assinante lento removido do canal", channel=channel)
+                self.unsubscribe(subscription)
+                subscription.drop()
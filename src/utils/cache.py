@@ -0,0 +1,279 @@
+"""
+In-process response cache with TTL, memory budget and request coalescing
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from loguru import logger
+
+
+@dataclass
+class CachedResponse:
+    """
+    Pre-rendered response stored in the cache
+
+    Notes:
+        variants holds the body compressed per content coding, so hot
+        entries are compressed only once
+    """
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime] = None
+    media_type: str = "application/json"
+    expires_at: float = 0.0
+    stale_until: float = 0.0
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        """
+        Approximate memory used by the entry
+        """
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+
+Loader = Callable[[], Awaitable[CachedResponse]]
+
+
+@dataclass
+class _Slot:
+    """
+    Internal cache slot (entry plus the path it belongs to)
+    """
+    path: str
+    entry: CachedResponse
+    size: int = field(default=0)
+
+
+class ResponseCache:
+    """
+    Response cache keyed on path + normalized query
+
+    Features:
+        - TTL with stale-while-revalidate window
+        - LRU eviction under a memory budget (bytes)
+        - Singleflight: concurrent misses of a key share one loader call
+        - Invalidation by path (generation based, so loads that started
+          before an invalidation are never stored), the time of the last
+          one is kept so refills right after a write can read the primary
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_bytes: int):
+        """
+        Args:
+            ttl: Seconds an entry is served as fresh
+            stale_ttl: Extra seconds an expired entry is served while it is revalidated
+            max_bytes: Memory budget of all stored bodies
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+
+        self._slots: "OrderedDict[str, _Slot]" = OrderedDict()
+        self._paths: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._size = 0
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Cache is disabled when it has no TTL or no memory
+        """
+        return self.ttl > 0 and self.max_bytes > 0
+
+    @property
+    def size(self) -> int:
+        """
+        Memory used by the stored entries
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def build_key(path: str, **params: Any) -> str:
+        """
+        Build a cache key from the path and the validated query params
+
+        Notes:
+            Params are sorted and None values dropped, so equivalent
+            requests always share the same key
+        """
+        query = "&".join(
+            f"{name}={value}" for name, value in sorted(params.items())
+            if value is not None
+        )
+        return f"{path}?{query}"
+
+    async def get_or_load(self, key: str, path: str, loader: Loader) -> CachedResponse:
+        """
+        Get an entry, loading it once per key when missing
+
+        Args:
+            key: Cache key (see build_key)
+            path: Path of the resource, used for invalidation
+            loader: Coroutine function that renders the response
+
+        Returns:
+            CachedResponse
+        """
+        if not self.enabled:
+            return await loader()
+
+        now = time.monotonic()
+        slot = self._slots.get(key)
+
+        if slot is not None:
+            entry = slot.entry
+
+            if now < entry.expires_at:
+                self._slots.move_to_end(key)
+                return entry
+
+            if now < entry.stale_until:
+                # Serve stale content and refresh in background
+                self._slots.move_to_end(key)
+                if key not in self._inflight:
+                    self._start_load(key, path, loader)
+                return entry
+
+            self._remove(key)
+
+        future = self._inflight.get(key) or self._start_load(key, path, loader)
+        return await asyncio.shield(future)
+
+    def add_variant(self, key: str, entry: CachedResponse, encoding: str, body: bytes) -> None:
+        """
+        Attach a compressed body to an entry, accounting it in the memory budget
+
+        Notes:
+            The entry may have been replaced or evicted meanwhile, then the
+            variant only lives as long as the caller keeps the entry
+        """
+        entry.variants[encoding] = body
+
+        slot = self._slots.get(key)
+        if slot is None or slot.entry is not entry:
+            return
+
+        slot.size += len(body)
+        self._size += len(body)
+        self._evict()
+
+    def invalidate(self, path: str) -> None:
+        """
+        Drop every entry of a path, whatever its query
+        """
+        self._drop(path)
+        self._invalidated_at[path] = time.monotonic()
+
+    def invalidated_within(self, path: str, seconds: float) -> bool:
+        """
+        Check if a path was invalidated in the last `seconds`
+        """
+        invalidated_at = self._invalidated_at.get(path)
+        return invalidated_at is not None and time.monotonic() - invalidated_at < seconds
+
+    def clear(self) -> None:
+        """
+        Drop every entry (and forget the invalidation times)
+        """
+        for path in set(self._paths) | set(self._generations):
+            self._drop(path)
+        self._invalidated_at.clear()
+
+    def _drop(self, path: str) -> None:
+        self._generations[path] = self._generations.get(path, 0) + 1
+        for key in list(self._paths.get(path, ())):
+            self._remove(key)
+
+    def _start_load(self, key: str, path: str, loader: Loader) -> asyncio.Future:
+        """
+        Start the loader of a key in its own task (singleflight)
+        """
+        generation = self._generations.get(path, 0)
+        task = asyncio.ensure_future(self._load(key, path, loader, generation))
+        self._inflight[key] = task
+
+        # Keep a reference, background refreshes are not awaited by anyone
+        self._background.add(task)
+        task.add_done_callback(self._on_load_done)
+        return task
+
+    def _on_load_done(self, task: asyncio.Task) -> None:
+        """
+        Release a finished loader task
+        """
+        self._background.discard(task)
+
+        # Errors were logged by the loader, mark them as retrieved
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: str, path: str, loader: Loader, generation: int) -> CachedResponse:
+        """
+        Run the loader and store its result
+        """
+        try:
+            entry = await loader()
+        except Exception:
+            logger.exception("Erro ao carregar resposta do cache", key=key)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        now = time.monotonic()
+        entry.expires_at = now + self.ttl
+        entry.stale_until = entry.expires_at + self.stale_ttl
+
+        # Invalidated while loading, the result may already be outdated
+        if self._generations.get(path, 0) == generation:
+            self._store(key, path, entry)
+
+        return entry
+
+    def _store(self, key: str, path: str, entry: CachedResponse) -> None:
+        """
+        Store an entry, evicting least recently used ones over budget
+        """
+        size = entry.size
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._slots[key] = _Slot(path=path, entry=entry, size=size)
+        self._paths.setdefault(path, set()).add(key)
+        self._size += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Evict least recently used entries while over budget
+        """
+        while self._size > self.max_bytes and self._slots:
+            oldest = next(iter(self._slots))
+            self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        """
+        Remove an entry by key
+        """
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+
+        self._size -= slot.size
+        keys = self._paths.get(slot.path)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._paths[slot.path]
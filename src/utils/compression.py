@@ -0,0 +1,134 @@
+"""
+HTTP response compression (Accept-Encoding negotiation, gzip and brotli)
+"""
+
+import gzip
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+GZIP = "gzip"
+BROTLI = "br"
+
+# Media types that are worth compressing (prefixes and exact matches)
+COMPRESSIBLE_PREFIXES = ("text/",)
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+}
+
+# Never compressed: already compressed media or responses that must be flushed
+SKIPPED_TYPES = {"text/event-stream"}
+
+
+def _parse_accept_encoding(accept_encoding: str) -> dict:
+    """
+    Parse an Accept-Encoding header into {coding: qvalue}
+    """
+    codings = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        codings[name] = quality
+
+    return codings
+
+
+class ResponseCompressor:
+    """
+    Negotiates and compresses response bodies
+
+    Notes:
+        Brotli is only offered when the brotli package is installed,
+        otherwise gzip is the only supported coding
+    """
+
+    def __init__(self, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Args:
+            minimum_size: Bodies smaller than this are sent uncompressed
+            gzip_level: Gzip compression level (1-9)
+            brotli_quality: Brotli quality (0-11)
+        """
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """
+        Supported codings, in order of preference
+        """
+        if brotli is not None:
+            return (BROTLI, GZIP)
+        return (GZIP,)
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """
+        Choose a coding from an Accept-Encoding header
+
+        Returns:
+            Optional[str]: Coding with the highest qvalue (ties resolved by
+            server preference), None when the body must be sent as is
+        """
+        if not accept_encoding:
+            return None
+
+        codings = _parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+
+        best, best_quality = None, 0.0
+        for encoding in self.encodings:
+            quality = codings.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+
+        return best
+
+    def should_compress(self, media_type: Optional[str], size: int) -> bool:
+        """
+        Check if a body of the given media type and size should be compressed
+        """
+        if size < self.minimum_size or not media_type:
+            return False
+
+        media_type = media_type.split(";", 1)[0].strip().lower()
+        if media_type in SKIPPED_TYPES:
+            return False
+
+        return media_type in COMPRESSIBLE_TYPES or media_type.startswith(COMPRESSIBLE_PREFIXES)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Compress a body with the given coding
+
+        Raises:
+            ValueError: Coding not supported
+        """
+        if encoding == GZIP:
+            # Fixed mtime keeps the output stable for the same body
+            return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+        if encoding == BROTLI and brotli is not None:
+            return brotli.compress(body, quality=self.brotli_quality)
+
+        raise ValueError(f"Codificacao nao suportada: {encoding}")
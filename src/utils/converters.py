@@ -3,15 +3,24 @@ Converters app
 """
 
 import io
-from PIL import Image
 
+from .metrics import IMAGE_PROCESSING_SECONDS
+from .timing import IMAGE, timed
+from .tracing import traced
 
+
+@traced("image.convert_webp")
 def convert_bytes_image_to_webp(bytes_image: bytes) -> bytes:
     """
     Convert bytes image to webp
     """
-    ig_bf = io.BytesIO(bytes_image)
-    img = Image.open(ig_bf)
-    img_io = io.BytesIO()
-    img.save(img_io, format="webp")
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+    with IMAGE_PROCESSING_SECONDS.time("decode"), timed(IMAGE):
+        ig_bf = io.BytesIO(bytes_image)
+        img = Image.open(ig_bf)
+        img.load()
+
+    with IMAGE_PROCESSING_SECONDS.time("encode"), timed(IMAGE):
+        img_io = io.BytesIO()
+        img.save(img_io, format="webp")
     return img_io.getvalue()
\ No newline at end of file
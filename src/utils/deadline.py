@@ -0,0 +1,91 @@
+"""
+Request deadlines (time budget of the current request)
+
+Notes:
+    The deadline is an absolute time of the monotonic clock kept in a
+    contextvar, so the database and storage calls of the request read it
+    without passing it around: SQL statements get a server-side limit (or
+    an interrupt) and HTTP calls a timeout of the remaining budget. Work
+    outside a request (startup, scripts) has no deadline.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when the time budget of the request ran out
+    """
+
+    def __init__(self, operation: str = ""):
+        self.operation = operation
+        super().__init__(f"Prazo da requisicao esgotado{f' em {operation}' if operation else ''}")
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Run the block with a deadline `seconds` from now (None for no deadline)
+
+    Notes:
+        A nested scope never extends the deadline of the outer one
+    """
+    deadline = None if seconds is None else time.monotonic() + seconds
+    outer = _deadline.get()
+    if deadline is not None and outer is not None:
+        deadline = min(deadline, outer)
+
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """
+    Run the block without the request deadline (compensations, cleanup)
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left of the current deadline (None without one, may be negative)
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    """
+    Check if the current deadline has passed
+    """
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout_for(default: Optional[float], operation: str = "") -> Optional[float]:
+    """
+    Timeout of a call: its own default capped by the remaining budget
+
+    Raises:
+        DeadlineExceeded: The budget already ran out, the call is not made
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(operation)
+    return left if default is None else min(default, left)
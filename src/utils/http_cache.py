@@ -0,0 +1,117 @@
+"""
+HTTP cache validators (ETag, Last-Modified and conditional requests)
+"""
+
+from hashlib import blake2b
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def build_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the given parts
+
+    Args:
+        parts: Values that identify the representation (route, params, version)
+
+    Returns:
+        str: Weak ETag, e.g. W/"3f2a..."
+    """
+    digest = blake2b(
+        "|".join("" if part is None else str(part) for part in parts).encode(),
+        digest_size=16,
+    )
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current ETag of the representation
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def http_date(value: datetime) -> str:
+    """
+    Format a datetime as an HTTP date (RFC 9110)
+
+    Notes:
+        Naive datetimes are stored by the database in server local time
+    """
+    if value.tzinfo is None:
+        value = value.astimezone()
+
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Check an If-Modified-Since header against the last modification date
+    """
+    if not if_modified_since or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.astimezone()
+
+    # HTTP dates have second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = "no-cache",
+) -> dict:
+    """
+    Build the validator headers of a cacheable response
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate the conditional headers of a request
+
+    Notes:
+        If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    return not_modified_since(request.headers.get("if-modified-since"), last_modified)
+
+
+def not_modified_response(headers: dict) -> Response:
+    """
+    Build an empty 304 Not Modified response
+    """
+    return Response(status_code=304, headers=headers)
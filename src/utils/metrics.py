@@ -0,0 +1,556 @@
+"""
+In-process metrics (counters, gauges and histograms) in Prometheus text format
+
+Notes:
+    Metrics are plain dicts without locks, recording a value costs a dict
+    lookup (and a bisect for histograms), so they can be used on the hot
+    path of every request. Updates from worker threads (run_in_threadpool)
+    may rarely lose an increment, which is acceptable for telemetry.
+
+    Under the pre-forked server (src/server.py) every worker has its own
+    registry. The registries are then shared through a directory: each
+    worker writes a snapshot of its series there (every
+    METRICS_FLUSH_SECONDS, at shutdown and when it serves a scrape), a
+    scrape renders the sum of every snapshot, and the master folds the
+    counters and histograms of the workers that exit into an archive, so
+    the totals never go back when a worker is recycled. Gauges are the sum
+    over the live workers.
+"""
+
+import asyncio
+import fcntl
+import glob
+import json
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Files of the shared directory (worker snapshots, series of exited workers)
+WORKER_FILE = "worker-{pid}.json"
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = "metrics.lock"
+
+# Latency buckets (seconds), from 1ms up to 10s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value
+    """
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """
+    Escape a label value
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    """
+    Format a label set, empty string when there are no labels
+    """
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class Metric(ABC):
+    """
+    Base metric
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """
+        Sample lines of the metric
+        """
+
+    def render(self) -> str:
+        """
+        Render the metric with its HELP and TYPE lines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Reset every series of the metric
+        """
+
+    @abstractmethod
+    def empty(self) -> "Metric":
+        """
+        New metric with the same definition and no series
+        """
+
+    @abstractmethod
+    def dump(self) -> List[list]:
+        """
+        Series as JSON values (see merge)
+        """
+
+    @abstractmethod
+    def merge(self, series: List[list]) -> None:
+        """
+        Add series dumped by another process
+        """
+
+
+class Counter(Metric):
+    """
+    Monotonic counter
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increment the series of the given label values
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """
+        Current value of a series
+        """
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def empty(self) -> "Counter":
+        return type(self)(self.name, self.documentation, self.labelnames)
+
+    def dump(self) -> List[list]:
+        return [[list(labels), value] for labels, value in self._values.items()]
+
+    def merge(self, series: List[list]) -> None:
+        for labels, value in series:
+            self.inc(*labels, amount=value)
+
+
+class Gauge(Counter):
+    """
+    Value that goes up and down
+    """
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """
+        Decrement the series of the given label values
+        """
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        """
+        Set the series of the given label values
+        """
+        self._values[labels] = value
+
+
+class _Timer:
+    """
+    Context manager that observes the elapsed time in a histogram
+    """
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [count per bucket..., count over the last bucket], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record a value in the series of the given label values
+        """
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def time(self, *labels: str) -> _Timer:
+        """
+        Time a block of code
+
+        Example:
+            with histogram.time("upload"):
+                ...
+        """
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        """
+        Number of observations of a series
+        """
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}"
+                )
+
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+
+        return lines
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def empty(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, self.labelnames, self.buckets)
+
+    def dump(self) -> List[list]:
+        return [[list(labels), counts, total[0]] for labels, (counts, total) in self._series.items()]
+
+    def merge(self, series: List[list]) -> None:
+        for labels, counts, total in series:
+            if len(counts) != len(self.buckets) + 1:
+                continue
+            current = self._series.get(tuple(labels))
+            if current is None:
+                current = self._series[tuple(labels)] = ([0] * (len(self.buckets) + 1), [0.0])
+            for index, count in enumerate(counts):
+                current[0][index] += count
+            current[1][0] += total
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together
+
+    Notes:
+        Registering an existing name returns the registered metric, so
+        modules imported more than once share the same series
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self.shared_dir: Optional[str] = None
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if existing.kind != metric.kind:
+                raise ValueError(f"Metrica {metric.name} ja registrada como {existing.kind}")
+            return existing
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """
+        Register a counter
+        """
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        """
+        Register a gauge
+        """
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Register a histogram
+        """
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        """
+        Get a registered metric by name
+        """
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Render every metric in Prometheus text format
+
+        Notes:
+            With a shared directory, the sum of the series of every worker
+            (this one first writes its own snapshot)
+        """
+        metrics = self._metrics.values() if self.shared_dir is None else self._aggregate()
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def share(self, directory: Optional[str]) -> None:
+        """
+        Share the series through a directory (set by the master before forking)
+        """
+        self.shared_dir = directory
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        """
+        Series of every metric as JSON values
+        """
+        return {name: metric.dump() for name, metric in self._metrics.items()}
+
+    def flush(self) -> None:
+        """
+        Write the snapshot of this process to the shared directory
+        """
+        if self.shared_dir is None:
+            return
+        path = os.path.join(self.shared_dir, WORKER_FILE.format(pid=os.getpid()))
+        _write_json(path, self.snapshot())
+
+    def retire(self, pid: int) -> None:
+        """
+        Fold the counters and histograms of an exited worker into the archive
+
+        Notes:
+            Called by the master when it reaps the worker. Gauges of the
+            worker are dropped, the increments made after its last flush
+            are lost only when it was killed without a graceful shutdown.
+        """
+        if self.shared_dir is None:
+            return
+        path = os.path.join(self.shared_dir, WORKER_FILE.format(pid=pid))
+        archive_path = os.path.join(self.shared_dir, ARCHIVE_FILE)
+
+        with self._locked(fcntl.LOCK_EX):
+            worker = _read_json(path)
+            if worker is None:
+                return
+            archive = {name: metric.empty() for name, metric in self._metrics.items() if metric.kind != "gauge"}
+            for snapshot in (_read_json(archive_path), worker):
+                _merge_snapshot(archive, snapshot)
+            _write_json(archive_path, {name: metric.dump() for name, metric in archive.items()})
+            os.remove(path)
+
+    def _aggregate(self) -> List[Metric]:
+        """
+        Metrics with the sum of the snapshots of the shared directory
+        """
+        self.flush()
+        merged = {name: metric.empty() for name, metric in self._metrics.items()}
+
+        with self._locked(fcntl.LOCK_SH):
+            for path in glob.glob(os.path.join(self.shared_dir, "*.json")):
+                _merge_snapshot(merged, _read_json(path))
+
+        return list(merged.values())
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        """
+        Lock of the shared directory (a worker retired while a scrape reads
+        the snapshots would be counted twice, or not at all)
+        """
+        with open(os.path.join(self.shared_dir, LOCK_FILE), "a", encoding="ascii") as file:
+            fcntl.flock(file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def clear(self) -> None:
+        """
+        Reset the series of every metric
+        """
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+def _write_json(path: str, data: Any) -> None:
+    """
+    Replace a file atomically (readers never see a partial snapshot)
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(data, file, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def _read_json(path: str) -> Optional[Any]:
+    """
+    Read a snapshot, None when it does not exist (or is not valid)
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_snapshot(metrics: Dict[str, Metric], snapshot: Optional[Dict[str, List[list]]]) -> None:
+    """
+    Add a snapshot to the metrics it has series of
+    """
+    for name, series in (snapshot or {}).items():
+        metric = metrics.get(name)
+        if metric is not None:
+            metric.merge(series)
+
+
+async def run_metrics_flush(metrics_registry: MetricsRegistry, interval: float) -> None:
+    """
+    Write the snapshot of this worker periodically (until cancelled)
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            metrics_registry.flush()
+        except OSError as err:
+            logger.warning(f"Erro ao salvar as metricas do worker: {err}")
+
+
+registry = MetricsRegistry()
+
+
+# HTTP
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Requisicoes HTTP por rota e status", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Latencia das requisicoes HTTP por rota", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requisicoes HTTP em andamento"
+)
+HTTP_DEADLINE_EXCEEDED = registry.counter(
+    "http_deadline_exceeded_total", "Requisicoes encerradas com 504 por prazo esgotado", ("method", "route")
+)
+
+# Database pool
+DB_POOL_CHECKOUTS = registry.counter(
+    "db_pool_checkouts_total", "Conexoes retiradas do pool do banco"
+)
+DB_POOL_IN_USE = registry.gauge(
+    "db_pool_connections_in_use", "Conexoes do pool do banco em uso"
+)
+DB_POOL_WAIT_SECONDS = registry.histogram(
+    "db_pool_wait_seconds", "Tempo de espera por uma conexao do pool do banco"
+)
+DB_SESSIONS = registry.counter(
+    "db_sessions_total", "Sessoes do banco abertas por destino (primary/replica)", ("target",)
+)
+
+# Blob storage
+BLOB_OPERATION_SECONDS = registry.histogram(
+    "blob_storage_operation_seconds", "Latencia das operacoes de blob storage", ("operation",)
+)
+
+# Image processing
+IMAGE_PROCESSING_SECONDS = registry.histogram(
+    "image_processing_seconds", "Duracao da decodificacao/codificacao de imagens", ("operation",)
+)
+
+# Rate limiting
+RATE_LIMITED_REQUESTS = registry.counter(
+    "http_rate_limited_total", "Requisicoes rejeitadas pelo rate limit por grupo e escopo", ("group", "scope")
+)
+
+# Admission control
+ADMISSION_LIMIT = registry.gauge(
+    "admission_concurrency_limit", "Limite de concorrencia atual por pool de admissao", ("pool",)
+)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight", "Requisicoes em andamento por pool de admissao", ("pool",)
+)
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Requisicoes rejeitadas com 503 por pool e motivo", ("pool", "reason")
+)
+ADMISSION_QUEUE_SECONDS = registry.histogram(
+    "admission_queue_wait_seconds", "Espera na fila de admissao por pool", ("pool",)
+)
+
+# Authentication
+AUTH_TOKEN_CACHE = registry.counter(
+    "auth_token_cache_total", "Verificacoes de JWT servidas pelo cache (hit) ou verificadas (miss)", ("result",)
+)
+
+# Password hashing
+PASSWORD_HASH_SECONDS = registry.histogram(
+    "password_hash_seconds", "Duracao dos hashes de senha (scrypt) por operacao", ("operation",)
+)
+PASSWORD_HASH_QUEUE_SECONDS = registry.histogram(
+    "password_hash_queue_wait_seconds", "Espera por uma thread do pool de hash de senhas"
+)
+PASSWORD_HASH_REJECTED = registry.counter(
+    "password_hash_rejected_total", "Hashes de senha rejeitados com 503 por motivo", ("reason",)
+)
+PASSWORD_REHASHED = registry.counter(
+    "password_rehashed_total", "Hashes de senha substituidos no login (legado ou custo menor)"
+)
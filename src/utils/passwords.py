@@ -0,0 +1,298 @@
+"""
+Password hashing (scrypt off the event loop, calibrated at startup)
+
+Notes:
+    A KDF costs tens of milliseconds of CPU per hash, done on the event
+    loop it would stall every other request of the worker during a login.
+    Hashes run in a dedicated thread pool (hashlib.scrypt releases the
+    GIL), its size caps how many run at once and a bounded queue in front
+    of it caps how long a login waits: past it the login fails fast
+    (PasswordHasherBusy, 503) instead of every login getting slower.
+
+    Stored format: scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>, the cost is
+    kept with each hash so it can be raised without breaking the old
+    ones. Hashes of the previous scheme (unsalted SHA-256, 64 hex chars)
+    are still verified and needs_rehash() tells the login to replace them.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from utils.deadline import timeout_for
+from utils.metrics import PASSWORD_HASH_SECONDS, PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_REJECTED
+
+
+SCRYPT = "scrypt"
+SALT_SIZE = 16
+KEY_SIZE = 32
+
+# Lowest cost calibration may pick (16 MiB with r=8)
+MIN_COST = 2**14
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the hashing queue is full or the wait ran out
+    """
+
+    def __init__(self):
+        super().__init__("Fila de hash de senhas cheia")
+
+
+def legacy_hash(password: str) -> str:
+    """
+    Hash of the previous scheme (unsalted SHA-256), only to verify old hashes
+    """
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def is_legacy_hash(password_hash: Optional[str]) -> bool:
+    """
+    Check if a stored hash has the legacy (pre-scrypt) format
+    """
+    return password_hash is not None and len(password_hash) == 64 and not password_hash.startswith(f"{SCRYPT}$")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+def _maxmem(n: int, r: int, p: int) -> int:
+    # scrypt uses 128 * r * (n + p) bytes, plus some slack for OpenSSL
+    return 128 * r * (n + p + 2) + 2**20
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=_maxmem(n, r, p), dklen=KEY_SIZE)
+
+
+def _parse(password_hash: str) -> Optional[Tuple[int, int, int, bytes, bytes]]:
+    try:
+        scheme, n, r, p, salt, key = password_hash.split("$")
+        if scheme != SCRYPT:
+            return None
+        return int(n), int(r), int(p), _b64decode(salt), _b64decode(key)
+    except ValueError:
+        return None
+
+
+class PasswordHasher:
+    """
+    scrypt password hashing in a bounded thread pool
+
+    Args:
+        n: CPU/memory cost (power of 2), replaced by calibrate()
+        r: Block size
+        p: Parallelism
+        workers: Threads hashing at once (concurrency cap)
+        queue_size: Hashes waiting for a thread, more fail with PasswordHasherBusy
+        queue_timeout: Seconds a hash waits for a thread (also capped by the request deadline)
+
+    Notes:
+        The pool is created on first use by each process, so the master of
+        the pre-forked server can calibrate and the workers inherit the
+        cost without inheriting threads.
+    """
+
+    def __init__(
+        self,
+        n: int = MIN_COST,
+        r: int = 8,
+        p: int = 1,
+        workers: int = 2,
+        queue_size: int = 64,
+        queue_timeout: float = 5.0,
+    ):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.calibrated = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = 0
+        self._dummy_hash: Optional[str] = None
+
+    def hash_sync(self, password: str) -> str:
+        """
+        Hash a password in the calling thread (scripts, calibration)
+        """
+        salt = os.urandom(SALT_SIZE)
+        key = _scrypt(password, salt, self.n, self.r, self.p)
+        return f"{SCRYPT}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify_sync(self, password: str, password_hash: Optional[str]) -> bool:
+        """
+        Check a password against a stored hash in the calling thread
+        """
+        if not password_hash:
+            return False
+        if is_legacy_hash(password_hash):
+            return hmac.compare_digest(password_hash, legacy_hash(password))
+
+        parsed = _parse(password_hash)
+        if parsed is None:
+            return False
+        n, r, p, salt, key = parsed
+        return hmac.compare_digest(key, _scrypt(password, salt, n, r, p))
+
+    def needs_rehash(self, password_hash: Optional[str]) -> bool:
+        """
+        Check if a hash is of the legacy scheme or cheaper than the current cost
+        """
+        parsed = _parse(password_hash) if password_hash else None
+        if parsed is None:
+            return True
+        n, r, p, _, _ = parsed
+        return n * r * p < self.n * self.r * self.p
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            self._pid = os.getpid()
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._loop = loop
+            self._pending = 0
+        return self._slots
+
+    async def _run(self, operation: str, func, *args):
+        """
+        Run a hash in the pool, waiting for a thread at most queue_timeout
+
+        Notes:
+            Threads are taken through a semaphore instead of the executor's
+            own queue, whose waiting jobs cannot be abandoned: a login that
+            gave up would still be hashed later, delaying the next ones.
+        """
+        slots = self._get_slots()
+        if self._pending >= self.workers + self.queue_size:
+            PASSWORD_HASH_REJECTED.inc("queue_full")
+            raise PasswordHasherBusy()
+
+        self._pending += 1
+        try:
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout_for(self.queue_timeout, "password hash"))
+            except asyncio.TimeoutError as err:
+                PASSWORD_HASH_REJECTED.inc("queue_timeout")
+                raise PasswordHasherBusy() from err
+            PASSWORD_HASH_QUEUE_SECONDS.observe(time.perf_counter() - start)
+
+            # Shielded, and the thread is released when the hash finishes: a
+            # cancelled request must not free it early (more would run than the cap)
+            try:
+                future = asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+            except BaseException:
+                slots.release()
+                raise
+            future.add_done_callback(lambda _: slots.release())
+
+            with PASSWORD_HASH_SECONDS.time(operation):
+                return await asyncio.shield(future)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password off the event loop
+
+        Raises:
+            PasswordHasherBusy: The hashing queue is full
+        """
+        return await self._run("hash", self.hash_sync, password)
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        """
+        Check a password against a stored hash off the event loop
+
+        Raises:
+            PasswordHasherBusy: The hashing queue is full
+        """
+        if not password_hash:
+            return False
+        if is_legacy_hash(password_hash):
+            return self.verify_sync(password, password_hash)
+        return await self._run("verify", self.verify_sync, password, password_hash)
+
+    async def verify_dummy(self, password: str) -> bool:
+        """
+        Verify against a hash of no user, at the current cost (always False)
+
+        Raises:
+            PasswordHasherBusy: The hashing queue is full
+
+        Notes:
+            Logins of unknown emails take as long as wrong passwords, so
+            the response time does not tell which emails have an account
+        """
+        if self._dummy_hash is None or self.needs_rehash(self._dummy_hash):
+            self._dummy_hash = await self.hash(base64.b64encode(os.urandom(SALT_SIZE)).decode())
+        await self.verify(password, self._dummy_hash)
+        return False
+
+    def calibrate(self, target_seconds: float, max_memory: int, min_cost: int = MIN_COST) -> int:
+        """
+        Pick the highest cost whose hash takes up to target_seconds
+
+        Args:
+            target_seconds: Time of a hash on this machine
+            max_memory: Bytes a hash may use (128 * n * r)
+            min_cost: Cost never gone below, even on slow machines
+
+        Returns:
+            The cost (n) picked
+
+        Notes:
+            Blocking (hashes at growing costs, about twice the target in
+            total), run it before serving or in a thread. The cost doubles
+            with n, so it stops before the doubling that would pass the
+            target.
+        """
+        n = min_cost
+        elapsed = self._measure(n)
+        while elapsed * 2 <= target_seconds and 128 * self.r * n * 2 <= max_memory:
+            n *= 2
+            elapsed = self._measure(n)
+
+        self.n = n
+        self.calibrated = True
+        self._dummy_hash = self.hash_sync(base64.b64encode(os.urandom(SALT_SIZE)).decode())
+        logger.info(f"Custo do hash de senhas calibrado: n={n} r={self.r} p={self.p} ({elapsed * 1000:.0f} ms)")
+        return n
+
+    def _measure(self, n: int) -> float:
+        salt = os.urandom(SALT_SIZE)
+        start = time.perf_counter()
+        _scrypt("calibration", salt, n, self.r, self.p)
+        return time.perf_counter() - start
+
+    def shutdown(self) -> None:
+        """
+        Stop the pool of this process (running hashes finish)
+        """
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._slots = None
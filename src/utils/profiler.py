@@ -0,0 +1,229 @@
+"""
+Statistical (sampling) profiler for single requests
+
+Notes:
+    A daemon thread samples the stack of the event loop thread every
+    interval seconds (sys._current_frames), the request code is never
+    instrumented, so the overhead is bounded by the sampling rate and only
+    paid while a profile is running. Samples are kept as collapsed stacks
+    ("root;...;leaf count"), the input format of flamegraph.pl, speedscope
+    and inferno. Requests share the event loop thread, so a profile also
+    contains the frames of concurrent requests running on the loop.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, List, Optional
+
+
+# Request ids accepted from the clients (also the only characters of the file names)
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def valid_request_id(value: str) -> bool:
+    """
+    Check a request id sent by a client (safe in file names and logs)
+    """
+    return bool(REQUEST_ID_PATTERN.match(value))
+
+
+def _file_part(value: str) -> str:
+    """
+    Part of a file name, without separators nor dots
+    """
+    return _UNSAFE_CHARACTERS.sub("_", value).strip("_")[:64]
+
+
+def _frame_label(frame) -> str:
+    """
+    Label of a stack frame (function and its definition site)
+    """
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame) -> str:
+    """
+    Collapse a stack into a root-first ';' separated line
+    """
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+@dataclass
+class Profile:
+    """
+    Stack samples of one request
+    """
+    request_id: str
+    method: str
+    route: str
+    reason: str
+    started_at: float
+    duration: float = 0.0
+    interval: float = 0.005
+    samples: Counter = field(default_factory=Counter)
+
+    @property
+    def sample_count(self) -> int:
+        """
+        Number of stack samples taken
+        """
+        return sum(self.samples.values())
+
+    def folded(self) -> str:
+        """
+        Samples in collapsed stack format (flamegraph compatible)
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> dict:
+        """
+        Profile metadata (without the samples)
+        """
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "route": self.route,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "duration": round(self.duration, 6),
+            "samples": self.sample_count,
+        }
+
+    def filename(self) -> str:
+        """
+        File name of the profile, with its route and request id
+        """
+        route = _file_part(self.route) or "root"
+        return (
+            f"{int(self.started_at)}_{_file_part(self.method)}_{route}_{_file_part(self.request_id)}.folded"
+        )
+
+    def write(self, directory: str) -> Path:
+        """
+        Write the collapsed stacks to a file of the directory
+
+        Raises:
+            ValueError: The file name would leave the directory
+        """
+        base = Path(directory).resolve()
+        path = (base / self.filename()).resolve()
+        if path.parent != base:
+            raise ValueError(f"Arquivo de perfil fora do diretorio: {path}")
+        base.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded(), encoding="utf-8")
+        return path
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of a thread until stopped
+
+    Args:
+        profile: Profile that receives the samples
+        thread_id: Thread to sample (defaults to the calling thread)
+    """
+
+    def __init__(self, profile: Profile, thread_id: Optional[int] = None):
+        self.profile = profile
+        self.thread_id = thread_id or threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._start = 0.0
+
+    def _run(self) -> None:
+        samples = self.profile.samples
+        while not self._stop.wait(self.profile.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            if frame is not None:
+                samples[collapse_stack(frame)] += 1
+
+    def start(self) -> "SamplingProfiler":
+        """
+        Start sampling
+        """
+        self._start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        """
+        Stop sampling and return the profile
+        """
+        self._stop.set()
+        self._thread.join()
+        self.profile.duration = time.perf_counter() - self._start
+        return self.profile
+
+
+class ProfileStore:
+    """
+    Ring buffer of the last profiles
+
+    Args:
+        max_profiles: Profiles kept (oldest are discarded)
+        max_concurrent: Profiles running at the same time, further requests
+            are not profiled (bounds the sampling overhead)
+    """
+
+    def __init__(self, max_profiles: int = 20, max_concurrent: int = 1):
+        self.max_concurrent = max_concurrent
+        self._profiles: Deque[Profile] = deque(maxlen=max_profiles)
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """
+        Reserve a profiling slot, False when every slot is in use
+        """
+        with self._lock:
+            if self._running >= self.max_concurrent:
+                return False
+            self._running += 1
+            return True
+
+    def release(self) -> None:
+        """
+        Release a profiling slot
+        """
+        with self._lock:
+            self._running -= 1
+
+    def add(self, profile: Profile) -> None:
+        """
+        Keep a finished profile
+        """
+        self._profiles.append(profile)
+
+    def get(self, request_id: str) -> Optional[Profile]:
+        """
+        Get a profile by request id
+        """
+        for profile in reversed(self._profiles):
+            if profile.request_id == request_id:
+                return profile
+        return None
+
+    def list(self) -> List[Profile]:
+        """
+        Profiles from the newest to the oldest
+        """
+        return list(reversed(self._profiles))
+
+    def clear(self) -> None:
+        """
+        Drop every profile
+        """
+        self._profiles.clear()
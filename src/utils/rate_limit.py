@@ -0,0 +1,248 @@
+"""
+Token bucket rate limiting (in-process and shared stores)
+
+Notes:
+    A bucket holds up to `burst` tokens and refills at `rate` tokens per
+    second, every request takes one token. Only two numbers are kept per
+    key (tokens and the time of the last update), the refill is computed
+    lazily on the next take. A bucket left idle for burst / rate seconds is
+    full again, the same as a missing one, so dropping idle buckets loses
+    nothing.
+"""
+
+import asyncio
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from loguru import logger
+
+
+# Store kinds (RATE_LIMIT_BACKEND)
+MEMORY = "memory"
+SHARED = "shared"
+
+
+@dataclass(frozen=True)
+class RateRule:
+    """
+    Limit of a bucket
+
+    Args:
+        rate: Tokens refilled per second
+        burst: Capacity of the bucket (requests allowed at once)
+    """
+
+    rate: float
+    burst: float
+
+    @classmethod
+    def per_minute(cls, requests: float, burst: float) -> "RateRule":
+        """
+        Rule of `requests` per minute
+        """
+        return cls(rate=requests / 60, burst=burst)
+
+    def share(self, workers: int) -> "RateRule":
+        """
+        Share of one of `workers` processes limiting on their own
+
+        Notes:
+            The burst never goes under one request, a share smaller than
+            that would reject every request
+        """
+        if workers <= 1:
+            return self
+        return RateRule(rate=self.rate / workers, burst=max(1.0, self.burst / workers))
+
+    @property
+    def idle_seconds(self) -> float:
+        """
+        Seconds after which an untouched bucket is full again
+        """
+        return self.burst / self.rate
+
+
+def take_token(tokens: float, updated: float, now: float, rule: RateRule, cost: float = 1.0) -> Tuple[float, float]:
+    """
+    Refill a bucket and try to take `cost` tokens
+
+    Args:
+        tokens: Tokens left at the last update
+        updated: Time of the last update
+        now: Current time (same clock as updated)
+        rule: Limit of the bucket
+        cost: Tokens the request takes
+
+    Returns:
+        Tokens left and the seconds to wait (0 when the request is allowed)
+    """
+    tokens = min(rule.burst, tokens + max(0.0, now - updated) * rule.rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rule.rate
+
+
+class RateLimitStore(ABC):
+    """
+    Buckets of the rate limiter
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rule: RateRule, cost: float = 1.0) -> float:
+        """
+        Take tokens from the bucket of key
+
+        Returns:
+            Seconds until the request would be allowed, 0 when it is
+        """
+
+    def share_workers(self, workers: int) -> None:
+        """
+        Limit to the share of one of `workers` processes (set before forking)
+
+        Notes:
+            Nothing to do for stores shared by the workers
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Buckets of this process, split in shards with their own lock
+
+    Args:
+        shards: Number of shards (lock and LRU dict each)
+        max_keys: Buckets kept across the shards, the least recently used
+            are dropped above it
+
+    Notes:
+        Each worker limits on its own with its share of the rules (see
+        share_workers), so the deployment allows about the configured
+        limit (SharedRateLimitStore for an exact one). The locks keep
+        take() safe from threadpool code, shards keep them uncontended
+        and bound the LRU work of a take.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000):
+        self.workers = 1
+        self._shards: List[Tuple[threading.Lock, "OrderedDict[str, List[float]]"]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(max(1, shards))
+        ]
+        self._max_per_shard = max(1, max_keys // len(self._shards))
+
+    def share_workers(self, workers: int) -> None:
+        """
+        Limit to the share of one of `workers` processes (set before forking)
+        """
+        self.workers = max(1, workers)
+
+    def _shard(self, key: str) -> Tuple[threading.Lock, "OrderedDict[str, List[float]]"]:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def take_at(self, key: str, rule: RateRule, now: float, cost: float = 1.0) -> float:
+        """
+        Take tokens at a given time of the monotonic clock
+        """
+        rule = rule.share(self.workers)
+        lock, buckets = self._shard(key)
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [rule.burst, now]
+                if len(buckets) > self._max_per_shard:
+                    buckets.popitem(last=False)
+            else:
+                buckets.move_to_end(key)
+
+            bucket[0], retry_after = take_token(bucket[0], bucket[1], now, rule, cost)
+            bucket[1] = now
+            return retry_after
+
+    async def take(self, key: str, rule: RateRule, cost: float = 1.0) -> float:
+        return self.take_at(key, rule, time.monotonic(), cost)
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
+
+
+class SharedRateLimitStore(RateLimitStore):
+    """
+    Buckets shared by every worker and instance (e.g. Redis)
+
+    Notes:
+        _take must refill and take atomically in the store (a Lua script
+        with HMGET/HSET on Redis, with a PEXPIRE of rule.idle_seconds so
+        idle buckets go away) and use the wall clock, the only clock the
+        instances share. The limiter fails open: when the store is down
+        requests are allowed and a warning is logged.
+    """
+
+    @abstractmethod
+    async def _take(self, key: str, rule: RateRule, cost: float, now: float) -> float:
+        """
+        Atomic refill and take of the bucket in the store
+        """
+
+    async def take(self, key: str, rule: RateRule, cost: float = 1.0) -> float:
+        try:
+            return await self._take(key, rule, cost, time.time())
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.warning(f"Rate limit indisponivel, requisicao liberada: {exc}")
+            return 0.0
+
+
+class LocalSharedStore(SharedRateLimitStore):
+    """
+    In-process stand-in of a shared store (development and tests)
+
+    Notes:
+        Keeps one record per key with an expiry, as the shared store would,
+        and serializes the takes with a lock as the store script does.
+        It is not shared between workers.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self._records: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = asyncio.Lock()
+        self.max_keys = max_keys
+
+    def _purge(self, now: float) -> None:
+        """
+        Drop the expired records (the store does it by TTL)
+        """
+        for key in [key for key, record in self._records.items() if record[2] <= now]:
+            del self._records[key]
+
+    async def _take(self, key: str, rule: RateRule, cost: float, now: float) -> float:
+        async with self._lock:
+            record = self._records.get(key)
+            if record is None or record[2] <= now:
+                record = (rule.burst, now, 0.0)
+
+            tokens, retry_after = take_token(record[0], record[1], now, rule, cost)
+            self._records[key] = (tokens, now, now + rule.idle_seconds)
+
+            if len(self._records) > self.max_keys:
+                self._purge(now)
+            return retry_after
+
+
+def create_rate_limit_store(kind: str, shards: int = 16, max_keys: int = 100_000) -> RateLimitStore:
+    """
+    Create the store of RATE_LIMIT_BACKEND
+
+    Args:
+        kind: "memory" (per process) or "shared" (local stand-in of the
+            shared store, replace it with the deployment's implementation)
+        shards: Shards of the memory store
+        max_keys: Buckets kept by the store
+    """
+    if kind == MEMORY:
+        return MemoryRateLimitStore(shards=shards, max_keys=max_keys)
+    if kind == SHARED:
+        return LocalSharedStore(max_keys=max_keys)
+    raise ValueError(f"Backend de rate limit desconhecido: {kind}")
@@ -2,18 +2,31 @@
 Security handler for the application
 """
 
-import jwt
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+import jwt
+
+from utils.metrics import AUTH_TOKEN_CACHE
+from utils.tokens import RevocationList, VerifiedTokenCache, token_digest
 
 
 class SecurityHandler:
     """
     Handler for security
+
+    Args:
+        secret_key: HMAC key of the tokens
+        cache_size: Verified payloads kept (0 verifies every token)
+        revocations: Revoked tokens and users
     """
 
-    def __init__(self, secret_key: str):
+    def __init__(self, secret_key: str, cache_size: int = 10_000, revocations: Optional[RevocationList] = None):
         self.secret_key = secret_key
         self.algorithm = "HS256"
+        self.cache = VerifiedTokenCache(cache_size)
+        self.revocations = revocations if revocations is not None else RevocationList()
 
     def encode_payload(self, payload: dict, expires_in: int) -> str:
         """
@@ -40,12 +53,58 @@ class SecurityHandler:
     def decode_payload(self, token: str) -> dict:
         """
         Decode JWT token
+
+        Notes:
+            Verified payloads are cached by token digest until their exp,
+            revocations are checked on every call (hits included). The
+            payload is shared with the cache, do not modify it.
+
+        Raises:
+            jwt.InvalidTokenError: Invalid, expired or revoked token
         """
-        return jwt.decode(
-            token,
-            self.secret_key,
-            algorithms=[self.algorithm]
-        )
+        digest = token_digest(token)
+        payload = self.cache.get(digest, time.time())
+
+        if payload is None:
+            AUTH_TOKEN_CACHE.inc("miss")
+            payload = jwt.decode(
+                token,
+                self.secret_key,
+                algorithms=[self.algorithm]
+            )
+            self.cache.put(digest, payload)
+        else:
+            AUTH_TOKEN_CACHE.inc("hit")
+
+        if self.revocations.is_revoked(digest, payload):
+            raise jwt.InvalidTokenError("Token revogado")
+
+        return payload
+
+    def revoke_token(self, token: str) -> Tuple[str, int]:
+        """
+        Revoke a valid token until it expires (logout)
+
+        Returns:
+            Digest of the token (hex) and its exp, to persist the revocation
+
+        Raises:
+            jwt.InvalidTokenError: Invalid or expired token
+        """
+        payload = self.decode_payload(token)
+        digest = token_digest(token)
+        expires_at = int(payload.get("exp", time.time() + 86400))
+        self.revocations.revoke(digest, expires_at)
+        return digest.hex(), expires_at
+
+    def revoke_user(self, subject: str) -> int:
+        """
+        Revoke every token issued to a user before this second (password change)
+
+        Returns:
+            The revocation time (epoch seconds), to persist the revocation
+        """
+        return self.revocations.revoke_user(subject)
 
     def validate_token(self, token: str) -> bool:
         """
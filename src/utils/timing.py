@@ -0,0 +1,151 @@
+"""
+Per-request cost breakdown by phase (Server-Timing header)
+
+Notes:
+    Repositories, the blob storage adapter, image helpers and the auth
+    dependency report their elapsed time into the accumulator of the
+    current request (a ContextVar), outside a request reporting is a no-op.
+    The accumulator is a mutable object shared with run_in_threadpool
+    workers, so image conversions in threads are accounted as well.
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+# Phases
+AUTH = "auth"
+DB = "db"
+BLOB = "blob"
+IMAGE = "image"
+SERIALIZATION = "serialization"
+
+
+class PhaseTimings:
+    """
+    Time spent per phase within one request
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.endpoint_returned: Optional[float] = None
+        self._depth: Dict[str, int] = {}
+
+    def add(self, phase: str, elapsed: float) -> None:
+        """
+        Add elapsed seconds to a phase
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+
+    def header(self) -> str:
+        """
+        Server-Timing header value (durations in milliseconds)
+
+        Example:
+            auth;dur=0.21, db;dur=3.80, serialization;dur=0.40, total;dur=5.12
+        """
+        total = time.perf_counter() - self.start
+        entries = [f"{phase};dur={elapsed * 1000:.2f}" for phase, elapsed in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_current_timings: ContextVar[Optional[PhaseTimings]] = ContextVar("phase_timings", default=None)
+
+
+def current_timings() -> Optional[PhaseTimings]:
+    """
+    Accumulator of the current request
+    """
+    return _current_timings.get()
+
+
+@contextmanager
+def track_timings() -> Iterator[PhaseTimings]:
+    """
+    Accumulate the phases reported inside the block
+    """
+    timings = PhaseTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+class _PhaseTimer:
+    """
+    Context manager that reports the elapsed time of a phase
+
+    Notes:
+        Nested timers of the same phase (e.g. a repository calling another
+        one) only report the outermost, so time is not counted twice
+    """
+
+    __slots__ = ("phase", "timings", "start")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+        self.timings = _current_timings.get()
+        self.start = 0.0
+
+    def __enter__(self) -> "_PhaseTimer":
+        if self.timings is not None:
+            depth = self.timings._depth  # pylint: disable=protected-access
+            depth[self.phase] = depth.get(self.phase, 0) + 1
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        if self.timings is None:
+            return
+
+        depth = self.timings._depth  # pylint: disable=protected-access
+        depth[self.phase] -= 1
+        if not depth[self.phase]:
+            self.timings.add(self.phase, time.perf_counter() - self.start)
+
+
+def timed(phase: str) -> _PhaseTimer:
+    """
+    Report the time spent in a block to the current request
+
+    Example:
+        with timed(IMAGE):
+            ...
+    """
+    return _PhaseTimer(phase)
+
+
+def timed_methods(phase: str):
+    """
+    Class decorator that reports every public coroutine method to a phase
+
+    Notes:
+        Used on the repositories (db phase). Async generators (streams)
+        are left untouched.
+    """
+    def decorator(cls: T) -> T:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.iscoroutinefunction(value):
+                continue
+            setattr(cls, attr, _timed_coroutine(phase, value))
+        return cls
+
+    return decorator
+
+
+def _timed_coroutine(phase: str, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with _PhaseTimer(phase):
+            return await func(*args, **kwargs)
+
+    return wrapper
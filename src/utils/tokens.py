@@ -0,0 +1,232 @@
+"""
+Verified token cache and token revocation
+
+Notes:
+    Tokens are identified by a digest of the encoded token (blake2b), the
+    same digest keys the cache of verified payloads and the revocation
+    list, and its bytes give the Bloom filter positions, so a cached
+    request hashes the token once. A hit costs the digest, a dict lookup,
+    the exp check and the revocation check, whatever the token size or
+    claims, instead of the HMAC verify and JSON parse.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+DIGEST_SIZE = 32
+
+# Kinds of persisted revocations
+REVOKED_TOKEN = "token"
+REVOKED_USER = "usuario"
+
+
+def token_digest(token: str) -> bytes:
+    """
+    Digest identifying an encoded token
+    """
+    return hashlib.blake2b(token.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+class BloomFilter:
+    """
+    Bloom filter over token digests
+
+    Args:
+        capacity: Expected items
+        error_rate: False positive rate at capacity
+
+    Notes:
+        Positions are 4-byte slices of the digest (already uniform), at
+        most DIGEST_SIZE // 4 hash functions. There are no false
+        negatives: a miss proves the digest was never added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = min(DIGEST_SIZE // 4, max(1, round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        for index in range(self.hashes):
+            yield int.from_bytes(digest[index * 4:index * 4 + 4], "little") % self.size
+
+    def add(self, digest: bytes) -> None:
+        """
+        Add a token digest to the filter
+        """
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class RevocationList:
+    """
+    Revoked tokens (until they expire) and users revoked up to a time
+
+    Args:
+        capacity: Expected revoked tokens, sizes the Bloom filter
+
+    Notes:
+        The Bloom filter answers most checks (tokens never revoked) without
+        touching the exact set, which settles its false positives.
+        Expired tokens are dropped by purge(), which rebuilds the filter
+        (a Bloom filter cannot remove items). This is the local front of
+        the revocations table: a revocation is applied here and persisted
+        by the request, the other workers get it from the table on their
+        next sync (database.revocations), so a logout is honored
+        everywhere after at most JWT_REVOCATION_SYNC_SECONDS.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self.last_id = 0
+        self._bloom = BloomFilter(capacity)
+        self._tokens: Dict[bytes, float] = {}
+        self._users: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _revoke(self, digest: bytes, expires_at: float) -> None:
+        self._tokens[digest] = expires_at
+        self._bloom.add(digest)
+
+    def _revoke_user(self, subject: str, revoked_at: int) -> None:
+        self._users[subject] = max(revoked_at, self._users.get(subject, revoked_at))
+
+    def revoke(self, digest: bytes, expires_at: float) -> None:
+        """
+        Revoke a token until its expiration
+        """
+        with self._lock:
+            self._revoke(digest, expires_at)
+            if len(self._tokens) > self.capacity:
+                self._purge(time.time())
+
+    def revoke_user(self, subject: str, at: Optional[float] = None) -> int:
+        """
+        Revoke every token of a user issued before `at` (logout everywhere, password change)
+
+        Returns:
+            The revocation time, in whole seconds
+
+        Notes:
+            iat has second resolution: tokens issued in the second of the
+            revocation are kept, so a login right after a password change
+            is not revoked with the old tokens
+        """
+        revoked_at = int(time.time() if at is None else at)
+        with self._lock:
+            self._revoke_user(subject, revoked_at)
+        return revoked_at
+
+    def load(self, rows: Iterable[Tuple[int, str, str, int, int]], now: Optional[float] = None) -> None:
+        """
+        Apply revocations read from the table
+
+        Args:
+            rows: (id, kind, key, revoked_at, expires_at), the key is the
+                token digest (hex) or the user subject
+            now: Current time (expired revocations are skipped)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            for row_id, kind, key, revoked_at, expires_at in rows:
+                self.last_id = max(self.last_id, row_id)
+                if expires_at <= now:
+                    continue
+                if kind == REVOKED_TOKEN:
+                    self._revoke(bytes.fromhex(key), expires_at)
+                elif kind == REVOKED_USER:
+                    self._revoke_user(key, revoked_at)
+
+            if len(self._tokens) > self.capacity:
+                self._purge(now)
+
+    def is_revoked(self, digest: bytes, payload: Optional[dict] = None) -> bool:
+        """
+        Check a token (by digest) and, given its payload, its user
+        """
+        if digest in self._bloom and digest in self._tokens:
+            return True
+        if payload is not None and self._users:
+            revoked_at = self._users.get(payload.get("sub"))
+            return revoked_at is not None and payload.get("iat", 0) < revoked_at
+        return False
+
+    def _purge(self, now: float) -> None:
+        self._tokens = {digest: exp for digest, exp in self._tokens.items() if exp > now}
+        self._bloom = BloomFilter(max(self.capacity, len(self._tokens)))
+        for digest in self._tokens:
+            self._bloom.add(digest)
+
+    def purge(self, now: Optional[float] = None) -> None:
+        """
+        Drop the expired revocations
+        """
+        with self._lock:
+            self._purge(time.time() if now is None else now)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token payloads by digest
+
+    Args:
+        max_size: Payloads kept, the least recently used are dropped
+
+    Notes:
+        Only tokens whose signature was verified are stored, a payload is
+        served until its exp. Payloads are shared, callers must not
+        modify them.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._payloads: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: bytes, now: float) -> Optional[dict]:
+        """
+        Payload of a verified token, None when missing or expired
+        """
+        with self._lock:
+            payload = self._payloads.get(digest)
+            if payload is None:
+                return None
+            if payload.get("exp", math.inf) <= now:
+                del self._payloads[digest]
+                return None
+            self._payloads.move_to_end(digest)
+            return payload
+
+    def put(self, digest: bytes, payload: dict) -> None:
+        """
+        Store the payload of a verified token, evicting the least recently used
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._payloads[digest] = payload
+            self._payloads.move_to_end(digest)
+            if len(self._payloads) > self.max_size:
+                self._payloads.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drop every cached payload
+        """
+        with self._lock:
+            self._payloads.clear()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
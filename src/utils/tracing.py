@@ -0,0 +1,536 @@
+"""
+Lightweight tracing with an OpenTelemetry compatible span model
+
+Notes:
+    Spans follow the OTLP data model (trace/span ids, parent, kind, status,
+    attributes, unix nano timestamps) and are exported as OTLP/JSON, so
+    files and collectors can be read by any OpenTelemetry tooling.
+    The active span is kept in a ContextVar, so spans nest across awaits
+    and run_in_threadpool calls.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from loguru import logger
+
+
+T = TypeVar("T")
+
+# Span kinds (OTLP enum values)
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# Status codes (OTLP enum values)
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class SpanContext:
+    """
+    Identity of a span, propagated to children and through traceparent
+    """
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+
+@dataclass
+class Span:
+    """
+    Timed operation of a trace
+    """
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_time: int = 0
+    end_time: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_UNSET
+    status_message: str = ""
+
+    @property
+    def is_recording(self) -> bool:
+        """
+        Only sampled spans are recorded and exported
+        """
+        return self.context.sampled
+
+    @property
+    def duration(self) -> float:
+        """
+        Duration in seconds
+        """
+        return (self.end_time - self.start_time) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Set an attribute of the span
+        """
+        if self.context.sampled:
+            self.attributes[key] = value
+
+    def set_status(self, code: int, message: str = "") -> None:
+        """
+        Set the status of the span
+        """
+        if not self.context.sampled:
+            return
+        self.status_code = code
+        self.status_message = message
+
+    def to_otlp(self) -> dict:
+        """
+        Span in OTLP/JSON format
+        """
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    """
+    Attribute in OTLP/JSON format
+    """
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _new_id(bits: int) -> str:
+    """
+    Random non-zero hex id
+    """
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """
+    Parse a W3C traceparent header (version 00)
+    """
+    if not value:
+        return None
+
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+
+    return SpanContext(trace_id=parts[1], span_id=parts[2], sampled=bool(flags & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    """
+    Format a W3C traceparent header
+    """
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class SpanExporter(ABC):
+    """
+    Destination of finished spans
+    """
+
+    @abstractmethod
+    async def export(self, spans: List[Span]) -> None:
+        """
+        Export a batch of spans
+        """
+
+    async def shutdown(self) -> None:
+        """
+        Release the exporter resources
+        """
+
+
+class InMemorySpanExporter(SpanExporter):
+    """
+    Keeps exported spans in memory (local collector for tests)
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    async def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        """
+        Drop the collected spans
+        """
+        self.spans.clear()
+
+
+def _otlp_payload(spans: List[Span], service_name: str) -> dict:
+    """
+    Build an OTLP/JSON ExportTraceServiceRequest
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "fishing-dock-api"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }],
+    }
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends each batch as one OTLP/JSON line to a file
+    """
+
+    def __init__(self, path: str, service_name: str):
+        self.path = Path(path)
+        self.service_name = service_name
+
+    def _write(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    async def export(self, spans: List[Span]) -> None:
+        line = json.dumps(_otlp_payload(spans, self.service_name), separators=(",", ":"))
+        await asyncio.to_thread(self._write, line)
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """
+    Sends batches to an OTLP/HTTP collector (JSON encoding)
+    """
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+        self._client = None
+
+    async def export(self, spans: List[Span]) -> None:
+        # Created on the first export, inside the worker process and its loop
+        # (the exporter itself is built at import, before the server forks)
+        if self._client is None:
+            import httpx  # pylint: disable=import-outside-toplevel
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+
+        response = await self._client.post(self.endpoint, json=_otlp_payload(spans, self.service_name))
+        response.raise_for_status()
+
+    async def shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+EXPORTER_FILE = "file"
+EXPORTER_OTLP = "otlp"
+EXPORTER_MEMORY = "memory"
+
+
+def create_span_exporter(
+    kind: str,
+    service_name: str,
+    file_path: str = "logs/traces.jsonl",
+    otlp_endpoint: Optional[str] = None,
+) -> SpanExporter:
+    """
+    Create the span exporter configured by name (file, otlp or memory)
+    """
+    if kind == EXPORTER_FILE:
+        return FileSpanExporter(file_path, service_name)
+
+    if kind == EXPORTER_OTLP:
+        if not otlp_endpoint:
+            raise ValueError("TRACING_OTLP_ENDPOINT e obrigatorio para o exportador otlp")
+        return OTLPHttpSpanExporter(otlp_endpoint, service_name)
+
+    if kind == EXPORTER_MEMORY:
+        return InMemorySpanExporter()
+
+    raise ValueError(f"Exportador de spans desconhecido: {kind}")
+
+
+class BatchSpanProcessor:
+    """
+    Buffers finished spans and exports them in batches
+
+    Notes:
+        The buffer is bounded, spans are dropped (and counted) when the
+        exporter cannot keep up, so tracing never grows memory unbounded.
+        Spans may end in worker threads, the buffer is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        schedule_delay: float = 5.0,
+    ):
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped = 0
+
+        self._queue: Deque[Span] = deque()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def on_end(self, span: Span) -> None:
+        """
+        Queue a finished span
+        """
+        with self._lock:
+            if len(self._queue) >= self.max_queue_size:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+
+    def _take_batch(self) -> List[Span]:
+        with self._lock:
+            size = min(len(self._queue), self.max_batch_size)
+            return [self._queue.popleft() for _ in range(size)]
+
+    async def force_flush(self) -> None:
+        """
+        Export every queued span
+        """
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+
+            try:
+                await self.exporter.export(batch)
+            except Exception:
+                logger.exception("Erro ao exportar spans", spans=len(batch))
+                return
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.schedule_delay)
+            await self.force_flush()
+
+    def start(self) -> None:
+        """
+        Start the periodic export task (inside a running loop)
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def shutdown(self) -> None:
+        """
+        Stop the periodic export, flushing the queued spans
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        await self.force_flush()
+        await self.exporter.shutdown()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# Placeholder of the spans of unsampled traces
+_NON_RECORDING_SPAN = Span(name="", context=SpanContext(trace_id="0" * 32, span_id="0" * 16, sampled=False))
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to the processor
+
+    Notes:
+        The sampling decision is taken once per trace (root span, or the
+        sampled flag of an incoming traceparent) and inherited by children.
+        Unsampled spans are not recorded, their cost is the ContextVar
+        switch only.
+    """
+
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None, sample_ratio: float = 1.0):
+        self.processor = processor
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Tracing is disabled without a processor or with a zero ratio
+        """
+        return self.processor is not None and self.sample_ratio > 0
+
+    def _should_sample(self) -> bool:
+        return self.sample_ratio >= 1 or random.random() < self.sample_ratio
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+    ) -> Iterator[Span]:
+        """
+        Start a span as child of the current one (or of the given parent)
+
+        Notes:
+            Exceptions mark the span as error and are re-raised
+        """
+        current = _current_span.get()
+        parent_context = parent or (current.context if current is not None else None)
+
+        if parent_context is not None:
+            sampled = parent_context.sampled
+        else:
+            sampled = self.enabled and self._should_sample()
+
+        # Unsampled traces share one non-recording span (no ids, no timestamps)
+        if not sampled:
+            if parent is None and current is _NON_RECORDING_SPAN:
+                yield _NON_RECORDING_SPAN
+                return
+
+            token = _current_span.set(_NON_RECORDING_SPAN)
+            try:
+                yield _NON_RECORDING_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        trace_id = parent_context.trace_id if parent_context is not None else _new_id(128)
+        span = Span(
+            name=name,
+            context=SpanContext(trace_id, _new_id(64), True),
+            parent_span_id=parent_context.span_id if parent_context is not None else None,
+            kind=kind,
+            attributes=dict(attributes) if attributes else {},
+        )
+
+        token = _current_span.set(span)
+        span.start_time = time.time_ns()
+        try:
+            yield span
+        except BaseException as err:
+            span.set_status(STATUS_ERROR, type(err).__name__)
+            raise
+        finally:
+            span.end_time = time.time_ns()
+            _current_span.reset(token)
+
+            if self.processor is not None:
+                self.processor.on_end(span)
+
+    async def force_flush(self) -> None:
+        """
+        Export every finished span
+        """
+        if self.processor is not None:
+            await self.processor.force_flush()
+
+
+_tracer = Tracer(processor=None, sample_ratio=0)
+
+
+def get_tracer() -> Tracer:
+    """
+    Tracer of the process
+    """
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """
+    Replace the tracer of the process (configured in setup, swapped in tests)
+    """
+    global _tracer  # pylint: disable=global-statement
+    _tracer = tracer
+
+
+def current_span() -> Optional[Span]:
+    """
+    Span active in the current context
+    """
+    return _current_span.get()
+
+
+def traced(name: Optional[str] = None, kind: int = SPAN_KIND_INTERNAL) -> Callable[[T], T]:
+    """
+    Decorator that runs a function (sync or async) inside a span
+
+    Args:
+        name: Span name, defaults to the function qualified name
+        kind: Span kind
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _tracer.start_span(span_name, kind):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _tracer.start_span(span_name, kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(cls: T) -> T:
+    """
+    Class decorator that traces every public coroutine method
+
+    Notes:
+        Used on controllers, services and repositories. Async generators
+        (streams) are left untouched, their spans would outlive the call.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+
+    return cls
@@ -0,0 +1,168 @@
+"""
+Trending topics index (time-decayed activity scores, ranked in memory)
+
+Notes:
+    Scores decay exponentially with a half-life. Instead of decaying every
+    score over time, events are weighted forward: an event at time t adds
+    weight * 2 ** ((t - landmark) / half_life), so later events weigh
+    more and the ranking of the stored scores never changes by time alone
+    (every score decays at the same rate). The decayed score at `now` is
+    the stored one times 2 ** (-(now - landmark) / half_life).
+
+    The landmark moves forward every LANDMARK_HALF_LIVES half-lives
+    (stored scores stay below 2 ** LANDMARK_HALF_LIVES times the weights),
+    every score is then rescaled once and the negligible ones dropped.
+    Landmarks are aligned to the epoch, so every worker and the snapshot
+    table agree on them.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Half-lives between two landmarks
+LANDMARK_HALF_LIVES = 32
+
+# Decayed scores below this are dropped on rebase
+MIN_SCORE = 1e-3
+
+
+def landmark_for(at: float, half_life: float) -> int:
+    """
+    Landmark (epoch seconds) of the period of a time
+    """
+    period = half_life * LANDMARK_HALF_LIVES
+    return int(at // period * period)
+
+
+def rescale(score: float, from_landmark: float, to_landmark: float, half_life: float) -> float:
+    """
+    Express a forward-decayed score relative to another landmark
+    """
+    return score * 2 ** ((from_landmark - to_landmark) / half_life)
+
+
+class TrendingIndex:
+    """
+    Topic scores kept ranked, fed by activity events
+
+    Args:
+        half_life: Seconds for the weight of an event to halve
+        max_topics: Topics ranked, the lowest are dropped past it
+
+    Notes:
+        The ranking is a sorted list of (-score, topic_id): an event moves
+        one entry (bisect), the top is a slice. Scores are per process,
+        the events not yet persisted (pending) are added to the snapshot
+        table by database.trending, which also reloads the scores of every
+        worker from it.
+    """
+
+    def __init__(self, half_life: float, max_topics: int = 1000):
+        self.half_life = half_life
+        self.max_topics = max_topics
+        self.landmark = landmark_for(time.time(), half_life)
+        self._scores: Dict[int, float] = {}
+        self._ranking: List[Tuple[float, int]] = []
+        self._pending: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _rebase(self, landmark: int) -> None:
+        """
+        Move to a later landmark, rescaling the scores once
+        """
+        def moved(scores: Dict[int, float]) -> Dict[int, float]:
+            return {
+                topic_id: rescale(score, self.landmark, landmark, self.half_life)
+                for topic_id, score in scores.items()
+            }
+
+        self._pending = moved(self._pending)
+        scores = moved(self._scores)
+        # At the landmark the stored score is the decayed one
+        self._scores = {topic_id: score for topic_id, score in scores.items() if score >= MIN_SCORE}
+        self._ranking = sorted((-score, topic_id) for topic_id, score in self._scores.items())
+        self.landmark = landmark
+        self._trim()
+
+    def _check_landmark(self, at: float) -> None:
+        landmark = landmark_for(at, self.half_life)
+        if landmark > self.landmark:
+            self._rebase(landmark)
+
+    def _set(self, topic_id: int, score: float) -> None:
+        old = self._scores.get(topic_id)
+        if old is not None:
+            index = bisect_left(self._ranking, (-old, topic_id))
+            del self._ranking[index]
+        self._scores[topic_id] = score
+        insort(self._ranking, (-score, topic_id))
+
+    def _trim(self) -> None:
+        while len(self._ranking) > self.max_topics:
+            _, topic_id = self._ranking.pop()
+            del self._scores[topic_id]
+
+    def record(self, topic_id: int, weight: float = 1.0, at: Optional[float] = None) -> None:
+        """
+        Add an activity event (post created, like) to a topic
+        """
+        at = time.time() if at is None else at
+        with self._lock:
+            self._check_landmark(at)
+            delta = weight * 2 ** ((at - self.landmark) / self.half_life)
+            self._pending[topic_id] = self._pending.get(topic_id, 0.0) + delta
+            self._set(topic_id, self._scores.get(topic_id, 0.0) + delta)
+            self._trim()
+
+    def top(self, limit: int, now: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Highest scored topics with their decayed score at `now`
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._check_landmark(now)
+            decay = 2 ** (-(now - self.landmark) / self.half_life)
+            return [(topic_id, -score * decay) for score, topic_id in self._ranking[:limit]]
+
+    def take_pending(self) -> Tuple[int, Dict[int, float]]:
+        """
+        Take the score increments not yet persisted, with their landmark
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return self.landmark, pending
+
+    def return_pending(self, landmark: int, pending: Dict[int, float]) -> None:
+        """
+        Put back increments whose persistence failed
+        """
+        with self._lock:
+            for topic_id, delta in pending.items():
+                delta = rescale(delta, landmark, self.landmark, self.half_life)
+                self._pending[topic_id] = self._pending.get(topic_id, 0.0) + delta
+
+    def load(self, rows: Iterable[Tuple[int, float, int]], now: Optional[float] = None) -> None:
+        """
+        Replace the scores by a snapshot, keeping the increments not yet persisted
+
+        Args:
+            rows: (topic_id, score, landmark of the score)
+            now: Current time (moves the landmark if needed)
+        """
+        with self._lock:
+            self._check_landmark(time.time() if now is None else now)
+            scores = dict(self._pending)
+            for topic_id, score, landmark in rows:
+                score = rescale(score, landmark, self.landmark, self.half_life)
+                scores[topic_id] = scores.get(topic_id, 0.0) + score
+
+            self._scores = {topic_id: score for topic_id, score in scores.items() if math.isfinite(score)}
+            self._ranking = sorted((-score, topic_id) for topic_id, score in self._scores.items())
+            self._trim()
+
+    def __len__(self) -> int:
+        return len(self._scores)
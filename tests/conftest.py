@@ -9,7 +9,7 @@ import pytest_asyncio
 
 from src.domain.entities import UserEntity
 from src.domain.services.users import LoginService
-from .unit.mock import MockUserRepository
+from .unit.mock import MockRevocationRepository, MockUserRepository
 from .unit.mock.mock_users import NOT_EXISTENT_EMAIL, NOT_EXISTENT_UUID, USER_PASSWORD
 
 
@@ -55,5 +55,5 @@ async def get_jwt_tokens(mock_user_repo: MockUserRepository):
     """
     Get jwt tokens
     """
-    service = LoginService(mock_user_repo)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
     return await service.login("email@existent-mock", USER_PASSWORD)
@@ -18,6 +18,10 @@ from httpx import AsyncClient, ASGITransport
 
 from src.api.app import app
 from src.integrations.blob_storage import BlobStorageFactory, StorageProviders
+from api.dependencies.services import setup_services
+from database.replicas import ReplicaSet
+from database.sqlite import create_sqlite_engines, single_writer_sessionmaker, sqlite_pragmas
+from setup import response_cache
 from ..mock import MockBlobStorage
 
 
@@ -72,12 +76,19 @@ async def async_client(mock_blob_storage_factory):
     # Set session on app state
     app.state.async_session = async_session
 
-    # Patch the storage_blob with our mock
+    # Responses cached by a previous test belong to another database
+    response_cache.clear()
+
+    # App-scoped services with the mock blob storage
+    services = app.state.services
+    setup_services(app, mock_blob_storage_factory)
+
     with patch('src.setup.storage_blob', mock_blob_storage_factory):
-        with patch('src.api.controllers.users.handlers.register_handler.storage_blob', mock_blob_storage_factory):
-            transport = ASGITransport(app=app)
-            async with AsyncClient(transport=transport, base_url="http://test") as client:
-                yield client
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+    app.state.services = services
 
     # Drop tables after test
     async with engine.begin() as conn:
@@ -86,6 +97,32 @@ async def async_client(mock_blob_storage_factory):
     await engine.dispose()
 
 
+@pytest_asyncio.fixture(scope='function')
+async def single_writer(async_client, tmp_path):
+    """
+    App served by the single-writer SQLite profile (one writer connection),
+    set up as the lifespan does
+    """
+    writer, reader = create_sqlite_engines(
+        f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+        sqlite_pragmas(busy_timeout_ms=1000, cache_size_kb=1024, mmap_size=0),
+        reader_pool_size=2,
+        writer_timeout=5,
+    )
+    async with writer.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+
+    async_session = app.state.async_session
+    app.state.async_session = single_writer_sessionmaker(writer, reader)
+    app.state.replicas = ReplicaSet([sessionmaker(reader, class_=AsyncSession, expire_on_commit=False)], lagging=False)
+    yield writer
+
+    app.state.async_session = async_session
+    app.state.replicas = None
+    await writer.dispose()
+    await reader.dispose()
+
+
 @pytest.fixture(scope='function')
 def valid_user_data():
     """
@@ -120,3 +157,12 @@ def invalid_user_data():
         "phone": "11999999999",
         "password": "weak"
     }
+
+
+@pytest_asyncio.fixture(scope='function')
+async def auth_headers(async_client, valid_user_data, valid_user_files):
+    """
+    Register a user and return the bearer authorization headers
+    """
+    response = await async_client.post("/users", data=valid_user_data, files=valid_user_files)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
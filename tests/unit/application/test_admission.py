@@ -0,0 +1,56 @@
+"""
+Test for the admission control middleware
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from api.middlewares import MEDIA_ROUTES
+from api.middlewares._http.admission import AdmissionMiddleware
+from utils.admission import AdmissionPool, READ, WRITE, MEDIA
+
+
+@pytest.mark.asyncio
+async def test_uploads_are_shed_while_reads_stay_fast():
+    """
+    Test a saturated media pool rejects uploads with 503 and reads are admitted
+    """
+    release = asyncio.Event()
+    app = FastAPI()
+
+    @app.post("/topics/{topic_id}/posts")
+    async def create_post(topic_id: int):
+        await release.wait()
+        return {"topic_id": topic_id}
+
+    @app.get("/public/topics")
+    async def list_topics():
+        return []
+
+    pools = {
+        READ: AdmissionPool(READ, max_limit=4, queue_size=4, queue_timeout=1, target_latency=1),
+        WRITE: AdmissionPool(WRITE, max_limit=4, queue_size=4, queue_timeout=1, target_latency=1),
+        MEDIA: AdmissionPool(MEDIA, max_limit=1, queue_size=1, queue_timeout=1, target_latency=1),
+    }
+    app.add_middleware(AdmissionMiddleware, pools=pools, media_routes=MEDIA_ROUTES)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        running = asyncio.create_task(client.post("/topics/1/posts"))
+        queued = asyncio.create_task(client.post("/topics/1/posts"))
+        while pools[MEDIA].queued == 0:
+            await asyncio.sleep(0.001)
+
+        shed = await client.post("/topics/1/posts")
+        read = await client.get("/public/topics")
+
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "1"
+        assert read.status_code == 200
+
+        release.set()
+        assert [(await task).status_code for task in (running, queued)] == [200, 200]
+
+    assert pools[MEDIA].in_flight == 0
@@ -0,0 +1,117 @@
+# pylint: disable=redefined-outer-name
+
+"""
+Test for the request deadlines (504) and the compensations of rolled back requests
+"""
+
+import asyncio
+from io import BytesIO
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient, ASGITransport
+from PIL import Image
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.integrations.blob_storage import StorageProviders
+from api.dependencies.connections import get_session, run_on_rollback
+from api.middlewares._http.deadline import DeadlineMiddleware
+from database.deadlines import apply_statement_deadlines
+from .test_public_topics import create_topic
+
+
+@pytest_asyncio.fixture
+async def deadline_app():
+    """
+    App with a 0.1s deadline and a request transaction per request
+    """
+    engine = apply_statement_deadlines(create_async_engine("sqlite+aiosqlite:///:memory:"))
+    app = FastAPI()
+    app.state.async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app.state.compensated = []
+
+    async def compensate():
+        app.state.compensated.append("blob")
+
+    @app.post("/slow-upload")
+    async def slow_upload(session: AsyncSession = Depends(get_session)):
+        run_on_rollback(session, compensate)
+        await asyncio.sleep(5)
+
+    @app.post("/slow-query")
+    async def slow_query(session: AsyncSession = Depends(get_session)):
+        connection = await session.connection()
+        await connection.execute(text(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) SELECT count(*) FROM n"
+        ))
+
+    @app.post("/fast")
+    async def fast(session: AsyncSession = Depends(get_session)):
+        run_on_rollback(session, compensate)
+        return {"ok": True}
+
+    app.add_middleware(DeadlineMiddleware, default_timeout=0.1)
+    yield app
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_504_and_compensates(deadline_app: FastAPI):
+    """
+    Test a request over its budget is cancelled with 504 and its compensations run
+    """
+    async with AsyncClient(transport=ASGITransport(app=deadline_app), base_url="http://test") as client:
+        response = await client.post("/slow-upload")
+
+    assert response.status_code == 504
+    assert deadline_app.state.compensated == ["blob"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_interrupts_statement(deadline_app: FastAPI):
+    """
+    Test a slow SQL statement is interrupted and answered with 504
+    """
+    async with AsyncClient(transport=ASGITransport(app=deadline_app), base_url="http://test") as client:
+        response = await client.post("/slow-query")
+
+    assert response.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_committed_request_drops_compensations(deadline_app: FastAPI):
+    """
+    Test compensations never run for committed requests
+    """
+    async with AsyncClient(transport=ASGITransport(app=deadline_app), base_url="http://test") as client:
+        response = await client.post("/fast")
+
+    assert response.status_code == 200
+    assert deadline_app.state.compensated == []
+
+
+@pytest.mark.asyncio
+async def test_failed_post_deletes_uploaded_blobs(async_client: AsyncClient, auth_headers: dict, mock_blob_storage_factory):
+    """
+    Test the blobs uploaded before a validation error are deleted from the storage
+    """
+    topic = await create_topic(async_client, auth_headers)
+    storage = mock_blob_storage_factory.get(StorageProviders.SUPABASE)
+
+    valid, small = BytesIO(), BytesIO()
+    Image.new("RGB", (650, 360)).save(valid, format="PNG")
+    Image.new("RGB", (10, 10)).save(small, format="PNG")
+
+    response = await async_client.post(
+        f"/topics/{topic['id']}/posts",
+        data={"title": "Post", "description": "Description"},
+        files=[("files", ("a.png", valid.getvalue(), "image/png")), ("files", ("b.png", small.getvalue(), "image/png"))],
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 400
+    assert storage.deleted_files == [f"mock-id-{storage.upload_count}"]
@@ -2,11 +2,15 @@
 Test for login endpoints
 """
 
+import asyncio
+
 import pytest
 
 from httpx import AsyncClient
 
+from setup import password_hasher
 from .conftest import create_test_image
+from .test_public_topics import create_topic
 
 
 @pytest.mark.asyncio
@@ -136,3 +140,63 @@ async def test_refresh_token_without_token(async_client: AsyncClient):
 
     # HTTPBearer returns 401 when no authorization header is provided
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_tokens(async_client: AsyncClient, valid_user_data: dict, valid_user_files: dict):
+    """
+    Test access and refresh tokens are rejected after logout
+    """
+    tokens = (await async_client.post("/users", data=valid_user_data, files=valid_user_files)).json()
+    access = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = await async_client.post(
+        "/users/security/logout", params={"refresh_token": tokens["refresh_token"]}, headers=access
+    )
+    assert response.status_code == 204
+
+    # Both tokens are still signed and unexpired, the revocation list rejects them
+    assert (await async_client.post("/users/security/logout", headers=access)).status_code == 401
+    refresh = await async_client.get(
+        "/users/security/refresh", headers={"Authorization": f"Bearer {tokens['refresh_token']}"}
+    )
+    assert refresh.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_writes_run_during_login_storm_with_single_writer(
+    async_client: AsyncClient,
+    valid_user_data: dict,
+    valid_user_files: dict,
+    single_writer,
+    monkeypatch,
+):
+    """
+    Test logins checking passwords do not hold the only writer connection
+    """
+    tokens = (await async_client.post("/users", data=valid_user_data, files=valid_user_files)).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # Password checks block until the write is done (a slow KDF)
+    verifying, release = asyncio.Semaphore(0), asyncio.Event()
+    verify = password_hasher.verify
+
+    async def slow_verify(password, password_hash):
+        verifying.release()
+        await release.wait()
+        return await verify(password, password_hash)
+
+    monkeypatch.setattr(password_hasher, "verify", slow_verify)
+    credentials = {"email": valid_user_data["email"], "password": valid_user_data["password"]}
+    logins = [
+        asyncio.create_task(async_client.post("/users/security/login", params=credentials)) for _ in range(5)
+    ]
+    for _ in logins:
+        await asyncio.wait_for(verifying.acquire(), 2)
+
+    topic = await asyncio.wait_for(create_topic(async_client, headers), 2)
+    release.set()
+
+    assert topic["title"] == "Topic"
+    assert [response.status_code for response in await asyncio.gather(*logins)] == [200] * 5
+    assert single_writer.pool.checkedout() == 0
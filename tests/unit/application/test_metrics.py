@@ -0,0 +1,56 @@
+"""
+Test for the metrics endpoint
+"""
+
+import pytest
+
+from httpx import AsyncClient
+
+from utils.metrics import HTTP_REQUESTS, BLOB_OPERATION_SECONDS, IMAGE_PROCESSING_SECONDS
+from .test_public_topics import create_topic
+
+
+@pytest.mark.asyncio
+async def test_metrics_by_route_template(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test requests are counted by route template and exposed at /metrics
+    """
+    topic = await create_topic(async_client, auth_headers)
+    before = HTTP_REQUESTS.value("GET", "/topics/{topic_id}", "200")
+
+    await async_client.get(f"/topics/{topic['id']}")
+    response = await async_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert HTTP_REQUESTS.value("GET", "/topics/{topic_id}", "200") == before + 1
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/topics/{topic_id}",le="+Inf"}' in response.text
+    assert f'/topics/{topic["id"]}"' not in response.text
+    assert "http_requests_in_flight" in response.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_unmatched_route(async_client: AsyncClient):
+    """
+    Test unknown URLs share a single series
+    """
+    before = HTTP_REQUESTS.value("GET", "unmatched", "404")
+
+    await async_client.get("/does-not-exist/1")
+    await async_client.get("/does-not-exist/2")
+
+    assert HTTP_REQUESTS.value("GET", "unmatched", "404") == before + 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_blob_and_image(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test topic creation records blob upload and image durations
+    """
+    uploads = BLOB_OPERATION_SECONDS.count("upload")
+    encodes = IMAGE_PROCESSING_SECONDS.count("encode")
+
+    await create_topic(async_client, auth_headers)
+
+    assert BLOB_OPERATION_SECONDS.count("upload") == uploads + 1
+    assert IMAGE_PROCESSING_SECONDS.count("encode") == encodes + 1
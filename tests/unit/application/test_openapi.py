@@ -0,0 +1,43 @@
+"""
+Test for the precomputed OpenAPI schema
+"""
+
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.api.app import app
+from api.openapi import FINGERPRINT_KEY, load_openapi_schema, write_openapi_schema
+
+
+def test_written_schema_is_loaded(tmp_path):
+    """Test the written schema matches the app and the generated schema"""
+    path = str(tmp_path / "openapi.json")
+    written = write_openapi_schema(app, path)
+
+    loaded = load_openapi_schema(app, path)
+    assert loaded == json.loads(json.dumps(written))
+    assert loaded["paths"] == app.openapi()["paths"]
+
+
+def test_stale_or_missing_schema_is_ignored(tmp_path):
+    """Test a file of other routes is not served"""
+    path = tmp_path / "openapi.json"
+    assert load_openapi_schema(app, str(path)) is None
+
+    path.write_text(json.dumps({"openapi": "3.1.0", FINGERPRINT_KEY: "stale"}))
+    assert load_openapi_schema(app, str(path)) is None
+
+    path.write_text("{")
+    assert load_openapi_schema(app, str(path)) is None
+
+
+@pytest.mark.asyncio
+async def test_openapi_endpoint():
+    """Test the schema is still served without a precomputed file"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/openapi.json")
+
+    assert response.status_code == 200
+    assert "/public/topics" in response.json()["paths"]
@@ -0,0 +1,104 @@
+"""
+Application tests for the request profiler
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from httpx import AsyncClient, ASGITransport
+
+from setup import profile_store
+from src.api.middlewares._http.profiling import ProfilingMiddleware
+from src.utils.profiler import ProfileStore
+
+
+PROFILER_TOKEN = "test-profiler-token"
+
+
+@pytest.fixture(autouse=True)
+def clear_profiles():
+    """
+    Start every test with an empty profile store
+    """
+    profile_store.clear()
+    yield
+    profile_store.clear()
+
+
+@pytest.mark.asyncio
+async def test_requested_profile(async_client: AsyncClient):
+    """
+    Test a request with the profiler token is profiled and downloadable
+    """
+    response = await async_client.get(
+        "/public/topics", headers={"X-Profile": PROFILER_TOKEN, "X-Request-ID": "probe-1"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == "probe-1"
+
+    listing = await async_client.get("/admin/profiles", headers={"X-Profile": PROFILER_TOKEN})
+
+    assert listing.status_code == 200
+    assert listing.json()[0]["request_id"] == "probe-1"
+    assert listing.json()[0]["route"] == "/public/topics"
+    assert listing.json()[0]["reason"] == "requested"
+
+    download = await async_client.get("/admin/profiles/probe-1", headers={"X-Profile": PROFILER_TOKEN})
+
+    assert download.status_code == 200
+    assert download.headers["content-type"].startswith("text/plain")
+    assert "probe-1" in download.headers["content-disposition"]
+
+
+@pytest.mark.asyncio
+async def test_requests_without_token_not_profiled(async_client: AsyncClient):
+    """
+    Test a wrong token neither profiles nor opens the admin endpoints
+    """
+    response = await async_client.get("/public/topics", headers={"X-Profile": "wrong"})
+
+    assert response.headers["x-request-id"]
+    assert profile_store.list() == []
+
+    assert (await async_client.get("/admin/profiles")).status_code == 403
+    assert (await async_client.get("/admin/profiles", headers={"X-Profile": "wrong"})).status_code == 403
+    assert (
+        await async_client.get("/admin/profiles/unknown", headers={"X-Profile": PROFILER_TOKEN})
+    ).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_slow_request_profiled(tmp_path):
+    """
+    Test requests over the latency threshold are profiled automatically
+    """
+    store = ProfileStore()
+
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.03)
+        end = time.perf_counter() + 0.03
+        while time.perf_counter() < end:
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    app = ProfilingMiddleware(
+        slow_app, store, slow_request_threshold=0.01, interval=0.001, output_dir=str(tmp_path / "profiles")
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/slow")
+        escaped = await client.get("/slow", headers={"X-Request-ID": "/../../escaped"})
+
+    profile = store.get(response.headers["x-request-id"])
+
+    assert profile.reason == "slow"
+    assert profile.sample_count > 0
+    assert "slow_app" in profile.folded()
+    # Request ids out of the pattern are replaced, never reach the file path
+    assert escaped.headers["x-request-id"] != "/../../escaped"
+    assert len(list((tmp_path / "profiles").iterdir())) == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["profiles"]
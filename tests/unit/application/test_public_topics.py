@@ -0,0 +1,255 @@
+"""
+Test for public topics endpoints (HTTP cache validators)
+"""
+
+from io import BytesIO
+
+import pytest
+
+from httpx import AsyncClient
+from PIL import Image
+
+from setup import response_cache, trending_index
+from src.api.app import app
+from database.activity import catch_up
+
+
+def create_topic_image() -> BytesIO:
+    """
+    Create an image with the minimum topic dimensions
+    """
+    buffer = BytesIO()
+    Image.new("RGB", (650, 360), color="blue").save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+async def create_topic(async_client: AsyncClient, auth_headers: dict, title: str = "Topic") -> dict:
+    """
+    Create a topic through the API
+    """
+    response = await async_client.post(
+        "/topics",
+        data={"title": title, "description": "Description"},
+        files={"image": ("topic.png", create_topic_image(), "image/png")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_search_topics_returns_validators(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test listing topics returns ETag and Last-Modified
+    """
+    await create_topic(async_client, auth_headers)
+
+    response = await async_client.get("/public/topics")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert "last-modified" in response.headers
+    assert response.headers["cache-control"] == "no-cache"
+
+
+@pytest.mark.asyncio
+async def test_search_topics_not_modified(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test repeated poll with If-None-Match returns 304 without body
+    """
+    await create_topic(async_client, auth_headers)
+
+    first = await async_client.get("/public/topics", params={"page": 1})
+    response = await async_client.get(
+        "/public/topics",
+        params={"page": 1},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == first.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_search_topics_etag_changes_after_write(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test ETag changes when a new topic is created
+    """
+    await create_topic(async_client, auth_headers, "First")
+    first = await async_client.get("/public/topics")
+
+    await create_topic(async_client, auth_headers, "Second")
+    response = await async_client.get(
+        "/public/topics",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json()["pagination"]["total_items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_search_topics_cache_follows_version(
+    async_client: AsyncClient, auth_headers: dict, monkeypatch
+):
+    """
+    Test a write is served even when the worker did not see the invalidation
+    """
+    await create_topic(async_client, auth_headers, "First")
+    first = await async_client.get("/public/topics")
+
+    # The write is handled by another worker
+    monkeypatch.setattr(response_cache, "invalidate", lambda path: None)
+    await create_topic(async_client, auth_headers, "Second")
+
+    response = await async_client.get("/public/topics")
+
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json()["pagination"]["total_items"] == 2
+
+
+@pytest.mark.asyncio
+async def test_search_topics_etag_depends_on_query(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test different pages have different ETags
+    """
+    await create_topic(async_client, auth_headers)
+
+    first = await async_client.get("/public/topics", params={"page": 1})
+    second = await async_client.get("/public/topics", params={"page": 2})
+
+    assert first.headers["etag"] != second.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_search_posts_not_modified_until_new_post(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test posts listing is revalidated until a new post is created
+    """
+    topic = await create_topic(async_client, auth_headers)
+    path = f"/public/topics/{topic['id']}/posts"
+
+    first = await async_client.get(path)
+    cached = await async_client.get(path, headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+
+    await async_client.post(
+        f"/topics/{topic['id']}/posts",
+        data={"title": "Post", "description": "Post description"},
+        headers=auth_headers,
+    )
+
+    response = await async_client.get(path, headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_topic_cache_headers(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test topic detail has Cache-Control/Last-Modified and honors If-Modified-Since
+    """
+    topic = await create_topic(async_client, auth_headers)
+
+    response = await async_client.get(f"/topics/{topic['id']}")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    cached = await async_client.get(
+        f"/topics/{topic['id']}",
+        headers={"If-Modified-Since": response.headers["last-modified"]},
+    )
+    assert cached.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_search_topics_precompressed_variant(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test cached listings are compressed once and served from the cache variant
+    """
+    for index in range(5):
+        await create_topic(async_client, auth_headers, f"Topic {index}")
+
+    first = await async_client.get("/public/topics", headers={"Accept-Encoding": "gzip"})
+    second = await async_client.get("/public/topics", headers={"Accept-Encoding": "gzip"})
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert second.json() == first.json()
+
+    entry = next(iter(response_cache._slots.values())).entry
+    assert list(entry.variants) == ["gzip"]
+
+
+@pytest.mark.asyncio
+async def test_trending_topics_ranked_by_posts(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test trending topics are ranked by their created posts
+    """
+    # The index is per process, drop the scores of previous tests
+    trending_index.take_pending()
+    trending_index.load([])
+
+    quiet = await create_topic(async_client, auth_headers, title="Quiet")
+    busy = await create_topic(async_client, auth_headers, title="Busy")
+    for topic, posts in ((quiet, 1), (busy, 3)):
+        for index in range(posts):
+            await async_client.post(
+                f"/topics/{topic['id']}/posts",
+                data={"title": f"Post {index}", "description": "Post description"},
+                headers=auth_headers,
+            )
+
+    response = await async_client.get("/public/topics/trending", params={"limit": 5})
+    assert response.status_code == 200
+
+    data = response.json()["data"]
+    assert [topic["id"] for topic in data] == [busy["id"], quiet["id"]]
+    assert data[0]["score"] > data[1]["score"] > 0
+    assert data[0]["qtd_posts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_topic_activity_series(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test the activity endpoint serves the rolled up posts with empty buckets filled
+    """
+    topic = await create_topic(async_client, auth_headers, title="Charted")
+    for index in range(3):
+        await async_client.post(
+            f"/topics/{topic['id']}/posts",
+            data={"title": f"Post {index}", "description": "Post description"},
+            headers=auth_headers,
+        )
+
+    # Nothing is counted before the aggregator runs
+    response = await async_client.get(f"/public/topics/{topic['id']}/activity")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert len(data) == 24
+    assert sum(point["posts"] for point in data) == 0
+
+    assert await catch_up(app.state.async_session, 1000, lag=0) == 3
+
+    hours = (await async_client.get(f"/public/topics/{topic['id']}/activity")).json()["data"]
+    assert sum(point["posts"] for point in hours) == 3
+
+    days = (await async_client.get(
+        f"/public/topics/{topic['id']}/activity", params={"granularity": "day"}
+    )).json()
+    assert days["granularity"] == "day"
+    assert len(days["data"]) == 30
+    assert sum(point["posts"] for point in days["data"]) == 3
+
+    response = await async_client.get(
+        f"/public/topics/{topic['id']}/activity",
+        params={"granularity": "hour", "start": "2020-01-01T00:00:00", "end": "2021-01-01T00:00:00"},
+    )
+    assert response.status_code == 400
+
+    response = await async_client.get("/public/topics/999/activity")
+    assert response.status_code == 404
@@ -0,0 +1,87 @@
+"""
+Query budgets per endpoint (X-DB-Query-Count debug header)
+
+Notes:
+    N+1 queries already fail every application test (the detector raises
+    in the test configuration), these budgets also catch extra round trips
+"""
+
+import pytest
+
+from httpx import AsyncClient
+
+from setup import response_cache
+from .test_public_topics import create_topic, create_topic_image
+
+
+def query_count(response) -> int:
+    """
+    Queries executed by a request
+    """
+    return int(response.headers["x-db-query-count"])
+
+
+@pytest.mark.asyncio
+async def test_get_topic_budget(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test topic detail is a single query
+    """
+    topic = await create_topic(async_client, auth_headers)
+
+    response = await async_client.get(f"/topics/{topic['id']}")
+
+    assert response.status_code == 200
+    assert query_count(response) == 1
+    assert float(response.headers["x-db-time-ms"]) >= float(response.headers["x-db-slowest-ms"])
+
+
+@pytest.mark.asyncio
+async def test_public_topics_cached_budget(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test a cached public listing only runs the version lookup
+    """
+    await create_topic(async_client, auth_headers)
+
+    first = await async_client.get("/public/topics")
+    second = await async_client.get("/public/topics")
+
+    assert query_count(first) <= 3
+    assert query_count(second) == 1
+
+
+@pytest.mark.asyncio
+async def test_public_topics_conditional_budget(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test a revalidation answers 304 from the version lookup, even on a cache miss
+    """
+    await create_topic(async_client, auth_headers)
+
+    first = await async_client.get("/public/topics")
+    response_cache.clear()
+    response = await async_client.get("/public/topics", headers={"If-None-Match": first.headers["etag"]})
+
+    assert response.status_code == 304
+    assert query_count(response) == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_post_appends_budget(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test uploading appends does not reload the post
+    """
+    topic = await create_topic(async_client, auth_headers)
+    post = await async_client.post(
+        f"/topics/{topic['id']}/posts",
+        data={"title": "Post", "description": "Post description"},
+        headers=auth_headers,
+    )
+
+    response = await async_client.post(
+        f"/topics/posts/{post.json()['id']}/appends",
+        files={"files": ("post.png", create_topic_image(), "image/png")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["appends"]) == 1
+    assert query_count(response) <= 6
@@ -0,0 +1,89 @@
+"""
+Test for the rate limiting middleware
+"""
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from setup import jwt_handler
+from api.middlewares import rate_limit_groups
+from api.middlewares._http.rate_limit import RateLimitGroup, RateLimitMiddleware
+from utils.rate_limit import MemoryRateLimitStore, RateRule
+
+
+def limited_app() -> FastAPI:
+    """
+    App with one limited route group (2 requests per user, 3 per IP)
+    """
+    app = FastAPI()
+
+    @app.post("/topics/{topic_id}/posts")
+    async def create_post(topic_id: int):
+        return {"topic_id": topic_id}
+
+    @app.get("/topics/{topic_id}/posts")
+    async def list_posts(topic_id: int):
+        return []
+
+    group = RateLimitGroup.build(
+        "media",
+        [("POST", "/topics/{topic_id}/posts")],
+        per_user=RateRule(rate=0.01, burst=2),
+        per_ip=RateRule(rate=0.01, burst=3),
+    )
+    app.add_middleware(
+        RateLimitMiddleware, store=MemoryRateLimitStore(), groups=[group], decode_token=jwt_handler.decode_payload
+    )
+    return app
+
+
+def bearer(sub: str) -> dict:
+    return {"Authorization": f"Bearer {jwt_handler.encode_payload({'sub': sub}, 60)}"}
+
+
+@pytest.mark.asyncio
+async def test_user_bucket_returns_429_with_retry_after():
+    """
+    Test a user over the limit gets 429 and Retry-After, others are not affected
+    """
+    async with AsyncClient(transport=ASGITransport(app=limited_app()), base_url="http://test") as client:
+        statuses = [(await client.post("/topics/1/posts", headers=bearer("alice"))).status_code for _ in range(2)]
+        limited = await client.post("/topics/1/posts", headers=bearer("alice"))
+
+        assert statuses == [200, 200]
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) >= 1
+
+        # Another user of the same IP still has the last IP token
+        assert (await client.post("/topics/1/posts", headers=bearer("bob"))).status_code == 200
+        assert (await client.post("/topics/1/posts", headers=bearer("carol"))).status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_anonymous_requests_use_ip_bucket_only():
+    """
+    Test requests without a valid token are limited by IP, other routes never
+    """
+    async with AsyncClient(transport=ASGITransport(app=limited_app()), base_url="http://test") as client:
+        headers = {"Authorization": "Bearer invalid"}
+        statuses = [(await client.post("/topics/1/posts", headers=headers)).status_code for _ in range(4)]
+        reads = [(await client.get("/topics/1/posts")).status_code for _ in range(5)]
+
+    assert statuses == [200, 200, 200, 429]
+    assert reads == [200] * 5
+
+
+def test_configured_groups_cover_expensive_routes():
+    """
+    Test the configured groups match the image and registration routes only
+    """
+    groups = {group.name: group for group in rate_limit_groups()}
+
+    assert groups["media"].matches("POST", "/topics")
+    assert groups["media"].matches("POST", "/topics/7/image")
+    assert groups["media"].matches("POST", "/topics/7/posts")
+    assert groups["media"].matches("POST", "/topics/posts/9/appends")
+    assert not groups["media"].matches("GET", "/topics/7/posts")
+    assert groups["register"].matches("POST", "/users")
+    assert not groups["register"].matches("POST", "/users/security/login")
@@ -0,0 +1,165 @@
+# pylint: disable=redefined-outer-name
+
+"""
+Test for the read/write split (replica routing and read-your-writes)
+"""
+
+import pytest
+import pytest_asyncio
+
+import sqlmodel
+from fastapi import FastAPI, Response
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.app import app
+from setup import config, response_cache
+from database.replicas import PRIMARY_PIN_COOKIE, ReplicaSet, is_pinned, primary_pin
+from api.middlewares._http.replicas import PrimaryPinMiddleware
+from .test_public_topics import create_topic
+
+
+@pytest_asyncio.fixture
+async def replica(async_client):
+    """
+    Empty replica database routed by the app (the primary is the test database)
+    """
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+
+    app.state.replicas = ReplicaSet([sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)])
+    yield app.state.replicas
+
+    app.state.replicas = None
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_public_reads_go_to_replica(async_client: AsyncClient, auth_headers: dict, replica: ReplicaSet):
+    """
+    Test anonymous reads are served by the replica, writes by the primary
+    """
+    await create_topic(async_client, auth_headers)
+    response_cache.clear()
+
+    response = await async_client.get("/public/topics")
+
+    assert response.status_code == 200
+    assert response.json()["pagination"]["total_items"] == 0
+    assert replica.in_flight == [0]
+
+
+@pytest.mark.asyncio
+async def test_authenticated_get_goes_to_replica(async_client: AsyncClient, auth_headers: dict, replica: ReplicaSet):
+    """
+    Test GET handlers read from the replica
+    """
+    topic = await create_topic(async_client, auth_headers)
+
+    response = await async_client.get(f"/topics/{topic['id']}", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pinned_client_reads_from_primary(async_client: AsyncClient, auth_headers: dict, replica: ReplicaSet):
+    """
+    Test a client pinned after a write reads its own writes
+    """
+    topic = await create_topic(async_client, auth_headers)
+    response_cache.clear()
+    async_client.cookies.set(PRIMARY_PIN_COOKIE, primary_pin(5, config.JWT_SECRET_KEY.encode()))
+
+    listing = await async_client.get("/public/topics")
+    detail = await async_client.get(f"/topics/{topic['id']}", headers=auth_headers)
+
+    assert listing.json()["pagination"]["total_items"] == 1
+    assert detail.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_forged_pin_reads_from_replica(async_client: AsyncClient, auth_headers: dict, replica: ReplicaSet):
+    """
+    Test an unsigned or tampered pin does not route the client to the primary
+    """
+    await create_topic(async_client, auth_headers)
+    response_cache.clear()
+    until, _, signature = primary_pin(5, config.JWT_SECRET_KEY.encode()).partition(".")
+
+    for forged in (until, f"{int(until) + 1000}.{signature}"):
+        async_client.cookies.set(PRIMARY_PIN_COOKIE, forged)
+        listing = await async_client.get("/public/topics")
+        assert listing.json()["pagination"]["total_items"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pin_cookie_set_after_successful_write():
+    """
+    Test only successful writes pin the client to the primary
+    """
+    pinned_app = FastAPI()
+
+    @pinned_app.get("/read")
+    async def read():
+        return {}
+
+    @pinned_app.post("/write")
+    async def write():
+        return {}
+
+    @pinned_app.post("/invalid")
+    async def invalid():
+        return Response(status_code=400)
+
+    pinned_app.add_middleware(PrimaryPinMiddleware, pin_seconds=5, secret=b"secret")
+
+    async with AsyncClient(transport=ASGITransport(app=pinned_app), base_url="http://test") as client:
+        write_response = await client.post("/write")
+        read_response = await client.get("/read")
+        invalid_response = await client.post("/invalid")
+
+    assert is_pinned(write_response.cookies[PRIMARY_PIN_COOKIE], 5, b"secret")
+    assert "set-cookie" not in read_response.headers
+    assert "set-cookie" not in invalid_response.headers
+
+
+@pytest.mark.asyncio
+async def test_cache_refill_after_write_reads_primary(
+    async_client: AsyncClient, auth_headers: dict, replica: ReplicaSet
+):
+    """
+    Test the first refill after an invalidation does not cache the page of a lagging replica
+    """
+    await create_topic(async_client, auth_headers)
+    async_client.cookies.clear()
+
+    first = await async_client.get("/public/topics")
+    cached = await async_client.get("/public/topics")
+
+    assert first.json()["pagination"]["total_items"] == 1
+    assert cached.json()["pagination"]["total_items"] == 1
+    assert replica.in_flight == [0]
+
+
+@pytest.mark.asyncio
+async def test_pinned_client_skips_shared_cache(
+    async_client: AsyncClient, auth_headers: dict, replica: ReplicaSet, monkeypatch
+):
+    """
+    Test a pinned client reads its write even when the shared cache holds an older page
+    """
+    await create_topic(async_client, auth_headers)
+    async_client.cookies.clear()
+
+    # Refilled from the lagging replica once the pin window passed
+    monkeypatch.setattr(config, "DATABASE_PRIMARY_PIN_SECONDS", 0)
+    stale = await async_client.get("/public/topics")
+    monkeypatch.undo()
+    assert stale.json()["pagination"]["total_items"] == 0
+
+    async_client.cookies.set(PRIMARY_PIN_COOKIE, primary_pin(5, config.JWT_SECRET_KEY.encode()))
+    pinned = await async_client.get("/public/topics")
+    assert pinned.json()["pagination"]["total_items"] == 1
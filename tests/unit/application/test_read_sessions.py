@@ -0,0 +1,62 @@
+# pylint: disable=redefined-outer-name
+
+"""
+Test for the read-only sessions of GET and public endpoints
+"""
+
+import pytest
+
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from src.api.app import app
+from setup import response_cache
+from .test_public_topics import create_topic
+
+
+@pytest.fixture
+def commits(async_client):
+    """
+    Commits issued on the test database
+    """
+    engine = app.state.async_session.kw["bind"].sync_engine
+    issued = []
+
+    def on_commit(_):
+        issued.append(1)
+
+    event.listen(engine, "commit", on_commit)
+    yield issued
+    event.remove(engine, "commit", on_commit)
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_commit(async_client: AsyncClient, auth_headers: dict, commits: list):
+    """
+    Test GET handlers and public listings never commit
+    """
+    topic = await create_topic(async_client, auth_headers)
+    response_cache.clear()
+    commits.clear()
+
+    detail = await async_client.get(f"/topics/{topic['id']}", headers=auth_headers)
+    listing = await async_client.get("/public/topics")
+    posts = await async_client.get(f"/public/topics/{topic['id']}/posts")
+
+    assert detail.status_code == 200
+    assert listing.json()["pagination"]["total_items"] == 1
+    assert posts.status_code == 200
+    assert not commits
+
+
+@pytest.mark.asyncio
+async def test_writes_commit(async_client: AsyncClient, auth_headers: dict, commits: list):
+    """
+    Test write handlers still commit their transaction
+    """
+    topic = await create_topic(async_client, auth_headers)
+
+    response = await async_client.get(f"/topics/{topic['id']}", headers=auth_headers)
+
+    assert response.json()["title"] == "Topic"
+    assert commits
@@ -0,0 +1,132 @@
+"""
+Test for the production server (pre-forked workers)
+"""
+
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from server import current_rss_bytes, max_requests_with_jitter, worker_count
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def test_worker_limits():
+    """Test the worker count and the jittered request limit"""
+    assert worker_count(3) == 3
+    assert worker_count(0) == (os.cpu_count() or 1)
+
+    assert max_requests_with_jitter(0, 100) is None
+    limits = {max_requests_with_jitter(1000, 50, random.Random(seed)) for seed in range(20)}
+    assert all(1000 <= limit <= 1050 for limit in limits)
+    assert len(limits) > 1
+
+    assert current_rss_bytes() > 0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port: int) -> int:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        return response.status
+
+
+def _scraped_requests(port: int) -> float:
+    """
+    Scrapes of /metrics counted by the scraped totals (every worker)
+    """
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        text = response.read().decode()
+    series = 'http_requests_total{method="GET",route="/metrics",status="200"} '
+    return sum(float(line[len(series):]) for line in text.splitlines() if line.startswith(series))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork only")
+def test_workers_are_recycled_and_stopped_gracefully():
+    """Test workers serve, are replaced after max requests and stop on SIGTERM"""
+    port = _free_port()
+    master = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "src", "server.py"), "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--max-requests", "2", "--max-requests-jitter", "0"],
+        cwd=ROOT, env={**os.environ, "TESTING": "1"}, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _get(port)
+                break
+            except OSError:
+                if time.monotonic() > deadline or master.poll() is not None:
+                    raise
+                time.sleep(0.2)
+
+        statuses = []
+        for _ in range(8):
+            try:
+                statuses.append(_get(port))
+            except OSError:
+                # A connection accepted by a worker as it recycles is dropped
+                time.sleep(0.3)
+        assert statuses.count(200) >= 6
+
+        # Recycled workers are reaped and respawned by the master
+        time.sleep(1)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        output, _ = master.communicate(timeout=30)
+
+    assert master.returncode == 0
+    assert "reciclando" in output
+    assert "Encerrando workers" in output
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork only")
+def test_metrics_are_totals_of_every_worker():
+    """Test a scrape counts the requests of every worker, recycled ones included"""
+    port = _free_port()
+    master = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "src", "server.py"), "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--max-requests", "3", "--max-requests-jitter", "0"],
+        cwd=ROOT, env={**os.environ, "TESTING": "1"}, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _get(port)
+                break
+            except OSError:
+                if time.monotonic() > deadline or master.poll() is not None:
+                    raise
+                time.sleep(0.2)
+
+        served, totals = 1, []
+        for _ in range(12):
+            try:
+                totals.append(_scraped_requests(port))
+            except OSError:
+                time.sleep(0.3)
+                continue
+            # Requests still counted only by a live worker that has not
+            # written its snapshot since (one per worker at most)
+            assert totals[-1] >= served - 2
+            served += 1
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.communicate(timeout=30)
+
+    assert served >= 10
+    assert totals == sorted(totals)
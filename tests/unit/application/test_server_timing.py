@@ -0,0 +1,54 @@
+"""
+Application tests for the Server-Timing header
+"""
+
+import pytest
+
+from httpx import AsyncClient
+
+from .test_public_topics import create_topic, create_topic_image
+
+
+def server_timing(response) -> dict:
+    """
+    Phases of the Server-Timing header (milliseconds)
+    """
+    phases = {}
+    for entry in response.headers["server-timing"].split(", "):
+        name, duration = entry.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+@pytest.mark.asyncio
+async def test_server_timing_phases(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test an upload reports auth, db, blob, image and serialization
+    """
+    topic = await create_topic(async_client, auth_headers)
+
+    response = await async_client.post(
+        f"/topics/{topic['id']}/posts",
+        data={"title": "Post", "description": "Post description"},
+        files={"files": ("post.png", create_topic_image(), "image/png")},
+        headers=auth_headers,
+    )
+
+    phases = server_timing(response)
+
+    assert response.status_code == 200
+    assert {"auth", "db", "blob", "image", "serialization"} <= set(phases)
+    assert phases["total"] >= phases["image"]
+
+
+@pytest.mark.asyncio
+async def test_server_timing_anonymous(async_client: AsyncClient):
+    """
+    Test public requests without auth only report the phases they used
+    """
+    response = await async_client.get("/public/topics")
+
+    phases = server_timing(response)
+
+    assert "auth" not in phases
+    assert "total" in phases
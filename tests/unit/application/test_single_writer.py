@@ -0,0 +1,53 @@
+"""
+Test for the single-writer SQLite profile (writer taken at the first write)
+"""
+
+import asyncio
+
+import pytest
+
+from httpx import AsyncClient
+
+from src.integrations.blob_storage import BlobStorageFactory, StorageProviders
+from .test_public_topics import create_topic
+
+
+@pytest.mark.asyncio
+async def test_writes_run_during_upload(
+    async_client: AsyncClient,
+    valid_user_data: dict,
+    valid_user_files: dict,
+    mock_blob_storage_factory: BlobStorageFactory,
+    single_writer,
+    monkeypatch,
+):
+    """
+    Test a slow upload does not hold the only writer connection
+    """
+    tokens = (await async_client.post("/users", data=valid_user_data, files=valid_user_files)).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    # Uploads block until the other write is done (a slow storage)
+    storage = mock_blob_storage_factory.get(StorageProviders.SUPABASE)
+    uploading, release = asyncio.Event(), asyncio.Event()
+    upload = storage.upload_archive
+
+    async def slow_upload(*args, **kwargs):
+        uploading.set()
+        await release.wait()
+        return await upload(*args, **kwargs)
+
+    monkeypatch.setattr(storage, "upload_archive", slow_upload)
+    creating = asyncio.create_task(create_topic(async_client, headers))
+    await asyncio.wait_for(uploading.wait(), 2)
+
+    assert single_writer.pool.checkedout() == 0
+    logout = await asyncio.wait_for(
+        async_client.post("/users/security/logout", params={"refresh_token": tokens["refresh_token"]}, headers=headers),
+        2,
+    )
+    release.set()
+
+    assert logout.status_code == 204
+    assert (await creating)["title"] == "Topic"
+    assert single_writer.pool.checkedout() == 0
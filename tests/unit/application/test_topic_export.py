@@ -0,0 +1,69 @@
+"""
+Test for the topic NDJSON export
+"""
+
+import json
+
+import pytest
+
+from httpx import AsyncClient
+
+from setup import config
+from .test_public_topics import create_topic, create_topic_image
+
+
+@pytest.mark.asyncio
+async def test_export_topic_posts(async_client: AsyncClient, auth_headers: dict, monkeypatch):
+    """
+    Test every post is exported in order, with attachments, across chunks
+    """
+    monkeypatch.setattr(config, "EXPORT_CHUNK_SIZE", 2)
+    topic = await create_topic(async_client, auth_headers)
+
+    for index in range(5):
+        files = {}
+        if index == 3:
+            files = {"files": ("post.png", create_topic_image(), "image/png")}
+
+        response = await async_client.post(
+            f"/topics/{topic['id']}/posts",
+            data={"title": f"Post {index}", "description": "Post description"},
+            files=files,
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+
+    response = await async_client.get(f"/topics/{topic['id']}/export", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["title"] for line in lines] == [f"Post {index}" for index in range(5)]
+    assert [len(line["appends"]) for line in lines] == [0, 0, 0, 1, 0]
+    assert lines[3]["appends"][0]["extensao"] == "webp"
+    assert lines[0]["created_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_export_requires_authentication(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test the export is not public
+    """
+    topic = await create_topic(async_client, auth_headers)
+
+    response = await async_client.get(f"/topics/{topic['id']}/export")
+
+    assert response.status_code in (401, 403)
+
+
+@pytest.mark.asyncio
+async def test_export_unknown_topic(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test exporting a topic that does not exist returns 404
+    """
+    response = await async_client.get("/topics/999/export", headers=auth_headers)
+
+    assert response.status_code == 404
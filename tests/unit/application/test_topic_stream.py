@@ -0,0 +1,131 @@
+"""
+Test for the topic posts live feed (Server-Sent Events)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from httpx import AsyncClient
+
+from setup import config, post_broker
+from src.api.app import app
+from src.api.controllers.topics.stream import topic_post_events, topic_channel, RETRY_FRAME
+from utils.broker import HEARTBEAT_FRAME
+from .test_public_topics import create_topic
+
+
+async def create_post(async_client: AsyncClient, auth_headers: dict, topic_id: int, title: str) -> dict:
+    """
+    Create a post through the API
+    """
+    response = await async_client.post(
+        f"/topics/{topic_id}/posts",
+        data={"title": title, "description": "Post description"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def parse_frame(frame: str) -> dict:
+    """
+    Parse a SSE frame into its fields
+    """
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+@pytest.mark.asyncio
+async def test_stream_unknown_topic(async_client: AsyncClient):
+    """
+    Test streaming a topic that does not exist returns 404
+    """
+    response = await async_client.get("/public/topics/999/stream")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_receives_created_post(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test a post created after subscribing is pushed after commit
+    """
+    topic = await create_topic(async_client, auth_headers)
+    events = topic_post_events(app, topic["id"])
+
+    assert await anext(events) == RETRY_FRAME
+    pending = asyncio.ensure_future(anext(events))
+    await asyncio.sleep(0)
+
+    post = await create_post(async_client, auth_headers, topic["id"], "Live")
+    frame = parse_frame(await asyncio.wait_for(pending, timeout=1))
+
+    assert frame["id"] == str(post["id"])
+    assert frame["event"] == "post_created"
+    assert frame["data"]["title"] == "Live"
+    assert "user_id" not in frame["data"]
+
+    await events.aclose()
+    assert post_broker.subscribers(topic_channel(topic["id"])) == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_from_last_event_id(async_client: AsyncClient, auth_headers: dict):
+    """
+    Test Last-Event-ID replays the posts missed by the client, in order
+    """
+    topic = await create_topic(async_client, auth_headers)
+    first = await create_post(async_client, auth_headers, topic["id"], "First")
+    await create_post(async_client, auth_headers, topic["id"], "Second")
+    await create_post(async_client, auth_headers, topic["id"], "Third")
+
+    events = topic_post_events(app, topic["id"], last_event_id=first["id"])
+
+    assert await anext(events) == RETRY_FRAME
+    titles = [parse_frame(await anext(events))["data"]["title"] for _ in range(2)]
+
+    assert titles == ["Second", "Third"]
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_heartbeat(async_client: AsyncClient, auth_headers: dict, monkeypatch):
+    """
+    Test a heartbeat comment is sent while there are no events
+    """
+    monkeypatch.setattr(config, "STREAM_HEARTBEAT_INTERVAL", 0.01)
+    topic = await create_topic(async_client, auth_headers)
+    events = topic_post_events(app, topic["id"])
+
+    await anext(events)
+
+    assert await anext(events) == HEARTBEAT_FRAME
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_catches_up_posts_of_other_workers(
+    async_client: AsyncClient, auth_headers: dict, monkeypatch
+):
+    """
+    Test posts published in another worker are read from the table on the heartbeat
+    """
+    monkeypatch.setattr(config, "STREAM_HEARTBEAT_INTERVAL", 0.01)
+    topic = await create_topic(async_client, auth_headers)
+    await create_post(async_client, auth_headers, topic["id"], "Before")
+    events = topic_post_events(app, topic["id"])
+    assert await anext(events) == RETRY_FRAME
+
+    # The broker of this worker never sees the post
+    monkeypatch.setattr(post_broker, "publish", lambda channel, event: None)
+    post = await create_post(async_client, auth_headers, topic["id"], "Remote")
+
+    frames = [await anext(events) for _ in range(2)]
+    frame = parse_frame(next(frame for frame in frames if frame != HEARTBEAT_FRAME))
+
+    assert frame["id"] == str(post["id"])
+    assert frame["data"]["title"] == "Remote"
+    await events.aclose()
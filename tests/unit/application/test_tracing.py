@@ -0,0 +1,74 @@
+"""
+Application tests for request tracing
+"""
+
+import pytest
+
+from httpx import AsyncClient
+
+from utils.tracing import get_tracer
+from .test_public_topics import create_topic
+
+
+@pytest.fixture
+async def spans():
+    """
+    Spans exported by the test tracer (in-memory exporter)
+    """
+    exporter = get_tracer().processor.exporter
+    await get_tracer().force_flush()
+    exporter.clear()
+    yield exporter.spans
+    exporter.clear()
+
+
+@pytest.mark.asyncio
+async def test_create_post_trace(async_client: AsyncClient, auth_headers: dict, spans: list):
+    """
+    Test a request produces one trace from the route down to the repositories
+    """
+    topic = await create_topic(async_client, auth_headers)
+    await get_tracer().force_flush()
+    spans.clear()
+
+    response = await async_client.post(
+        f"/topics/{topic['id']}/posts",
+        data={"title": "Post", "description": "Post description"},
+        headers=auth_headers,
+    )
+    await get_tracer().force_flush()
+
+    assert response.status_code == 200
+
+    by_name = {span.name: span for span in spans}
+    root = by_name["POST /topics/{topic_id}/posts"]
+
+    assert root.parent_span_id is None
+    assert root.attributes["http.response.status_code"] == 200
+    assert response.headers["traceparent"].split("-")[1] == root.context.trace_id
+    assert {span.context.trace_id for span in spans} == {root.context.trace_id}
+
+    controller = by_name["PostsController.create_post"]
+    service = by_name["PostService.create"]
+    repository = by_name["PostRepository.create"]
+
+    assert controller.parent_span_id == root.context.span_id
+    assert service.parent_span_id == controller.context.span_id
+    assert repository.parent_span_id == service.context.span_id
+
+
+@pytest.mark.asyncio
+async def test_incoming_traceparent(async_client: AsyncClient, spans: list):
+    """
+    Test the request continues the caller trace
+    """
+    header = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+    response = await async_client.get("/public/topics", headers={"traceparent": header})
+    await get_tracer().force_flush()
+
+    root = next(span for span in spans if span.name == "GET /public/topics")
+
+    assert response.status_code == 200
+    assert root.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert root.parent_span_id == "b7ad6b7169203331"
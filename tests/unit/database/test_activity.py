@@ -0,0 +1,136 @@
+"""
+Tests for the topic activity rollup
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import sqlmodel
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.activity import ACTIVITY_ROLLUP, catch_up, rollup_batch
+from database.models import PostModel, TopicModel, UserModel
+from database.repositories import ActivityRepository
+
+
+NOW = datetime(2026, 3, 10, 12, 30)
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """
+    SQLite file with two topics
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'activity.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+        await conn.execute(insert(UserModel.__table__).values(
+            id=1, nome="User", email="user@example.com", uuid="uuid", telefone="11999999999", senha="-",
+        ))
+        await conn.execute(insert(TopicModel.__table__), [
+            {"id": topic_id, "titulo": f"Topic {topic_id}", "descricao": "-", "quantidade_posts": 0, "criado_por_id": 1}
+            for topic_id in (1, 2)
+        ])
+
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def add_posts(session_factory, *posts):
+    """
+    Insert (topic id, creation date) posts, ids in order
+    """
+    async with session_factory() as session:
+        await session.exec(insert(PostModel.__table__), params=[
+            {"titulo": "Post", "descricao": "-", "usuario_id": 1, "topico_post_id": topic_id,
+             "gostei_contador": 0, "resposta_contador": 0, "criado_em": created_at, "atualizado_em": created_at}
+            for topic_id, created_at in posts
+        ])
+        await session.commit()
+
+
+async def hourly(session_factory, topic_id):
+    async with session_factory() as session:
+        points = await ActivityRepository(session).list_hourly(topic_id, NOW - timedelta(days=1), NOW)
+    return [(point.start.hour, point.posts) for point in points]
+
+
+async def test_rollup_counts_posts_by_topic_and_hour(session_factory):
+    """
+    Test batches add up in the hourly rows and move the watermark
+    """
+    await add_posts(
+        session_factory,
+        (1, NOW.replace(hour=9, minute=5)),
+        (1, NOW.replace(hour=9, minute=55)),
+        (2, NOW.replace(hour=9, minute=10)),
+        (1, NOW.replace(hour=10, minute=0)),
+        (1, NOW.replace(hour=10, minute=59)),
+    )
+
+    async with session_factory() as session:
+        assert await rollup_batch(session, 3, 60, now=NOW) == 3
+    async with session_factory() as session:
+        assert await rollup_batch(session, 3, 60, now=NOW) == 2
+    async with session_factory() as session:
+        assert await rollup_batch(session, 3, 60, now=NOW) == 0
+        assert await ActivityRepository(session).get_watermark(ACTIVITY_ROLLUP) == 5
+
+    assert await hourly(session_factory, 1) == [(9, 2), (10, 2)]
+    assert await hourly(session_factory, 2) == [(9, 1)]
+
+
+async def test_rollup_waits_for_the_lag(session_factory):
+    """
+    Test posts newer than the lag, and every post after them, wait for a later run
+    """
+    await add_posts(
+        session_factory,
+        (1, NOW - timedelta(minutes=10)),
+        (1, NOW - timedelta(seconds=30)),
+        (1, NOW - timedelta(minutes=5)),
+    )
+
+    async with session_factory() as session:
+        assert await rollup_batch(session, 10, 60, now=NOW) == 1
+    async with session_factory() as session:
+        assert await rollup_batch(session, 10, 60, now=NOW + timedelta(minutes=1)) == 2
+
+
+async def test_concurrent_run_does_not_count_twice(session_factory):
+    """
+    Test a run whose watermark was moved meanwhile counts nothing
+    """
+    await add_posts(session_factory, (1, NOW - timedelta(hours=1)), (1, NOW - timedelta(hours=1)))
+
+    async with session_factory() as session:
+        repo = ActivityRepository(session)
+        assert await repo.advance_watermark(ACTIVITY_ROLLUP, 0, 1)
+        assert not await repo.advance_watermark(ACTIVITY_ROLLUP, 0, 2)
+        assert await repo.advance_watermark(ACTIVITY_ROLLUP, 1, 2)
+        await session.commit()
+
+    async with session_factory() as session:
+        assert not await ActivityRepository(session).advance_watermark(ACTIVITY_ROLLUP, 0, 2)
+
+
+async def test_catch_up_and_rebuild(session_factory):
+    """
+    Test catching up runs every batch and a reset rebuilds the same counts
+    """
+    await add_posts(session_factory, *[(1 + index % 2, NOW - timedelta(hours=2)) for index in range(7)])
+
+    assert await catch_up(session_factory, 2, 60) == 7
+    assert await hourly(session_factory, 1) == [(10, 4)]
+
+    async with session_factory() as session:
+        await ActivityRepository(session).reset(ACTIVITY_ROLLUP)
+        await session.commit()
+    assert await hourly(session_factory, 1) == []
+
+    assert await catch_up(session_factory, 3, 60) == 7
+    assert await hourly(session_factory, 1) == [(10, 4)]
+    assert await hourly(session_factory, 2) == [(10, 3)]
@@ -0,0 +1,114 @@
+"""
+Tests for the request deadlines on SQL statements
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.deadlines import (
+    INTERRUPT_KEY,
+    apply_statement_deadlines,
+    _mysql_before_cursor_execute,
+    _sqlite_before_cursor_execute,
+    _sqlite_handle,
+)
+from database.instrumentation import instrument_queries, track_queries
+from utils.deadline import DeadlineExceeded, deadline_scope
+
+
+# Counts to 10^8, seconds of work for SQLite
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) SELECT count(*) FROM n"
+)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_statement_interrupted_at_deadline():
+    """
+    Test a running SQLite statement is interrupted when the deadline passes
+    """
+    engine = apply_statement_deadlines(create_async_engine("sqlite+aiosqlite:///:memory:"))
+    try:
+        async with engine.connect() as conn:
+            with deadline_scope(0.05), pytest.raises(OperationalError, match="interrupted"):
+                await conn.execute(SLOW_QUERY)
+
+            # The connection is usable afterwards, the interrupt was cancelled
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_statement_after_deadline_is_not_sent():
+    """
+    Test a statement started after the deadline fails before reaching the database
+    """
+    engine = apply_statement_deadlines(create_async_engine("sqlite+aiosqlite:///:memory:"))
+    try:
+        async with engine.connect() as conn:
+            with deadline_scope(0), pytest.raises(DeadlineExceeded):
+                await conn.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+
+
+def test_mysql_selects_get_execution_limit():
+    """
+    Test MySQL SELECTs carry the remaining budget as MAX_EXECUTION_TIME, writes are untouched
+    """
+    with deadline_scope(2.0):
+        select, _ = _mysql_before_cursor_execute(None, None, "SELECT id FROM posts", {}, None, False)
+        update, _ = _mysql_before_cursor_execute(None, None, "UPDATE posts SET id = 1", {}, None, False)
+
+    assert select.startswith("SELECT /*+ MAX_EXECUTION_TIME(")
+    assert select.endswith(" id FROM posts")
+    assert update == "UPDATE posts SET id = 1"
+
+
+def test_mysql_execution_hint_keeps_n_plus_one_detection():
+    """
+    Test repeated SELECTs of a MySQL engine with deadlines keep one shape for the N+1 detector
+
+    Notes:
+        No MySQL server here: the engine's listeners run in the order
+        Connection._cursor_execute runs them
+    """
+    engine = apply_statement_deadlines(create_async_engine("mysql+aiomysql://user@localhost/db"))
+    instrument_queries()
+    dispatch = engine.sync_engine.dispatch
+    conn = SimpleNamespace(info={})
+
+    hints = set()
+    with track_queries(n_plus_one_threshold=3) as stats:
+        for budget in (1.0, 2.0, 3.0):
+            statement, parameters = "SELECT id FROM posts WHERE topico_post_id = %s", (1,)
+            with deadline_scope(budget):
+                for listener in dispatch.before_cursor_execute:
+                    statement, parameters = listener(conn, None, statement, parameters, None, False)
+            hints.add(statement.split("*/")[0])
+            for listener in dispatch.after_cursor_execute:
+                listener(conn, None, statement, parameters, None, False)
+
+    # Every statement sent had a different hint
+    assert len(hints) == 3
+
+    assert stats.count == 3
+    assert stats.repeated == ["SELECT id FROM posts WHERE topico_post_id = %s"]
+    assert stats.slowest_statement == "SELECT id FROM posts WHERE topico_post_id = %s"
+
+
+def test_sqlite_interrupt_degrades_without_driver_handle():
+    """
+    Test a driver without the private sqlite3 handle only gets the check before the statement
+    """
+    conn = SimpleNamespace(info={}, connection=SimpleNamespace(driver_connection=SimpleNamespace()))
+
+    assert _sqlite_handle(conn) is None
+    with deadline_scope(2.0):
+        _sqlite_before_cursor_execute(conn)
+    assert INTERRUPT_KEY not in conn.info
@@ -0,0 +1,98 @@
+"""
+Tests for the SQL instrumentation
+"""
+
+import pytest
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.instrumentation import (
+    NPlusOneError,
+    allow_repeated_queries,
+    instrument_queries,
+    track_queries,
+)
+
+
+@pytest.fixture
+async def engine():
+    """
+    In-memory engine with the query hooks installed
+    """
+    instrument_queries()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    yield engine
+    await engine.dispose()
+
+
+class TestTrackQueries:
+    """
+    Tests for track_queries
+    """
+
+    @pytest.mark.asyncio
+    async def test_counts_time_and_slowest(self, engine):
+        """Test count, total time and slowest statement are recorded"""
+        with track_queries() as stats:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+
+        assert stats.count == 2
+        assert stats.total_time >= stats.slowest_time > 0
+        assert stats.slowest_statement in ("SELECT 1", "SELECT 2")
+
+    @pytest.mark.asyncio
+    async def test_outside_scope_not_recorded(self, engine):
+        """Test statements after the scope are not recorded"""
+        with track_queries() as stats:
+            pass
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        assert stats.count == 0
+
+    @pytest.mark.asyncio
+    async def test_nested_scopes(self, engine):
+        """Test every active scope records the statement"""
+        with track_queries() as outer:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                with track_queries() as inner:
+                    await conn.execute(text("SELECT 2"))
+
+        assert outer.count == 2
+        assert inner.count == 1
+
+    @pytest.mark.asyncio
+    async def test_n_plus_one_flagged(self, engine):
+        """Test repeated statement shapes are flagged once"""
+        with track_queries(n_plus_one_threshold=2) as stats:
+            async with engine.connect() as conn:
+                for value in range(3):
+                    await conn.execute(text("SELECT :value"), {"value": value})
+
+        assert stats.repeated == ["SELECT ?"]
+
+    @pytest.mark.asyncio
+    async def test_n_plus_one_raises(self, engine):
+        """Test the detector can fail the caller"""
+        with pytest.raises(NPlusOneError):
+            with track_queries(n_plus_one_threshold=2, raise_on_n_plus_one=True):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT 1"))
+
+    @pytest.mark.asyncio
+    async def test_allowed_repeats_are_counted_not_flagged(self, engine):
+        """Test intentional batches do not trigger the detector"""
+        with track_queries(n_plus_one_threshold=2, raise_on_n_plus_one=True) as stats:
+            async with engine.connect() as conn:
+                with allow_repeated_queries():
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT 1"))
+
+        assert stats.count == 2
+        assert not stats.repeated
@@ -0,0 +1,59 @@
+"""
+Tests for the schema revision check
+"""
+
+import os
+
+import pytest
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from database.migrations import SCHEMA_REVISION, SchemaRevisionError, bootstrap_schema, check_schema_revision
+from database.models import SQLModel
+
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "alembic")
+
+
+def test_schema_revision_is_alembic_head():
+    """Test the revision checked at startup is the head of the migrations"""
+    assert ScriptDirectory(ALEMBIC_DIR).get_heads() == [SCHEMA_REVISION]
+
+
+def _engine(revision=None):
+    engine = create_engine("sqlite://")
+    if revision is not None:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            conn.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+    return engine
+
+
+def test_check_passes_at_head():
+    """Test a database at the expected revision starts"""
+    with _engine(SCHEMA_REVISION).connect() as conn:
+        check_schema_revision(conn)
+
+
+@pytest.mark.parametrize("revision", [None, "66d59931ffb5"])
+def test_check_fails_fast(revision):
+    """Test a database without migrations or behind the code does not start"""
+    with _engine(revision).connect() as conn:
+        with pytest.raises(SchemaRevisionError, match="alembic upgrade head"):
+            check_schema_revision(conn)
+
+
+def test_bootstrap_creates_schema_at_head():
+    """Test a new database gets every table and the head revision, once"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        bootstrap_schema(conn, SQLModel.metadata)
+
+    with engine.connect() as conn:
+        check_schema_revision(conn)
+        assert set(SQLModel.metadata.tables) <= set(inspect(conn).get_table_names())
+
+    with engine.begin() as conn:
+        with pytest.raises(SchemaRevisionError, match="alembic upgrade head"):
+            bootstrap_schema(conn, SQLModel.metadata)
@@ -0,0 +1,95 @@
+"""
+Tests for the read replica routing
+"""
+
+import pytest
+
+from database.replicas import LEAST_LOAD, ROUND_ROBIN, ReplicaSet, is_pinned, primary_pin
+
+
+SECRET = b"test-secret"
+
+
+class FakeSession:
+    """
+    Async context manager standing for a session
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+
+def fake_sessionmaker(name: str):
+    """
+    Sessionmaker of FakeSession
+    """
+    return lambda: FakeSession(name)
+
+
+class TestReplicaSet:
+    """
+    Tests for ReplicaSet
+    """
+
+    def test_round_robin(self):
+        """Test replicas are picked in turn"""
+        replicas = ReplicaSet([fake_sessionmaker("a"), fake_sessionmaker("b")], ROUND_ROBIN)
+
+        assert [replicas.pick() for _ in range(4)] == [0, 1, 0, 1]
+
+    @pytest.mark.asyncio
+    async def test_least_load_skips_busy_replica(self):
+        """Test the replica with fewer open sessions is picked"""
+        replicas = ReplicaSet([fake_sessionmaker("a"), fake_sessionmaker("b")], LEAST_LOAD)
+
+        async with replicas.session() as first:
+            async with replicas.session() as second:
+                assert {first.name, second.name} == {"a", "b"}
+                assert replicas.in_flight == [1, 1]
+
+            async with replicas.session() as third:
+                assert third.name == second.name
+
+        assert replicas.in_flight == [0, 0]
+
+    def test_requires_replicas_and_known_strategy(self):
+        """Test invalid configurations are rejected"""
+        with pytest.raises(ValueError):
+            ReplicaSet([])
+
+        with pytest.raises(ValueError):
+            ReplicaSet([fake_sessionmaker("a")], "random")
+
+
+class TestPrimaryPin:
+    """
+    Tests for the read-your-writes pin
+    """
+
+    def test_fresh_pin_is_valid(self):
+        """Test a pin set after a write routes to the primary"""
+        assert is_pinned(primary_pin(5, SECRET), 5, SECRET)
+
+    def test_expired_missing_or_invalid_pin(self):
+        """Test expired, missing and malformed pins are ignored"""
+        assert not is_pinned(primary_pin(-1, SECRET), 5, SECRET)
+        assert not is_pinned(None, 5, SECRET)
+        assert not is_pinned("not-a-time", 5, SECRET)
+
+    def test_pin_longer_than_allowed_is_ignored(self):
+        """Test clients cannot pin themselves for longer than a write does"""
+        assert not is_pinned(primary_pin(3600, SECRET), 5, SECRET)
+
+    def test_unsigned_or_tampered_pin_is_ignored(self):
+        """Test clients cannot forge a pin"""
+        until, _, signature = primary_pin(5, SECRET).partition(".")
+
+        assert not is_pinned(until, 5, SECRET)
+        assert not is_pinned(f"{int(until) + 1000}.{signature}", 5, SECRET)
+        assert not is_pinned(primary_pin(5, b"other-secret"), 5, SECRET)
@@ -0,0 +1,80 @@
+"""
+Tests for the token revocations shared by the workers
+"""
+
+import time
+
+import jwt
+import pytest
+import sqlmodel
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.repositories import RevocationRepository
+from database.revocations import sync_revocations
+from utils.security import SecurityHandler
+from utils.tokens import REVOKED_TOKEN, REVOKED_USER, RevocationList
+
+
+SECRET = "test-secret-key-with-minimum-32-bytes!"
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """
+    SQLite file with the schema
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'revocations.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_logout_reaches_other_workers_and_restarts(session_factory):
+    """
+    Test a token revoked by one worker is rejected by another after a sync, and by a new one at startup
+    """
+    first = SecurityHandler(SECRET, revocations=RevocationList(100))
+    second = SecurityHandler(SECRET, revocations=RevocationList(100))
+    token = first.encode_payload({"sub": "user"}, 60)
+    assert second.decode_payload(token)["sub"] == "user"
+
+    digest, expires_at = first.revoke_token(token)
+    async with session_factory() as session:
+        await RevocationRepository(session).add(REVOKED_TOKEN, int(time.time()), {digest: expires_at})
+        await session.commit()
+
+    assert await sync_revocations(second.revocations, session_factory) == 1
+    with pytest.raises(jwt.InvalidTokenError):
+        second.decode_payload(token)
+
+    restarted = SecurityHandler(SECRET, revocations=RevocationList(100))
+    await sync_revocations(restarted.revocations, session_factory)
+    with pytest.raises(jwt.InvalidTokenError):
+        restarted.decode_payload(token)
+
+
+async def test_sync_reads_new_and_recent_rows_and_deletes_expired(session_factory):
+    """
+    Test later syncs read the rows after the last id and the expired rows are deleted
+    """
+    now = int(time.time())
+    revocations = RevocationList(100)
+    async with session_factory() as session:
+        repo = RevocationRepository(session)
+        await repo.add(REVOKED_USER, now - 1000, {"old": now - 10})
+        await repo.add(REVOKED_USER, now, {"user": now + 60})
+        await session.commit()
+
+    assert await sync_revocations(revocations, session_factory) == 1
+    assert revocations.is_revoked(b"a" * 32, {"sub": "user", "iat": now - 1})
+
+    async with session_factory() as session:
+        repo = RevocationRepository(session)
+        await repo.add(REVOKED_USER, now, {"other": now + 60})
+        await session.commit()
+        assert await sync_revocations(revocations, session_factory) == 1
+        assert [row.key for row in await repo.list_after(0, now - 100, 10)] == ["user", "other"]
@@ -0,0 +1,81 @@
+"""
+Tests for the trending scores snapshot
+"""
+
+import pytest
+import sqlmodel
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.models import TopicModel, UserModel
+from database.repositories import TrendingRepository
+from database.trending import sync_trending_index
+from utils.trending import TrendingIndex
+
+
+HOUR = 3600.0
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """
+    SQLite file with three topics
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'trending.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+        await conn.execute(insert(UserModel.__table__).values(
+            id=1, nome="User", email="user@example.com", uuid="uuid", telefone="11999999999", senha="-",
+        ))
+        await conn.execute(insert(TopicModel.__table__), [
+            {"id": topic_id, "titulo": f"Topic {topic_id}", "descricao": "-", "quantidade_posts": 0, "criado_por_id": 1}
+            for topic_id in (1, 2, 3)
+        ])
+
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_add_scores(session_factory):
+    """
+    Test increments of the same landmark add up and older rows are rescaled
+    """
+    async with session_factory() as session:
+        repo = TrendingRepository(session)
+        await repo.add_scores(0, {1: 1.0, 2: 4.0}, HOUR)
+        await repo.add_scores(0, {1: 2.0}, HOUR)
+        await repo.add_scores(int(2 * HOUR), {2: 1.0}, HOUR)
+        await session.commit()
+
+        assert [(row.topic_id, row.score) for row in await repo.list_scores(0, 10)] == [(1, 3.0)]
+        assert [(row.topic_id, row.score) for row in await repo.list_scores(int(2 * HOUR), 10)] == [(2, 2.0)]
+
+        await repo.delete_before(int(2 * HOUR))
+        assert await repo.list_scores(0, 10) == []
+
+
+async def test_sync_shares_scores_between_workers(session_factory):
+    """
+    Test two workers see each other's events after a sync, without counting them twice
+    """
+    first, second = TrendingIndex(half_life=HOUR), TrendingIndex(half_life=HOUR)
+    first.record(1)
+    first.record(1)
+    second.record(2)
+    second.record(2)
+    second.record(2)
+
+    await sync_trending_index(first, session_factory)
+    await sync_trending_index(second, session_factory)
+    await sync_trending_index(first, session_factory)
+
+    for index in (first, second):
+        assert [topic_id for topic_id, _ in index.top(10)] == [2, 1]
+        assert dict(index.top(10))[2] == pytest.approx(3, rel=1e-3)
+
+    # A new worker restores the snapshot at startup
+    restored = TrendingIndex(half_life=HOUR)
+    await sync_trending_index(restored, session_factory)
+    assert dict(restored.top(10)) == pytest.approx(dict(first.top(10)), rel=1e-3)
@@ -0,0 +1,74 @@
+"""
+Tests for the listing versions used in the HTTP cache validators
+"""
+
+import pytest
+import sqlmodel
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.models import PostModel, TopicModel, UserModel
+from database.repositories import PostRepository, TopicRepository
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """
+    SQLite file with one topic and one post
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'versions.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlmodel.SQLModel.metadata.create_all)
+        await conn.execute(insert(UserModel.__table__).values(
+            id=1, nome="User", email="user@example.com", uuid="uuid", telefone="11999999999", senha="-",
+        ))
+        await conn.execute(insert(TopicModel.__table__).values(
+            id=1, titulo="Topic", descricao="-", quantidade_posts=1, criado_por_id=1,
+        ))
+        await conn.execute(insert(PostModel.__table__).values(
+            id=1, titulo="Post", descricao="-", usuario_id=1, topico_post_id=1,
+            gostei_contador=0, resposta_contador=0,
+        ))
+
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_post_version_changes_on_every_update(session_factory):
+    """
+    Test updates within the same second still give a new posts listing version
+    """
+    tokens = []
+    for _ in range(3):
+        async with session_factory() as session:
+            repository = PostRepository(session)
+            tokens.append((await repository.get_topic_version(1)).token())
+            await repository.increment_reply_count(1, 1)
+            await session.commit()
+
+    assert len(set(tokens)) == 3
+
+    async with session_factory() as session:
+        version = await PostRepository(session).get_topic_version(1)
+    assert version.token() == "1:3"
+
+
+async def test_topic_version_changes_on_every_update(session_factory):
+    """
+    Test updates within the same second still give a new topics listing version
+    """
+    async with session_factory() as session:
+        repository = TopicRepository(session)
+        before = await repository.get_version()
+        await repository.increment_post_count(1, 1)
+        await session.commit()
+
+    async with session_factory() as session:
+        after = await TopicRepository(session).get_version()
+
+    assert before.revision == 0
+    assert after.revision == 1
+    assert after.last_id == before.last_id
+    assert after.token() != before.token()
@@ -0,0 +1,43 @@
+"""
+Tests for app-scoped services dependency
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.api.dependencies.services import AppServices, get_controller
+from src.api.controllers.topics.handlers import PostsController
+from src.integrations.blob_storage import BlobStorageFactory, StorageProviders
+from tests.unit.mock import MockBlobStorage
+
+
+class TestAppServices:
+    """
+    Tests for AppServices and get_controller
+    """
+
+    @pytest.fixture
+    def services(self):
+        factory = BlobStorageFactory()
+        factory.register(StorageProviders.SUPABASE, MockBlobStorage())
+        return AppServices(factory)
+
+    def test_adapter_created_once(self, services):
+        """Test every controller shares the adapter of the app"""
+        first = PostsController(MagicMock(), services)
+        second = PostsController(MagicMock(), services)
+
+        assert first.blob_service.storage_provider is services.blob_storage
+        assert second.blob_service.storage_provider is services.blob_storage
+        assert first.blob_service.provider_name == StorageProviders.SUPABASE.value
+
+    @pytest.mark.asyncio
+    async def test_repositories_built_on_use(self, services):
+        """Test the controller builds only the repositories it uses, bound to its session"""
+        session = MagicMock()
+        controller = await get_controller(PostsController)(session=session, services=services)
+
+        assert "post_repo" not in vars(controller)
+        assert controller.post_service.post_repository is controller.post_repo
+        assert controller.post_repo.session is session
+        assert "blob_repo" not in vars(controller)
@@ -6,9 +6,11 @@ import pytest
 
 from src.domain.services.users import LoginService
 from src.domain.exceptions import SecurityError
+from src.utils.passwords import PasswordHasher
+from setup import password_hasher
 
 
-from ...mock import MockUserRepository
+from ...mock import MockRevocationRepository, MockUserRepository
 from ...mock.mock_users import NOT_EXISTENT_EMAIL, USER_PASSWORD
 
 
@@ -18,7 +20,7 @@ async def test_login_not_existent_user(mock_user_repo: MockUserRepository):
     """
     Test login not existent user
     """
-    service = LoginService(mock_user_repo)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
     with pytest.raises(SecurityError):
         await service.login(NOT_EXISTENT_EMAIL, "password")
 
@@ -28,7 +30,7 @@ async def test_login_user(mock_user_repo: MockUserRepository):
     """
     Test login user
     """
-    service = LoginService(mock_user_repo)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
     user = await service.login("email@existent-mock", USER_PASSWORD)
     assert user
 
@@ -38,6 +40,46 @@ async def test_login_with_invalid_password(mock_user_repo: MockUserRepository):
     """
     Test login with invalid password
     """
-    service = LoginService(mock_user_repo)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
     with pytest.raises(SecurityError):
         await service.login("email@existent-mock", "invalid-password")
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_legacy_password(mock_user_repo: MockUserRepository, monkeypatch):
+    """
+    Test a legacy SHA-256 hash is replaced by a scrypt hash on login
+    """
+    updated = []
+
+    async def update_user(user):
+        updated.append(user)
+        return user
+
+    monkeypatch.setattr(mock_user_repo, "update_user", update_user)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
+    await service.login("email@existent-mock", USER_PASSWORD)
+
+    assert len(updated) == 1
+    new_hash = updated[0].get_password_hash()
+    assert new_hash.startswith("scrypt$")
+    assert PasswordHasher().verify_sync(USER_PASSWORD, new_hash)
+
+
+@pytest.mark.asyncio
+async def test_login_not_existent_user_checks_dummy_hash(mock_user_repo: MockUserRepository, monkeypatch):
+    """
+    Test an unknown email still pays for a password check (no timing oracle)
+    """
+    checked = []
+
+    async def verify_dummy(password):
+        checked.append(password)
+        return False
+
+    monkeypatch.setattr(password_hasher, "verify_dummy", verify_dummy)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
+    with pytest.raises(SecurityError):
+        await service.login(NOT_EXISTENT_EMAIL, "password")
+
+    assert checked == ["password"]
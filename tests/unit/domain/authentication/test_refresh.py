@@ -9,7 +9,7 @@ from src.domain.services.users.login_services import UserToken
 from src.domain.exceptions import SecurityError
 
 
-from ...mock import MockUserRepository
+from ...mock import MockRevocationRepository, MockUserRepository
 
 
 @pytest.mark.asyncio
@@ -17,7 +17,7 @@ async def test_refresh_with_invalid_token(mock_user_repo: MockUserRepository):
     """
     Test refresh with invalid token
     """
-    service = LoginService(mock_user_repo)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
     with pytest.raises(SecurityError):
         await service.refresh_token("invalid-token")
 
@@ -30,6 +30,6 @@ async def test_refresh_with_valid_token(
     """
     Test refresh with valid token
     """
-    service = LoginService(mock_user_repo)
+    service = LoginService(mock_user_repo, MockRevocationRepository())
     tokens = await service.refresh_token(get_jwt_tokens["refresh_token"])
     assert tokens
@@ -8,7 +8,7 @@ from src.domain.services.users import RegisterService
 from src.domain.exceptions import DuplicateException
 from src.domain.entities.user import UserEntity
 
-from ...mock import MockUserRepository
+from ...mock import MockRevocationRepository, MockUserRepository
 from ...mock.mock_users import NOT_EXISTENT_EMAIL
 
 
@@ -20,7 +20,7 @@ async def test_create_valid_user(
     """
     Test create user
     """
-    service = RegisterService(mock_user_repo)
+    service = RegisterService(mock_user_repo, MockRevocationRepository())
     user = await service.create_new_user(mock_user_not_existent)
     assert user.email == NOT_EXISTENT_EMAIL
 
@@ -33,6 +33,21 @@ async def test_create_user_already_exists(
     """
     Test create user
     """
-    service = RegisterService(mock_user_repo)
+    service = RegisterService(mock_user_repo, MockRevocationRepository())
     with pytest.raises(DuplicateException):
         await service.create_new_user(mock_existent_user_entity)
+
+
+@pytest.mark.asyncio
+async def test_update_password_revokes_issued_tokens(
+    mock_user_repo: MockUserRepository,
+    mock_existent_user_entity: UserEntity,
+):
+    """
+    Test a password change persists the revocation of the user's tokens
+    """
+    revocations = MockRevocationRepository()
+    service = RegisterService(mock_user_repo, revocations)
+    await service.update_user_password(mock_existent_user_entity, "NewStrong123!")
+
+    assert [(row.kind, row.key) for row in revocations.revocations] == [("usuario", mock_existent_user_entity.uuid)]
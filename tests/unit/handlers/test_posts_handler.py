@@ -5,7 +5,7 @@ Tests for posts handler
 import pytest
 from io import BytesIO
 from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from fastapi import HTTPException, UploadFile
 
 from src.api.controllers.topics.handlers.posts_handler import PostsController
@@ -66,21 +66,15 @@ class TestPostsController:
         """
         Create a controller with mocked dependencies
         """
-        with patch('src.api.controllers.topics.handlers.posts_handler.storage_blob') as mock_storage, \
-             patch('src.api.controllers.topics.handlers.posts_handler.BlobStorageAdapter') as mock_adapter:
-
-            mock_storage.get.return_value = MagicMock()
-            mock_adapter.return_value = mock_blob_provider
-
-            controller = PostsController.__new__(PostsController)
-            controller.post_repo = mock_post_repo
-            controller.blob_repo = mock_blob_repo
-            controller.user_repo = mock_user_repo
-            controller.topic_repo = mock_topic_repo
-            controller.post_service = MagicMock()
-            controller.blob_service = MagicMock()
-
-            return controller
+        controller = PostsController.__new__(PostsController)
+        controller.post_repo = mock_post_repo
+        controller.blob_repo = mock_blob_repo
+        controller.user_repo = mock_user_repo
+        controller.topic_repo = mock_topic_repo
+        controller.post_service = MagicMock()
+        controller.blob_service = MagicMock()
+
+        return controller
 
     # Test _get_user_id
     @pytest.mark.asyncio
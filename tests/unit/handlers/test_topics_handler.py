@@ -5,7 +5,7 @@ Tests for topics handler
 import pytest
 from io import BytesIO
 from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from fastapi import HTTPException, UploadFile
 
 from src.api.controllers.topics.handlers.topics_handler import TopicsController
@@ -62,20 +62,14 @@ class TestTopicsController:
         """
         Create a controller with mocked dependencies
         """
-        with patch('src.api.controllers.topics.handlers.topics_handler.storage_blob') as mock_storage, \
-             patch('src.api.controllers.topics.handlers.topics_handler.BlobStorageAdapter') as mock_adapter:
-
-            mock_storage.get.return_value = MagicMock()
-            mock_adapter.return_value = mock_blob_provider
-
-            controller = TopicsController.__new__(TopicsController)
-            controller.topic_repo = mock_topic_repo
-            controller.blob_repo = mock_blob_repo
-            controller.user_repo = mock_user_repo
-            controller.topic_service = MagicMock()
-            controller.blob_service = MagicMock()
-
-            return controller
+        controller = TopicsController.__new__(TopicsController)
+        controller.topic_repo = mock_topic_repo
+        controller.blob_repo = mock_blob_repo
+        controller.user_repo = mock_user_repo
+        controller.topic_service = MagicMock()
+        controller.blob_service = MagicMock()
+
+        return controller
 
     # Test _get_user_id
     @pytest.mark.asyncio
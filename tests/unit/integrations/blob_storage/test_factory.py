@@ -63,3 +63,21 @@ def test_override_registered_provider():
     factory.register(StorageProviders.SUPABASE, mock_storage2)
 
     assert factory.get(StorageProviders.SUPABASE) is mock_storage2
+
+
+def test_lazy_provider_created_on_first_get():
+    """
+    Test a lazily registered provider is created once, when first requested
+    """
+    factory = BlobStorageFactory()
+    created = []
+
+    def build():
+        created.append(MockBlobStorage())
+        return created[-1]
+
+    factory.register_lazy(StorageProviders.SUPABASE, build)
+    assert not created
+
+    assert factory.get(StorageProviders.SUPABASE) is factory.get(StorageProviders.SUPABASE)
+    assert len(created) == 1
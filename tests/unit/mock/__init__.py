@@ -6,6 +6,7 @@ from .mock_users import MockUserRepository
 from .mock_blob_storage import MockBlobStorage, MockBlobStorageProvider
 from .mock_config import MockConfig
 from .mock_topics import MockTopicRepository, MockPostRepository, MockBlobRepository
+from .mock_revocations import MockRevocationRepository
 
 
 __all__ = [
@@ -16,4 +17,5 @@ __all__ = [
     "MockTopicRepository",
     "MockPostRepository",
     "MockBlobRepository",
+    "MockRevocationRepository",
 ]
@@ -15,10 +15,29 @@ class MockConfig:
         self.API_TITLE = "Test API"
         self.API_DESCRIPTION = "Test API Description"
 
+        # Production server (src/server.py)
+        self.SERVER_WORKERS = 1
+        self.SERVER_MAX_REQUESTS = 0
+        self.SERVER_MAX_REQUESTS_JITTER = 0
+        self.SERVER_MAX_RSS_MB = 0
+        self.SERVER_GRACEFUL_TIMEOUT = 10.0
+
         # JWT Config - use a proper length key for tests
         self.JWT_SECRET_KEY = "test-secret-key-with-minimum-32-bytes!"
         self.JWT_ACCESS_TOKEN_EXPIRES = 3600
         self.JWT_REFRESH_TOKEN_EXPIRES = 86400
+        self.JWT_CACHE_SIZE = 10000
+        self.JWT_REVOCATION_CAPACITY = 100000
+        self.JWT_REVOCATION_SYNC_SECONDS = 0
+
+        # Password hashing
+        self.PASSWORD_HASH_N = 1024
+        self.PASSWORD_HASH_WORKERS = 2
+        self.PASSWORD_HASH_QUEUE = 64
+        self.PASSWORD_HASH_QUEUE_TIMEOUT = 5.0
+        self.PASSWORD_HASH_CALIBRATE = 0
+        self.PASSWORD_HASH_TARGET_SECONDS = 0.1
+        self.PASSWORD_HASH_MAX_MEMORY_MB = 64
 
         # Logger Config
         self.LOG_FILE_ACTIVE = 0
@@ -27,10 +46,125 @@ class MockConfig:
         self.SUPABASE_URL = "https://mock-supabase.example.com"
         self.SUPABASE_KEY = "mock-supabase-key"
         self.SUPABASE_STORAGE_NAME = "mock-storage"
+        self.SUPABASE_TIMEOUT = 30.0
 
         # Database (in-memory SQLite for tests)
         self.DATABASE_SQLITE_PATH = "sqlite+aiosqlite:///:memory:"
 
+        # Schema at startup
+        self.DATABASE_SCHEMA_CHECK = "create_all"
+        self.OPENAPI_SCHEMA_PATH = None
+
+        # Read replicas
+        self.DATABASE_REPLICA_PATHS = []
+        self.DATABASE_REPLICA_STRATEGY = "round_robin"
+        self.DATABASE_PRIMARY_PIN_SECONDS = 5.0
+
+        # SQLite profile (WAL pragmas, single writer and reader pool; SQLite files only)
+        self.SQLITE_PRAGMAS_ENABLED = 1
+        self.SQLITE_BUSY_TIMEOUT_MS = 5000
+        self.SQLITE_CACHE_SIZE_KB = 65536
+        self.SQLITE_MMAP_SIZE = 268435456
+        self.SQLITE_SINGLE_WRITER = 1
+        self.SQLITE_READER_POOL_SIZE = 4
+        self.SQLITE_WRITER_TIMEOUT = 30.0
+
+        # HTTP cache
+        self.HTTP_CACHE_MAX_AGE = 60
+
+        # Public response cache
+        self.RESPONSE_CACHE_TTL = 5
+        self.RESPONSE_CACHE_STALE_TTL = 30
+        self.RESPONSE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+        # Response compression
+        self.COMPRESSION_MINIMUM_SIZE = 500
+        self.COMPRESSION_GZIP_LEVEL = 6
+        self.COMPRESSION_BROTLI_QUALITY = 4
+
+        # Server-Sent Events
+        self.STREAM_QUEUE_SIZE = 100
+        self.STREAM_HEARTBEAT_INTERVAL = 15
+        self.STREAM_RESUME_BATCH_SIZE = 100
+
+        # Topic export (posts per cursor chunk)
+        self.EXPORT_CHUNK_SIZE = 1000
+
+        # Metrics (/metrics endpoint and middleware)
+        self.METRICS_ENABLED = 1
+        self.METRICS_FLUSH_SECONDS = 0
+
+        # SQL instrumentation
+        self.SQL_DEBUG_HEADER = 1
+        self.SQL_N_PLUS_ONE_THRESHOLD = 2
+        self.SQL_N_PLUS_ONE_RAISE = 1
+        self.SQL_SLOW_REQUEST_DB_TIME = 0.5
+
+        # Tracing
+        self.TRACING_ENABLED = 1
+        self.TRACING_SERVICE_NAME = "fishing-dock-api"
+        self.TRACING_SAMPLE_RATIO = 1.0
+        self.TRACING_EXPORTER = "memory"
+        self.TRACING_FILE_PATH = "logs/traces.jsonl"
+        self.TRACING_OTLP_ENDPOINT = None
+        self.TRACING_QUEUE_SIZE = 2048
+        self.TRACING_BATCH_SIZE = 512
+        self.TRACING_FLUSH_INTERVAL = 5
+
+        # Server-Timing header
+        self.SERVER_TIMING_ENABLED = 1
+
+        # Request profiler
+        self.PROFILER_ENABLED = 1
+        self.PROFILER_TOKEN = "test-profiler-token"
+        self.PROFILER_SLOW_REQUEST_THRESHOLD = 5.0
+        self.PROFILER_INTERVAL = 0.005
+        self.PROFILER_MAX_PROFILES = 20
+        self.PROFILER_OUTPUT_DIR = None
+
+        # Rate limiting
+        self.RATE_LIMIT_ENABLED = 0
+        self.RATE_LIMIT_BACKEND = "memory"
+        self.RATE_LIMIT_SHARDS = 16
+        self.RATE_LIMIT_MAX_KEYS = 100_000
+        self.RATE_LIMIT_MEDIA_USER_PER_MINUTE = 30
+        self.RATE_LIMIT_MEDIA_USER_BURST = 10
+        self.RATE_LIMIT_MEDIA_IP_PER_MINUTE = 120
+        self.RATE_LIMIT_MEDIA_IP_BURST = 30
+        self.RATE_LIMIT_REGISTER_IP_PER_MINUTE = 5
+        self.RATE_LIMIT_REGISTER_IP_BURST = 5
+
+        # Admission control
+        self.ADMISSION_ENABLED = 0
+        self.ADMISSION_READ_LIMIT = 64
+        self.ADMISSION_READ_QUEUE = 128
+        self.ADMISSION_READ_QUEUE_TIMEOUT = 0.5
+        self.ADMISSION_READ_TARGET_LATENCY = 0.5
+        self.ADMISSION_WRITE_LIMIT = 16
+        self.ADMISSION_WRITE_QUEUE = 32
+        self.ADMISSION_WRITE_QUEUE_TIMEOUT = 2.0
+        self.ADMISSION_WRITE_TARGET_LATENCY = 1.0
+        self.ADMISSION_MEDIA_LIMIT = 4
+        self.ADMISSION_MEDIA_QUEUE = 8
+        self.ADMISSION_MEDIA_QUEUE_TIMEOUT = 5.0
+        self.ADMISSION_MEDIA_TARGET_LATENCY = 2.0
+
+        # Request deadlines
+        self.DEADLINE_ENABLED = 1
+        self.DEADLINE_DEFAULT_SECONDS = 30.0
+        self.DEADLINE_MEDIA_SECONDS = 60.0
+        self.DEADLINE_COMPENSATION_SECONDS = 10.0
+
+        # Trending topics
+        self.TRENDING_HALF_LIFE_HOURS = 6.0
+        self.TRENDING_MAX_TOPICS = 1000
+        self.TRENDING_SYNC_SECONDS = 0
+
+        # Topic activity rollup
+        self.ACTIVITY_ROLLUP_INTERVAL_SECONDS = 0
+        self.ACTIVITY_ROLLUP_BATCH_SIZE = 1000
+        self.ACTIVITY_ROLLUP_LAG_SECONDS = 60.0
+
     def setup_loguru(self):
         """
         No-op for testing
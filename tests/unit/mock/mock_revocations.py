@@ -0,0 +1,50 @@
+"""
+Mock token revocations reference
+"""
+
+from typing import Dict, List
+
+from src.domain.repositories.revocation import IRevocationRepository
+from src.domain.entities.revocation import TokenRevocationEntity
+
+
+class MockRevocationRepository(IRevocationRepository):
+    """
+    Mock token revocations repository (kept in a list)
+    """
+
+    def __init__(self):
+        self.revocations: List[TokenRevocationEntity] = []
+
+    async def add(self, kind: str, revoked_at: int, expirations: Dict[str, int]) -> None:
+        """
+        Persist revocations
+        """
+        for key, expires_at in expirations.items():
+            self.revocations.append(
+                TokenRevocationEntity(
+                    id=len(self.revocations) + 1,
+                    kind=kind,
+                    key=key,
+                    revoked_at=revoked_at,
+                    expires_at=expires_at,
+                )
+            )
+
+    async def list_after(self, after_id: int, now: int, limit: int) -> List[TokenRevocationEntity]:
+        """
+        Revocations added after an id and not expired
+        """
+        return [row for row in self.revocations if row.id > after_id and row.expires_at > now][:limit]
+
+    async def list_recent(self, since: int, now: int) -> List[TokenRevocationEntity]:
+        """
+        Revocations made since a time and not expired
+        """
+        return [row for row in self.revocations if row.revoked_at >= since and row.expires_at > now]
+
+    async def delete_expired(self, now: int) -> None:
+        """
+        Delete the expired revocations
+        """
+        self.revocations = [row for row in self.revocations if row.expires_at > now]
@@ -8,7 +8,16 @@ from typing import Dict, Optional, List
 from src.domain.repositories.topics import ITopicRepository
 from src.domain.repositories.posts import IPostRepository
 from src.domain.repositories.blob import IBlobRepository
-from src.domain.entities import TopicEntity, PostEntity, BlobEntity
+from src.domain.entities import TopicEntity, PostEntity, BlobEntity, ContentVersionEntity
+
+
+class MockSession:
+    """
+    Mock session, only keeps the info dict used by after commit callbacks
+    """
+
+    def __init__(self):
+        self.info: dict = {}
 
 
 class MockTopicRepository(ITopicRepository):
@@ -17,8 +26,10 @@ class MockTopicRepository(ITopicRepository):
     """
 
     def __init__(self):
+        self.session = MockSession()
         self._topics: Dict[int, TopicEntity] = {}
         self._counter = 1
+        self._revision = 0
 
     async def create(self, topic: TopicEntity) -> TopicEntity:
         """
@@ -35,6 +46,7 @@ class MockTopicRepository(ITopicRepository):
         """
         if topic.id in self._topics:
             self._topics[topic.id] = topic
+            self._revision += 1
         return topic
 
     async def get_by_id(self, topic_id: int) -> TopicEntity:
@@ -43,12 +55,19 @@ class MockTopicRepository(ITopicRepository):
         """
         return self._topics.get(topic_id)
 
+    async def get_by_ids(self, topic_ids: List[int]) -> List[TopicEntity]:
+        """
+        Get topics by id
+        """
+        return [self._topics[topic_id] for topic_id in topic_ids if topic_id in self._topics]
+
     async def increment_post_count(self, topic_id: int, quantity: int) -> None:
         """
         Increment post count for a topic
         """
         if topic_id in self._topics:
             self._topics[topic_id].qtd_posts += quantity
+            self._revision += 1
 
     async def search(
         self,
@@ -82,6 +101,19 @@ class MockTopicRepository(ITopicRepository):
 
         return topics, total_count
 
+    async def get_version(self) -> ContentVersionEntity:
+        """
+        Get the current version of the topics listing
+        """
+        if not self._topics:
+            return ContentVersionEntity(last_id=None, last_modified=None)
+
+        return ContentVersionEntity(
+            last_id=max(self._topics),
+            last_modified=max(t.updated_at or t.created_at for t in self._topics.values()),
+            revision=self._revision,
+        )
+
 
 class MockPostRepository(IPostRepository):
     """
@@ -89,8 +121,10 @@ class MockPostRepository(IPostRepository):
     """
 
     def __init__(self):
+        self.session = MockSession()
         self._posts: Dict[int, PostEntity] = {}
         self._counter = 1
+        self._revisions: Dict[int, int] = {}
 
     async def create(self, topic_id: int, user_id: int, post: PostEntity) -> PostEntity:
         """
@@ -109,6 +143,7 @@ class MockPostRepository(IPostRepository):
         """
         if post.id in self._posts:
             self._posts[post.id] = post
+            self._bump(post.id)
         return post
 
     async def get_by_id(self, post_id: int) -> PostEntity:
@@ -123,6 +158,7 @@ class MockPostRepository(IPostRepository):
         """
         if post_id in self._posts:
             self._posts[post_id].reply_count += quantity
+            self._bump(post_id)
 
     async def add_appends(self, post_id: int, blobs: List[BlobEntity]) -> None:
         """
@@ -133,6 +169,21 @@ class MockPostRepository(IPostRepository):
             if post.post_apppends is None:
                 post.post_apppends = []
             post.post_apppends.extend(blobs)
+            await self.touch(post_id)
+
+    async def touch(self, post_id: int) -> None:
+        """
+        Mark a post as updated
+        """
+        if post_id in self._posts:
+            self._posts[post_id].updated_at = datetime.now()
+            self._bump(post_id)
+
+    def _bump(self, post_id: int) -> None:
+        """
+        Increment the version of a post, like the database does on UPDATE
+        """
+        self._revisions[post_id] = self._revisions.get(post_id, 0) + 1
 
     async def search(
         self,
@@ -168,6 +219,51 @@ class MockPostRepository(IPostRepository):
 
         return posts, total_count
 
+    async def list_after(self, topic_id: int, after_id: int, limit: int) -> List[PostEntity]:
+        """
+        List posts of a topic created after the given post id
+        """
+        posts = sorted(
+            (p for p in self._posts.values() if p.topic_post_id == topic_id and p.id > after_id),
+            key=lambda p: p.id,
+        )
+        return posts[:limit]
+
+    async def stream_by_topic(self, topic_id: int, chunk_size: int):
+        """
+        Stream every post of a topic in chunks
+        """
+        posts = sorted(
+            (p for p in self._posts.values() if p.topic_post_id == topic_id),
+            key=lambda p: p.id,
+        )
+        for start in range(0, len(posts), chunk_size):
+            yield posts[start:start + chunk_size]
+
+    async def get_appends(self, post_ids: List[int]) -> Dict[int, List[BlobEntity]]:
+        """
+        Get the attachments of several posts
+        """
+        return {
+            post_id: self._posts[post_id].post_apppends
+            for post_id in post_ids
+            if post_id in self._posts and self._posts[post_id].post_apppends
+        }
+
+    async def get_topic_version(self, topic_id: int) -> ContentVersionEntity:
+        """
+        Get the current version of the posts listing of a topic
+        """
+        posts = [p for p in self._posts.values() if p.topic_post_id == topic_id]
+        if not posts:
+            return ContentVersionEntity(last_id=None, last_modified=None)
+
+        return ContentVersionEntity(
+            last_id=max(p.id for p in posts),
+            last_modified=max((p.updated_at for p in posts if p.updated_at), default=None),
+            revision=sum(self._revisions.get(p.id, 0) for p in posts),
+        )
+
 
 class MockBlobRepository(IBlobRepository):
     """
@@ -4,6 +4,7 @@ Mock users reference
 
 from src.domain.repositories.user import IUserRepository
 from src.domain.entities.user import UserEntity
+from src.utils.passwords import legacy_hash
 
 
 USER_PASSWORD = "password"
@@ -41,7 +42,7 @@ class MockUserRepository(IUserRepository):
             excluido=False,
         )
 
-        user.set_password(USER_PASSWORD)
+        user.set_password_hash(legacy_hash(USER_PASSWORD))
         return user
 
     async def get_by_email(self, email: str) -> UserEntity:
@@ -61,7 +62,7 @@ class MockUserRepository(IUserRepository):
             excluido=False,
         )
 
-        user.set_password(USER_PASSWORD)
+        user.set_password_hash(legacy_hash(USER_PASSWORD))
         return user
 
     async def update_user(self, user: UserEntity) -> UserEntity:
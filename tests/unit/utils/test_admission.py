@@ -0,0 +1,81 @@
+"""
+Tests for the admission pools
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.admission import AdmissionPool, AdmissionRejected, QUEUE_FULL, QUEUE_TIMEOUT
+
+
+def pool(**kwargs) -> AdmissionPool:
+    options = {"max_limit": 2, "queue_size": 1, "queue_timeout": 0.05, "target_latency": 0.1}
+    options.update(kwargs)
+    return AdmissionPool("test", **options)
+
+
+class TestAdmissionPool:
+    """
+    Tests for AdmissionPool
+    """
+
+    @pytest.mark.asyncio
+    async def test_queue_full_is_rejected(self):
+        """Test requests beyond the limit and the queue are rejected at once"""
+        admission = pool()
+        await admission.acquire()
+        await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as error:
+            await admission.acquire()
+        assert error.value.reason == QUEUE_FULL
+
+        admission.release(0.01)
+        await waiting
+        assert admission.in_flight == 2
+        assert admission.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_is_rejected(self):
+        """Test a wait longer than the queue timeout is rejected and leaves the queue"""
+        admission = pool(max_limit=1)
+        await admission.acquire()
+
+        with pytest.raises(AdmissionRejected) as error:
+            await admission.acquire()
+
+        assert error.value.reason == QUEUE_TIMEOUT
+        assert admission.queued == 0
+        assert admission.in_flight == 1
+
+    def test_slow_requests_decrease_limit(self):
+        """Test a slow request cuts the limit once per target latency"""
+        admission = pool(max_limit=8)
+        admission._adapt(1.0, now=10.0)  # pylint: disable=protected-access
+        admission._adapt(1.0, now=10.01)  # pylint: disable=protected-access
+
+        assert admission.limit == 6
+
+    def test_fast_requests_increase_saturated_limit(self):
+        """Test the limit grows back only while the pool is saturated"""
+        admission = pool(max_limit=8)
+        admission.limit = 4.0
+        admission._adapt(0.01, now=0.0)  # pylint: disable=protected-access
+        assert admission.limit == 4.0
+
+        admission.in_flight = 4
+        admission._adapt(0.01, now=0.0)  # pylint: disable=protected-access
+        assert admission.limit == 4.25
+
+    def test_workers_share_the_pool(self):
+        """Test each of the workers gets its share of the slots and queue"""
+        admission = pool(max_limit=8, queue_size=4)
+        admission.share_workers(3)
+
+        assert (admission.max_limit, admission.limit, admission.queue_size) == (2, 2.0, 1)
+
+        admission.share_workers(16)
+        assert admission.max_limit == 1
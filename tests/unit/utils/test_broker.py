@@ -0,0 +1,68 @@
+"""
+Tests for the Server-Sent Events broker
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.broker import EventBroker, ServerSentEvent, format_sse
+
+
+class TestFormatSse:
+    """
+    Tests for format_sse
+    """
+
+    def test_full_frame(self):
+        """Test id, event and data fields"""
+        assert format_sse('{"id": 1}', "post_created", 1) == 'id: 1\nevent: post_created\ndata: {"id": 1}\n\n'
+
+    def test_multiline_data(self):
+        """Test each line of data becomes a data field"""
+        assert format_sse("a\nb") == "data: a\ndata: b\n\n"
+
+
+class TestEventBroker:
+    """
+    Tests for EventBroker
+    """
+
+    @pytest.mark.asyncio
+    async def test_publish_fans_out_to_channel(self):
+        """Test every subscriber of the channel receives the event"""
+        broker = EventBroker(queue_size=10)
+        first = broker.subscribe("topics:1")
+        second = broker.subscribe("topics:1")
+        other = broker.subscribe("topics:2")
+
+        event = ServerSentEvent(id=1, event="post_created", data="{}")
+        broker.publish("topics:1", event)
+
+        assert await first.get() is event
+        assert await second.get() is event
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(other.get(), timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_dropped(self):
+        """Test a full queue drops the subscriber instead of blocking"""
+        broker = EventBroker(queue_size=2)
+        slow = broker.subscribe("topics:1")
+
+        for event_id in range(3):
+            broker.publish("topics:1", ServerSentEvent(id=event_id, event="post_created", data="{}"))
+
+        assert slow.dropped
+        assert broker.subscribers("topics:1") == 0
+        assert await slow.get() is None
+        assert await slow.get() is None
+
+    def test_close_unsubscribes(self):
+        """Test closing a subscription removes it from the channel"""
+        broker = EventBroker()
+
+        with broker.subscribe("topics:1"):
+            assert broker.subscribers("topics:1") == 1
+
+        assert broker.subscribers("topics:1") == 0
@@ -0,0 +1,195 @@
+"""
+Tests for the response cache
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.cache import ResponseCache, CachedResponse
+
+
+def make_loader(body: bytes = b"{}", delay: float = 0):
+    """
+    Create a loader that counts its calls
+    """
+    calls = {"count": 0}
+
+    async def loader() -> CachedResponse:
+        calls["count"] += 1
+        await asyncio.sleep(delay)
+        return CachedResponse(body=body, etag=f'W/"{calls["count"]}"')
+
+    return loader, calls
+
+
+class TestResponseCache:
+    """
+    Tests for ResponseCache
+    """
+
+    @pytest.mark.asyncio
+    async def test_hit_does_not_call_loader(self):
+        """Test a fresh entry is served without loading again"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=1024)
+        loader, calls = make_loader()
+
+        first = await cache.get_or_load("/a?", "/a", loader)
+        second = await cache.get_or_load("/a?", "/a", loader)
+
+        assert first is second
+        assert calls["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        """Test only one loader runs for concurrent misses of a key"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=1024)
+        loader, calls = make_loader(delay=0.01)
+
+        results = await asyncio.gather(*[
+            cache.get_or_load("/a?", "/a", loader) for _ in range(50)
+        ])
+
+        assert calls["count"] == 1
+        assert all(result is results[0] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_loader_error_is_not_cached(self):
+        """Test a failing loader propagates and is retried on next call"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=1024)
+
+        async def failing():
+            raise RuntimeError("database down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("/a?", "/a", failing)
+
+        loader, calls = make_loader()
+        await cache.get_or_load("/a?", "/a", loader)
+        assert calls["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_revalidating(self):
+        """Test an expired entry inside the stale window is served and refreshed"""
+        cache = ResponseCache(ttl=1, stale_ttl=60, max_bytes=1024)
+        loader, calls = make_loader()
+
+        with patch("src.utils.cache.time.monotonic", return_value=100.0):
+            first = await cache.get_or_load("/a?", "/a", loader)
+
+        with patch("src.utils.cache.time.monotonic", return_value=102.0):
+            stale = await cache.get_or_load("/a?", "/a", loader)
+            await asyncio.sleep(0)
+
+        assert stale is first
+        assert calls["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_path_entries(self):
+        """Test invalidation drops every query of a path only"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=1024)
+        loader, calls = make_loader()
+
+        await cache.get_or_load("/a?page=1", "/a", loader)
+        await cache.get_or_load("/a?page=2", "/a", loader)
+        await cache.get_or_load("/b?page=1", "/b", loader)
+
+        cache.invalidate("/a")
+
+        assert len(cache) == 1
+        await cache.get_or_load("/a?page=1", "/a", loader)
+        assert calls["count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_load_is_not_stored(self):
+        """Test a load started before an invalidation is not stored"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=1024)
+        loader, _ = make_loader(delay=0.01)
+
+        pending = asyncio.ensure_future(cache.get_or_load("/a?", "/a", loader))
+        await asyncio.sleep(0)
+        cache.invalidate("/a")
+        await pending
+
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_memory_budget_evicts_least_recently_used(self):
+        """Test entries over the memory budget evict the oldest ones"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=10)
+        loader, _ = make_loader(body=b"12345")
+
+        await cache.get_or_load("/a?", "/a", loader)
+        await cache.get_or_load("/b?", "/b", loader)
+        await cache.get_or_load("/a?", "/a", loader)
+        await cache.get_or_load("/c?", "/c", loader)
+
+        assert len(cache) == 2
+        assert cache.size <= 10
+        assert "/b?" not in cache._slots
+
+    @pytest.mark.asyncio
+    async def test_other_worker_staleness_is_bounded_by_ttl(self):
+        """Test a worker that missed an invalidation serves the old page for one TTL (plus one refill)"""
+        database = {"body": b"old"}
+
+        async def loader() -> CachedResponse:
+            await asyncio.sleep(0)
+            return CachedResponse(body=database["body"], etag=f'W/"{database["body"].decode()}"')
+
+        writer = ResponseCache(ttl=1, stale_ttl=60, max_bytes=1024)
+        other = ResponseCache(ttl=1, stale_ttl=60, max_bytes=1024)
+
+        with patch("src.utils.cache.time.monotonic", return_value=100.0):
+            await writer.get_or_load("/a?", "/a", loader)
+            await other.get_or_load("/a?", "/a", loader)
+
+        # The write only invalidates the cache of the worker that served it
+        database["body"] = b"new"
+        with patch("src.utils.cache.time.monotonic", return_value=100.2):
+            writer.invalidate("/a")
+            assert (await writer.get_or_load("/a?", "/a", loader)).body == b"new"
+            assert (await other.get_or_load("/a?", "/a", loader)).body == b"old"
+
+        with patch("src.utils.cache.time.monotonic", return_value=101.1):
+            # Expired: served once more while it is refilled
+            assert (await other.get_or_load("/a?", "/a", loader)).body == b"old"
+            for _ in range(3):
+                await asyncio.sleep(0)
+            assert (await other.get_or_load("/a?", "/a", loader)).body == b"new"
+
+    def test_invalidation_time_is_kept(self):
+        """Test recent invalidations are reported per path and forgotten by clear"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=1000)
+        cache.invalidate("/a")
+
+        assert cache.invalidated_within("/a", 5)
+        assert not cache.invalidated_within("/b", 5)
+        assert not cache.invalidated_within("/a", 0)
+
+        cache.clear()
+        assert not cache.invalidated_within("/a", 5)
+
+    def test_build_key_is_normalized(self):
+        """Test key ignores param order and None values"""
+        first = ResponseCache.build_key("/a", page=1, search=None, items_per_page=10)
+        second = ResponseCache.build_key("/a", items_per_page=10, page=1)
+
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_variant_counts_in_memory_budget(self):
+        """Test compressed variants are accounted and evicted with the entry"""
+        cache = ResponseCache(ttl=60, stale_ttl=0, max_bytes=12)
+        loader, _ = make_loader(body=b"12345")
+
+        first = await cache.get_or_load("/a?", "/a", loader)
+        cache.add_variant("/a?", first, "gzip", b"123")
+        assert cache.size == 8
+
+        await cache.get_or_load("/b?", "/b", loader)
+
+        assert len(cache) == 1
+        assert "/a?" not in cache._slots
+        assert cache.size == 5
@@ -0,0 +1,176 @@
+"""
+Tests for response compression
+"""
+
+import gzip
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from src.api.middlewares._http.compression import CompressionMiddleware
+from src.utils import compression
+from src.utils.compression import ResponseCompressor, GZIP, BROTLI
+
+
+BODY = b'{"data": "' + b"fishing dock " * 100 + b'"}'
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    """
+    Simulate an environment without the brotli package
+    """
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+class TestResponseCompressor:
+    """
+    Tests for ResponseCompressor
+    """
+
+    def test_negotiate_prefers_highest_quality(self):
+        """Test the coding with the highest qvalue is chosen"""
+        compressor = ResponseCompressor()
+
+        assert compressor.negotiate("br;q=0.5, gzip;q=0.9") == GZIP
+
+    @pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+    def test_negotiate_prefers_brotli_on_tie(self):
+        """Test server preference resolves equal qvalues"""
+        compressor = ResponseCompressor()
+
+        assert compressor.negotiate("gzip, deflate, br") == BROTLI
+
+    def test_negotiate_without_brotli(self, gzip_only):
+        """Test brotli is never offered when the package is missing"""
+        compressor = ResponseCompressor()
+
+        assert compressor.negotiate("br") is None
+        assert compressor.negotiate("br, gzip") == GZIP
+
+    def test_negotiate_rejects_zero_quality_and_identity(self):
+        """Test q=0 codings and identity only requests are not compressed"""
+        compressor = ResponseCompressor()
+
+        assert compressor.negotiate("gzip;q=0, br;q=0") is None
+        assert compressor.negotiate("identity") is None
+        assert compressor.negotiate(None) is None
+
+    def test_negotiate_wildcard(self, gzip_only):
+        """Test wildcard accepts any supported coding"""
+        compressor = ResponseCompressor()
+
+        assert compressor.negotiate("*") == GZIP
+
+    def test_should_compress(self):
+        """Test threshold and media types"""
+        compressor = ResponseCompressor(minimum_size=100)
+
+        assert compressor.should_compress("application/json", 100)
+        assert compressor.should_compress("text/html; charset=utf-8", 500)
+        assert not compressor.should_compress("application/json", 99)
+        assert not compressor.should_compress("image/webp", 5000)
+        assert not compressor.should_compress("text/event-stream", 5000)
+        assert not compressor.should_compress(None, 5000)
+
+    def test_gzip_roundtrip(self):
+        """Test gzip output decompresses to the body and is stable"""
+        compressor = ResponseCompressor()
+
+        compressed = compressor.compress(BODY, GZIP)
+
+        assert gzip.decompress(compressed) == BODY
+        assert compressor.compress(BODY, GZIP) == compressed
+        assert len(compressed) < len(BODY)
+
+    def test_unsupported_encoding(self):
+        """Test unknown codings raise ValueError"""
+        with pytest.raises(ValueError):
+            ResponseCompressor().compress(BODY, "zstd")
+
+
+def create_app() -> FastAPI:
+    """
+    Create an app with the compression middleware
+    """
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, compressor=ResponseCompressor(minimum_size=500))
+
+    @app.get("/json")
+    async def json_body():
+        return Response(content=BODY, media_type="application/json")
+
+    @app.get("/small")
+    async def small_body():
+        return PlainTextResponse("ok")
+
+    @app.get("/image")
+    async def image_body():
+        return Response(content=BODY, media_type="image/webp")
+
+    @app.get("/encoded")
+    async def encoded_body():
+        return Response(
+            content=gzip.compress(BODY),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/stream")
+    async def stream_body():
+        async def chunks():
+            yield BODY
+            yield BODY
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+class TestCompressionMiddleware:
+    """
+    Tests for CompressionMiddleware
+    """
+
+    @pytest.fixture
+    async def client(self, gzip_only):
+        transport = ASGITransport(app=create_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_compresses_json(self, client: AsyncClient):
+        """Test large JSON bodies are gzip compressed"""
+        response = await client.get("/json", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.content == BODY
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", ["/small", "/image", "/stream"])
+    async def test_skips_uncompressible(self, client: AsyncClient, path: str):
+        """Test small bodies, media and streams are not compressed"""
+        response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_skips_already_encoded(self, client: AsyncClient):
+        """Test bodies with a Content-Encoding are not compressed again"""
+        response = await client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == BODY
+
+    @pytest.mark.asyncio
+    async def test_without_accept_encoding(self, client: AsyncClient):
+        """Test clients that do not accept a coding get the plain body"""
+        response = await client.get("/json", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.content == BODY
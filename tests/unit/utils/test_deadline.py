@@ -0,0 +1,40 @@
+"""
+Tests for the request deadlines
+"""
+
+import pytest
+
+from src.utils.deadline import DeadlineExceeded, deadline_scope, expired, no_deadline, remaining, timeout_for
+
+
+class TestDeadline:
+    """
+    Tests for deadline_scope and timeout_for
+    """
+
+    def test_no_deadline_outside_requests(self):
+        """Test calls keep their own timeout without a deadline"""
+        assert remaining() is None
+        assert timeout_for(30.0) == 30.0
+
+    def test_timeout_capped_by_remaining_budget(self):
+        """Test the timeout of a call never exceeds the budget"""
+        with deadline_scope(1.0):
+            assert timeout_for(30.0) <= 1.0
+            assert timeout_for(0.5) == 0.5
+
+    def test_nested_scope_never_extends(self):
+        """Test an inner scope keeps the earlier outer deadline"""
+        with deadline_scope(1.0) as outer:
+            with deadline_scope(60.0) as inner:
+                assert inner == outer
+
+    def test_expired_budget_raises(self):
+        """Test no call is made once the budget ran out"""
+        with deadline_scope(0):
+            assert expired()
+            with pytest.raises(DeadlineExceeded):
+                timeout_for(30.0, "supabase")
+
+            with no_deadline():
+                assert timeout_for(30.0) == 30.0
@@ -0,0 +1,166 @@
+"""
+Tests for the in-process metrics
+"""
+
+import json
+import os
+
+import pytest
+
+from src.utils.metrics import WORKER_FILE, Metric, MetricsRegistry
+
+
+def worker_registry():
+    """
+    Registry with the metrics of a worker
+    """
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ("route",))
+    registry.gauge("in_flight", "In flight")
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    return registry
+
+
+def write_worker(directory: str, pid: int, registry: MetricsRegistry) -> None:
+    """
+    Write the snapshot of another worker
+    """
+    with open(os.path.join(directory, WORKER_FILE.format(pid=pid)), "w", encoding="utf-8") as file:
+        json.dump(registry.snapshot(), file)
+
+
+class TestMetrics:
+    """
+    Tests for counters, gauges and histograms
+    """
+
+    def test_counter_render(self):
+        """Test counter series are rendered with labels"""
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ("route",))
+
+        counter.inc("/a")
+        counter.inc("/a")
+        counter.inc('/b"x')
+
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 2' in text
+        assert 'requests_total{route="/b\\"x"} 1' in text
+
+    def test_gauge_inc_dec(self):
+        """Test gauges go up and down"""
+        registry = MetricsRegistry()
+        gauge = registry.gauge("in_flight", "In flight")
+
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        assert gauge.value() == 1
+        assert "in_flight 1" in registry.render()
+
+    def test_histogram_cumulative_buckets(self):
+        """Test buckets are cumulative and include +Inf, sum and count"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.1, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(3, "/a")
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+        assert 'latency_seconds_sum{route="/a"} 3.65' in text
+        assert 'latency_seconds_count{route="/a"} 4' in text
+
+    def test_histogram_timer(self):
+        """Test time() observes the block duration"""
+        histogram = MetricsRegistry().histogram("block_seconds", "Block")
+
+        with histogram.time():
+            pass
+
+        assert histogram.count() == 1
+
+    def test_register_existing_returns_same_metric(self):
+        """Test registering a name twice shares the series"""
+        registry = MetricsRegistry()
+
+        first = registry.counter("requests_total", "Requests")
+        second = registry.counter("requests_total", "Requests")
+
+        assert first is second
+        with pytest.raises(ValueError):
+            registry.gauge("requests_total", "Requests")
+
+    def test_metric_must_implement_series(self):
+        """Test a metric without its series methods cannot be created"""
+
+        class Incomplete(Metric):  # pylint: disable=abstract-method
+            def samples(self):
+                return []
+
+        with pytest.raises(TypeError):
+            Incomplete("incomplete", "Incomplete")
+
+
+class TestSharedMetrics:
+    """
+    Tests for the metrics shared by the workers of the pre-forked server
+    """
+
+    def test_scrape_sums_every_worker(self, tmp_path):
+        """Test any worker renders the totals of every worker"""
+        local, other = worker_registry(), worker_registry()
+        local.share(str(tmp_path))
+        local.get("requests_total").inc("/a", amount=2)
+        local.get("in_flight").inc()
+        local.get("latency_seconds").observe(0.05)
+        other.get("requests_total").inc("/a", amount=3)
+        other.get("requests_total").inc("/b")
+        other.get("in_flight").inc()
+        other.get("latency_seconds").observe(0.5)
+        write_worker(str(tmp_path), 999_999, other)
+
+        text = local.render()
+
+        assert 'requests_total{route="/a"} 5' in text
+        assert 'requests_total{route="/b"} 1' in text
+        assert "in_flight 2" in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert "latency_seconds_count 2" in text
+        # The local series are untouched by the scrape
+        assert local.get("requests_total").value("/a") == 2
+
+    def test_retired_worker_counters_are_kept(self, tmp_path):
+        """Test counters of an exited worker stay in the totals, its gauges do not"""
+        local = worker_registry()
+        local.share(str(tmp_path))
+        for pid in (999_998, 999_999):
+            other = worker_registry()
+            other.get("requests_total").inc("/a", amount=3)
+            other.get("in_flight").inc()
+            write_worker(str(tmp_path), pid, other)
+            local.retire(pid)
+
+        text = local.render()
+
+        assert 'requests_total{route="/a"} 6' in text
+        assert "\nin_flight " not in text
+        assert sorted(os.listdir(tmp_path)) == ["archive.json", "metrics.lock", WORKER_FILE.format(pid=os.getpid())]
+
+    def test_not_shared_renders_local_series(self):
+        """Test a registry without a shared directory never writes snapshots"""
+        registry = worker_registry()
+        registry.get("requests_total").inc("/a")
+        registry.flush()
+        registry.retire(999_999)
+
+        assert 'requests_total{route="/a"} 1' in registry.render()
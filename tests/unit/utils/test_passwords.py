@@ -0,0 +1,111 @@
+"""
+Tests for the password hasher
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.passwords import MIN_COST, PasswordHasher, PasswordHasherBusy, legacy_hash
+
+
+# Low cost, the tests only check the behavior
+TEST_COST = 1024
+
+
+class TestPasswordHasher:
+    """
+    Tests for PasswordHasher
+    """
+
+    async def test_hash_and_verify(self):
+        """Test a hash verifies its password only"""
+        hasher = PasswordHasher(n=TEST_COST)
+        password_hash = await hasher.hash("S3nha!forte")
+
+        assert password_hash.startswith(f"scrypt${TEST_COST}$8$1$")
+        assert await hasher.verify("S3nha!forte", password_hash)
+        assert not await hasher.verify("outra", password_hash)
+        hasher.shutdown()
+
+    def test_hashes_are_salted(self):
+        """Test the same password gives different hashes"""
+        hasher = PasswordHasher(n=TEST_COST)
+        assert hasher.hash_sync("password") != hasher.hash_sync("password")
+
+    async def test_verify_legacy_hash(self):
+        """Test unsalted SHA-256 hashes are still verified"""
+        hasher = PasswordHasher(n=TEST_COST)
+
+        assert await hasher.verify("password", legacy_hash("password"))
+        assert not await hasher.verify("wrong", legacy_hash("password"))
+        assert not await hasher.verify("password", None)
+        assert not await hasher.verify("password", "scrypt$invalid")
+
+    def test_needs_rehash(self):
+        """Test legacy and cheaper hashes need a rehash, current or stronger ones do not"""
+        hasher = PasswordHasher(n=TEST_COST * 2)
+
+        assert hasher.needs_rehash(legacy_hash("password"))
+        assert hasher.needs_rehash(PasswordHasher(n=TEST_COST).hash_sync("password"))
+        assert not hasher.needs_rehash(hasher.hash_sync("password"))
+        assert not hasher.needs_rehash(PasswordHasher(n=TEST_COST * 4).hash_sync("password"))
+
+    def test_calibrate(self):
+        """Test calibration stays between the minimum cost and the memory limit"""
+        hasher = PasswordHasher()
+
+        assert hasher.calibrate(target_seconds=0, max_memory=2**30) == MIN_COST
+        assert hasher.calibrated
+        assert hasher.calibrate(target_seconds=60, max_memory=128 * 8 * MIN_COST * 2) == MIN_COST * 2
+        assert hasher.hash_sync("password").startswith(f"scrypt${MIN_COST * 2}$")
+
+    async def test_queue_full(self):
+        """Test hashes past the workers and the queue fail fast"""
+        hasher = PasswordHasher(n=MIN_COST, workers=1, queue_size=1)
+
+        results = await asyncio.gather(*(hasher.hash("password") for _ in range(3)), return_exceptions=True)
+
+        assert sum(isinstance(result, PasswordHasherBusy) for result in results) == 1
+        assert sum(isinstance(result, str) for result in results) == 2
+        hasher.shutdown()
+
+    async def test_queue_timeout(self):
+        """Test a hash waiting longer than the queue timeout fails"""
+        hasher = PasswordHasher(n=MIN_COST * 4, workers=1, queue_size=4, queue_timeout=0.001)
+
+        results = await asyncio.gather(*(hasher.hash("password") for _ in range(2)), return_exceptions=True)
+
+        assert isinstance(results[0], str)
+        assert isinstance(results[1], PasswordHasherBusy)
+        hasher.shutdown()
+
+    async def test_event_loop_not_blocked(self):
+        """Test the loop keeps running while hashes run"""
+        hasher = PasswordHasher(n=MIN_COST * 4, workers=2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(hasher.hash("password") for _ in range(4)))
+        task.cancel()
+
+        assert ticks > 10
+        hasher.shutdown()
+
+
+    async def test_verify_dummy(self):
+        """Test the dummy hash is made once, at the current cost, and never matches"""
+        hasher = PasswordHasher(n=TEST_COST)
+
+        assert not await hasher.verify_dummy("password")
+        dummy = hasher._dummy_hash  # pylint: disable=protected-access
+        assert not hasher.needs_rehash(dummy)
+        assert not await hasher.verify_dummy("password")
+        assert hasher._dummy_hash == dummy  # pylint: disable=protected-access
+        hasher.shutdown()
@@ -0,0 +1,102 @@
+"""
+Tests for the request sampling profiler
+"""
+
+import time
+
+import pytest
+
+from src.utils.profiler import Profile, ProfileStore, SamplingProfiler, valid_request_id
+
+
+def busy_function(duration: float) -> None:
+    """
+    Keep the thread busy
+    """
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+def new_profile(request_id: str = "req-1") -> Profile:
+    """
+    Create an empty profile
+    """
+    return Profile(
+        request_id=request_id,
+        method="GET",
+        route="/topics/{topic_id}",
+        reason="requested",
+        started_at=time.time(),
+        interval=0.001,
+    )
+
+
+class TestProfiler:
+    """
+    Tests for the sampling profiler and the profile store
+    """
+
+    def test_samples_calling_thread(self):
+        """Test the stack of the profiled thread is sampled"""
+        profiler = SamplingProfiler(new_profile()).start()
+        busy_function(0.05)
+        profile = profiler.stop()
+
+        assert profile.sample_count > 0
+        assert profile.duration >= 0.05
+        assert "busy_function (test_profiler.py:" in profile.folded()
+
+    def test_folded_format(self):
+        """Test samples are written as collapsed stacks"""
+        profile = new_profile()
+        profile.samples["main (app.py:1);handler (app.py:10)"] += 3
+
+        assert profile.folded() == "main (app.py:1);handler (app.py:10) 3\n"
+        assert profile.filename().endswith("_GET_topics_topic_id_req-1.folded")
+
+    def test_write(self, tmp_path):
+        """Test the profile is written to the output directory"""
+        profile = new_profile()
+        profile.samples["main (app.py:1)"] += 1
+
+        path = profile.write(str(tmp_path))
+
+        assert path.parent == tmp_path
+        assert path.read_text() == "main (app.py:1) 1\n"
+
+    def test_file_name_stays_in_directory(self, tmp_path):
+        """Test ids and routes with path separators never leave the output directory"""
+        profile = new_profile("/../../../../tmp/escaped")
+        profile.route = "/../.."
+
+        path = profile.write(str(tmp_path))
+
+        assert path.parent == tmp_path
+        assert path.name.endswith("_GET_root_tmp_escaped.folded")
+
+    @pytest.mark.parametrize("request_id, valid", [
+        ("req-1_A", True), ("a" * 64, True), ("", False), ("a" * 65, False), ("../x", False), ("a.b", False),
+    ])
+    def test_valid_request_id(self, request_id, valid):
+        """Test only short ids of letters, digits, '-' and '_' are accepted"""
+        assert valid_request_id(request_id) is valid
+
+    def test_store_ring_buffer(self):
+        """Test only the last profiles are kept"""
+        store = ProfileStore(max_profiles=2)
+        for request_id in ("a", "b", "c"):
+            store.add(new_profile(request_id))
+
+        assert [profile.request_id for profile in store.list()] == ["c", "b"]
+        assert store.get("a") is None
+        assert store.get("b").request_id == "b"
+
+    def test_store_concurrency_limit(self):
+        """Test profiling slots are bounded"""
+        store = ProfileStore(max_concurrent=1)
+
+        assert store.acquire()
+        assert not store.acquire()
+        store.release()
+        assert store.acquire()
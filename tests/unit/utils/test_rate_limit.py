@@ -0,0 +1,108 @@
+"""
+Tests for the token bucket rate limiter stores
+"""
+
+import pytest
+
+from src.utils.rate_limit import (
+    LocalSharedStore,
+    MemoryRateLimitStore,
+    RateRule,
+    SharedRateLimitStore,
+    create_rate_limit_store,
+    take_token,
+)
+
+
+RULE = RateRule(rate=1.0, burst=3)
+
+
+class TestTakeToken:
+    """
+    Tests for the bucket math
+    """
+
+    def test_refill_is_capped_at_burst(self):
+        """Test an idle bucket never holds more than burst tokens"""
+        assert take_token(0, 0, 100, RULE) == (2, 0.0)
+
+    def test_empty_bucket_returns_wait(self):
+        """Test the wait is the time to refill the missing tokens"""
+        tokens, wait = take_token(0.25, 0, 0, RULE)
+        assert tokens == 0.25
+        assert wait == pytest.approx(0.75)
+
+
+class TestMemoryRateLimitStore:
+    """
+    Tests for MemoryRateLimitStore
+    """
+
+    def test_burst_then_refill(self):
+        """Test burst requests pass, the next waits for one token"""
+        store = MemoryRateLimitStore(shards=4)
+
+        assert [store.take_at("k", RULE, now=10.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert store.take_at("k", RULE, now=10.0) == pytest.approx(1.0)
+        assert store.take_at("k", RULE, now=11.0) == 0.0
+
+    def test_keys_are_independent(self):
+        """Test buckets of different keys do not share tokens"""
+        store = MemoryRateLimitStore(shards=4)
+        for _ in range(3):
+            store.take_at("a", RULE, now=0.0)
+
+        assert store.take_at("a", RULE, now=0.0) > 0
+        assert store.take_at("b", RULE, now=0.0) == 0.0
+
+    def test_least_recently_used_are_evicted(self):
+        """Test the store keeps at most max_keys buckets"""
+        store = MemoryRateLimitStore(shards=1, max_keys=2)
+        for key in ("a", "b", "c"):
+            store.take_at(key, RULE, now=0.0)
+
+        assert len(store) == 2
+
+    def test_workers_share_the_limit(self):
+        """Test each of the workers gets its share of the rate and burst"""
+        store = MemoryRateLimitStore(shards=1)
+        store.share_workers(3)
+
+        assert store.take_at("k", RULE, now=0.0) == 0.0
+        assert store.take_at("k", RULE, now=0.0) == pytest.approx(3.0)
+
+    def test_share_keeps_one_request(self):
+        """Test a share never rejects every request"""
+        assert RateRule(rate=1.0, burst=3).share(8).burst == 1.0
+        assert RULE.share(1) is RULE
+
+
+class TestSharedStores:
+    """
+    Tests for the shared store contract and its local stand-in
+    """
+
+    @pytest.mark.asyncio
+    async def test_local_shared_store_limits(self):
+        """Test the stand-in applies the same bucket"""
+        store = create_rate_limit_store("shared")
+        assert isinstance(store, LocalSharedStore)
+
+        waits = [await store.take("k", RateRule(rate=0.001, burst=2)) for _ in range(3)]
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] > 0
+
+    @pytest.mark.asyncio
+    async def test_store_errors_fail_open(self):
+        """Test a failing shared store allows the request"""
+
+        class Unavailable(SharedRateLimitStore):
+            async def _take(self, key, rule, cost, now):
+                raise ConnectionError("down")
+
+        assert await Unavailable().take("k", RULE) == 0.0
+
+    def test_unknown_backend(self):
+        """Test an unknown backend is a configuration error"""
+        with pytest.raises(ValueError):
+            create_rate_limit_store("redis")
@@ -0,0 +1,82 @@
+"""
+Tests for the per-request phase timings
+"""
+
+import pytest
+
+from src.utils import timing
+from src.utils.timing import DB, IMAGE, current_timings, timed, timed_methods, track_timings
+
+
+class FakeClock:
+    """
+    Clock of the timers, only moves when advanced
+    """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fake clock used by the timing module
+    """
+    fake = FakeClock()
+    monkeypatch.setattr(timing, "time", fake)
+    return fake
+
+
+class TestTiming:
+    """
+    Tests for the phase accumulator and the Server-Timing value
+    """
+
+    def test_header(self, clock: FakeClock):
+        """Test phases are rendered in milliseconds with the total last"""
+        with track_timings() as timings:
+            with timed(IMAGE):
+                clock.advance(0.002)
+            clock.advance(0.001)
+
+        assert timings.header() == "image;dur=2.00, total;dur=3.00"
+
+    def test_outside_request_is_noop(self):
+        """Test reporting without an accumulator does nothing"""
+        assert current_timings() is None
+
+        with timed(DB):
+            pass
+
+        assert current_timings() is None
+
+    def test_nested_phase_counted_once(self, clock: FakeClock):
+        """Test nested timers of a phase only report the outermost"""
+        with track_timings() as timings:
+            with timed(DB):
+                clock.advance(0.25)
+                with timed(DB):
+                    clock.advance(0.5)
+                clock.advance(0.25)
+
+        assert timings.phases == {DB: 1.0}
+
+    @pytest.mark.asyncio
+    async def test_timed_methods(self):
+        """Test public coroutine methods report into the phase"""
+
+        @timed_methods(DB)
+        class Repository:
+            async def get(self):
+                return 1
+
+        with track_timings() as timings:
+            assert await Repository().get() == 1
+
+        assert timings.phases[DB] > 0
@@ -0,0 +1,145 @@
+"""
+Tests for the verified token cache and the revocation list
+"""
+
+import jwt
+import pytest
+
+from src.utils.security import SecurityHandler
+from src.utils.tokens import REVOKED_TOKEN, REVOKED_USER, BloomFilter, RevocationList, VerifiedTokenCache, token_digest
+
+
+SECRET = "test-secret-key-with-minimum-32-bytes!"
+
+
+class TestBloomFilter:
+    """
+    Tests for BloomFilter
+    """
+
+    def test_no_false_negatives(self):
+        """Test every added digest is reported"""
+        bloom = BloomFilter(capacity=1000)
+        digests = [token_digest(f"token-{i}") for i in range(1000)]
+        for digest in digests:
+            bloom.add(digest)
+
+        assert all(digest in bloom for digest in digests)
+
+    def test_false_positive_rate(self):
+        """Test the false positives stay near the configured rate"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(token_digest(f"token-{i}"))
+
+        false_positives = sum(token_digest(f"other-{i}") in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+class TestVerifiedTokenCache:
+    """
+    Tests for VerifiedTokenCache
+    """
+
+    def test_expired_payload_is_dropped(self):
+        """Test payloads are served only until their exp"""
+        cache = VerifiedTokenCache(max_size=10)
+        cache.put(b"a", {"exp": 100})
+
+        assert cache.get(b"a", now=99) == {"exp": 100}
+        assert cache.get(b"a", now=100) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the cache is bounded"""
+        cache = VerifiedTokenCache(max_size=2)
+        cache.put(b"a", {})
+        cache.put(b"b", {})
+        cache.get(b"a", now=0)
+        cache.put(b"c", {})
+
+        assert cache.get(b"b", now=0) is None
+        assert cache.get(b"a", now=0) == {}
+
+
+class TestSecurityHandler:
+    """
+    Tests for the cached decode and the revocations of SecurityHandler
+    """
+
+    def test_cached_payload_is_still_checked_for_revocation(self):
+        """Test a revoked token is rejected even when its payload is cached"""
+        handler = SecurityHandler(SECRET)
+        token = handler.encode_payload({"sub": "user"}, 60)
+
+        assert handler.decode_payload(token) is handler.decode_payload(token)
+
+        handler.revoke_token(token)
+        with pytest.raises(jwt.InvalidTokenError):
+            handler.decode_payload(token)
+
+    def test_revoke_user_rejects_issued_tokens(self):
+        """Test every token issued to a user before the revocation is rejected"""
+        handler = SecurityHandler(SECRET)
+        token = handler.encode_payload({"sub": "user"}, 60)
+        other = handler.encode_payload({"sub": "other"}, 60)
+
+        # Tokens of the second of the revocation are kept (see the next test)
+        handler.revocations.revoke_user("user", at=jwt.decode(token, SECRET, algorithms=["HS256"])["iat"] + 1)
+
+        with pytest.raises(jwt.InvalidTokenError):
+            handler.decode_payload(token)
+        assert handler.decode_payload(other)["sub"] == "other"
+
+    def test_tampered_token_is_never_cached(self):
+        """Test a token with a bad signature is verified and rejected"""
+        handler = SecurityHandler(SECRET)
+        token = handler.encode_payload({"sub": "user"}, 60)
+
+        with pytest.raises(jwt.InvalidSignatureError):
+            handler.decode_payload(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+        assert len(handler.cache) == 0
+
+
+def test_purge_drops_expired_revocations():
+    """
+    Test expired revocations are dropped and the filter rebuilt
+    """
+    revocations = RevocationList(capacity=10)
+    revocations.revoke(b"expired" * 5, expires_at=10)
+    revocations.revoke(b"current" * 5, expires_at=1000)
+
+    revocations.purge(now=100)
+
+    assert len(revocations) == 1
+    assert revocations.is_revoked(b"current" * 5)
+    assert not revocations.is_revoked(b"expired" * 5)
+
+
+def test_revoke_user_keeps_tokens_of_the_same_second():
+    """
+    Test a login in the second of a password change is not revoked with the old tokens
+    """
+    revocations = RevocationList(capacity=10)
+    assert revocations.revoke_user("user", at=100.7) == 100
+
+    assert revocations.is_revoked(b"a" * 32, {"sub": "user", "iat": 99})
+    assert not revocations.is_revoked(b"a" * 32, {"sub": "user", "iat": 100})
+
+
+def test_load_applies_persisted_revocations():
+    """
+    Test rows of the revocations table are applied and the last id tracked
+    """
+    revocations = RevocationList(capacity=10)
+    digest = token_digest("token")
+    revocations.load([
+        (1, REVOKED_TOKEN, digest.hex(), 100, 1000),
+        (3, REVOKED_USER, "user", 100, 1000),
+        (2, REVOKED_TOKEN, token_digest("expired").hex(), 10, 50),
+    ], now=200)
+
+    assert revocations.last_id == 3
+    assert revocations.is_revoked(digest)
+    assert not revocations.is_revoked(token_digest("expired"))
+    assert revocations.is_revoked(b"a" * 32, {"sub": "user", "iat": 99})
@@ -0,0 +1,170 @@
+"""
+Tests for the request tracing
+"""
+
+import json
+
+import pytest
+
+from src.utils.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    STATUS_ERROR,
+    SpanExporter,
+    Tracer,
+    format_traceparent,
+    get_tracer,
+    parse_traceparent,
+    set_tracer,
+    traced,
+    traced_methods,
+)
+
+
+@pytest.fixture
+def exporter():
+    """
+    Install a sampling tracer with an in-memory exporter
+    """
+    exporter = InMemorySpanExporter()
+    previous = get_tracer()
+    set_tracer(Tracer(BatchSpanProcessor(exporter), sample_ratio=1.0))
+    yield exporter
+    set_tracer(previous)
+
+
+class TestTracing:
+    """
+    Tests for spans, sampling and exporters
+    """
+
+    @pytest.mark.asyncio
+    async def test_nested_spans(self, exporter: InMemorySpanExporter):
+        """Test children share the trace and point to their parent"""
+        tracer = get_tracer()
+
+        with tracer.start_span("parent") as parent:
+            with tracer.start_span("child", attributes={"rows": 3}) as child:
+                pass
+
+        await tracer.force_flush()
+
+        assert [span.name for span in exporter.spans] == ["child", "parent"]
+        assert child.context.trace_id == parent.context.trace_id
+        assert child.parent_span_id == parent.context.span_id
+        assert parent.parent_span_id is None
+        assert child.attributes == {"rows": 3}
+        assert child.end_time >= child.start_time
+
+    @pytest.mark.asyncio
+    async def test_error_status(self, exporter: InMemorySpanExporter):
+        """Test exceptions mark the span as error"""
+        tracer = get_tracer()
+
+        with pytest.raises(ValueError):
+            with tracer.start_span("failing"):
+                raise ValueError("boom")
+
+        await tracer.force_flush()
+
+        assert exporter.spans[0].status_code == STATUS_ERROR
+        assert exporter.spans[0].status_message == "ValueError"
+
+    @pytest.mark.asyncio
+    async def test_traced_decorators(self, exporter: InMemorySpanExporter):
+        """Test sync, async and class decorators"""
+
+        @traced("convert")
+        def convert():
+            return 1
+
+        @traced_methods
+        class Service:
+            async def create(self):
+                return convert()
+
+            async def _private(self):
+                return 2
+
+        assert await Service().create() == 1
+        assert await Service()._private() == 2
+        await get_tracer().force_flush()
+
+        assert [span.name for span in exporter.spans] == ["convert", "Service.create"]
+        assert exporter.spans[0].parent_span_id == exporter.spans[1].context.span_id
+
+    @pytest.mark.asyncio
+    async def test_unsampled_traces_are_not_exported(self):
+        """Test a zero ratio records nothing, children inherit the decision"""
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(BatchSpanProcessor(exporter), sample_ratio=0)
+
+        with tracer.start_span("root") as root:
+            with tracer.start_span("child") as child:
+                child.set_attribute("ignored", True)
+
+        await tracer.force_flush()
+
+        assert not root.is_recording
+        assert not child.is_recording
+        assert child.attributes == {}
+        assert exporter.spans == []
+
+    @pytest.mark.asyncio
+    async def test_traceparent_propagation(self, exporter: InMemorySpanExporter):
+        """Test an incoming traceparent is continued"""
+        header = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+        parent = parse_traceparent(header)
+
+        with get_tracer().start_span("server", parent=parent) as span:
+            pass
+
+        assert span.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert span.parent_span_id == "b7ad6b7169203331"
+        assert format_traceparent(span.context).endswith("-01")
+        assert parse_traceparent("invalid") is None
+        assert not parse_traceparent(header[:-2] + "00").sampled
+
+    @pytest.mark.asyncio
+    async def test_processor_bounded_queue(self):
+        """Test spans are dropped when the queue is full"""
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(BatchSpanProcessor(exporter, max_queue_size=2, max_batch_size=1))
+
+        for _ in range(3):
+            with tracer.start_span("span"):
+                pass
+
+        await tracer.force_flush()
+
+        assert len(exporter.spans) == 2
+        assert tracer.processor.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_file_exporter(self, tmp_path):
+        """Test batches are written as OTLP/JSON lines"""
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(BatchSpanProcessor(FileSpanExporter(str(path), "test-service")))
+
+        with tracer.start_span("span", attributes={"http.route": "/topics", "rows": 2}):
+            pass
+
+        await tracer.processor.shutdown()
+
+        payload = json.loads(path.read_text().splitlines()[0])
+        resource_spans = payload["resourceSpans"][0]
+        span = resource_spans["scopeSpans"][0]["spans"][0]
+
+        assert resource_spans["resource"]["attributes"][0]["value"] == {"stringValue": "test-service"}
+        assert span["name"] == "span"
+        assert {"key": "rows", "value": {"intValue": "2"}} in span["attributes"]
+
+    def test_exporter_must_implement_export(self):
+        """Test an exporter without export cannot be created"""
+
+        class Incomplete(SpanExporter):  # pylint: disable=abstract-method
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
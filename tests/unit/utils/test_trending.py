@@ -0,0 +1,91 @@
+"""
+Tests for the trending topics index
+"""
+
+import pytest
+
+from src.utils.trending import LANDMARK_HALF_LIVES, TrendingIndex, landmark_for
+
+
+HOUR = 3600.0
+
+
+def create_index(**kwargs) -> TrendingIndex:
+    index = TrendingIndex(half_life=HOUR, **kwargs)
+    index.landmark = landmark_for(0, HOUR)
+    return index
+
+
+class TestTrendingIndex:
+    """
+    Tests for TrendingIndex
+    """
+
+    def test_ranked_by_score(self):
+        """Test topics are ranked by their events"""
+        index = create_index()
+        for topic_id, events in ((1, 1), (2, 3), (3, 2)):
+            for _ in range(events):
+                index.record(topic_id, at=100)
+
+        assert [topic_id for topic_id, _ in index.top(10, now=100)] == [2, 3, 1]
+        assert index.top(1, now=100)[0][1] == pytest.approx(3, rel=1e-6)
+
+    def test_scores_decay(self):
+        """Test a score halves every half-life and recent events weigh more"""
+        index = create_index()
+        index.record(1, weight=4, at=0)
+        index.record(2, weight=1, at=3 * HOUR)
+
+        scores = dict(index.top(10, now=3 * HOUR))
+        assert scores[1] == pytest.approx(0.5)
+        assert scores[2] == pytest.approx(1)
+        assert [topic_id for topic_id, _ in index.top(10, now=3 * HOUR)] == [2, 1]
+
+    def test_landmark_rebase_keeps_scores(self):
+        """Test moving to the next landmark rescales without changing the decayed scores"""
+        index = create_index()
+        period = HOUR * LANDMARK_HALF_LIVES
+        index.record(1, weight=2 ** 20, at=period - HOUR)
+        index.record(2, weight=1, at=0)
+
+        before = dict(index.top(10, now=period - 1))
+        index.record(3, at=period + HOUR)
+        after = dict(index.top(10, now=period - 1 + HOUR * 2))
+
+        assert index.landmark == period
+        assert after[1] == pytest.approx(before[1] / 4, rel=1e-6)
+        # Decayed to 2 ** -32 at the landmark, dropped
+        assert 2 not in after
+        assert len(index) == 2
+
+    def test_max_topics(self):
+        """Test the lowest topics are dropped past max_topics"""
+        index = create_index(max_topics=2)
+        index.record(1, weight=3, at=0)
+        index.record(2, weight=1, at=0)
+        index.record(3, weight=2, at=0)
+
+        assert [topic_id for topic_id, _ in index.top(10, now=0)] == [1, 3]
+
+    def test_pending_and_load(self):
+        """Test a snapshot replaces the scores but keeps the increments not persisted"""
+        index = create_index()
+        index.record(1, at=0)
+        landmark, pending = index.take_pending()
+        assert pending == {1: pytest.approx(1)}
+
+        index.record(2, at=0)
+        index.load([(1, 5.0, landmark), (3, 2.0, landmark)], now=0)
+
+        assert dict(index.top(10, now=0)) == {1: pytest.approx(5), 3: pytest.approx(2), 2: pytest.approx(1)}
+
+    def test_return_pending(self):
+        """Test increments that failed to persist are taken again"""
+        index = create_index()
+        index.record(1, at=0)
+        landmark, pending = index.take_pending()
+        index.return_pending(landmark, pending)
+        index.record(1, at=0)
+
+        assert index.take_pending()[1] == {1: pytest.approx(2)}